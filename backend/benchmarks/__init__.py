@@ -0,0 +1,10 @@
+"""
+Benchmarks
+
+Standalone performance scripts, run from backend/:
+
+    python -m benchmarks.<name>
+
+They use the synthetic FIT encoder in tests/fit_builder.py so results are
+reproducible without private data.
+"""
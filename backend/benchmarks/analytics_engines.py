@@ -0,0 +1,176 @@
+"""
+Analytical queries: SQLite vs DuckDB
+
+Fills a SQLite database with synthetic years of daily metrics and
+3-minute stress samples, then runs the daily_metrics workloads (the
+correlation fetch, a monthly rollup) and a multi-year scan of the stress
+samples on the SQLite reader and on DuckDB; checks they agree and reports
+the best latency of several runs, plus the time DuckDB needs to see the
+data (attaching the SQLite file when its sqlite extension is installed,
+copying the tables into it otherwise).
+
+The app itself only uses SQLite: DuckDB is slower on the daily_metrics
+queries the endpoints run and only wins the large scan, which no endpoint
+does. Needs duckdb and pandas.
+
+    python -m benchmarks.analytics_engines [--years N] [--repeat N]
+"""
+
+import argparse
+import logging
+import math
+import sqlite3
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+from benchmarks.fit_decoder import best_of
+from db.connection import Database
+from db.daily_metrics import refresh_daily_metrics
+
+STRESS_SAMPLES_PER_DAY = 24 * 20
+
+WORKLOADS = [
+    ("correlation", """SELECT date, sleep_duration, resting_hr FROM daily_metrics
+        WHERE sleep_duration IS NOT NULL AND resting_hr IS NOT NULL ORDER BY date"""),
+    ("monthly rollup", """SELECT substr(date, 1, 7) AS month, AVG(sleep_duration), AVG(resting_hr),
+        AVG(hrv_value), AVG(avg_stress), SUM(step_count)
+        FROM daily_metrics GROUP BY month ORDER BY month"""),
+    ("stress scan", """SELECT substr(timestamp, 1, 10) AS day, AVG(stress_level), MAX(stress_level)
+        FROM stress_records GROUP BY day ORDER BY day"""),
+]
+
+
+def fill(connection, years):
+    """Insert `years` of daily rows and stress samples"""
+    start = date(2020, 1, 1)
+    days = [start + timedelta(days=i) for i in range(years * 365)]
+    daily = [(d.isoformat(), i) for i, d in enumerate(days)]
+    connection.executemany(
+        "INSERT INTO sleep_records (date, duration_minutes, sleep_score) VALUES (?, ?, ?)",
+        [(d, int(420 + 60 * math.sin(i / 7)), 70 + i % 30) for d, i in daily]
+    )
+    connection.executemany(
+        "INSERT INTO resting_hr (date, resting_hr) VALUES (?, ?)",
+        [(d, 50 + i % 12) for d, i in daily]
+    )
+    connection.executemany(
+        "INSERT INTO hrv_records (date, hrv_value) VALUES (?, ?)",
+        [(d, 40 + 20 * math.cos(i / 11)) for d, i in daily if i % 9]
+    )
+    connection.executemany(
+        "INSERT INTO daily_stress (date, avg_stress) VALUES (?, ?)",
+        [(d, 25 + i % 40) for d, i in daily]
+    )
+    connection.executemany(
+        "INSERT INTO daily_steps (date, step_count) VALUES (?, ?)",
+        [(d, 4000 + (i * 977) % 9000) for d, i in daily]
+    )
+
+    first = datetime.combine(start, datetime.min.time())
+    step = timedelta(minutes=3)
+    batch = STRESS_SAMPLES_PER_DAY * 30
+    for offset in range(0, len(days) * STRESS_SAMPLES_PER_DAY, batch):
+        connection.executemany(
+            "INSERT INTO stress_records (timestamp, stress_level) VALUES (?, ?)",
+            [((first + step * i).isoformat(sep=" "), (i * 37) % 100) for i in range(offset, offset + batch)]
+        )
+    refresh_daily_metrics(connection)
+    connection.commit()
+    return len(days)
+
+
+def duckdb_type(declared):
+    """DuckDB type for a SQLite declared type (dates stay strings, as in SQLite)"""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return "BIGINT"
+    if "BLOB" in declared:
+        return "BLOB"
+    if any(name in declared for name in ("REAL", "FLOA", "DOUB")):
+        return "DOUBLE"
+    return "VARCHAR"
+
+
+def open_duckdb(sqlite_path, duckdb_path):
+    """DuckDB over the SQLite tables, attached or copied; returns (connection, mode)"""
+    # Never fetch extensions over the network
+    config = {"autoinstall_known_extensions": False, "autoload_known_extensions": False}
+    attached = duckdb.connect(":memory:", config=config)
+    try:
+        attached.execute("LOAD sqlite")
+        attached.execute(f"ATTACH '{sqlite_path}' AS ingest (TYPE sqlite, READ_ONLY)")
+        attached.execute("USE ingest")
+        return attached, "attach"
+    except duckdb.Error:
+        attached.close()
+
+    target = duckdb.connect(duckdb_path, config=config)
+    source = sqlite3.connect(sqlite_path)
+    try:
+        for (table,) in source.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"):
+            columns = [(column, duckdb_type(declared)) for _, column, declared, *_ in
+                       source.execute(f"PRAGMA table_info({table})")]
+            if any(column_type == "BLOB" for _, column_type in columns):
+                continue
+            target.execute(f"CREATE TABLE {table} ({', '.join(f'{c} {t}' for c, t in columns)})")
+            cursor = source.execute(f"SELECT {', '.join(c for c, _ in columns)} FROM {table}")
+            while rows := cursor.fetchmany(50000):
+                target.register("chunk", pd.DataFrame.from_records(rows, columns=[c for c, _ in columns]))
+                target.execute(f"INSERT INTO {table} SELECT * FROM chunk")
+                target.unregister("chunk")
+    finally:
+        source.close()
+    return target, "copy"
+
+
+def same_rows(expected, actual):
+    """Equal rows, allowing for float sums added up in another order"""
+    return len(expected) == len(actual) and all(
+        len(a) == len(b) and all(
+            math.isclose(x, y, rel_tol=1e-9) if isinstance(x, float) else x == y for x, y in zip(a, b)
+        )
+        for a, b in zip(expected, actual)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Database(str(Path(tmpdir) / "bench.db"))
+        db.connect()
+        db.initialize_schema()
+        days = fill(db.connection, args.years)
+
+        started = time.perf_counter()
+        analytics, mode = open_duckdb(db.db_path, str(Path(tmpdir) / "bench.duckdb"))
+        build_s = time.perf_counter() - started
+        print(f"{days} days, {days * STRESS_SAMPLES_PER_DAY} stress samples")
+        print(f"DuckDB {mode}: ready in {build_s * 1000:.0f} ms")
+        print()
+
+        print(f"{'workload':<16}{'sqlite ms':>11}{'duckdb ms':>11}{'speedup':>9}")
+        try:
+            with db.read() as reader:
+                for label, sql in WORKLOADS:
+                    assert same_rows(reader.execute(sql).fetchall(), analytics.execute(sql).fetchall()), \
+                        f"results differ for {label}"
+                    sqlite_s = best_of(args.repeat, lambda: reader.execute(sql).fetchall())
+                    duckdb_s = best_of(args.repeat, lambda: analytics.execute(sql).fetchall())
+                    print(f"{label:<16}{sqlite_s * 1000:>11.2f}{duckdb_s * 1000:>11.2f}{sqlite_s / duckdb_s:>8.1f}x")
+        finally:
+            analytics.close()
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Field mapping: walking every alias list vs compiled mapping plans
+
+Maps a synthetic year of already decoded UDS and sleep records by walking
+every name variant per record (the mappers before compiled plans), with
+a compiled plan into dicts, and with a plan straight into row tuples;
+checks they agree and reports the best per-record cost of several runs.
+
+    python -m benchmarks.field_mappings [--days N] [--repeat N]
+"""
+
+import argparse
+import logging
+
+from benchmarks.fit_decoder import best_of
+from ingestion.field_mappings import (
+    DAILY_SUMMARY_FIELD_MAPPINGS,
+    SLEEP_FIELD_MAPPINGS,
+    clear_mapping_plans,
+    get_field_value,
+    map_record_rows,
+    map_records,
+    mapping_plan_stats
+)
+
+
+def walk_aliases(record, field_mappings):
+    """The per-record mapping every map_*_record() did before compiled plans"""
+    mapped = {}
+    for db_field, json_fields in field_mappings.items():
+        value = get_field_value(record, json_fields)
+        if value is not None:
+            mapped[db_field] = value
+    return mapped
+
+
+def main():
+    from benchmarks.json_decoder import sleep_night, uds_day
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    clear_mapping_plans()
+
+    corpus = [
+        ("daily_summaries", DAILY_SUMMARY_FIELD_MAPPINGS, uds_day),
+        ("sleep", SLEEP_FIELD_MAPPINGS, sleep_night),
+    ]
+
+    print(f"{'records':<18}{'mapping':<14}{'us/record':>11}{'speedup':>9}")
+    for name, mappings, build in corpus:
+        records = [build(day) for day in range(args.days)]
+        expected = [walk_aliases(record, mappings) for record in records]
+        assert list(map_records(records, mappings)) == expected, f"mapped values differ for {name}"
+        assert [dict((c, v) for c, v in zip(mappings, row) if v is not None)
+                for row in map_record_rows(records, mappings)] == expected, f"rows differ for {name}"
+
+        runs = [
+            ("alias walk", lambda: [walk_aliases(record, mappings) for record in records]),
+            ("plan -> dict", lambda: list(map_records(records, mappings))),
+            ("plan -> row", lambda: list(map_record_rows(records, mappings))),
+        ]
+        baseline_s = None
+        for label, fn in runs:
+            seconds = best_of(args.repeat, fn)
+            baseline_s = baseline_s or seconds
+            speedup = f"{baseline_s / seconds:>8.1f}x" if seconds != baseline_s else ""
+            print(f"{name if label == 'alias walk' else '':<18}{label:<14}{seconds / args.days * 1e6:>11.2f}{speedup:>9}")
+
+    print()
+    print(f"plan cache: {mapping_plan_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Native FIT decoder vs fitparse
+
+Decodes a fixed synthetic corpus with both decoders, checks that they
+return identical values, and reports the best of several runs.
+
+    python -m benchmarks.fit_decoder [--repeat N]
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime
+
+from ingestion.fit_decoder import NATIVE_MESSAGE_TYPES, iter_native_fit_messages
+from ingestion.fit_folder import iter_fit_messages, parse_fit_file
+from tests.fit_builder import build_fit_bytes, sample_activity_messages, sample_monitoring_messages
+
+START = datetime(2024, 1, 15, 7, 0)
+
+
+def build_corpus():
+    """name -> FIT bytes; the same every run"""
+    return {
+        "activity_1h": build_fit_bytes(sample_activity_messages(START, seconds=3600)),
+        "activity_1h_compressed_ts": build_fit_bytes(
+            sample_activity_messages(START, seconds=3600), compressed_timestamps=True
+        ),
+        "monitoring_1d_1min": build_fit_bytes(sample_monitoring_messages(START, intervals=1440)),
+    }
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'file':<28}{'messages':>10}{'fitparse s':>12}{'native s':>10}{'speedup':>9}")
+    for name, data in build_corpus().items():
+        expected = list(iter_fit_messages(data, NATIVE_MESSAGE_TYPES))
+        actual = list(iter_native_fit_messages(data, NATIVE_MESSAGE_TYPES))
+        assert actual == expected, f"decoded values differ for {name}"
+
+        fitparse_s = best_of(args.repeat, lambda: list(iter_fit_messages(data, NATIVE_MESSAGE_TYPES)))
+        native_s = best_of(args.repeat, lambda: list(iter_native_fit_messages(data, NATIVE_MESSAGE_TYPES)))
+        print(f"{name:<28}{len(expected):>10}{fitparse_s:>12.3f}{native_s:>10.3f}{fitparse_s / native_s:>8.1f}x")
+
+    print()
+    print("parse_fit_file (includes hashing and the fitparse pass for other types)")
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, data in build_corpus().items():
+            path = Path(tmpdir) / f"{name}.fit"
+            path.write_bytes(data)
+            fitparse_s = best_of(args.repeat, lambda: parse_fit_file(str(path), native=False))
+            native_s = best_of(args.repeat, lambda: parse_fit_file(str(path), native=True))
+            print(f"{name:<28}{'':>10}{fitparse_s:>12.3f}{native_s:>10.3f}{fitparse_s / native_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
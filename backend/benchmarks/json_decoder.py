@@ -0,0 +1,100 @@
+"""
+Sleep and daily summary JSON decoding: stdlib vs the fast backends
+
+Decodes and maps a synthetic year of UDS and sleep records the way the
+importer did before json_decoder.py (json.loads + walking every alias
+list) and with each available RecordDecoder backend, checks that they map
+identical values, and reports the best per-record cost of several runs.
+
+    python -m benchmarks.json_decoder [--days N] [--repeat N]
+"""
+
+import argparse
+import json
+import logging
+from datetime import date, timedelta
+
+import ingestion.json_decoder as json_decoder
+from benchmarks.field_mappings import walk_aliases
+from benchmarks.fit_decoder import best_of
+from ingestion.field_mappings import DAILY_SUMMARY_FIELD_MAPPINGS, SLEEP_FIELD_MAPPINGS
+from ingestion.json_decoder import RecordDecoder
+
+START = date(2023, 1, 1)
+
+
+def uds_day(day: int) -> dict:
+    """One UDS record, padded with unmapped keys like real exports"""
+    record = {
+        "calendarDate": (START + timedelta(days=day)).isoformat(),
+        "totalSteps": 8000 + day,
+        "totalKilocalories": 2300.0 + day,
+        "totalDistanceMeters": 6400 + day,
+        "floorsAscended": 9,
+        "restingHeartRate": 52,
+        "minHeartRate": 45,
+        "maxHeartRate": 160,
+        "averageStressLevel": 31,
+        "maxStressLevel": 90,
+        "bodyBatteryChargedValue": 60,
+        "bodyBatteryDrainedValue": 58,
+        "moderateIntensityMinutes": 20,
+        "vigorousIntensityMinutes": 5,
+    }
+    for i in range(60):
+        record[f"unmappedMetric{i}"] = {"value": i, "samples": [day, i, day * i]}
+    return record
+
+
+def sleep_night(day: int) -> dict:
+    start = f"{(START + timedelta(days=day)).isoformat()}T22:30:00.0"
+    return {
+        "calendarDate": (START + timedelta(days=day + 1)).isoformat(),
+        "sleepStartTimestampGMT": start,
+        "sleepEndTimestampGMT": start,
+        "deepSleepSeconds": 5400,
+        "lightSleepSeconds": 14400,
+        "remSleepSeconds": 6000,
+        "awakeSleepSeconds": 600,
+        "averageRespiration": 14.5,
+        "avgSleepHeartRate": 51,
+        "sleepLevels": [{"startGMT": start, "activityLevel": i % 3} for i in range(40)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    backends = ["json"] + [
+        name for name, module in (("orjson", json_decoder.orjson), ("msgspec", json_decoder.msgspec))
+        if module is not None
+    ]
+    corpus = [
+        ("daily_summaries", DAILY_SUMMARY_FIELD_MAPPINGS, uds_day),
+        ("sleep", SLEEP_FIELD_MAPPINGS, sleep_night),
+    ]
+
+    print(f"{'records':<18}{'decoder':<10}{'us/record':>11}{'speedup':>9}")
+    for name, mappings, build in corpus:
+        data = json.dumps([build(day) for day in range(args.days)]).encode()
+
+        def baseline():
+            return [walk_aliases(item, mappings) for item in json.loads(data)]
+
+        expected = baseline()
+        baseline_s = best_of(args.repeat, baseline)
+        print(f"{name:<18}{'before':<10}{baseline_s / args.days * 1e6:>11.2f}{'':>9}")
+
+        for backend in backends:
+            decoder = RecordDecoder(f"Bench_{name}_{backend}", mappings, backend=backend)
+            assert list(decoder.iter_mapped(data)) == expected, f"mapped values differ for {name}/{backend}"
+            fast_s = best_of(args.repeat, lambda: list(decoder.iter_mapped(data)))
+            print(f"{'':<18}{backend:<10}{fast_s / args.days * 1e6:>11.2f}{baseline_s / fast_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+SQLite performance profiles: insert throughput and query latency
+
+Writes a synthetic run of stress samples (one every 3 minutes, committed
+in batches the way the importers commit files) into a fresh database
+under each profile in db/connection.py, then times a per-day average over
+a month of them, the kind of range query the dashboard runs.
+
+    python -m benchmarks.sqlite_profiles [--days N] [--batch N] [--repeat N]
+"""
+
+import argparse
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.fit_decoder import best_of
+from db.connection import PERFORMANCE_PROFILES, Database
+
+SAMPLES_PER_DAY = 24 * 20
+
+INSERT_SQL = "INSERT INTO stress_records (timestamp, stress_level, source_file_hash) VALUES (?, ?, ?)"
+
+QUERY_SQL = """SELECT date(timestamp) AS day, AVG(stress_level)
+   FROM stress_records WHERE timestamp >= ? AND timestamp < ?
+   GROUP BY day ORDER BY day"""
+
+
+def stress_rows(days):
+    start = datetime(2024, 1, 1)
+    step = timedelta(minutes=3)
+    return [
+        ((start + step * i).isoformat(sep=" "), (i * 37) % 100, f"file{i // SAMPLES_PER_DAY}")
+        for i in range(days * SAMPLES_PER_DAY)
+    ]
+
+
+def run_profile(profile, rows, batch, repeat):
+    """(rows per second, ms per query) for one profile on a fresh database"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        best_insert = float("inf")
+        for attempt in range(repeat):
+            db = Database(str(Path(tmpdir) / f"bench{attempt}.db"), profile=profile)
+            connection = db.connect()
+            db.initialize_schema()
+
+            def insert():
+                for offset in range(0, len(rows), batch):
+                    connection.executemany(INSERT_SQL, rows[offset:offset + batch])
+                    connection.commit()
+
+            best_insert = min(best_insert, best_of(1, insert))
+            if attempt < repeat - 1:
+                db.close()
+
+        query_s = best_of(repeat, lambda: connection.execute(
+            QUERY_SQL, ("2024-01-01", "2024-01-31")
+        ).fetchall())
+        db.close()
+
+    return len(rows) / best_insert, query_s * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--batch", type=int, default=SAMPLES_PER_DAY, help="rows per commit")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    rows = stress_rows(args.days)
+    print(f"{len(rows)} rows, {args.batch} per commit")
+    print(f"{'profile':<14}{'rows/s':>12}{'query ms':>10}{'speedup':>9}")
+    baseline = None
+    for profile in ("safe", "interactive", "bulk-import"):
+        assert profile in PERFORMANCE_PROFILES
+        rows_per_second, query_ms = run_profile(profile, rows, args.batch, args.repeat)
+        baseline = baseline or rows_per_second
+        print(f"{profile:<14}{rows_per_second:>12,.0f}{query_ms:>10.2f}{rows_per_second / baseline:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Bulk Writer
+
+Buffers rows per target statement and flushes them with executemany() inside
+one transaction that can span many imported files, instead of one execute()
+round trip per row and one commit per file.
+
+Usage:
+    writer = BulkWriter(db_connection)
+    writer.add(INSERT_SQL, row)
+    ...
+    writer.commit()   # flush all buffers, then commit
+"""
+
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class BulkWriter:
+    """Per-statement row buffers flushed with executemany()"""
+
+    def __init__(self, db_connection, max_buffered_rows: int = 50000):
+        """
+        Args:
+            db_connection: Database connection (the single writer)
+            max_buffered_rows: Flush automatically once this many rows are
+                buffered across all statements. Flushing does not commit.
+        """
+        self.connection = db_connection
+        self.max_buffered_rows = max_buffered_rows
+
+        # Insertion-ordered: statements are flushed in the order first seen
+        self._buffers: Dict[str, List[Sequence[Any]]] = {}
+        self._buffered_rows = 0
+        self._pending_keys = set()
+
+        self.rows_written = 0
+        self.flush_seconds = 0.0
+        self.commits = 0
+
+    def add(self, sql: str, row: Sequence[Any]):
+        """Buffer one row for sql"""
+        self._buffers.setdefault(sql, []).append(row)
+        self._buffered_rows += 1
+        if self._buffered_rows >= self.max_buffered_rows:
+            self.flush()
+
+    def add_many(self, sql: str, rows: Iterable[Sequence[Any]]):
+        """Buffer several rows for sql"""
+        buffer = self._buffers.setdefault(sql, [])
+        before = len(buffer)
+        buffer.extend(rows)
+        self._buffered_rows += len(buffer) - before
+        if self._buffered_rows >= self.max_buffered_rows:
+            self.flush()
+
+    def add_pending_key(self, key: Any):
+        """Remember a key (e.g. file hash) written in the current transaction"""
+        self._pending_keys.add(key)
+
+    def is_pending(self, key: Any) -> bool:
+        """True if key was added since the last commit/rollback"""
+        return key in self._pending_keys
+
+    @property
+    def buffered_rows(self) -> int:
+        return self._buffered_rows
+
+    def flush(self):
+        """Execute all buffered rows with executemany (no commit)"""
+        if not self._buffered_rows:
+            return
+
+        started = time.perf_counter()
+        for sql, rows in self._buffers.items():
+            if rows:
+                self.connection.executemany(sql, rows)
+                self.rows_written += len(rows)
+        self.flush_seconds += time.perf_counter() - started
+
+        self._buffers = {}
+        self._buffered_rows = 0
+
+    def commit(self):
+        """Flush buffers and commit the transaction"""
+        self.flush()
+        self.connection.commit()
+        self._pending_keys.clear()
+        self.commits += 1
+
+    def rollback(self):
+        """Drop buffered rows and roll back the transaction"""
+        self._buffers = {}
+        self._buffered_rows = 0
+        self._pending_keys.clear()
+        try:
+            self.connection.rollback()
+        except Exception:
+            pass  # Rollback may not be available in DuckDB
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows written per second of executemany time"""
+        if self.flush_seconds <= 0:
+            return 0.0
+        return self.rows_written / self.flush_seconds
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
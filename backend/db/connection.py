@@ -2,33 +2,168 @@
 Database Connection Manager
 
 Handles initialization and connections to the local database.
-Use DuckDB or SQLite based on preference.
+
+SQLite is the store: imports write to it and the API reads from it.
+
+SQLite allows one writer at a time, so a Database has a single writer
+connection (Database.connection), used through write() by one thread at a
+time, and a read-only connection per thread that calls read(). In WAL
+mode readers see the last committed state while a write is in progress,
+so dashboard queries run in parallel with an import instead of queuing
+behind it.
+
+Usage:
+    db = get_db()
+    with db.read() as conn:
+        rows = conn.execute("SELECT ...").fetchall()
+    with db.write() as conn:
+        conn.execute("INSERT ...")  # committed on exit, rolled back on error
 """
 
 import os
+import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
 import logging
 
+from db.daily_metrics import ensure_daily_metrics, prepare_daily_metrics
+
 logger = logging.getLogger(__name__)
 
-# Choose your database backend
-USE_DUCKDB = False  # Set to True to use DuckDB (has schema issues with foreign keys currently)
+# SQLite PRAGMA settings per named performance profile, applied in this
+# order. page_size only takes effect on a database with no tables yet;
+# journal_mode and synchronous can't change inside a transaction, so they
+# are left as they are (with a warning) while one is open.
+#
+# - safe: SQLite's own defaults (rollback journal, fsync on every commit)
+# - interactive: WAL, so dashboard reads don't wait on writes, with a
+#   64 MB page cache and 256 MB of memory-mapped reads
+# - bulk-import: WAL without fsync and a 256 MB cache. A power loss can
+#   lose (or, in rare cases, corrupt) the newest writes, so it is only
+#   switched on for the length of an import, which checkpoints its progress
+PERFORMANCE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "safe": {
+        "page_size": 4096,
+        "journal_mode": "delete",
+        "synchronous": 2,  # FULL
+        "cache_size": -2000,  # KiB
+        "mmap_size": 0,
+        "temp_store": 0,  # DEFAULT
+    },
+    "interactive": {
+        "page_size": 4096,
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "cache_size": -64 * 1024,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": 2,  # MEMORY
+    },
+    "bulk-import": {
+        "page_size": 4096,
+        "journal_mode": "wal",
+        "synchronous": 0,  # OFF
+        "cache_size": -256 * 1024,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": 2,
+    },
+}
+
+DEFAULT_PROFILE = "interactive"
+
+_TRANSACTION_BOUND = ("journal_mode", "synchronous")
+
+# Profile settings a read-only connection can apply for itself
+_READER_PRAGMAS = ("cache_size", "mmap_size", "temp_store")
+
+# Columns added to existing tables since they were first released, which
+# CREATE TABLE IF NOT EXISTS doesn't add to an older database
+_ADDED_COLUMNS = (
+    ("daily_steps", "source_recorded_at", "TIMESTAMP"),
+)
+
+
+def _read_pragmas(connection, names) -> Dict[str, Any]:
+    values = {}
+    for name in names:
+        value = connection.execute(f"PRAGMA {name}").fetchone()[0]
+        values[name] = value.lower() if isinstance(value, str) else value
+    return values
+
+
+def _set_pragmas(connection, settings: Dict[str, Any]):
+    """Set the PRAGMAs in settings that differ from the connection's"""
+    current = _read_pragmas(connection, settings)
+    for name, value in settings.items():
+        if current[name] == value:
+            continue
+        if name == "page_size" and connection.execute("PRAGMA page_count").fetchone()[0]:
+            continue  # Fixed once the database has pages (short of a VACUUM)
+        if name in _TRANSACTION_BOUND and connection.in_transaction:
+            logger.warning(f"Not setting PRAGMA {name} = {value} inside a transaction")
+            continue
+        try:
+            connection.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Could not set PRAGMA {name} = {value}: {e}")
+
+
+def apply_profile(connection, profile: str) -> Dict[str, Any]:
+    """
+    Switch a SQLite connection to a named performance profile
+
+    Args:
+        connection: sqlite3 connection
+        profile: PERFORMANCE_PROFILES key
+
+    Returns:
+        The settings it replaced, for restore_profile()
+
+    Raises:
+        ValueError: If the profile doesn't exist
+    """
+    if profile not in PERFORMANCE_PROFILES:
+        raise ValueError(f"Unknown performance profile: {profile}")
+    settings = PERFORMANCE_PROFILES[profile]
+    previous = _read_pragmas(connection, settings)
+    _set_pragmas(connection, settings)
+    logger.debug(f"Applied SQLite performance profile: {profile}")
+    return previous
 
-if USE_DUCKDB:
-    import duckdb
-else:
-    import sqlite3
+
+def restore_profile(connection, previous: Dict[str, Any]):
+    """Put back the settings apply_profile() returned"""
+    if previous:
+        _set_pragmas(connection, {name: value for name, value in previous.items() if name != "page_size"})
+
+
+@contextmanager
+def performance_profile(connection, profile: str) -> Iterator[None]:
+    """
+    Run a block under a performance profile, then restore the previous one
+
+    Usage:
+        with performance_profile(db_connection, "bulk-import"):
+            ...
+    """
+    previous = apply_profile(connection, profile)
+    try:
+        yield
+    finally:
+        restore_profile(connection, previous)
 
 
 class Database:
     """Database connection manager"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, profile: str = DEFAULT_PROFILE):
         """
         Initialize database connection
 
         Args:
             db_path: Path to database file. If None, uses default location.
+            profile: PERFORMANCE_PROFILES key applied on connect()
         """
         if db_path is None:
             # Default to user's home directory
@@ -41,21 +176,80 @@ class Database:
             db_file_path.parent.mkdir(parents=True, exist_ok=True)
 
         self.db_path = db_path
+        self.profile = profile
         self.connection = None
 
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers: List[Any] = []
+        self._readers_lock = threading.Lock()
+
         logger.info(f"Database path: {self.db_path}")
 
-    def connect(self):
-        """Establish database connection"""
-        if USE_DUCKDB:
-            self.connection = duckdb.connect(self.db_path)
-            logger.info("Connected to DuckDB")
-        else:
-            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
-            logger.info("Connected to SQLite")
+    def connect(self, profile: Optional[str] = None):
+        """
+        Establish database connection
+
+        Args:
+            profile: Performance profile to use instead of self.profile
+        """
+        self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.profile = profile or self.profile
+        apply_profile(self.connection, self.profile)
+        logger.info(f"Connected to SQLite ({self.profile} profile)")
 
         return self.connection
 
+    def use_profile(self, profile: str):
+        """Switch the open connection to another performance profile"""
+        apply_profile(self.connection, profile)
+        self.profile = profile
+
+    @contextmanager
+    def write(self) -> Iterator[Any]:
+        """
+        Exclusive use of the writer connection
+
+        Commits when the block ends and rolls back if it raises. Only one
+        thread writes at a time; the others wait here rather than on
+        SQLite's file lock.
+        """
+        with self._write_lock:
+            if self.connection is None:
+                self.connect()
+            try:
+                yield self.connection
+                self.connection.commit()
+            except BaseException:
+                self.connection.rollback()
+                raise
+
+    @contextmanager
+    def read(self) -> Iterator[Any]:
+        """
+        This thread's read-only connection
+
+        Opened on first use and kept for the thread's later reads, so a
+        pool of request threads ends up with one reader each.
+        """
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            reader = self._open_reader()
+        yield reader
+
+    def _open_reader(self):
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        # Used only by the thread that opened it, but closed by close()
+        reader = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        settings = PERFORMANCE_PROFILES[self.profile]
+        _set_pragmas(reader, {name: settings[name] for name in _READER_PRAGMAS})
+
+        self._local.reader = reader
+        with self._readers_lock:
+            self._readers.append(reader)
+        logger.debug(f"Opened reader connection for thread {threading.current_thread().name}")
+        return reader
+
     def initialize_schema(self):
         """
         Initialize database schema from schema.sql
@@ -76,20 +270,34 @@ class Database:
             schema_sql = f.read()
 
         try:
-            if USE_DUCKDB:
-                # DuckDB can execute multiple statements at once
-                self.connection.execute(schema_sql)
-            else:
-                # SQLite needs executescript for multiple statements
-                self.connection.executescript(schema_sql)
+            # daily_metrics used to be a view; schema.sql now creates a table
+            rebuild_metrics = prepare_daily_metrics(self.connection)
+
+            # SQLite needs executescript for multiple statements
+            self.connection.executescript(schema_sql)
+            self._add_missing_columns()
+            ensure_daily_metrics(self.connection, rebuild=rebuild_metrics)
 
             logger.info("Schema initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize schema: {e}")
             raise
 
+    def _add_missing_columns(self):
+        for table, column, declared in _ADDED_COLUMNS:
+            columns = {row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declared}")
+                logger.info(f"Added column {table}.{column}")
+
     def close(self):
-        """Close database connection"""
+        """Close the writer and every reader connection"""
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+            self._local = threading.local()
+        for reader in readers:
+            reader.close()
+
         if self.connection:
             self.connection.close()
             logger.info("Database connection closed")
@@ -97,6 +305,7 @@ class Database:
 
 # Global database instance
 _db_instance = None
+_db_instance_lock = threading.Lock()
 
 
 def get_db() -> Database:
@@ -108,9 +317,11 @@ def get_db() -> Database:
     """
     global _db_instance
 
-    if _db_instance is None:
-        _db_instance = Database()
-        _db_instance.connect()
-        _db_instance.initialize_schema()
+    with _db_instance_lock:
+        if _db_instance is None:
+            db = Database()
+            db.connect()
+            db.initialize_schema()
+            _db_instance = db
 
     return _db_instance
@@ -0,0 +1,207 @@
+"""
+Daily Metrics Table
+
+Maintains daily_metrics: one row per calendar day holding every daily
+metric (sleep, resting HR, HRV, stress, steps, daily summary fields), so
+correlation and heatmap queries read one narrow table keyed by date
+instead of joining seven.
+
+Triggers on the source tables, created here from DAILY_METRIC_SOURCES,
+record each date an insert, update or delete touches in
+daily_metrics_dirty. refresh_daily_metrics()
+recomputes just those dates and fills in the date spine around them, so
+an import only pays for the days it wrote. Importers call it before their
+final commit, so the table commits with the data it summarizes.
+
+Where two sources have the same metric, the dedicated table wins over the
+UDS daily summary (resting_hr over resting_heart_rate, daily_steps over
+step_count, ...), and sleep_records over sleep_detailed.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DAILY_METRIC_SOURCES = (
+    "sleep_records",
+    "sleep_detailed",
+    "resting_hr",
+    "hrv_records",
+    "daily_stress",
+    "daily_steps",
+    "daily_summaries",
+)
+
+# daily_metrics column -> expression over the source tables joined on date
+DAILY_METRIC_EXPRESSIONS = {
+    "sleep_duration": "COALESCE(s.duration_minutes, NULLIF((COALESCE(sd.deep_sleep_seconds, 0)"
+                      " + COALESCE(sd.light_sleep_seconds, 0) + COALESCE(sd.rem_sleep_seconds, 0)) / 60, 0))",
+    "sleep_score": "s.sleep_score",
+    "deep_sleep_minutes": "COALESCE(s.deep_sleep_minutes, sd.deep_sleep_seconds / 60)",
+    "light_sleep_minutes": "COALESCE(s.light_sleep_minutes, sd.light_sleep_seconds / 60)",
+    "rem_sleep_minutes": "COALESCE(s.rem_sleep_minutes, sd.rem_sleep_seconds / 60)",
+    "awake_minutes": "COALESCE(s.awake_minutes, sd.awake_sleep_seconds / 60)",
+    "avg_sleep_hr": "sd.average_sleep_hr",
+    "avg_respiration": "sd.average_respiration",
+    "avg_spo2": "sd.average_spo2",
+    "resting_hr": "COALESCE(rhr.resting_hr, ds.resting_heart_rate)",
+    "min_heart_rate": "ds.min_heart_rate",
+    "max_heart_rate": "ds.max_heart_rate",
+    "hrv_value": "hrv.hrv_value",
+    "avg_stress": "COALESCE(st.avg_stress, ds.stress_avg)",
+    "max_stress": "COALESCE(st.max_stress, ds.stress_max)",
+    "min_stress": "COALESCE(st.min_stress, ds.stress_min)",
+    "step_count": "COALESCE(steps.step_count, ds.step_count)",
+    "distance_meters": "COALESCE(steps.distance_meters, ds.distance_meters)",
+    "calories": "COALESCE(steps.calories, ds.calories_burned)",
+    "floors_climbed": "ds.floors_climbed",
+    "active_minutes": "ds.active_minutes",
+    "intensity_minutes_moderate": "ds.intensity_minutes_moderate",
+    "intensity_minutes_vigorous": "ds.intensity_minutes_vigorous",
+    "body_battery_charged": "ds.body_battery_charged",
+    "body_battery_drained": "ds.body_battery_drained",
+}
+
+DAILY_METRIC_COLUMNS = tuple(DAILY_METRIC_EXPRESSIONS)
+
+# "WHERE true" keeps SQLite from reading ON CONFLICT as part of the join
+_REFRESH_SQL = f"""INSERT INTO daily_metrics (date, {", ".join(DAILY_METRIC_COLUMNS)}, updated_at)
+SELECT d.date, {", ".join(DAILY_METRIC_EXPRESSIONS.values())}, CURRENT_TIMESTAMP
+FROM daily_metrics_dirty d
+LEFT JOIN sleep_records s ON s.date = d.date
+LEFT JOIN sleep_detailed sd ON sd.date = d.date
+LEFT JOIN resting_hr rhr ON rhr.date = d.date
+LEFT JOIN hrv_records hrv ON hrv.date = d.date
+LEFT JOIN daily_stress st ON st.date = d.date
+LEFT JOIN daily_steps steps ON steps.date = d.date
+LEFT JOIN daily_summaries ds ON ds.date = d.date
+WHERE true
+ON CONFLICT (date) DO UPDATE SET
+{", ".join(f"{column} = excluded.{column}" for column in DAILY_METRIC_COLUMNS)},
+updated_at = excluded.updated_at"""
+
+# Marks a date dirty. Checks for it instead of using INSERT OR IGNORE: an
+# upsert's conflict handling would override the OR IGNORE of the triggers
+# it fires.
+_MARK_DIRTY_SQL = """    INSERT INTO daily_metrics_dirty (date) SELECT {row}.date
+    WHERE NOT EXISTS (SELECT 1 FROM daily_metrics_dirty WHERE date = {row}.date);"""
+
+# Trigger event -> rows whose dates it marks dirty
+_TRIGGER_ROWS = {
+    "insert": ("NEW",),
+    "update": ("OLD", "NEW"),
+    "delete": ("OLD",),
+}
+
+
+def _trigger_sql(table: str, event: str) -> str:
+    marks = "\n".join(_MARK_DIRTY_SQL.format(row=row) for row in _TRIGGER_ROWS[event])
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {table}_daily_metrics_{event} AFTER {event.upper()} ON {table}\n"
+        f"BEGIN\n{marks}\nEND"
+    )
+
+
+_TRIGGER_SQL = [_trigger_sql(table, event) for table in DAILY_METRIC_SOURCES for event in _TRIGGER_ROWS]
+
+_SPINE_SQL = """INSERT OR IGNORE INTO daily_metrics (date)
+WITH RECURSIVE spine(date) AS (
+    SELECT date(?)
+    UNION ALL
+    SELECT date(date, '+1 day') FROM spine WHERE date < date(?)
+)
+SELECT date FROM spine"""
+
+
+def _spine_bounds(db_connection) -> Tuple[Optional[str], Optional[str]]:
+    return db_connection.execute(
+        "SELECT MIN(date), MAX(date) FROM daily_metrics WHERE date(date) IS NOT NULL"
+    ).fetchone()
+
+
+def refresh_daily_metrics(db_connection) -> int:
+    """
+    Recompute daily_metrics for the dates written since the last refresh
+
+    Rows are upserted for each dirty date, and any days between the old
+    and new ends of the date spine are added as empty rows. Not committed
+    here: call it before the import's last commit.
+
+    Returns:
+        Number of dates recomputed
+    """
+    dirty = db_connection.execute("SELECT COUNT(*) FROM daily_metrics_dirty").fetchone()[0]
+    if not dirty:
+        return 0
+
+    first, last = _spine_bounds(db_connection)
+    db_connection.execute(_REFRESH_SQL)
+    db_connection.execute("DELETE FROM daily_metrics_dirty")
+
+    new_first, new_last = _spine_bounds(db_connection)
+    if first is None:
+        if new_first is not None:
+            db_connection.execute(_SPINE_SQL, (new_first, new_last))
+    else:
+        # Only the stretches the spine grew by can have gaps
+        if new_first < first:
+            db_connection.execute(_SPINE_SQL, (new_first, first))
+        if new_last > last:
+            db_connection.execute(_SPINE_SQL, (last, new_last))
+
+    logger.info(f"Refreshed daily metrics for {dirty} dates")
+    return dirty
+
+
+def rebuild_daily_metrics(db_connection) -> int:
+    """
+    Recompute daily_metrics for every date in the source tables
+
+    Used when the table is created on a database that already has data.
+    Not committed here.
+
+    Returns:
+        Number of dates recomputed
+    """
+    for table in DAILY_METRIC_SOURCES:
+        db_connection.execute(
+            f"INSERT OR IGNORE INTO daily_metrics_dirty (date) SELECT date FROM {table} WHERE date IS NOT NULL"
+        )
+    return refresh_daily_metrics(db_connection)
+
+
+def prepare_daily_metrics(db_connection) -> bool:
+    """
+    Replace the old daily_metrics view, before schema.sql creates the table
+
+    Returns:
+        True if the view was dropped, so the new table needs a rebuild
+    """
+    row = db_connection.execute(
+        "SELECT type FROM sqlite_master WHERE name = 'daily_metrics'"
+    ).fetchone()
+    if row is None or row[0] != "view":
+        return False
+    db_connection.execute("DROP VIEW daily_metrics")
+    logger.info("Replacing the daily_metrics view with a table")
+    return True
+
+
+def ensure_daily_metrics(db_connection, rebuild: bool = False) -> int:
+    """
+    Bring daily_metrics up to date after the schema is loaded
+
+    Creates the source table triggers that are missing, rebuilds the table
+    when asked to (after prepare_daily_metrics() dropped the view), and
+    picks up dates left dirty by an import that never got to refresh.
+    Committed.
+
+    Returns:
+        Number of dates recomputed
+    """
+    for sql in _TRIGGER_SQL:
+        db_connection.execute(sql)
+    refreshed = rebuild_daily_metrics(db_connection) if rebuild else refresh_daily_metrics(db_connection)
+    db_connection.commit()
+    return refreshed
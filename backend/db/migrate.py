@@ -1,23 +1,24 @@
 """
 Database Migration Runner
 
-Applies migrations to the Foldline database.
+Applies migrations to the Foldline database. That is the SQLite database
+the app reads and writes, so it is the default here too.
 """
 
 import os
 import logging
 from pathlib import Path
 from typing import Optional
-import duckdb
 import sqlite3
 
 logger = logging.getLogger(__name__)
 
 
-def get_db_connection(db_path: str, use_duckdb: bool = True):
-    """Get database connection (DuckDB or SQLite)"""
+def get_db_connection(db_path: str, use_duckdb: bool = False):
+    """Get database connection (SQLite, or DuckDB if asked for)"""
     if use_duckdb:
         try:
+            import duckdb
             conn = duckdb.connect(db_path)
             logger.info(f"Connected to DuckDB: {db_path}")
             return conn, "duckdb"
@@ -105,14 +106,14 @@ def apply_migration(conn, db_type: str, migration_file: Path):
         raise
 
 
-def run_migrations(db_path: str, migrations_dir: str, use_duckdb: bool = True):
+def run_migrations(db_path: str, migrations_dir: str, use_duckdb: bool = False):
     """
     Run all pending migrations
 
     Args:
         db_path: Path to database file
         migrations_dir: Directory containing migration files
-        use_duckdb: Whether to use DuckDB (fallback to SQLite if False)
+        use_duckdb: Open db_path as a DuckDB file instead of SQLite
     """
     logger.info("Starting database migration...")
 
@@ -168,7 +169,10 @@ if __name__ == "__main__":
     )
 
     # Default paths (can be overridden)
-    DB_PATH = os.environ.get("FOLDLINE_DB_PATH", "./foldline.db")
+    DB_PATH = os.environ.get(
+        "FOLDLINE_DB_PATH",
+        str(Path.home() / ".foldline" / "data" / "foldline.db")
+    )
     MIGRATIONS_DIR = os.path.join(
         os.path.dirname(__file__),
         "migrations"
@@ -178,4 +182,4 @@ if __name__ == "__main__":
     logger.info(f"Migrations directory: {MIGRATIONS_DIR}")
 
     # Run migrations
-    run_migrations(DB_PATH, MIGRATIONS_DIR, use_duckdb=True)
+    run_migrations(DB_PATH, MIGRATIONS_DIR)
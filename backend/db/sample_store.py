@@ -0,0 +1,232 @@
+"""
+Activity Sample Store
+
+Columnar storage for per-second activity streams (HR, speed, cadence, power,
+position, ...) taken from FIT `record` messages.
+
+Each stream is stored as one typed NumPy array serialized into a BLOB, one
+row per (activity, channel), so an activity's full stream is written with a
+single executemany() and read back with a single query - no FIT re-parsing.
+"""
+
+import logging
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from db.upserts import upsert_sql
+
+logger = logging.getLogger(__name__)
+
+SEMICIRCLES_TO_DEGREES = 180.0 / 2 ** 31
+
+# channel -> (dtype stored on disk, FIT record fields to read it from, in preference order)
+SAMPLE_CHANNELS = {
+    "heart_rate": ("<f4", ("heart_rate",)),
+    "cadence": ("<f4", ("cadence",)),
+    "speed": ("<f4", ("enhanced_speed", "speed")),
+    "power": ("<f4", ("power",)),
+    "distance": ("<f8", ("distance",)),
+    "altitude": ("<f4", ("enhanced_altitude", "altitude")),
+    "temperature": ("<f4", ("temperature",)),
+    "position_lat": ("<f8", ("position_lat",)),
+    "position_long": ("<f8", ("position_long",)),
+}
+
+TIMESTAMP_CHANNEL = "timestamp"
+TIMESTAMP_DTYPE = "<i8"  # Unix epoch seconds (UTC)
+
+_POSITION_CHANNELS = ("position_lat", "position_long")
+
+
+def _to_epoch_seconds(value: Any) -> Optional[int]:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    return None
+
+
+class SampleColumnsBuilder:
+    """
+    Accumulates FIT record dicts into per-channel columns
+
+    Values are buffered in compact `array` buffers as records stream in, so
+    a multi-hour activity never holds a list of per-second dicts. Missing
+    values are stored as NaN.
+    """
+
+    def __init__(self):
+        self._timestamps = array("q")
+        self._columns = {channel: array("d") for channel in SAMPLE_CHANNELS}
+        self._seen = set()
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def append(self, record: Dict[str, Any]):
+        """Add one FIT `record` message (records without a timestamp are ignored)"""
+        timestamp = _to_epoch_seconds(record.get("timestamp"))
+        if timestamp is None:
+            return
+
+        self._timestamps.append(timestamp)
+        for channel, (_, fields) in SAMPLE_CHANNELS.items():
+            value = None
+            for field in fields:
+                value = record.get(field)
+                if value is not None:
+                    break
+
+            if isinstance(value, (int, float)):
+                if channel in _POSITION_CHANNELS:
+                    value = value * SEMICIRCLES_TO_DEGREES
+                self._columns[channel].append(float(value))
+                self._seen.add(channel)
+            else:
+                self._columns[channel].append(float("nan"))
+
+    def finish(self) -> Dict[str, np.ndarray]:
+        """
+        Return the typed columns, dropping channels that never had a value
+
+        Returns:
+            {channel: ndarray} including the "timestamp" channel, or an empty
+            dict if no records were appended
+        """
+        if not self._timestamps:
+            return {}
+
+        columns = {TIMESTAMP_CHANNEL: np.frombuffer(self._timestamps, dtype=np.int64).astype(TIMESTAMP_DTYPE)}
+        for channel, (dtype, _) in SAMPLE_CHANNELS.items():
+            if channel in self._seen:
+                columns[channel] = np.frombuffer(self._columns[channel], dtype=np.float64).astype(dtype)
+        return columns
+
+
+def build_sample_columns(records: Iterable[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Build typed sample columns from a stream of FIT record dicts"""
+    builder = SampleColumnsBuilder()
+    for record in records:
+        builder.append(record)
+    return builder.finish()
+
+
+def slice_samples(samples: Dict[str, np.ndarray], start: Any, end: Any) -> Dict[str, np.ndarray]:
+    """
+    Select the samples whose timestamp falls within [start, end]
+
+    Used to split a multi-session file's streams between its sessions.
+    """
+    if not samples:
+        return {}
+
+    timestamps = samples[TIMESTAMP_CHANNEL]
+    start_s = _to_epoch_seconds(start)
+    end_s = _to_epoch_seconds(end)
+    lo = 0 if start_s is None else int(np.searchsorted(timestamps, start_s, side="left"))
+    hi = len(timestamps) if end_s is None else int(np.searchsorted(timestamps, end_s, side="right"))
+    return {channel: values[lo:hi] for channel, values in samples.items()}
+
+
+ACTIVITY_SAMPLES_INSERT_SQL = upsert_sql(
+    "activity_samples",
+    ("activity_id", "channel", "dtype", "sample_count", "data", "source_file_hash"),
+    ("activity_id", "channel")
+)
+
+
+def activity_sample_rows(
+    activity_samples: Iterable[Tuple[int, Dict[str, np.ndarray]]],
+    source_file_hash: Optional[str] = None
+) -> List[Tuple]:
+    """
+    Serialize sample streams into activity_samples rows
+
+    Args:
+        activity_samples: (activity_id, {channel: ndarray}) pairs
+        source_file_hash: File the samples were parsed from
+
+    Returns:
+        Rows for ACTIVITY_SAMPLES_INSERT_SQL, one per (activity, channel)
+    """
+    rows = []
+
+    for activity_id, samples in activity_samples:
+        if not samples:
+            continue
+        sample_count = len(samples[TIMESTAMP_CHANNEL])
+        if sample_count == 0:
+            continue
+
+        for channel, values in samples.items():
+            values = np.ascontiguousarray(values)
+            rows.append((
+                activity_id,
+                channel,
+                values.dtype.str,
+                sample_count,
+                values.tobytes(),
+                source_file_hash
+            ))
+
+    return rows
+
+
+def write_activity_samples(
+    db_connection,
+    activity_samples: Iterable[Tuple[int, Dict[str, np.ndarray]]],
+    source_file_hash: Optional[str] = None
+) -> int:
+    """
+    Bulk-write sample streams for one or more activities
+
+    Existing streams for the same (activity, channel) are replaced when
+    their data differs. The
+    caller owns the transaction (no commit here).
+
+    Args:
+        db_connection: Database connection
+        activity_samples: (activity_id, {channel: ndarray}) pairs
+        source_file_hash: File the samples were parsed from
+
+    Returns:
+        Number of rows written (one per activity channel)
+    """
+    rows = activity_sample_rows(activity_samples, source_file_hash)
+    if rows:
+        db_connection.executemany(ACTIVITY_SAMPLES_INSERT_SQL, rows)
+    return len(rows)
+
+
+def read_activity_samples(db_connection, activity_id: int, channels: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Read an activity's sample streams in one query
+
+    Args:
+        db_connection: Database connection
+        activity_id: activities.id
+        channels: Optional subset of channels to load
+
+    Returns:
+        {channel: ndarray}; empty if the activity has no stored samples
+    """
+    query = "SELECT channel, dtype, data FROM activity_samples WHERE activity_id = ?"
+    params = [activity_id]
+
+    if channels is not None:
+        channels = list(channels)
+        if not channels:
+            return {}
+        query += f" AND channel IN ({', '.join('?' for _ in channels)})"
+        params.extend(channels)
+
+    cursor = db_connection.execute(query, params)
+    return {
+        channel: np.frombuffer(data, dtype=np.dtype(dtype))
+        for channel, dtype, data in cursor.fetchall()
+    }
@@ -49,6 +49,21 @@ CREATE TABLE IF NOT EXISTS imported_files (
 CREATE INDEX IF NOT EXISTS idx_imported_files_source ON imported_files(source);
 CREATE INDEX IF NOT EXISTS idx_imported_files_modified ON imported_files(modified_time);
 CREATE INDEX IF NOT EXISTS idx_imported_files_type ON imported_files(file_type);
+CREATE INDEX IF NOT EXISTS idx_imported_files_path ON imported_files(file_path);
+
+-- Per-member progress of archive imports, so an interrupted GDPR import
+-- resumes where it stopped. A member is skipped on the next run only if its
+-- CRC and size in the archive are unchanged. Across archives, the table is
+-- the manifest of imported member contents: a newer export's members with a
+-- matching name, CRC and size are skipped without decompression.
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+    archive_path TEXT NOT NULL,
+    member_name TEXT NOT NULL,
+    member_crc BIGINT NOT NULL,
+    member_size BIGINT NOT NULL,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (archive_path, member_name)
+);
 
 -- ============================================================================
 -- Sleep Data
@@ -134,6 +149,7 @@ CREATE TABLE IF NOT EXISTS daily_steps (
     distance_meters REAL,
     calories REAL,
     source_file_hash TEXT,
+    source_recorded_at TIMESTAMP,  -- the source FIT file's file_id time_created
     imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (source_file_hash) REFERENCES imported_files(file_hash)
 );
@@ -162,6 +178,20 @@ CREATE TABLE IF NOT EXISTS activities (
 
 CREATE INDEX IF NOT EXISTS idx_activities_start ON activities(start_time);
 
+-- Per-second activity streams (from FIT `record` messages), stored columnar:
+-- one typed NumPy array per (activity, channel), serialized into a BLOB.
+-- See db/sample_store.py
+CREATE TABLE IF NOT EXISTS activity_samples (
+    activity_id INTEGER NOT NULL,  -- activities.id
+    channel TEXT NOT NULL,  -- 'timestamp', 'heart_rate', 'speed', 'power', ...
+    dtype TEXT NOT NULL,  -- NumPy dtype string, e.g. '<f4'
+    sample_count INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    source_file_hash TEXT,
+    imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (activity_id, channel)
+);
+
 -- ============================================================================
 -- Enhanced Sleep Data (from JSON)
 -- ============================================================================
@@ -319,21 +349,49 @@ CREATE INDEX IF NOT EXISTS idx_sleep_detailed_gmt ON sleep_detailed(sleep_start_
 CREATE INDEX IF NOT EXISTS idx_body_composition_source ON body_composition(measurement_source);
 
 -- ============================================================================
--- Views for quick queries
--- ============================================================================
-
--- Combined daily metrics view
-CREATE VIEW IF NOT EXISTS daily_metrics AS
-SELECT
-    COALESCE(s.date, rhr.date, hs.date, dst.date, dsteps.date) AS date,
-    s.duration_minutes AS sleep_duration,
-    s.sleep_score,
-    rhr.resting_hr,
-    hs.hrv_value,
-    dst.avg_stress,
-    dsteps.step_count
-FROM sleep_records s
-FULL OUTER JOIN resting_hr rhr ON s.date = rhr.date
-FULL OUTER JOIN hrv_records hs ON s.date = hs.date
-FULL OUTER JOIN daily_stress dst ON s.date = dst.date
-FULL OUTER JOIN daily_steps dsteps ON s.date = dsteps.date;
+-- Daily Metrics (one row per day, for correlations and heatmaps)
+-- ============================================================================
+
+-- Every daily metric in one narrow table, on a continuous date spine from
+-- the first to the last day with any data (days with no data are NULL
+-- rows, so lags and gaps line up by date). Built from sleep_records,
+-- sleep_detailed, resting_hr, hrv_records, daily_stress, daily_steps and
+-- daily_summaries by db/daily_metrics.py, which recomputes only the dates
+-- in daily_metrics_dirty.
+CREATE TABLE IF NOT EXISTS daily_metrics (
+    date DATE PRIMARY KEY,
+    sleep_duration INTEGER,  -- minutes
+    sleep_score REAL,
+    deep_sleep_minutes INTEGER,
+    light_sleep_minutes INTEGER,
+    rem_sleep_minutes INTEGER,
+    awake_minutes INTEGER,
+    avg_sleep_hr REAL,
+    avg_respiration REAL,
+    avg_spo2 REAL,
+    resting_hr INTEGER,
+    min_heart_rate INTEGER,
+    max_heart_rate INTEGER,
+    hrv_value REAL,
+    avg_stress REAL,
+    max_stress INTEGER,
+    min_stress INTEGER,
+    step_count INTEGER,
+    distance_meters REAL,
+    calories REAL,
+    floors_climbed INTEGER,
+    active_minutes INTEGER,
+    intensity_minutes_moderate INTEGER,
+    intensity_minutes_vigorous INTEGER,
+    body_battery_charged INTEGER,
+    body_battery_drained INTEGER,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+-- Dates written to a source table since daily_metrics was last refreshed,
+-- recorded by insert, update and delete triggers on each source table.
+-- They are created by db/daily_metrics.py from DAILY_METRIC_SOURCES, so
+-- the two can't drift apart.
+CREATE TABLE IF NOT EXISTS daily_metrics_dirty (
+    date DATE PRIMARY KEY
+) WITHOUT ROWID;
@@ -0,0 +1,113 @@
+"""
+Stable Record Keys and Natural-Key Upserts
+
+Ingestion writers derive primary keys from the content of a record (device
+identity, timestamps, dates) rather than Python's per-process randomized
+hash(), so importing the same data twice produces the same keys. Writes are
+then ON CONFLICT upserts that only touch a row when a value actually
+changed, which keeps re-imports from rewriting (or duplicating) rows.
+"""
+
+import hashlib
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Sequence
+
+_KEY_SEPARATOR = "\x1f"
+
+
+def _key_part(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return "" if value is None else str(value)
+
+
+def stable_record_id(*parts: Any) -> int:
+    """
+    Derive a deterministic positive 63-bit integer key from parts
+
+    The same parts always give the same key, in any process.
+
+    Args:
+        *parts: Values identifying the record (e.g. "stress", timestamp)
+
+    Returns:
+        Integer suitable for an INTEGER PRIMARY KEY
+    """
+    text = _KEY_SEPARATOR.join(_key_part(part) for part in parts)
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def fit_file_identity(file_info: Optional[dict], file_hash: str) -> str:
+    """
+    Identify the recording behind a FIT file from its file_id message
+
+    Uses the device serial number and creation time, so re-exported copies
+    of the same recording share an identity even if their bytes differ.
+    Falls back to the file hash when file_id is missing.
+    """
+    file_info = file_info or {}
+    serial = file_info.get("serial_number")
+    created = file_info.get("time_created")
+    if serial is None and created is None:
+        return file_hash
+    return _KEY_SEPARATOR.join((
+        _key_part(file_info.get("manufacturer")),
+        _key_part(serial),
+        _key_part(created),
+    ))
+
+
+def upsert_sql(
+    table: str,
+    columns: Sequence[str],
+    conflict_columns: Sequence[str],
+    compare_exclude: Iterable[str] = ("id", "source_file_hash"),
+    touch_column: Optional[str] = "imported_at",
+    merge_columns: Iterable[str] = ()
+) -> str:
+    """
+    Build an INSERT ... ON CONFLICT DO UPDATE that skips unchanged rows
+
+    Every non-conflict column is updated from the incoming row, but only
+    when at least one compared column differs, so re-importing identical
+    data costs no writes.
+
+    Args:
+        table: Target table
+        columns: Inserted columns, in parameter order
+        conflict_columns: Natural key the conflict is detected on
+        compare_exclude: Columns that don't count as a change
+        touch_column: Timestamp column set to CURRENT_TIMESTAMP on update
+        merge_columns: Columns an incoming NULL leaves as they are, for
+            rows assembled from several partial records
+
+    Returns:
+        SQL with one ? placeholder per column
+    """
+    update_columns = [c for c in columns if c not in conflict_columns and c != "id"]
+    excluded = set(compare_exclude)
+    compare_columns = [c for c in update_columns if c not in excluded]
+    merged = set(merge_columns)
+
+    assignments = [
+        f"{c} = COALESCE(excluded.{c}, {table}.{c})" if c in merged else f"{c} = excluded.{c}"
+        for c in update_columns
+    ]
+    if touch_column:
+        assignments.append(f"{touch_column} = CURRENT_TIMESTAMP")
+
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)})\n"
+        f"   VALUES ({', '.join('?' for _ in columns)})\n"
+        f"   ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET\n"
+        f"   {', '.join(assignments)}"
+    )
+    if compare_columns:
+        changed = " OR ".join(
+            f"(excluded.{c} IS NOT NULL AND {table}.{c} IS NOT excluded.{c})" if c in merged
+            else f"{table}.{c} IS NOT excluded.{c}"
+            for c in compare_columns
+        )
+        sql += f"\n   WHERE {changed}"
+    return sql
@@ -0,0 +1,123 @@
+"""
+Archive Import Checkpoints
+
+Records which members of an archive (a Garmin GDPR export zip) have been
+fully imported, so a restarted import can skip them without extracting,
+hashing or parsing them again.
+
+A member counts as done for one archive path and one (CRC, size) of its
+content, as listed in the zip's central directory. Reading those needs no
+decompression, so checking a 6 GB export costs only its directory listing.
+
+Together, the checkpoints of every archive imported so far form a manifest
+of member contents already in the database. A newer export of the same
+account repeats most of its members unchanged: those are matched against
+the manifest by name (from DI_CONNECT down) and (CRC, size), and skipped
+without decompression, so only new or changed days are processed.
+"""
+
+import logging
+import os
+import zipfile
+from typing import Dict, Iterable, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_CHECKPOINT_SQL = """INSERT INTO import_checkpoints
+   (archive_path, member_name, member_crc, member_size)
+   VALUES (?, ?, ?, ?)
+   ON CONFLICT (archive_path, member_name) DO UPDATE SET
+   member_crc = excluded.member_crc, member_size = excluded.member_size,
+   completed_at = CURRENT_TIMESTAMP"""
+
+
+def archive_key(zip_path: str) -> str:
+    """Normalized path the checkpoints of an archive are stored under"""
+    return os.path.abspath(zip_path)
+
+
+def load_completed_members(db_connection, zip_path: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Load the checkpoints of an archive
+
+    Returns:
+        {member_name: (crc, size)} for members already imported
+    """
+    cursor = db_connection.execute(
+        "SELECT member_name, member_crc, member_size FROM import_checkpoints WHERE archive_path = ?",
+        (archive_key(zip_path),)
+    )
+    return {name: (crc, size) for name, crc, size in cursor.fetchall()}
+
+
+def is_member_completed(member: zipfile.ZipInfo, completed: Dict[str, Tuple[int, int]]) -> bool:
+    """True if the member was imported with the same content"""
+    return completed.get(member.filename) == (member.CRC, member.file_size)
+
+
+def manifest_name(member_name: str) -> str:
+    """
+    Name a member is matched on across exports
+
+    Exports differ in the folder DI_CONNECT sits under (or have none), so
+    names are compared from DI_CONNECT down.
+    """
+    _, found, rest = member_name.partition("DI_CONNECT/")
+    return found + rest if found else member_name
+
+
+def load_member_manifest(db_connection) -> Dict[str, Set[Tuple[int, int]]]:
+    """
+    Load the checkpoints of every archive as one manifest
+
+    Returns:
+        {manifest_name: {(crc, size), ...}} of member contents already imported
+    """
+    manifest: Dict[str, Set[Tuple[int, int]]] = {}
+    cursor = db_connection.execute("SELECT member_name, member_crc, member_size FROM import_checkpoints")
+    for name, crc, size in cursor:
+        manifest.setdefault(manifest_name(name), set()).add((crc, size))
+    return manifest
+
+
+def is_member_in_manifest(member: zipfile.ZipInfo, manifest: Dict[str, Set[Tuple[int, int]]]) -> bool:
+    """True if the same member content was imported from any archive"""
+    return (member.CRC, member.file_size) in manifest.get(manifest_name(member.filename), ())
+
+
+def record_member_completed(db_connection, zip_path: str, member: zipfile.ZipInfo):
+    """
+    Mark a member as imported
+
+    Not committed here: call it just before the member's own rows are
+    written, so the checkpoint commits in the same transaction as the data
+    (and is rolled back with it if the write fails).
+    """
+    db_connection.execute(
+        _CHECKPOINT_SQL,
+        (archive_key(zip_path), member.filename, member.CRC, member.file_size)
+    )
+
+
+def record_members_completed(db_connection, zip_path: str, members: Iterable[zipfile.ZipInfo]):
+    """Mark several members as imported (not committed, see record_member_completed)"""
+    key = archive_key(zip_path)
+    db_connection.executemany(
+        _CHECKPOINT_SQL,
+        ((key, member.filename, member.CRC, member.file_size) for member in members)
+    )
+
+
+def clear_checkpoints(db_connection, zip_path: str) -> int:
+    """
+    Forget an archive's progress so the next import processes every member
+
+    Returns:
+        Number of checkpoints removed
+    """
+    cursor = db_connection.execute(
+        "DELETE FROM import_checkpoints WHERE archive_path = ?",
+        (archive_key(zip_path),)
+    )
+    db_connection.commit()
+    return cursor.rowcount
@@ -10,9 +10,12 @@ References:
 - PRE_COMMERCIAL_MVP_PLAN.md - Week 1 requirements
 """
 
-from typing import Dict, Any, Optional, List
-from datetime import datetime, date
+from typing import Dict, Any, Iterable, Iterator, Optional, List, Tuple
 import logging
+import threading
+
+# Date parsing lives in utils.dates; re-exported for existing callers
+from utils.dates import parse_date, parse_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -183,6 +186,189 @@ MENSTRUAL_CYCLE_FIELD_MAPPINGS = {
 }
 
 
+# ============================================================================
+# Compiled Mapping Plans
+# ============================================================================
+
+# Stands in for the source key of columns a schema variant doesn't carry
+_NO_SOURCE = object()
+
+
+class MappingPlan:
+    """
+    Field mapping compiled for one export schema variant
+
+    A schema variant is the set of name variants a record carries. Records
+    of one file (and usually of one export) share it, so instead of probing
+    every name variant of every field per record, the variants present are
+    resolved once: most fields end up with a single source key and the
+    rest with a short fallback chain.
+
+    A record fits the plan if it carries none of the variants the plan
+    left out; a source key it lacks simply reads as missing. Mapping a
+    record with a plan it fits gives exactly what walking the alias lists
+    would.
+    """
+
+    __slots__ = ("field_mappings", "signature", "absent", "columns", "sources", "_first", "_fallbacks")
+
+    def __init__(self, field_mappings: Dict[str, List[str]], keys: Iterable[str]):
+        """
+        Args:
+            field_mappings: db field -> name variants, in priority order
+            keys: Keys of a record of this schema variant
+        """
+        keys = set(keys)
+        aliases = {name for names in field_mappings.values() for name in names}
+        self.field_mappings = field_mappings
+        self.signature = frozenset(aliases & keys)
+        self.absent = frozenset(aliases - keys)
+        # Target columns in field_mappings order, and the source keys present
+        # for each (empty if the variant doesn't carry the field)
+        self.columns: Tuple[str, ...] = tuple(field_mappings)
+        self.sources: Tuple[Tuple[str, ...], ...] = tuple(
+            tuple(name for name in names if name in self.signature)
+            for names in field_mappings.values()
+        )
+        # One key per column, read in a single map() pass (a key no dict has
+        # for columns the variant lacks), then the few fallback chains
+        self._first = tuple(names[0] if names else _NO_SOURCE for names in self.sources)
+        self._fallbacks = tuple(
+            (index, names[1:]) for index, names in enumerate(self.sources) if len(names) > 1
+        )
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        """True if record fits this plan's schema variant"""
+        # dict_keys.isdisjoint() iterates the (small) frozenset, not the record
+        return record.keys().isdisjoint(self.absent)
+
+    def row(self, record: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Values for self.columns in order (None where missing), ready for executemany"""
+        get = record.get
+        values = list(map(get, self._first))
+        for index, names in self._fallbacks:
+            if values[index] is None:
+                for name in names:
+                    value = get(name)
+                    if value is not None:
+                        values[index] = value
+                        break
+        return tuple(values)
+
+    def extract(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Mapped record, as the map_*_record() functions return it"""
+        return {
+            column: value for column, value in zip(self.columns, self.row(record)) if value is not None
+        }
+
+
+class MappingPlanCache:
+    """
+    Compiled plans keyed by (field mappings, schema variant)
+
+    Consecutive records that fit the last plan reuse it after one set
+    check; a new variant costs one compile. Lookups and compiles are
+    counted for diagnostics, under the lock, since the cache is shared by
+    parser threads.
+    """
+
+    def __init__(self, max_plans: int = 256):
+        self.max_plans = max_plans
+        self._plans: Dict[Tuple[int, frozenset], MappingPlan] = {}
+        self._last: Dict[int, MappingPlan] = {}
+        # id(field_mappings) -> (field_mappings, all of its name variants)
+        self._aliases: Dict[int, Tuple[Dict[str, List[str]], frozenset]] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.compiles = 0
+
+    def plan_for(self, field_mappings: Dict[str, List[str]], record: Dict[str, Any]) -> MappingPlan:
+        """Plan for record's schema variant, compiled on first use"""
+        mappings_id = id(field_mappings)
+        last = self._last.get(mappings_id)
+        if last is not None and last.field_mappings is field_mappings and last.matches(record):
+            with self._lock:
+                self.lookups += 1
+            return last
+
+        with self._lock:
+            self.lookups += 1
+            known = self._aliases.get(mappings_id)
+            if known is None or known[0] is not field_mappings:
+                known = (field_mappings, frozenset(name for names in field_mappings.values() for name in names))
+                self._aliases[mappings_id] = known
+            aliases = known[1]
+            key = (mappings_id, frozenset(record.keys() & aliases))
+            plan = self._plans.get(key)
+            if plan is None or plan.field_mappings is not field_mappings:
+                if len(self._plans) >= self.max_plans:
+                    self._plans.clear()
+                plan = MappingPlan(field_mappings, key[1])
+                self._plans[key] = plan
+                self.compiles += 1
+            self._last[mappings_id] = plan
+        return plan
+
+    def stats(self) -> Dict[str, Any]:
+        """Plan count, lookups, hits/misses and hit rate"""
+        with self._lock:
+            plans, lookups, compiles = len(self._plans), self.lookups, self.compiles
+        return {
+            "plans": plans,
+            "lookups": lookups,
+            "hits": lookups - compiles,
+            "misses": compiles,
+            "hit_rate": round((lookups - compiles) / lookups, 4) if lookups else None,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+            self._last.clear()
+            self._aliases.clear()
+            self.lookups = 0
+            self.compiles = 0
+
+
+# Shared by all mappers in this module
+_plan_cache = MappingPlanCache()
+
+
+def get_mapping_plan(field_mappings: Dict[str, List[str]], record: Dict[str, Any]) -> MappingPlan:
+    """Compiled plan for record's schema variant (cached)"""
+    return _plan_cache.plan_for(field_mappings, record)
+
+
+def mapping_plan_stats() -> Dict[str, Any]:
+    """Plan cache statistics, for diagnostics"""
+    return _plan_cache.stats()
+
+
+def clear_mapping_plans():
+    """Drop all compiled plans and reset the statistics"""
+    _plan_cache.clear()
+
+
+def map_records(records: Iterable[Dict[str, Any]], field_mappings: Dict[str, List[str]]) -> Iterator[Dict[str, Any]]:
+    """Map a batch of records, reusing one plan per schema variant"""
+    for record in records:
+        yield _plan_cache.plan_for(field_mappings, record).extract(record)
+
+
+def map_record_rows(
+    records: Iterable[Dict[str, Any]],
+    field_mappings: Dict[str, List[str]]
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    Map a batch of records to row tuples
+
+    Each row holds the values of field_mappings' columns in order, so it
+    can be fed to executemany() with a matching column list.
+    """
+    for record in records:
+        yield _plan_cache.plan_for(field_mappings, record).row(record)
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
@@ -215,14 +401,7 @@ def map_sleep_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Mapped sleep record
     """
-    mapped = {}
-
-    for db_field, json_fields in SLEEP_FIELD_MAPPINGS.items():
-        value = get_field_value(json_data, json_fields)
-        if value is not None:
-            mapped[db_field] = value
-
-    return mapped
+    return get_mapping_plan(SLEEP_FIELD_MAPPINGS, json_data).extract(json_data)
 
 
 def map_daily_summary_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -235,14 +414,7 @@ def map_daily_summary_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Mapped daily summary record
     """
-    mapped = {}
-
-    for db_field, json_fields in DAILY_SUMMARY_FIELD_MAPPINGS.items():
-        value = get_field_value(json_data, json_fields)
-        if value is not None:
-            mapped[db_field] = value
-
-    return mapped
+    return get_mapping_plan(DAILY_SUMMARY_FIELD_MAPPINGS, json_data).extract(json_data)
 
 
 def map_hrv_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -255,12 +427,7 @@ def map_hrv_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Mapped HRV record
     """
-    mapped = {}
-
-    for db_field, json_fields in HRV_FIELD_MAPPINGS.items():
-        value = get_field_value(json_data, json_fields)
-        if value is not None:
-            mapped[db_field] = value
+    mapped = get_mapping_plan(HRV_FIELD_MAPPINGS, json_data).extract(json_data)
 
     # Determine measurement type if not explicitly provided
     if "measurement_type" not in mapped:
@@ -282,14 +449,7 @@ def map_stress_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Mapped stress record
     """
-    mapped = {}
-
-    for db_field, json_fields in STRESS_FIELD_MAPPINGS.items():
-        value = get_field_value(json_data, json_fields)
-        if value is not None:
-            mapped[db_field] = value
-
-    return mapped
+    return get_mapping_plan(STRESS_FIELD_MAPPINGS, json_data).extract(json_data)
 
 
 def map_activity_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -302,14 +462,7 @@ def map_activity_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Mapped activity record
     """
-    mapped = {}
-
-    for db_field, json_fields in ACTIVITY_FIELD_MAPPINGS.items():
-        value = get_field_value(json_data, json_fields)
-        if value is not None:
-            mapped[db_field] = value
-
-    return mapped
+    return get_mapping_plan(ACTIVITY_FIELD_MAPPINGS, json_data).extract(json_data)
 
 
 def map_fitness_assessment_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -322,14 +475,7 @@ def map_fitness_assessment_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Mapped fitness assessment record
     """
-    mapped = {}
-
-    for db_field, json_fields in FITNESS_ASSESSMENT_FIELD_MAPPINGS.items():
-        value = get_field_value(json_data, json_fields)
-        if value is not None:
-            mapped[db_field] = value
-
-    return mapped
+    return get_mapping_plan(FITNESS_ASSESSMENT_FIELD_MAPPINGS, json_data).extract(json_data)
 
 
 def map_hydration_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -342,14 +488,7 @@ def map_hydration_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Mapped hydration record
     """
-    mapped = {}
-
-    for db_field, json_fields in HYDRATION_FIELD_MAPPINGS.items():
-        value = get_field_value(json_data, json_fields)
-        if value is not None:
-            mapped[db_field] = value
-
-    return mapped
+    return get_mapping_plan(HYDRATION_FIELD_MAPPINGS, json_data).extract(json_data)
 
 
 def map_body_composition_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -362,14 +501,7 @@ def map_body_composition_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Mapped body composition record
     """
-    mapped = {}
-
-    for db_field, json_fields in BODY_COMPOSITION_FIELD_MAPPINGS.items():
-        value = get_field_value(json_data, json_fields)
-        if value is not None:
-            mapped[db_field] = value
-
-    return mapped
+    return get_mapping_plan(BODY_COMPOSITION_FIELD_MAPPINGS, json_data).extract(json_data)
 
 
 def map_menstrual_cycle_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -382,58 +514,4 @@ def map_menstrual_cycle_record(json_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Mapped menstrual cycle record
     """
-    mapped = {}
-
-    for db_field, json_fields in MENSTRUAL_CYCLE_FIELD_MAPPINGS.items():
-        value = get_field_value(json_data, json_fields)
-        if value is not None:
-            mapped[db_field] = value
-
-    return mapped
-
-
-def parse_date(date_str: str) -> Optional[date]:
-    """
-    Parse various date formats found in Garmin JSON files
-
-    Args:
-        date_str: Date string to parse
-
-    Returns:
-        date object or None if parsing fails
-    """
-    if not date_str:
-        return None
-
-    # Common formats: "2024-01-15", "2024-01-15T08:30:00.0"
-    try:
-        if 'T' in date_str:
-            return datetime.fromisoformat(date_str.replace('Z', '')).date()
-        else:
-            return datetime.fromisoformat(date_str).date()
-    except (ValueError, TypeError):
-        logger.warning(f"Could not parse date: {date_str}")
-        return None
-
-
-def parse_timestamp(ts_str: str) -> Optional[datetime]:
-    """
-    Parse timestamp formats found in Garmin JSON files
-
-    Args:
-        ts_str: Timestamp string to parse
-
-    Returns:
-        datetime object or None if parsing fails
-    """
-    if not ts_str:
-        return None
-
-    try:
-        # Handle both with and without timezone
-        if ts_str.endswith('Z'):
-            ts_str = ts_str[:-1] + '+00:00'
-        return datetime.fromisoformat(ts_str.replace('Z', ''))
-    except (ValueError, TypeError):
-        logger.warning(f"Could not parse timestamp: {ts_str}")
-        return None
+    return get_mapping_plan(MENSTRUAL_CYCLE_FIELD_MAPPINGS, json_data).extract(json_data)
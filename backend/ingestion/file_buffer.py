@@ -0,0 +1,81 @@
+"""
+Read-Once File Buffers
+
+Holds a file's contents for the whole ingestion of that file, so the same
+bytes feed the SHA-256 used for deduplication and the FIT decoder instead
+of each of them opening and reading the file again.
+
+Small files are read into memory; large ones are memory-mapped so the OS
+pages them in on demand without an extra copy.
+"""
+
+import hashlib
+import mmap
+import os
+from typing import Optional, Union
+
+# Files at least this large are mmapped instead of read into bytes
+MMAP_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+
+class FileBuffer:
+    """
+    Lazily loaded contents of one file, plus its cached SHA-256
+
+    Nothing is read until data or sha256 is first accessed, so a buffer can
+    be opened for every scanned file and only cost I/O for the files that
+    actually need hashing or parsing.
+
+    Usage:
+        with FileBuffer(path) as buffer:
+            file_hash = buffer.sha256
+            parse(buffer.data)
+    """
+
+    def __init__(self, file_path: str, mmap_threshold: int = MMAP_THRESHOLD_BYTES):
+        self.file_path = file_path
+        self.mmap_threshold = mmap_threshold
+        self._data: Optional[Union[bytes, mmap.mmap]] = None
+        self._sha256: Optional[str] = None
+
+    @classmethod
+    def from_bytes(cls, file_path: str, data: bytes) -> "FileBuffer":
+        """
+        Wrap contents already in memory (e.g. a zip member)
+
+        file_path only names the contents; nothing is read from it.
+        """
+        buffer = cls(file_path)
+        buffer._data = data
+        return buffer
+
+    @property
+    def data(self) -> Union[bytes, mmap.mmap]:
+        """File contents as bytes, or an mmap for large files"""
+        if self._data is None:
+            with open(self.file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size and size >= self.mmap_threshold:
+                    self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    self._data = f.read()
+        return self._data
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the contents (same value as compute_file_hash)"""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,476 @@
+"""
+Native FIT Decoder
+
+A struct-based decoder for the high-volume FIT message types: per-second
+`record` messages in activities and `monitoring` / `stress_level` / `hrv`
+messages in wellness files. These make up nearly every message in a
+Garmin export, and fitparse decodes them one field at a time.
+
+Each definition message is compiled once into a struct.Struct covering a
+whole data message (header byte included), and consecutive data messages
+that share a definition are bulk-decoded with Struct.iter_unpack(). Field
+semantics - invalid values, scale/offset, enum names, subfields,
+components and compressed timestamps - come from fitparse's own profile,
+so values match what fitparse returns.
+
+Anything this decoder does not handle (developer fields on a wanted
+message, malformed headers, truncated data) raises UnsupportedFitData and
+the caller falls back to fitparse for the whole file. CRCs are not checked
+here; the fitparse pass that decodes the remaining message types does.
+"""
+
+import struct
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from fitparse.profile import MESSAGE_TYPES
+    from fitparse.records import parse_string
+except ImportError:
+    MESSAGE_TYPES = None
+    parse_string = None
+
+# Message types the native decoder is used for
+NATIVE_MESSAGE_TYPES = frozenset({'record', 'monitoring', 'stress_level', 'hrv'})
+
+_FIT_EPOCH = datetime(1989, 12, 31)
+_TIMESTAMP_FIELD_NUM = 253
+_MIN_ABSOLUTE_DATE_TIME = 0x10000000
+
+# base type number -> (struct format, size, invalid value, kind)
+_BASE_TYPES = {
+    0x00: ('B', 1, 0xFF, 'int'),        # enum
+    0x01: ('b', 1, 0x7F, 'int'),        # sint8
+    0x02: ('B', 1, 0xFF, 'int'),        # uint8
+    0x83: ('h', 2, 0x7FFF, 'int'),      # sint16
+    0x84: ('H', 2, 0xFFFF, 'int'),      # uint16
+    0x85: ('i', 4, 0x7FFFFFFF, 'int'),  # sint32
+    0x86: ('I', 4, 0xFFFFFFFF, 'int'),  # uint32
+    0x07: ('s', 1, None, 'string'),     # string
+    0x88: ('f', 4, None, 'float'),      # float32
+    0x89: ('d', 8, None, 'float'),      # float64
+    0x0A: ('B', 1, 0, 'int'),           # uint8z
+    0x8B: ('H', 2, 0, 'int'),           # uint16z
+    0x8C: ('I', 4, 0, 'int'),           # uint32z
+    0x0D: ('B', 1, None, 'byte'),       # byte
+    0x8E: ('q', 8, 0x7FFFFFFFFFFFFFFF, 'int'),  # sint64
+    0x8F: ('Q', 8, 0xFFFFFFFFFFFFFFFF, 'int'),  # uint64
+    0x90: ('Q', 8, 0, 'int'),           # uint64z
+}
+_BYTE_BASE_TYPE = 0x0D
+
+
+class UnsupportedFitData(Exception):
+    """The file uses something the native decoder doesn't handle"""
+
+
+def native_decoder_available() -> bool:
+    """The decoder needs fitparse's profile tables"""
+    return MESSAGE_TYPES is not None
+
+
+def _accumulate(raw_value: int, accumulation: int, num_bits: int) -> int:
+    max_value = 1 << num_bits
+    max_mask = max_value - 1
+    base_value = raw_value + (accumulation & ~max_mask)
+    if raw_value < (accumulation & max_mask):
+        base_value += max_value
+    return base_value
+
+
+def _scale_offset(field, value):
+    if isinstance(value, tuple):
+        return tuple(_scale_offset(field, v) for v in value)
+    if isinstance(value, (int, float)):
+        if field.scale:
+            value = float(value) / field.scale
+        if field.offset:
+            value = value - field.offset
+    return value
+
+
+def _process_type(type_name: str, value):
+    """fitparse's default FitFileDataProcessor type conversions"""
+    if value is None:
+        return None
+    if type_name == 'date_time':
+        if value >= _MIN_ABSOLUTE_DATE_TIME:
+            return _FIT_EPOCH + timedelta(seconds=value)
+    elif type_name == 'local_date_time':
+        return _FIT_EPOCH + timedelta(seconds=value)
+    elif type_name == 'bool':
+        return bool(value)
+    elif type_name == 'localtime_into_day':
+        m, s = divmod(value, 60)
+        h, m = divmod(m, 60)
+        return dt_time(h, m, s)
+    return value
+
+
+_converters: Dict[Any, Callable[[Any], Any]] = {}
+
+
+def _converter(field) -> Callable[[Any], Any]:
+    """render (enum name) -> scale/offset -> type processor, compiled per profile field"""
+    converter = _converters.get(field)
+    if converter is not None:
+        return converter
+
+    values = field.type.values
+    type_name = field.type.name
+    needs_scale = bool(field.scale or field.offset)
+    needs_processing = type_name in ('date_time', 'local_date_time', 'bool', 'localtime_into_day')
+
+    if not values and not needs_scale and not needs_processing:
+        def converter(raw):
+            return raw
+    else:
+        def converter(raw):
+            value = raw
+            if values and raw in values:
+                value = values[raw]
+            if needs_scale:
+                value = _scale_offset(field, value)
+            if needs_processing:
+                value = _process_type(type_name, value)
+            return value
+
+    _converters[field] = converter
+    return converter
+
+
+def _render_component(component, raw_value):
+    """fitparse ComponentField.render (bit extraction)"""
+    if raw_value is None:
+        return None
+    if isinstance(raw_value, tuple):
+        if component.bit_offset and component.bit_offset >= len(raw_value) << 3:
+            raise ValueError()
+        unpacked = 0
+        for value in reversed(raw_value):
+            unpacked = (unpacked << 8) + (value or 0)
+        raw_value = unpacked
+    if isinstance(raw_value, int):
+        raw_value = (raw_value >> component.bit_offset) & ((1 << component.bits) - 1)
+    return raw_value
+
+
+def _raw_extractor(slot: int, count: int, kind: str, invalid) -> Callable[[tuple], Any]:
+    """Pull one field's raw value out of an unpacked message tuple"""
+    if kind == 'string':
+        return lambda values: parse_string(values[slot])
+    if kind == 'byte':
+        end = slot + count
+
+        def extract(values):
+            raw = values[slot:end]
+            return None if all(b == 0xFF for b in raw) else raw
+        return extract
+    if kind == 'float':
+        if count == 1:
+            return lambda values: None if values[slot] != values[slot] else values[slot]
+        end = slot + count
+        return lambda values: tuple(None if v != v else v for v in values[slot:end])
+    if count == 1:
+        return lambda values: None if values[slot] == invalid else values[slot]
+    end = slot + count
+    return lambda values: tuple(None if v == invalid else v for v in values[slot:end])
+
+
+class _FieldPlan:
+    __slots__ = ('def_num', 'field', 'name', 'extract', 'subfields', 'components', 'convert')
+
+    def __init__(self, def_num, field, extract):
+        self.def_num = def_num
+        self.field = field
+        self.name = field.name if field else 'unknown_%d' % def_num
+        self.extract = extract
+        self.subfields = field.subfields if field else None
+        self.components = field.components if field else None
+        self.convert = _converter(field) if field else None
+
+
+class _DefinitionPlan:
+    """A compiled definition message"""
+
+    __slots__ = ('name', 'mesg_num', 'size', 'struct', 'fields', 'wanted',
+                 'timestamp', 'accumulating')
+
+    def __init__(self, name, mesg_num, size):
+        self.name = name
+        self.mesg_num = mesg_num
+        self.size = size
+        self.struct = None
+        self.fields: List[_FieldPlan] = []
+        self.wanted = False
+        # (offset in message payload, Struct, invalid value) for field 253
+        self.timestamp = None
+        # component def nums whose accumulators reset with this definition
+        self.accumulating: List[int] = []
+
+
+def _compile_definition(data, pos: int, header: int, wanted_types) -> _DefinitionPlan:
+    """Compile the definition message at pos"""
+    endian = '>' if data[pos + 2] else '<'
+    mesg_num, num_fields = struct.unpack_from(endian + 'HB', data, pos + 3)
+    mesg_type = MESSAGE_TYPES.get(mesg_num)
+    name = mesg_type.name if mesg_type else 'unknown_%d' % mesg_num
+    wanted = name in wanted_types
+
+    field_defs = []
+    cursor = pos + 6
+    for _ in range(num_fields):
+        field_defs.append(tuple(data[cursor:cursor + 3]))
+        cursor += 3
+
+    dev_size = 0
+    if header & 0x20:
+        num_dev_fields = data[cursor]
+        cursor += 1
+        if wanted and num_dev_fields:
+            raise UnsupportedFitData(f"developer fields on {name}")
+        for _ in range(num_dev_fields):
+            dev_size += data[cursor + 1]
+            cursor += 3
+
+    plan = _DefinitionPlan(name, mesg_num, 0)
+    plan.wanted = wanted
+    fmt = [endian, 'B']
+    slot = 1
+    offset = 0
+
+    for def_num, size, base_type_num in field_defs:
+        fmt_char, base_size, invalid, kind = _BASE_TYPES.get(base_type_num, _BASE_TYPES[_BYTE_BASE_TYPE])
+        if size % base_size:
+            raise UnsupportedFitData(f"invalid field size {size} in {name}")
+        count = size // base_size
+        field = mesg_type.fields.get(def_num) if mesg_type else None
+
+        if field and field.components:
+            plan.accumulating.extend(c.def_num for c in field.components if c.accumulate)
+
+        if def_num == _TIMESTAMP_FIELD_NUM:
+            if kind != 'int' or count != 1:
+                raise UnsupportedFitData(f"unexpected timestamp layout in {name}")
+            plan.timestamp = (offset, struct.Struct(endian + fmt_char), invalid)
+
+        if wanted:
+            if kind == 'string':
+                fmt.append(f'{size}s')
+                slots = 1
+            elif kind == 'byte':
+                fmt.append(f'{size}B')
+                slots = size
+            else:
+                fmt.append(f'{count}{fmt_char}')
+                slots = count
+            plan.fields.append(_FieldPlan(def_num, field, _raw_extractor(slot, count if kind != 'byte' else size, kind, invalid)))
+            slot += slots
+
+        offset += size
+
+    plan.size = offset + dev_size
+    if wanted:
+        plan.struct = struct.Struct(''.join(fmt))
+    return plan
+
+
+class NativeFitDecoder:
+    """Walks a FIT file's bytes and decodes the wanted message types"""
+
+    def __init__(self, data, message_types: Iterable[str]):
+        if not native_decoder_available():
+            raise UnsupportedFitData("fitparse profile not available")
+        self.data = data
+        self.view = memoryview(data)
+        self.wanted_types = frozenset(message_types)
+        self._plan_cache: Dict[bytes, _DefinitionPlan] = {}
+
+    def _reset(self):
+        self._local_plans: Dict[int, _DefinitionPlan] = {}
+        self._accumulators: Dict[int, Dict[int, int]] = {}
+        self._timestamp = 0
+
+    def messages(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (message_name, {field_name: value}) like iter_fit_messages()"""
+        data = self.data
+        total = len(data)
+        pos = 0
+
+        while pos < total:
+            if total - pos < 12 or bytes(data[pos + 8:pos + 12]) != b'.FIT':
+                raise UnsupportedFitData("invalid FIT header")
+            header_size = data[pos]
+            data_size = struct.unpack_from('<I', data, pos + 4)[0]
+            start = pos + header_size
+            end = start + data_size
+            if header_size < 12 or end + 2 > total:
+                raise UnsupportedFitData("truncated FIT file")
+
+            self._reset()
+            yield from self._decode_segment(start, end)
+            pos = end + 2  # skip data CRC; chained files follow
+
+    def _definition(self, pos: int, header: int) -> int:
+        num_fields = self.data[pos + 5]
+        def_end = pos + 6 + 3 * num_fields
+        if header & 0x20:
+            def_end += 1 + 3 * self.data[def_end]
+        # Monitoring files re-send the same few definitions over and over
+        key = bytes((header & 0x20,)) + bytes(self.view[pos + 1:def_end])
+        plan = self._plan_cache.get(key)
+        if plan is None:
+            plan = _compile_definition(self.data, pos, header, self.wanted_types)
+            self._plan_cache[key] = plan
+
+        if plan.accumulating:
+            accumulators = self._accumulators.setdefault(plan.mesg_num, {})
+            for def_num in plan.accumulating:
+                accumulators[def_num] = 0
+
+        self._local_plans[header & 0x0F] = plan
+        return def_end
+
+    def _decode_segment(self, pos: int, end: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        data = self.data
+
+        while pos < end:
+            header = data[pos]
+
+            if header & 0x80:
+                local = (header >> 5) & 0x3
+            elif header & 0x40:
+                pos = self._definition(pos, header)
+                continue
+            else:
+                local = header & 0x0F
+
+            plan = self._local_plans.get(local)
+            if plan is None:
+                raise UnsupportedFitData(f"data message for undefined local type {local}")
+            stride = 1 + plan.size
+
+            if not plan.wanted:
+                self._advance_timestamp(plan, header, pos)
+                pos += stride
+                continue
+
+            # Extend the run over every following message with this definition
+            run_end = pos + stride
+            while run_end < end:
+                next_header = data[run_end]
+                if next_header & 0x80:
+                    if (next_header >> 5) & 0x3 != local:
+                        break
+                elif next_header & 0x40 or next_header & 0x0F != local:
+                    break
+                run_end += stride
+            if run_end > end:
+                raise UnsupportedFitData("truncated data message")
+
+            for values in plan.struct.iter_unpack(self.view[pos:run_end]):
+                message = self._message_values(plan, values)
+                if message:
+                    yield plan.name, message
+            pos = run_end
+
+    def _advance_timestamp(self, plan: _DefinitionPlan, header: int, pos: int):
+        """Keep the compressed-timestamp accumulator in step for skipped messages"""
+        if plan.timestamp is not None:
+            offset, ts_struct, invalid = plan.timestamp
+            raw = ts_struct.unpack_from(self.data, pos + 1 + offset)[0]
+            if raw != invalid:
+                self._timestamp = raw
+        if header & 0x80:
+            self._timestamp = _accumulate(header & 0x1F, self._timestamp, 5)
+
+    def _message_values(self, plan: _DefinitionPlan, values: tuple) -> Dict[str, Any]:
+        fields = plan.fields
+        raws = [field_plan.extract(values) for field_plan in fields]
+        result = {}
+
+        for field_plan, raw in zip(fields, raws):
+            field = field_plan.field
+            if field is None:
+                if raw is not None:
+                    result[field_plan.name] = raw
+            else:
+                convert = field_plan.convert
+                if field_plan.subfields:
+                    resolved = self._resolve_subfield(field, fields, raws)
+                    if resolved is not field:
+                        field = resolved
+                        convert = _converter(field)
+
+                if field.components:
+                    self._expand_components(plan, field, raw, fields, raws, result)
+
+                value = convert(raw)
+                if value is not None:
+                    result[field.name] = value
+
+            if field_plan.def_num == _TIMESTAMP_FIELD_NUM and raw is not None:
+                self._timestamp = raw
+
+        header = values[0]
+        if header & 0x80:
+            self._timestamp = _accumulate(header & 0x1F, self._timestamp, 5)
+            timestamp = _process_type('date_time', self._timestamp)
+            if timestamp is not None:
+                result['timestamp'] = timestamp
+
+        return result
+
+    @staticmethod
+    def _resolve_subfield(field, fields: List[_FieldPlan], raws: list):
+        for sub_field in field.subfields:
+            for ref_field in sub_field.ref_fields:
+                for field_plan, raw in zip(fields, raws):
+                    if field_plan.def_num == ref_field.def_num and ref_field.raw_value == raw:
+                        return sub_field
+        return field
+
+    def _expand_components(self, plan, field, raw, fields, raws, result):
+        mesg_fields = MESSAGE_TYPES[plan.mesg_num].fields
+        for component in field.components:
+            try:
+                cmp_raw = _render_component(component, raw)
+            except ValueError:
+                continue
+
+            if component.accumulate and cmp_raw is not None:
+                accumulators = self._accumulators.setdefault(plan.mesg_num, {})
+                cmp_raw = _accumulate(cmp_raw, accumulators.get(component.def_num, 0), component.bits)
+                accumulators[component.def_num] = cmp_raw
+
+            cmp_raw = _scale_offset(component, cmp_raw)
+            cmp_field = mesg_fields[component.def_num]
+            if cmp_field.subfields:
+                cmp_field = self._resolve_subfield(cmp_field, fields, raws)
+
+            value = cmp_raw
+            values = cmp_field.type.values
+            if values and value in values:
+                value = values[value]
+            value = _process_type(cmp_field.type.name, value)
+            if value is not None:
+                result[cmp_field.name] = value
+
+
+def iter_native_fit_messages(data, message_types: Iterable[str] = NATIVE_MESSAGE_TYPES) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream decoded messages of the given types from FIT bytes
+
+    Args:
+        data: FIT file contents (bytes, bytearray, mmap)
+        message_types: Message names to decode; all others are skipped
+
+    Yields:
+        (message_name, {field_name: value}) with None values dropped, the
+        same as ingestion.fit_folder.iter_fit_messages()
+
+    Raises:
+        UnsupportedFitData: the file needs the fitparse path (may be raised
+        after some messages were already yielded)
+    """
+    return NativeFitDecoder(data, message_types).messages()
@@ -7,19 +7,36 @@ Walks a directory tree to find and parse .fit files
 
 import os
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Optional, Iterable, Iterator, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 import hashlib
 import logging
-from datetime import datetime
+import struct
+import time
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
 try:
     from fitparse import FitFile
+    from fitparse.records import add_dev_data_id, add_dev_field_description
 except ImportError:
     FitFile = None
     logger.warning("fitparse not available - FIT file parsing will not work")
 
+from db.bulk_writer import BulkWriter
+from db.connection import apply_profile, restore_profile
+from db.daily_metrics import refresh_daily_metrics
+from db.sample_store import (
+    ACTIVITY_SAMPLES_INSERT_SQL,
+    SampleColumnsBuilder,
+    activity_sample_rows,
+    slice_samples
+)
+from db.upserts import fit_file_identity, stable_record_id, upsert_sql
+from ingestion.file_buffer import FileBuffer
+from ingestion.fit_decoder import NATIVE_MESSAGE_TYPES, UnsupportedFitData, iter_native_fit_messages
+
 
 def scan_fit_directory(folder_path: str) -> List[str]:
     """
@@ -90,12 +107,201 @@ def get_file_metadata(file_path: str) -> Dict[str, Any]:
     }
 
 
-def parse_fit_file(file_path: str) -> Dict[str, Any]:
+def is_file_imported(db_connection, file_hash: str) -> bool:
+    """Check whether a file hash is already recorded in imported_files"""
+    cursor = db_connection.execute(
+        "SELECT file_hash FROM imported_files WHERE file_hash = ?",
+        (file_hash,)
+    )
+    return cursor.fetchone() is not None
+
+
+# FIT message types that insert_fit_data() writes somewhere, and the key of
+# parse_fit_file()'s result each one is collected under. Everything else is
+# skipped at the decoder.
+FIT_MESSAGE_KEYS = {
+    'file_id': 'file_info',
+    'monitoring': 'daily_steps',
+    'stress_level': 'stress_records',
+    'sleep': 'sleep_records',
+    'hrv': 'hrv_records',
+    'session': 'sessions',
+    'activity': 'activities',
+    'record': 'samples',
+}
+
+CONSUMED_MESSAGE_TYPES = frozenset({
+    'file_id', 'monitoring', 'stress_level', 'sleep', 'hrv', 'session', 'record'
+})
+
+# Decode record/monitoring/stress_level/hrv with the native struct decoder
+# (ingestion/fit_decoder.py) instead of fitparse
+USE_NATIVE_FIT_DECODER = True
+
+# Messages fitparse needs to see to decode developer fields correctly
+_ALWAYS_DECODED_MESSAGE_TYPES = frozenset({'developer_data_id', 'field_description'})
+
+_TIMESTAMP_FIELD_NUM = 253
+
+
+if FitFile is not None:
+    class FilteredFitFile(FitFile):
+        """
+        fitparse FitFile that only decodes the requested message types
+
+        Data messages of any other type are skipped by reading past their
+        bytes (still feeding the CRC and the compressed-timestamp
+        accumulator), so none of fitparse's per-field work is done for them.
+        Parsed messages are not retained on the instance, which keeps memory
+        flat for long monitoring and activity files.
+        """
+
+        def __init__(self, fileish, message_types, check_crc=True):
+            self._wanted_types = frozenset(message_types) | _ALWAYS_DECODED_MESSAGE_TYPES
+            # local message number -> (message size, timestamp struct or None) for skipped types
+            self._skip_plans = {}
+            super().__init__(fileish, check_crc=check_crc)
+
+        def _parse_message(self):
+            if self._bytes_left <= 0:
+                if not self._complete:
+                    self._read_and_assert_crc()
+
+                if self._file.tell() >= self._filesize:
+                    self._complete = True
+                    self.close()
+                    return None
+
+                # Chained FIT files
+                self._parse_file_header()
+                return self._parse_message()
+
+            header = self._parse_message_header()
+
+            if header.is_definition:
+                return self._parse_definition_message(header)
+
+            return self._parse_data_message(header)
+
+        def _parse_definition_message(self, header):
+            def_mesg = super()._parse_definition_message(header)
+            local_num = header.local_mesg_num
+
+            if def_mesg.name in self._wanted_types:
+                self._skip_plans.pop(local_num, None)
+                return def_mesg
+
+            size = 0
+            timestamp_struct = None
+            for field_def in def_mesg.field_defs:
+                if field_def.def_num == _TIMESTAMP_FIELD_NUM and field_def.size == 4:
+                    timestamp_struct = (size, struct.Struct(def_mesg.endian + 'I'))
+                size += field_def.size
+            size += sum(field_def.size for field_def in def_mesg.dev_field_defs)
+
+            self._skip_plans[local_num] = (size, timestamp_struct)
+            return def_mesg
+
+        def _parse_data_message(self, header):
+            skip_plan = self._skip_plans.get(header.local_mesg_num)
+            if skip_plan is None:
+                message = super()._parse_data_message(header)
+                if message.mesg_type is not None:
+                    if message.mesg_type.name == 'developer_data_id':
+                        add_dev_data_id(message)
+                    elif message.mesg_type.name == 'field_description':
+                        add_dev_field_description(message)
+                return message
+
+            size, timestamp_struct = skip_plan
+            raw = self._read(size)
+
+            # Keep compressed timestamps of later (wanted) messages correct
+            if timestamp_struct is not None:
+                offset, ts_struct = timestamp_struct
+                timestamp = ts_struct.unpack_from(raw, offset)[0]
+                if timestamp != 0xFFFFFFFF:
+                    self._compressed_ts_accumulator = timestamp
+            if header.time_offset is not None:
+                self._compressed_ts_accumulator = self._apply_compressed_accumulation(
+                    header.time_offset, self._compressed_ts_accumulator, 5,
+                )
+            return None
+else:
+    FilteredFitFile = None
+
+
+def iter_fit_messages(fileish, message_types: Iterable[str] = CONSUMED_MESSAGE_TYPES) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream decoded messages of the given types from a FIT file
+
+    Args:
+        fileish: Path, bytes or binary file object
+        message_types: Message names to decode; all others are skipped
+
+    Yields:
+        (message_name, {field_name: value}) with None values dropped
+    """
+    if FilteredFitFile is None:
+        raise RuntimeError("fitparse not installed")
+
+    fitfile = FilteredFitFile(fileish, message_types)
+    # Leave caller-owned file objects (e.g. an mmap from FileBuffer) open
+    owns_file = fitfile._file is not fileish
+    try:
+        for message in fitfile.get_messages():
+            if message.name not in message_types:
+                continue
+            values = {}
+            for field in message:
+                if field.value is not None:
+                    values[field.name] = field.value
+            if values:
+                yield message.name, values
+    finally:
+        if owns_file:
+            fitfile.close()
+
+
+def iter_fit_records(fileish) -> Iterator[Dict[str, Any]]:
+    """
+    Stream per-second `record` messages (HR, speed, cadence, power, position)
+
+    Only `record` messages are decoded, so this is cheap to run on activity
+    files when just the sample streams are needed.
+    """
+    for _, values in iter_fit_messages(fileish, frozenset({'record'})):
+        yield values
+
+
+def parse_fit_file(
+    file_path: str,
+    message_types: Iterable[str] = CONSUMED_MESSAGE_TYPES,
+    buffer: Optional[FileBuffer] = None,
+    native: Optional[bool] = None
+) -> Dict[str, Any]:
     """
     Parse a single FIT file using fitparse library
 
+    Only the message types in message_types are decoded; by default that is
+    the set insert_fit_data() actually writes. Per-second `record` messages
+    are streamed straight into typed sample columns (data['samples']) rather
+    than kept as a list of dicts.
+
+    The file is read once: the same buffer is hashed and decoded. Pass a
+    FileBuffer that was already hashed (e.g. by the sync engine) to avoid
+    reading it again.
+
+    The high-volume types (record, monitoring, stress_level, hrv) go through
+    the native struct decoder in ingestion/fit_decoder.py; fitparse decodes
+    the rest and verifies the CRC. Files the native decoder can't handle are
+    decoded entirely by fitparse.
+
     Args:
         file_path: Path to the FIT file
+        message_types: FIT message names to decode
+        buffer: Optional FileBuffer for file_path, owned by the caller
+        native: Use the native decoder (defaults to USE_NATIVE_FIT_DECODER)
 
     Returns:
         Dictionary containing parsed data organized by message type
@@ -106,123 +312,197 @@ def parse_fit_file(file_path: str) -> Dict[str, Any]:
         logger.error("fitparse library not available")
         return {"error": "fitparse not installed"}
 
+    owns_buffer = buffer is None
+    if owns_buffer:
+        buffer = FileBuffer(file_path)
+
     data = {
         "file_path": file_path,
-        "file_hash": compute_file_hash(file_path),
+        "file_hash": buffer.sha256,
         "sleep_records": [],
         "hrv_records": [],
         "stress_records": [],
         "daily_steps": [],
         "activities": [],
         "sessions": [],
-        "records": [],
-        "file_info": {}
+        "file_info": {},
+        "samples": {}
     }
+    samples = SampleColumnsBuilder()
+
+    def collect(messages, samples):
+        for message_type, values in messages:
+            key = FIT_MESSAGE_KEYS.get(message_type)
+            if key == 'file_info':
+                data['file_info'] = values
+            elif key == 'samples':
+                samples.append(values)
+            elif key:
+                data[key].append(values)
+
+    message_types = frozenset(message_types)
+    if native is None:
+        native = USE_NATIVE_FIT_DECODER
+    native_types = message_types & NATIVE_MESSAGE_TYPES if native else frozenset()
 
     try:
-        fitfile = FitFile(file_path)
-        logger.debug(f"Successfully opened FIT file: {file_path}")
-
-        for record in fitfile.get_messages():
-            message_type = record.name
-
-            if message_type == 'file_id':
-                # File metadata
-                file_info = {}
-                for field in record:
-                    if field.value is not None:
-                        file_info[field.name] = field.value
-                data['file_info'] = file_info
-
-            elif message_type == 'monitoring':
-                # Daily summaries (steps, calories, etc.)
-                monitoring_record = {}
-                for field in record:
-                    if field.value is not None:
-                        monitoring_record[field.name] = field.value
-                if monitoring_record:
-                    data['daily_steps'].append(monitoring_record)
-
-            elif message_type == 'stress_level':
-                # Stress measurements
-                stress_record = {}
-                for field in record:
-                    if field.value is not None:
-                        stress_record[field.name] = field.value
-                if stress_record:
-                    data['stress_records'].append(stress_record)
-
-            elif message_type == 'sleep':
-                # Sleep data (rare in FIT files, usually in JSON)
-                sleep_record = {}
-                for field in record:
-                    if field.value is not None:
-                        sleep_record[field.name] = field.value
-                if sleep_record:
-                    data['sleep_records'].append(sleep_record)
-
-            elif message_type == 'hrv':
-                # Heart rate variability
-                hrv_record = {}
-                for field in record:
-                    if field.value is not None:
-                        hrv_record[field.name] = field.value
-                if hrv_record:
-                    data['hrv_records'].append(hrv_record)
-
-            elif message_type == 'session':
-                # Workout sessions
-                session_record = {}
-                for field in record:
-                    if field.value is not None:
-                        session_record[field.name] = field.value
-                if session_record:
-                    data['sessions'].append(session_record)
-
-            elif message_type == 'activity':
-                # Activity summaries
-                activity_record = {}
-                for field in record:
-                    if field.value is not None:
-                        activity_record[field.name] = field.value
-                if activity_record:
-                    data['activities'].append(activity_record)
-
-            elif message_type == 'record':
-                # Per-second data during activities
-                record_data = {}
-                for field in record:
-                    if field.value is not None:
-                        record_data[field.name] = field.value
-                if record_data:
-                    data['records'].append(record_data)
+        if native_types:
+            try:
+                collect(iter_native_fit_messages(buffer.data, native_types), samples)
+            except UnsupportedFitData as e:
+                logger.debug(f"Native FIT decoder not usable for {file_path} ({e}), using fitparse")
+                for message_type in native_types:
+                    key = FIT_MESSAGE_KEYS.get(message_type)
+                    if key and key != 'samples':
+                        data[key] = []
+                samples = SampleColumnsBuilder()
+                native_types = frozenset()
+
+        collect(iter_fit_messages(buffer.data, message_types - native_types), samples)
+
+        data['samples'] = samples.finish()
 
         # Log summary of parsed data
         summary = {
-            'sleep_records': len(data['sleep_records']),
-            'hrv_records': len(data['hrv_records']),
-            'stress_records': len(data['stress_records']),
-            'daily_steps': len(data['daily_steps']),
-            'activities': len(data['activities']),
-            'sessions': len(data['sessions']),
-            'records': len(data['records'])
+            key: len(data[key])
+            for key in FIT_MESSAGE_KEYS.values()
+            if key not in ('file_info', 'samples')
         }
+        summary['samples'] = len(samples)
         logger.info(f"Parsed FIT file {file_path}: {summary}")
 
     except Exception as e:
         logger.error(f"Error parsing FIT file {file_path}: {e}")
         data["error"] = str(e)
 
+    finally:
+        if owns_buffer:
+            buffer.close()
+
     return data
 
 
-def insert_fit_data(parsed_data: Dict[str, Any], db_connection, source: str = "manual") -> int:
+_IMPORTED_FILES_SQL = """INSERT INTO imported_files
+   (file_hash, file_path, file_type, file_size, modified_time, source, record_count)
+   VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+_SLEEP_RECORDS_SQL = upsert_sql(
+    "sleep_records",
+    ("id", "date", "start_time", "duration_minutes", "source_file_hash"),
+    ("date",)
+)
+
+_HRV_RECORDS_SQL = upsert_sql(
+    "hrv_records",
+    ("id", "date", "hrv_value", "measurement_type", "source_file_hash"),
+    ("date",)
+)
+
+_STRESS_RECORDS_SQL = upsert_sql(
+    "stress_records",
+    ("id", "timestamp", "stress_level", "source_file_hash"),
+    ("id",)
+)
+
+# Monitoring totals are cumulative from midnight. A day's row is replaced
+# by the file it came from (re-parsed) or by one the device recorded later,
+# which has the later (or corrected) total. Files recorded at the same or
+# an unknown time are overlapping partial files, where the larger total wins.
+_DAILY_STEPS_SQL = """INSERT INTO daily_steps
+   (date, step_count, distance_meters, calories, source_file_hash, source_recorded_at)
+   VALUES (?, ?, ?, ?, ?, ?)
+   ON CONFLICT (date) DO UPDATE SET
+   step_count = excluded.step_count, distance_meters = excluded.distance_meters,
+   calories = excluded.calories, source_file_hash = excluded.source_file_hash,
+   source_recorded_at = excluded.source_recorded_at, imported_at = CURRENT_TIMESTAMP
+   WHERE (excluded.source_file_hash = daily_steps.source_file_hash
+          OR excluded.source_recorded_at > daily_steps.source_recorded_at
+          OR ((excluded.source_recorded_at IS NULL OR daily_steps.source_recorded_at IS NULL
+               OR excluded.source_recorded_at = daily_steps.source_recorded_at)
+              AND excluded.step_count >= daily_steps.step_count))
+     AND (daily_steps.step_count IS NOT excluded.step_count
+          OR daily_steps.distance_meters IS NOT excluded.distance_meters
+          OR daily_steps.calories IS NOT excluded.calories
+          OR daily_steps.source_recorded_at IS NOT excluded.source_recorded_at)"""
+
+_ACTIVITIES_SQL = upsert_sql(
+    "activities",
+    ("id", "start_time", "activity_type", "duration_seconds", "distance_meters",
+     "avg_hr", "max_hr", "training_load", "source_file_hash"),
+    ("id",)
+)
+
+
+def aggregate_daily_steps(monitoring_records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reduce monitoring messages to one steps/distance/calories total per day
+
+    Garmin monitoring counters are cumulative per activity type (walking,
+    running, ...) and reset at midnight, so a day's total is the sum over
+    activity types of each type's largest value that day. Only days with
+    at least one step count are returned.
+
+    Args:
+        monitoring_records: `monitoring` message dicts from parse_fit_file()
+
+    Returns:
+        List of {date, steps, distance, active_calories} dicts, ordered by date
+    """
+    # (date, activity_type) -> [steps, distance, active_calories] maxima
+    maxima: Dict[Tuple[Any, Any], List[Optional[float]]] = {}
+    step_days = set()
+
+    for record in monitoring_records:
+        timestamp = record.get('timestamp')
+        if timestamp is None:
+            continue
+        date = timestamp.date() if hasattr(timestamp, 'date') else timestamp
+        key = (date, record.get('activity_type'))
+        current = maxima.get(key)
+        if current is None:
+            current = maxima[key] = [None, None, None]
+
+        for i, field in enumerate(('steps', 'distance', 'active_calories')):
+            value = record.get(field)
+            if value is not None and (current[i] is None or value > current[i]):
+                current[i] = value
+        if record.get('steps') is not None:
+            step_days.add(date)
+
+    days: Dict[Any, Dict[str, Any]] = {}
+    for (date, _), (steps, distance, calories) in maxima.items():
+        if date not in step_days:
+            continue
+        day = days.setdefault(date, {'date': date, 'steps': 0, 'distance': None, 'active_calories': None})
+        if steps is not None:
+            day['steps'] += steps
+        if distance is not None:
+            day['distance'] = (day['distance'] or 0) + distance
+        if calories is not None:
+            day['active_calories'] = (day['active_calories'] or 0) + calories
+
+    return [days[date] for date in sorted(days)]
+
+
+def insert_fit_data(
+    parsed_data: Dict[str, Any],
+    db_connection,
+    source: str = "manual",
+    writer: Optional[BulkWriter] = None
+) -> int:
     """
     Insert parsed FIT data into the database
 
+    Rows are collected per target table and written with executemany(). If
+    a BulkWriter is passed, rows are only buffered on it and the caller
+    decides when to flush/commit, so one transaction can cover many files.
+    Without one, the file is written and committed on its own.
+
     Args:
         parsed_data: Data returned from parse_fit_file()
         db_connection: Database connection
+        source: Source identifier ('manual', 'gdpr', 'garmin_express')
+        writer: Optional shared BulkWriter
 
     Returns:
         Number of records inserted
@@ -237,32 +517,24 @@ def insert_fit_data(parsed_data: Dict[str, Any], db_connection, source: str = "m
 
     file_hash = parsed_data["file_hash"]
     file_path = parsed_data["file_path"]
-    total_inserted = 0
+    owns_writer = writer is None
+    if owns_writer:
+        writer = BulkWriter(db_connection)
 
     try:
-        # Get file metadata for sync tracking
-        metadata = get_file_metadata(file_path)
-
-        # Check if file already imported
-        cursor = db_connection.execute(
-            "SELECT file_hash FROM imported_files WHERE file_hash = ?",
-            (file_hash,)
-        )
-        if cursor.fetchone():
+        # Get file metadata for sync tracking (given by the parser for
+        # contents that never existed as a file, like streamed zip members)
+        metadata = parsed_data.get("file_metadata") or get_file_metadata(file_path)
+
+        # Check if file already imported (or queued in this transaction)
+        if writer.is_pending(file_hash) or is_file_imported(db_connection, file_hash):
             logger.info(f"File already imported: {file_path}")
             return 0
 
-        # Insert file tracking record with sync metadata
-        db_connection.execute(
-            """INSERT INTO imported_files
-               (file_hash, file_path, file_type, file_size, modified_time, source, record_count)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (file_hash, file_path, 'fit', metadata['file_size'],
-             metadata['modified_time'], source, 0)  # Will update record_count later
-        )
-
-        # Insert sleep records
-        for i, sleep_record in enumerate(parsed_data.get('sleep_records', [])):
+        # Build every row for this file before buffering any of them, so a
+        # bad file never leaves half its rows in a shared writer
+        sleep_rows = []
+        for sleep_record in parsed_data.get('sleep_records', []):
             if 'local_start_time' in sleep_record and 'sleep_time' in sleep_record:
                 start_time = sleep_record.get('local_start_time')
                 duration_s = sleep_record.get('sleep_time', 0)
@@ -274,171 +546,293 @@ def insert_fit_data(parsed_data: Dict[str, Any], db_connection, source: str = "m
                 else:
                     date = start_time
 
-                # Generate unique ID
-                sleep_id = hash(file_hash + f"sleep_{i}") % (2**31)
-
-                db_connection.execute(
-                    """INSERT OR REPLACE INTO sleep_records
-                       (id, date, start_time, duration_minutes, source_file_hash)
-                       VALUES (?, ?, ?, ?, ?)""",
-                    (sleep_id, date, start_time, duration_min, file_hash)
-                )
-                total_inserted += 1
+                sleep_id = stable_record_id("sleep", date)
+                sleep_rows.append((sleep_id, date, start_time, duration_min, file_hash))
 
-        # Insert HRV records
-        for i, hrv_record in enumerate(parsed_data.get('hrv_records', [])):
+        hrv_rows = []
+        for hrv_record in parsed_data.get('hrv_records', []):
             if 'timestamp' in hrv_record and 'rmssd' in hrv_record:
                 timestamp = hrv_record['timestamp']
                 date = timestamp.date() if hasattr(timestamp, 'date') else timestamp
 
-                # Generate unique ID
-                hrv_id = hash(file_hash + f"hrv_{i}") % (2**31)
+                hrv_id = stable_record_id("hrv", date)
+                hrv_rows.append((hrv_id, date, hrv_record['rmssd'], 'rmssd', file_hash))
 
-                db_connection.execute(
-                    """INSERT OR REPLACE INTO hrv_records
-                       (id, date, hrv_value, measurement_type, source_file_hash)
-                       VALUES (?, ?, ?, ?, ?)""",
-                    (hrv_id, date, hrv_record['rmssd'], 'rmssd', file_hash)
-                )
-                total_inserted += 1
-
-        # Insert stress records
-        for i, stress_record in enumerate(parsed_data.get('stress_records', [])):
+        stress_rows = []
+        for stress_record in parsed_data.get('stress_records', []):
             if 'stress_level_time' in stress_record and 'stress_level_value' in stress_record:
-                # Generate unique ID
-                stress_id = hash(file_hash + f"stress_{i}") % (2**31)
-
-                db_connection.execute(
-                    """INSERT INTO stress_records
-                       (id, timestamp, stress_level, source_file_hash)
-                       VALUES (?, ?, ?, ?)""",
-                    (stress_id, stress_record['stress_level_time'], stress_record['stress_level_value'], file_hash)
-                )
-                total_inserted += 1
-
-        # Insert daily steps from monitoring records
-        for monitoring_record in parsed_data.get('daily_steps', []):
-            if 'timestamp' in monitoring_record and 'steps' in monitoring_record:
-                timestamp = monitoring_record['timestamp']
-                date = timestamp.date() if hasattr(timestamp, 'date') else timestamp
-
-                # Use INSERT OR IGNORE for DuckDB, then UPDATE if needed
-                try:
-                    db_connection.execute(
-                        """INSERT INTO daily_steps
-                           (date, step_count, distance_meters, calories, source_file_hash)
-                           VALUES (?, ?, ?, ?, ?)""",
-                        (date,
-                         monitoring_record.get('steps', 0),
-                         monitoring_record.get('distance'),
-                         monitoring_record.get('active_calories'),
-                         file_hash)
-                    )
-                    total_inserted += 1
-                except:
-                    # If insert fails due to duplicate, update instead
-                    db_connection.execute(
-                        """UPDATE daily_steps SET
-                           step_count = ?, distance_meters = ?, calories = ?,
-                           source_file_hash = ?, imported_at = CURRENT_TIMESTAMP
-                           WHERE date = ?""",
-                        (monitoring_record.get('steps', 0),
-                         monitoring_record.get('distance'),
-                         monitoring_record.get('active_calories'),
-                         file_hash,
-                         date)
-                    )
-                    # Don't increment total_inserted for updates
-
-        # Insert activities from sessions
-        for i, session in enumerate(parsed_data.get('sessions', [])):
+                # Stress is one per-user time series: the timestamp is the natural key
+                stress_id = stable_record_id("stress", stress_record['stress_level_time'])
+                stress_rows.append((
+                    stress_id,
+                    stress_record['stress_level_time'],
+                    stress_record['stress_level_value'],
+                    file_hash
+                ))
+
+        # Daily steps: monitoring messages reduced in memory to one row per day
+        recorded_at = (parsed_data.get('file_info') or {}).get('time_created')
+        steps_rows = [
+            (day['date'], day['steps'], day['distance'], day['active_calories'], file_hash, recorded_at)
+            for day in aggregate_daily_steps(parsed_data.get('daily_steps', []))
+        ]
+
+        # Activities from sessions
+        recording = fit_file_identity(parsed_data.get('file_info'), file_hash)
+        activity_rows = []
+        activity_sessions = []
+        for session in parsed_data.get('sessions', []):
             if 'start_time' in session:
-                # Generate unique ID using file hash and index
-                session_id = hash(file_hash + str(i)) % (2**31)  # Ensure positive 32-bit int
-
-                db_connection.execute(
-                    """INSERT INTO activities
-                       (id, start_time, activity_type, duration_seconds, distance_meters,
-                        avg_hr, max_hr, training_load, source_file_hash)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (session_id,
-                     session.get('start_time'),
-                     session.get('sport'),
-                     session.get('total_elapsed_time'),
-                     session.get('total_distance'),
-                     session.get('avg_heart_rate'),
-                     session.get('max_heart_rate'),
-                     session.get('training_load_peak', 0),
-                     file_hash)
-                )
-                total_inserted += 1
-
-        # Update record count in imported_files
-        db_connection.execute(
-            "UPDATE imported_files SET record_count = ? WHERE file_hash = ?",
-            (total_inserted, file_hash)
-        )
-
-        # Commit transaction
-        db_connection.commit()
-        logger.info(f"Inserted {total_inserted} records from {file_path}")
+                # Same recording + same session start -> same activity, in any process
+                session_id = stable_record_id("activity", recording, session['start_time'])
+                activity_sessions.append((session_id, session))
+                activity_rows.append((
+                    session_id,
+                    session.get('start_time'),
+                    session.get('sport'),
+                    session.get('total_elapsed_time'),
+                    session.get('total_distance'),
+                    session.get('avg_heart_rate'),
+                    session.get('max_heart_rate'),
+                    session.get('training_load_peak', 0),
+                    file_hash
+                ))
+
+        # Per-second sample streams, stored against their activity
+        sample_rows = []
+        samples = parsed_data.get('samples')
+        if samples and activity_sessions:
+            if len(activity_sessions) == 1:
+                activity_samples = [(activity_sessions[0][0], samples)]
+            else:
+                # Multisport files: split streams by each session's time window
+                activity_samples = []
+                for session_id, session in activity_sessions:
+                    start = session['start_time']
+                    elapsed = session.get('total_elapsed_time')
+                    end = start + timedelta(seconds=elapsed) if elapsed and hasattr(start, 'date') else None
+                    activity_samples.append((session_id, slice_samples(samples, start, end)))
+            sample_rows = activity_sample_rows(activity_samples, file_hash)
+
+        total_inserted = (len(sleep_rows) + len(hrv_rows) + len(stress_rows)
+                          + len(steps_rows) + len(activity_rows))
+
+        # File tracking record with sync metadata goes first
+        writer.add(_IMPORTED_FILES_SQL, (
+            file_hash, file_path, 'fit', metadata['file_size'],
+            metadata['modified_time'], source, total_inserted
+        ))
+        writer.add_many(_SLEEP_RECORDS_SQL, sleep_rows)
+        writer.add_many(_HRV_RECORDS_SQL, hrv_rows)
+        writer.add_many(_STRESS_RECORDS_SQL, stress_rows)
+        writer.add_many(_DAILY_STEPS_SQL, steps_rows)
+        writer.add_many(_ACTIVITIES_SQL, activity_rows)
+        writer.add_many(ACTIVITY_SAMPLES_INSERT_SQL, sample_rows)
+        writer.add_pending_key(file_hash)
+
+        if owns_writer:
+            writer.commit()
+            logger.info(f"Inserted {total_inserted} records from {file_path}")
 
     except Exception as e:
         logger.error(f"Error inserting data from {file_path}: {e}")
-        try:
-            db_connection.rollback()
-        except:
-            pass  # Rollback may not be available in DuckDB
+        if owns_writer:
+            writer.rollback()
         return 0
 
     return total_inserted
 
 
-def process_fit_folder(folder_path: str, db_connection) -> Dict[str, Any]:
+# A FIT file to parse: a path on disk, or (name, contents) for data that is
+# already in memory, such as a member streamed out of a zip
+FitSource = Union[str, Tuple[str, bytes]]
+
+
+def _source_path(source: FitSource) -> str:
+    return source if isinstance(source, str) else source[0]
+
+
+def _parse_fit_file_timed(source: FitSource) -> Tuple[Dict[str, Any], float]:
+    """
+    Parse a FIT file and report how long it took
+
+    Module-level so it can be pickled into a process pool worker.
+    """
+    started = time.perf_counter()
+    if isinstance(source, str):
+        parsed_data = parse_fit_file(source)
+    else:
+        file_path, contents = source
+        with FileBuffer.from_bytes(file_path, contents) as buffer:
+            parsed_data = parse_fit_file(file_path, buffer=buffer)
+    return parsed_data, time.perf_counter() - started
+
+
+def iter_parsed_fit_files(fit_files: Iterable[FitSource], workers: int = 1) -> Iterator[Tuple[str, Dict[str, Any], float]]:
+    """
+    Parse FIT files, optionally across a process pool
+
+    With workers > 1, files are parsed in a ProcessPoolExecutor and yielded
+    as they complete. At most workers * 2 files are in flight so parsed
+    results don't pile up in memory while the caller is writing. fit_files
+    is consumed lazily, so in-memory sources can be produced on demand.
+
+    Args:
+        fit_files: Paths to FIT files, or (name, contents) pairs
+        workers: Number of parser processes (1 = parse in this process)
+
+    Yields:
+        (file_path, parsed_data, parse_seconds) tuples. parsed_data contains
+        an "error" key if the file could not be parsed.
+    """
+    if workers <= 1 or (isinstance(fit_files, list) and len(fit_files) <= 1):
+        for source in fit_files:
+            parsed_data, elapsed = _parse_fit_file_timed(source)
+            yield _source_path(source), parsed_data, elapsed
+        return
+
+    pending_files = iter(fit_files)
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+
+        def submit_next() -> bool:
+            source = next(pending_files, None)
+            if source is None:
+                return False
+            in_flight[executor.submit(_parse_fit_file_timed, source)] = _source_path(source)
+            return True
+
+        while len(in_flight) < max_in_flight and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = in_flight.pop(future)
+                try:
+                    parsed_data, elapsed = future.result()
+                except Exception as e:
+                    logger.error(f"Parser worker failed on {file_path}: {e}")
+                    parsed_data, elapsed = {"file_path": file_path, "error": str(e)}, 0.0
+                submit_next()
+                yield file_path, parsed_data, elapsed
+
+
+def process_fit_folder(
+    folder_path: str,
+    db_connection,
+    workers: int = 1,
+    batch_files: int = 50,
+    progress_callback: Optional[Callable[[str, int, int], None]] = None
+) -> Dict[str, Any]:
     """
     Complete pipeline to process a FIT folder
 
     1. Scan for FIT files
-    2. Parse each file
+    2. Parse each file (in a process pool when workers > 1)
     3. Deduplicate based on hash
-    4. Insert into DB
+    4. Insert into DB (always from this process - the single writer),
+       buffering rows and committing once per `batch_files` files
     5. Return summary
 
+    If a batch fails to commit it is rolled back and its files are replayed
+    one at a time, so a single bad file only loses its own rows.
+
     Args:
         folder_path: Directory containing FIT files
         db_connection: Database connection
+        workers: Number of parser processes to use
+        batch_files: Number of files written per transaction
+        progress_callback: Optional callback function(operation, current, total),
+            called once per file; an exception it raises aborts the import
+            and leaves the open batch uncommitted
 
     Returns:
-        Summary of processing results
+        Summary of processing results, including per-stage timings and
+        write throughput
     """
     logger.info(f"Processing FIT folder: {folder_path}")
 
+    workers = max(1, workers or 1)
+    batch_files = max(1, batch_files or 1)
+
     summary = {
         "files_found": 0,
         "files_processed": 0,
         "total_records": 0,
         "duplicates_skipped": 0,
         "errors": 0,
-        "error_files": []
+        "error_files": [],
+        "workers": workers,
+        "rows_written": 0,
+        "rows_per_second": 0.0,
+        "timings": {
+            "scan_seconds": 0.0,
+            "parse_seconds": 0.0,
+            "write_seconds": 0.0,
+            "total_seconds": 0.0
+        }
     }
+    timings = summary["timings"]
+    started = time.perf_counter()
+    writer = BulkWriter(db_connection)
+    previous_profile = None
+
+    # (file_path, parsed_data, records_inserted, duplicate) for the open batch
+    batch: List[Tuple[str, Dict[str, Any], int, bool]] = []
+
+    def record_result(file_path: str, records_inserted: int, duplicate: bool):
+        if records_inserted:
+            summary["total_records"] += records_inserted
+            summary["files_processed"] += 1
+        elif duplicate:
+            summary["duplicates_skipped"] += 1
+            logger.info(f"Skipped duplicate file: {file_path}")
+        else:
+            logger.warning(f"No records extracted from file: {file_path}")
+
+    def commit_batch():
+        write_started = time.perf_counter()
+        try:
+            writer.commit()
+            for file_path, _, records_inserted, duplicate in batch:
+                record_result(file_path, records_inserted, duplicate)
+        except Exception as e:
+            logger.error(f"Batch commit failed, replaying {len(batch)} files individually: {e}")
+            writer.rollback()
+            for file_path, parsed_data, _, _ in batch:
+                records_inserted = insert_fit_data(parsed_data, db_connection)
+                record_result(file_path, records_inserted, is_file_imported(db_connection, parsed_data["file_hash"]))
+        finally:
+            batch.clear()
+            timings["write_seconds"] += time.perf_counter() - write_started
 
     try:
         # 1. Scan for FIT files
         fit_files = scan_fit_directory(folder_path)
         summary["files_found"] = len(fit_files)
+        timings["scan_seconds"] = time.perf_counter() - started
 
         if not fit_files:
             logger.info("No FIT files found in directory")
             return summary
 
-        # 2. Process each FIT file
-        for file_path in fit_files:
+        # Bulk-import PRAGMAs until the folder is written (see db/connection.py)
+        previous_profile = apply_profile(db_connection, "bulk-import")
+
+        # 2. Parse files (possibly in parallel) and buffer their rows
+        parsed_files = iter_parsed_fit_files(fit_files, workers)
+        for idx, (file_path, parsed_data, parse_seconds) in enumerate(parsed_files):
+            timings["parse_seconds"] += parse_seconds
+            if progress_callback:
+                progress_callback("Processing FIT files", idx + 1, len(fit_files))
+            write_started = time.perf_counter()
+
             try:
                 logger.info(f"Processing file: {file_path}")
 
-                # Parse the FIT file
-                parsed_data = parse_fit_file(file_path)
-
                 if "error" in parsed_data:
                     logger.error(f"Failed to parse {file_path}: {parsed_data['error']}")
                     summary["errors"] += 1
@@ -448,24 +842,13 @@ def process_fit_folder(folder_path: str, db_connection) -> Dict[str, Any]:
                     })
                     continue
 
-                # Insert data into database
-                records_inserted = insert_fit_data(parsed_data, db_connection)
-
+                # Buffer rows on the shared writer
+                records_inserted = insert_fit_data(parsed_data, db_connection, writer=writer)
+                duplicate = False
                 if records_inserted == 0:
-                    # Check if it was a duplicate
                     file_hash = parsed_data["file_hash"]
-                    cursor = db_connection.execute(
-                        "SELECT file_hash FROM imported_files WHERE file_hash = ?",
-                        (file_hash,)
-                    )
-                    if cursor.fetchone():
-                        summary["duplicates_skipped"] += 1
-                        logger.info(f"Skipped duplicate file: {file_path}")
-                    else:
-                        logger.warning(f"No records extracted from file: {file_path}")
-                else:
-                    summary["total_records"] += records_inserted
-                    summary["files_processed"] += 1
+                    duplicate = writer.is_pending(file_hash) or is_file_imported(db_connection, file_hash)
+                batch.append((file_path, parsed_data, records_inserted, duplicate))
 
             except Exception as e:
                 logger.error(f"Error processing file {file_path}: {e}")
@@ -475,6 +858,19 @@ def process_fit_folder(folder_path: str, db_connection) -> Dict[str, Any]:
                     "error": str(e)
                 })
 
+            finally:
+                timings["write_seconds"] += time.perf_counter() - write_started
+
+            if len(batch) >= batch_files:
+                commit_batch()
+
+        if batch:
+            commit_batch()
+
+        # Days this import wrote (daily_steps)
+        refresh_daily_metrics(db_connection)
+        db_connection.commit()
+
         # Final summary log
         logger.info(f"Folder processing complete: {summary}")
 
@@ -486,4 +882,17 @@ def process_fit_folder(folder_path: str, db_connection) -> Dict[str, Any]:
             "error": str(e)
         })
 
+    finally:
+        if previous_profile is not None:
+            # journal_mode and synchronous can't change inside a transaction,
+            # so drop what a failed or cancelled batch left staged first
+            if db_connection.in_transaction:
+                writer.rollback()
+            restore_profile(db_connection, previous_profile)
+        summary["rows_written"] = writer.rows_written
+        summary["rows_per_second"] = round(writer.rows_per_second, 1)
+        timings["total_seconds"] = time.perf_counter() - started
+        for stage, seconds in timings.items():
+            timings[stage] = round(seconds, 3)
+
     return summary
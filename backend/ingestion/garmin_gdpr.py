@@ -17,22 +17,146 @@ import tempfile
 import shutil
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Callable
+import copy
+from functools import partial
+import hashlib
+import io
 import logging
+import time
 import json
+from datetime import datetime
+
+from db.connection import apply_profile, restore_profile
+from db.daily_metrics import refresh_daily_metrics
+from ingestion.checkpoints import (
+    is_member_completed,
+    is_member_in_manifest,
+    load_completed_members,
+    load_member_manifest,
+    record_member_completed,
+    record_members_completed
+)
+from ingestion.file_buffer import FileBuffer
 
 logger = logging.getLogger(__name__)
 
+# Zips inside zips are opened as streams down to this many levels; deeper
+# ones are reported and skipped
+MAX_NESTED_ZIP_DEPTH = 3
+
+# Nested zips up to this size (uncompressed) are read into memory once;
+# larger ones are read as a stream over their parent, which decompresses
+# them again for every backwards seek
+MAX_BUFFERED_NESTED_ZIP_BYTES = 256 * 1024 * 1024
+
+# Read size when hashing large members ahead of streaming them
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Rough single-worker import throughput (uncompressed bytes per second) and
+# fixed cost per file (hashing, checkpoint, commit), for plan_gdpr_export()
+PLAN_BYTES_PER_SECOND = {
+    "fit_files": 2 * 1024 * 1024,
+    "sleep_json": 8 * 1024 * 1024,
+    "daily_summaries": 8 * 1024 * 1024,
+    "hrv": 8 * 1024 * 1024,
+    "stress": 8 * 1024 * 1024,
+    "fitness_assessments": 8 * 1024 * 1024,
+    "hydration": 8 * 1024 * 1024,
+    "menstrual_cycles": 8 * 1024 * 1024,
+    "body_composition": 8 * 1024 * 1024,
+}
+PLAN_SECONDS_PER_FILE = 0.002
+
+
+def _new_export_summary(extract_to: Optional[str]) -> Dict[str, Any]:
+    return {
+        "total_files": 0,
+        "fit_files": [],
+        "tcx_files": [],
+        "json_files": [],
+        "extract_path": extract_to,
+        "di_connect_found": False,
+        "members": {},
+        "skipped_members": 0,
+        "nested_members": {},
+        "nested_archives": [],
+        "nested_zip_members": {},
+        "nested_errors": [],
+        "file_categories": {
+            "sleep": [],
+            "daily_summaries": [],
+            "activities": [],
+            "hrv": [],
+            "stress": [],
+            "fitness_assessments": [],
+            "hydration": [],
+            "menstrual_cycles": [],
+            "body_composition": [],
+            "other": []
+        }
+    }
+
 
-def extract_garmin_export(zip_path: str, extract_to: Optional[str] = None) -> Dict[str, Any]:
+def _categorize_file(summary: Dict[str, Any], full_path: str, directory: str, file: str):
+    """Add one file of an export to the summary's type and category lists"""
+    file_lower = file.lower()
+    summary["total_files"] += 1
+
+    # Categorize by file extension
+    if file_lower.endswith('.fit'):
+        summary["fit_files"].append(full_path)
+        # Categorize FIT files by subdirectory
+        if "activities" in directory.lower() or "fitness" in directory.lower():
+            summary["file_categories"]["activities"].append(full_path)
+        else:
+            summary["file_categories"]["other"].append(full_path)
+
+    elif file_lower.endswith('.tcx'):
+        summary["tcx_files"].append(full_path)
+        summary["file_categories"]["activities"].append(full_path)
+
+    elif file_lower.endswith('.json'):
+        summary["json_files"].append(full_path)
+
+        # Categorize JSON files by filename pattern
+        if "sleep" in file_lower:
+            summary["file_categories"]["sleep"].append(full_path)
+        elif "udsfile" in file_lower or "dailysummary" in file_lower or "summarizedactivities" in file_lower:
+            summary["file_categories"]["daily_summaries"].append(full_path)
+        elif "hrv" in file_lower:
+            summary["file_categories"]["hrv"].append(full_path)
+        elif "stress" in file_lower:
+            summary["file_categories"]["stress"].append(full_path)
+        elif "fitnessage" in file_lower or "vo2max" in file_lower:
+            summary["file_categories"]["fitness_assessments"].append(full_path)
+        elif "hydration" in file_lower:
+            summary["file_categories"]["hydration"].append(full_path)
+        elif "menstrual" in file_lower:
+            summary["file_categories"]["menstrual_cycles"].append(full_path)
+        elif "weight" in file_lower or "bodycomposition" in file_lower:
+            summary["file_categories"]["body_composition"].append(full_path)
+        else:
+            summary["file_categories"]["other"].append(full_path)
+
+
+def extract_garmin_export(
+    zip_path: str,
+    extract_to: Optional[str] = None,
+    skip_member: Optional[Callable[[zipfile.ZipInfo], bool]] = None
+) -> Dict[str, Any]:
     """
     Extract a Garmin GDPR export zip file
 
     Args:
         zip_path: Path to the .zip file
         extract_to: Directory to extract files to (if None, uses temp directory)
+        skip_member: Optional predicate; members it returns True for are not
+            extracted (used to resume an import from its checkpoints)
 
     Returns:
-        Summary dict with extracted file counts and types
+        Summary dict with extracted file counts and types. "members" maps
+        each extracted file's path to its ZipInfo; "skipped_members" counts
+        the members left in the archive.
     """
     logger.info(f"Extracting GDPR export: {zip_path}")
 
@@ -50,26 +174,7 @@ def extract_garmin_export(zip_path: str, extract_to: Optional[str] = None) -> Di
     else:
         os.makedirs(extract_to, exist_ok=True)
 
-    summary = {
-        "total_files": 0,
-        "fit_files": [],
-        "tcx_files": [],
-        "json_files": [],
-        "extract_path": extract_to,
-        "di_connect_found": False,
-        "file_categories": {
-            "sleep": [],
-            "daily_summaries": [],
-            "activities": [],
-            "hrv": [],
-            "stress": [],
-            "fitness_assessments": [],
-            "hydration": [],
-            "menstrual_cycles": [],
-            "body_composition": [],
-            "other": []
-        }
-    }
+    summary = _new_export_summary(extract_to)
 
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
@@ -77,9 +182,17 @@ def extract_garmin_export(zip_path: str, extract_to: Optional[str] = None) -> Di
             all_files = zip_ref.namelist()
             logger.info(f"ZIP contains {len(all_files)} files")
 
-            # Extract all files
-            zip_ref.extractall(extract_to)
+            # Extract all files (except those skip_member rules out)
+            for member in zip_ref.infolist():
+                if skip_member is not None and not member.is_dir() and skip_member(member):
+                    summary["skipped_members"] += 1
+                    continue
+                extracted_path = zip_ref.extract(member, extract_to)
+                if not member.is_dir():
+                    summary["members"][os.path.normpath(extracted_path)] = member
             logger.info(f"Extracted to: {extract_to}")
+            if summary["skipped_members"]:
+                logger.info(f"Skipped {summary['skipped_members']} already imported files")
 
             # Find DI_CONNECT directory
             di_connect_path = None
@@ -98,45 +211,7 @@ def extract_garmin_export(zip_path: str, extract_to: Optional[str] = None) -> Di
             # Recursively scan and categorize files
             for root, dirs, files in os.walk(di_connect_path):
                 for file in files:
-                    full_path = os.path.join(root, file)
-                    file_lower = file.lower()
-                    summary["total_files"] += 1
-
-                    # Categorize by file extension
-                    if file_lower.endswith('.fit'):
-                        summary["fit_files"].append(full_path)
-                        # Categorize FIT files by subdirectory
-                        if "activities" in root.lower() or "fitness" in root.lower():
-                            summary["file_categories"]["activities"].append(full_path)
-                        else:
-                            summary["file_categories"]["other"].append(full_path)
-
-                    elif file_lower.endswith('.tcx'):
-                        summary["tcx_files"].append(full_path)
-                        summary["file_categories"]["activities"].append(full_path)
-
-                    elif file_lower.endswith('.json'):
-                        summary["json_files"].append(full_path)
-
-                        # Categorize JSON files by filename pattern
-                        if "sleep" in file_lower:
-                            summary["file_categories"]["sleep"].append(full_path)
-                        elif "udsfile" in file_lower or "dailysummary" in file_lower or "summarizedactivities" in file_lower:
-                            summary["file_categories"]["daily_summaries"].append(full_path)
-                        elif "hrv" in file_lower:
-                            summary["file_categories"]["hrv"].append(full_path)
-                        elif "stress" in file_lower:
-                            summary["file_categories"]["stress"].append(full_path)
-                        elif "fitnessage" in file_lower or "vo2max" in file_lower:
-                            summary["file_categories"]["fitness_assessments"].append(full_path)
-                        elif "hydration" in file_lower:
-                            summary["file_categories"]["hydration"].append(full_path)
-                        elif "menstrual" in file_lower:
-                            summary["file_categories"]["menstrual_cycles"].append(full_path)
-                        elif "weight" in file_lower or "bodycomposition" in file_lower:
-                            summary["file_categories"]["body_composition"].append(full_path)
-                        else:
-                            summary["file_categories"]["other"].append(full_path)
+                    _categorize_file(summary, os.path.join(root, file), root, file)
 
         # Log summary of categorized files
         logger.info(f"Extraction complete: {summary['total_files']} files")
@@ -155,11 +230,260 @@ def extract_garmin_export(zip_path: str, extract_to: Optional[str] = None) -> Di
     return summary
 
 
+def scan_garmin_export(
+    zip_ref: zipfile.ZipFile,
+    skip_member: Optional[Callable[[zipfile.ZipInfo], bool]] = None,
+    open_nested: bool = True
+) -> Dict[str, Any]:
+    """
+    Categorize a Garmin GDPR export from its central directory
+
+    The streaming counterpart of extract_garmin_export: nothing is
+    decompressed or written to disk. The file lists hold member names,
+    to be read with zip_ref.read() when they are processed, so members
+    that are never processed are never decompressed.
+
+    Args:
+        zip_ref: Open ZipFile of the export
+        skip_member: Optional predicate; members it returns True for are
+            left out (used to resume an import from its checkpoints)
+        open_nested: Recurse into nested zips. Listing one decompresses it,
+            so planning leaves them closed (listed in "nested_zip_members")
+
+    Returns:
+        Summary dict in the same shape as extract_garmin_export's, with
+        "extract_path" None and "members" keyed by member name
+    """
+    summary = _new_export_summary(None)
+    files = [member for member in zip_ref.infolist() if not member.is_dir()]
+    logger.info(f"ZIP contains {len(files)} files")
+
+    # Only look inside DI_CONNECT when the export has one (shallowest wins)
+    prefix = ""
+    di_connect_dirs = sorted(
+        (name.split("/")[:name.split("/").index("DI_CONNECT") + 1]
+         for name in (member.filename for member in files)
+         if "DI_CONNECT" in name.split("/")[:-1]),
+        key=len
+    )
+    if di_connect_dirs:
+        prefix = "/".join(di_connect_dirs[0]) + "/"
+        summary["di_connect_found"] = True
+        logger.info(f"Found DI_CONNECT directory: {prefix}")
+    else:
+        logger.warning("DI_CONNECT directory not found, scanning entire archive")
+
+    _scan_archive_members(
+        summary, zip_ref, [member for member in files if member.filename.startswith(prefix)],
+        "", 0, skip_member, open_nested
+    )
+
+    logger.info(f"Scanned {summary['total_files']} files without extracting")
+    return summary
+
+
+def _scan_archive_members(
+    summary: Dict[str, Any],
+    archive: zipfile.ZipFile,
+    members: List[zipfile.ZipInfo],
+    name_prefix: str,
+    depth: int,
+    skip_member: Optional[Callable[[zipfile.ZipInfo], bool]],
+    open_nested: bool = True
+):
+    """
+    Categorize members of an archive, recursing into nested zips
+
+    Nothing is written to disk. A nested zip up to
+    MAX_BUFFERED_NESTED_ZIP_BYTES is decompressed once into memory and
+    opened from there. A larger one is opened with
+    ZipFile(archive.open(member)), a seekable decompressing stream over its
+    parent: opening it reads to the end for the central directory, and
+    every backwards seek after that (the first member read, and any member
+    read out of offset order by the parallel parsers) decompresses it again
+    from the start. Its members are named "<nested zip name>/<member name>",
+    as if the zip were a directory.
+    """
+    for member in sorted(members, key=lambda m: m.header_offset):
+        name = name_prefix + member.filename
+        if depth:
+            # Checkpoints and skip_member see the nested member under its full name
+            named = copy.copy(member)
+            named.filename = name
+        else:
+            named = member
+
+        if member.filename.lower().endswith('.zip'):
+            # A nested zip imported whole before isn't even opened
+            if skip_member is not None and skip_member(named):
+                summary["skipped_members"] += 1
+                continue
+            if not open_nested:
+                summary["nested_zip_members"][name] = named
+                continue
+            if depth >= MAX_NESTED_ZIP_DEPTH:
+                logger.warning(f"Skipping nested zip deeper than {MAX_NESTED_ZIP_DEPTH} levels: {name}")
+                summary["nested_errors"].append({"file": name, "error": "nested too deeply"})
+                continue
+            try:
+                if member.file_size <= MAX_BUFFERED_NESTED_ZIP_BYTES:
+                    nested = zipfile.ZipFile(io.BytesIO(archive.read(member)))
+                else:
+                    logger.info(f"Nested zip {name} is too big to hold, reading it as a stream")
+                    nested = zipfile.ZipFile(archive.open(member))
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError, OSError) as e:
+                logger.warning(f"Could not open nested zip {name}: {e}")
+                summary["nested_errors"].append({"file": name, "error": str(e)})
+                continue
+            summary["nested_archives"].append(nested)
+            summary["nested_zip_members"][name] = named
+            logger.info(f"Scanning nested zip: {name}")
+            _scan_archive_members(
+                summary, nested, [m for m in nested.infolist() if not m.is_dir()],
+                name + "/", depth + 1, skip_member, open_nested
+            )
+            continue
+
+        if skip_member is not None and skip_member(named):
+            summary["skipped_members"] += 1
+            continue
+
+        summary["members"][name] = named
+        if depth:
+            summary["nested_members"][name] = (archive, member)
+        directory, _, file = name.rpartition("/")
+        _categorize_file(summary, name, directory, file)
+
+
+def _plan_entry() -> Dict[str, Any]:
+    return {"members": 0, "compressed_bytes": 0, "uncompressed_bytes": 0, "already_imported": 0, "estimated_seconds": 0.0}
+
+
+def plan_gdpr_export(
+    zip_path: str,
+    db_connection,
+    resume: bool = True,
+    workers: int = 1
+) -> Dict[str, Any]:
+    """
+    Dry run of process_gdpr_export: what an import would do, and how long
+
+    Reads only the zip's central directory and the import checkpoints
+    (nothing is extracted or decompressed, so this takes milliseconds even
+    for multi-GB exports). Members are categorized as the import would,
+    and counted as already imported if the import would skip them.
+
+    The estimate divides each category's bytes still to import by
+    PLAN_BYTES_PER_SECOND plus a per-file cost. FIT files are parsed in
+    parallel by the worker processes; the JSON categories share this
+    process's GIL however many threads they have (see pipeline.py), so
+    they take about the sum of their times. The import takes about as long
+    as the slower of the two. Nested zips aren't opened: their contents
+    are estimated as FIT files (they hold uploaded activities).
+
+    Args:
+        zip_path: Path to Garmin GDPR export ZIP file
+        db_connection: Database connection
+        resume: Count checkpointed members (of this or an earlier export) as imported
+        workers: Number of FIT parser processes the import would use
+
+    Returns:
+        Plan with totals and "by_category" member counts, compressed and
+        uncompressed bytes, already imported members and estimated seconds
+    """
+    started = time.perf_counter()
+
+    if not os.path.exists(zip_path):
+        raise FileNotFoundError(f"ZIP file not found: {zip_path}")
+    if not zipfile.is_zipfile(zip_path):
+        raise ValueError(f"File is not a valid ZIP archive: {zip_path}")
+
+    completed: Dict[str, Any] = {}
+    manifest: Dict[str, Any] = {}
+    if resume:
+        completed = load_completed_members(db_connection, zip_path)
+        manifest = load_member_manifest(db_connection)
+
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        scanned = scan_garmin_export(zip_ref, open_nested=False)
+
+    file_categories = scanned["file_categories"]
+    planned = {
+        "fit_files": scanned["fit_files"],
+        "sleep_json": file_categories["sleep"],
+        "daily_summaries": file_categories["daily_summaries"],
+    }
+    for category in ("hrv", "stress", "fitness_assessments", "hydration", "menstrual_cycles", "body_composition"):
+        planned[category] = file_categories[category]
+    members = scanned["members"]
+
+    plan = {
+        "zip_path": zip_path,
+        "total_members": 0,
+        "compressed_bytes": 0,
+        "uncompressed_bytes": 0,
+        "members_already_imported": 0,
+        "estimated_seconds": 0.0,
+        "by_category": {},
+        "nested_zips": _plan_entry(),
+        "not_imported": _plan_entry(),
+    }
+
+    def add(entry: Dict[str, Any], member: zipfile.ZipInfo, rate_category: Optional[str]):
+        entry["members"] += 1
+        entry["compressed_bytes"] += member.compress_size
+        entry["uncompressed_bytes"] += member.file_size
+        if rate_category is None:
+            return
+        if is_member_completed(member, completed) or is_member_in_manifest(member, manifest):
+            entry["already_imported"] += 1
+            return
+        parallel = workers if rate_category == "fit_files" else 1
+        entry["estimated_seconds"] += (
+            member.file_size / (PLAN_BYTES_PER_SECOND[rate_category] * max(parallel, 1))
+            + PLAN_SECONDS_PER_FILE
+        )
+
+    planned_names = set()
+    for category, names in planned.items():
+        entry = plan["by_category"][category] = _plan_entry()
+        for name in names:
+            add(entry, members[name], category)
+        planned_names.update(names)
+    for member in scanned["nested_zip_members"].values():
+        add(plan["nested_zips"], member, "fit_files")
+    for name, member in members.items():
+        if name not in planned_names:
+            # TCX files, unrecognized JSON and anything outside the importers
+            add(plan["not_imported"], member, None)
+
+    entries = list(plan["by_category"].values()) + [plan["nested_zips"], plan["not_imported"]]
+    for entry in entries:
+        entry["estimated_seconds"] = round(entry["estimated_seconds"], 3)
+        plan["total_members"] += entry["members"]
+        plan["compressed_bytes"] += entry["compressed_bytes"]
+        plan["uncompressed_bytes"] += entry["uncompressed_bytes"]
+        plan["members_already_imported"] += entry["already_imported"]
+
+    # Nested FIT files share the FIT parser pool with the top-level ones
+    fit_seconds = plan["by_category"]["fit_files"]["estimated_seconds"] + plan["nested_zips"]["estimated_seconds"]
+    json_seconds = sum(
+        entry["estimated_seconds"] for category, entry in plan["by_category"].items() if category != "fit_files"
+    )
+    plan["estimated_seconds"] = round(max(fit_seconds, json_seconds), 3)
+    plan["planning_time_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return plan
+
+
 def process_gdpr_export(
     zip_path: str,
     db_connection,
     progress_callback: Optional[Callable[[str, int, int], None]] = None,
-    cleanup_temp: bool = True
+    cleanup_temp: bool = True,
+    resume: bool = True,
+    streaming: bool = False,
+    workers: int = 1,
+    json_threads: int = 2
 ) -> Dict[str, Any]:
     """
     Complete pipeline to process a GDPR export
@@ -169,11 +493,37 @@ def process_gdpr_export(
     3. Insert into DB with deduplication
     4. Return comprehensive summary
 
+    Each imported archive member is checkpointed in the same transaction as
+    its data. With resume, members already checkpointed for this archive
+    (and unchanged in it) are not extracted or parsed again, so restarting
+    an interrupted import only costs the work that is left. Members a
+    previously imported export already had, with the same name, CRC and
+    size, are skipped the same way (counted in members_unchanged), so
+    importing a newer export only processes new or changed files.
+
+    With streaming, the archive is never extracted: members are listed from
+    its central directory and each one the importers need is read straight
+    into memory and handed to the FIT/JSON parsers. Nested zips (e.g. the
+    uploaded-files archives under DI_CONNECT) are read the same way.
+
+    FIT files are parsed in a pool of `workers` processes. Each JSON
+    category (sleep, daily summaries, HRV, stress, fitness assessments,
+    hydration, body composition, menstrual cycles) is read on its own
+    threads, which overlap reading and decompressing members with parsing
+    but share the GIL, so JSON parsing uses one core (see pipeline.py).
+    This thread writes the parsed files to the database as they arrive, so
+    every table is populated in one pass. Files of one category may be
+    written in completion order rather than archive order.
+
     Args:
         zip_path: Path to Garmin GDPR export ZIP file
         db_connection: Database connection
         progress_callback: Optional callback function(operation, current, total)
         cleanup_temp: Whether to delete temporary extraction directory
+        resume: Skip members completed by a previous run of this archive
+        streaming: Read members from the zip instead of extracting it
+        workers: Number of FIT parser processes
+        json_threads: Number of reader threads for each JSON category (I/O overlap only)
 
     Returns:
         Comprehensive summary of import operation
@@ -187,6 +537,9 @@ def process_gdpr_export(
         "total_files_processed": 0,
         "total_records_inserted": 0,
         "duplicates_skipped": 0,
+        "members_resumed": 0,
+        "members_unchanged": 0,
+        "nested_zips": 0,
         "errors": 0,
         "error_details": [],
         "extract_path": None,
@@ -207,187 +560,357 @@ def process_gdpr_export(
     import time
     start_time = time.time()
     extract_path = None
+    zip_ref = None
+    nested_archives = []
+    # Bulk-import PRAGMAs for the length of the import: every member is
+    # checkpointed, so a crash only costs the files being written
+    previous_profile = apply_profile(db_connection, "bulk-import")
 
     try:
-        # Step 1: Extract ZIP file
-        logger.info("Step 1: Extracting GDPR export ZIP file")
+        # Step 1: Extract ZIP file (or just list it when streaming)
+        logger.info("Step 1: Scanning GDPR export ZIP file" if streaming else "Step 1: Extracting GDPR export ZIP file")
         if progress_callback:
-            progress_callback("Extracting ZIP file", 0, 100)
-
-        extraction_summary = extract_garmin_export(zip_path)
+            progress_callback("Scanning ZIP file" if streaming else "Extracting ZIP file", 0, 100)
+
+        skip_member = None
+        unchanged_members = []
+        if resume:
+            completed = load_completed_members(db_connection, zip_path)
+            # Checkpoints of every archive: members an earlier export already had
+            manifest = load_member_manifest(db_connection)
+            if manifest:
+                def skip_member(member: zipfile.ZipInfo) -> bool:
+                    if is_member_completed(member, completed):
+                        return True
+                    if is_member_in_manifest(member, manifest):
+                        unchanged_members.append(member)
+                        return True
+                    return False
+
+        if streaming:
+            if not os.path.exists(zip_path):
+                raise FileNotFoundError(f"ZIP file not found: {zip_path}")
+            if not zipfile.is_zipfile(zip_path):
+                raise ValueError(f"File is not a valid ZIP archive: {zip_path}")
+            zip_ref = zipfile.ZipFile(zip_path, 'r')
+            extraction_summary = scan_garmin_export(zip_ref, skip_member=skip_member)
+        else:
+            extraction_summary = extract_garmin_export(zip_path, skip_member=skip_member)
         extract_path = extraction_summary["extract_path"]
         summary["extract_path"] = extract_path
-        summary["total_files_found"] = extraction_summary["total_files"]
-
-        logger.info(f"Extracted {summary['total_files_found']} files to {extract_path}")
+        # Members checkpointed by an earlier run (of this or an earlier export)
+        # are already imported: count them as duplicates
+        summary["members_unchanged"] = len(unchanged_members)
+        summary["members_resumed"] = extraction_summary["skipped_members"] - summary["members_unchanged"]
+        skipped = extraction_summary["skipped_members"]
+        summary["duplicates_skipped"] += skipped
+        summary["total_files_found"] = extraction_summary["total_files"] + skipped
+        # This archive's checkpoints cover its unchanged members too (committed with the first file)
+        record_members_completed(db_connection, zip_path, unchanged_members)
+        members = extraction_summary["members"]
+        nested_members = extraction_summary["nested_members"]
+        nested_archives = extraction_summary["nested_archives"]
+        summary["nested_zips"] = len(nested_archives)
+        for nested_error in extraction_summary["nested_errors"]:
+            summary["errors"] += 1
+            summary["error_details"].append({
+                "file": os.path.join(zip_path, nested_error["file"]),
+                "type": "zip",
+                "error": nested_error["error"]
+            })
+
+        def checkpoint(file_path: str):
+            # Staged before the file's rows are written; commits with them
+            member = members.get(file_path if streaming else os.path.normpath(file_path))
+            if member is not None:
+                record_member_completed(db_connection, zip_path, member)
+
+        def display_path(file_path: str) -> str:
+            # Streamed members are reported as paths inside the archive
+            return os.path.join(zip_path, file_path) if streaming else file_path
+
+        def read_member(file_path: str) -> bytes:
+            if file_path in nested_members:
+                archive, member = nested_members[file_path]
+                return archive.read(member)
+            return zip_ref.read(members[file_path])
+
+        def open_member(file_path: str):
+            """Binary stream of an extracted file or archive member"""
+            if not streaming:
+                return open(file_path, 'rb')
+            if file_path in nested_members:
+                archive, member = nested_members[file_path]
+                return archive.open(member)
+            return zip_ref.open(members[file_path])
+
+        def member_buffer(file_path: str) -> FileBuffer:
+            """Contents of a file or member, read once for hashing and parsing"""
+            if not streaming:
+                return FileBuffer(file_path)
+            return FileBuffer.from_bytes(display_path(file_path), read_member(file_path))
+
+        def member_hash(file_path: str) -> str:
+            """
+            SHA-256 of a member in one streamed pass, for members too big to
+            hold; the writer re-opens the member to parse it
+            """
+            hasher = hashlib.sha256()
+            with open_member(file_path) as fp:
+                while chunk := fp.read(HASH_CHUNK_SIZE):
+                    hasher.update(chunk)
+            return hasher.hexdigest()
+
+        if streaming:
+            logger.info(f"Found {summary['total_files_found']} members in {zip_path}")
+        else:
+            logger.info(f"Extracted {summary['total_files_found']} files to {extract_path}")
+
+        # Steps 2-3: Parse FIT and every JSON category concurrently. Only this
+        # thread touches db_connection and summary: files are counted, and
+        # progress reported per category, as each one is written.
+        from ingestion.fit_folder import insert_fit_data, iter_parsed_fit_files
+        from ingestion.json_decoder import FAST_DECODE_MAX_BYTES
+        from ingestion.json_parser import (
+            JSON_CATEGORIES, stream_sleep_json, stream_daily_summary_json, stream_category_json,
+            insert_sleep_data, insert_daily_summary_data, insert_category_data
+        )
+        from ingestion.pipeline import CategoryPipeline
 
-        # Step 2: Process FIT files
         fit_files = extraction_summary["fit_files"]
         summary["by_category"]["fit_files"]["found"] = len(fit_files)
 
-        if fit_files:
-            logger.info(f"Step 2: Processing {len(fit_files)} FIT files")
-            from ingestion.fit_folder import parse_fit_file, insert_fit_data
-
-            for idx, fit_file in enumerate(fit_files):
-                try:
-                    if progress_callback:
-                        progress_callback(f"Processing FIT files", idx + 1, len(fit_files))
-
-                    # Parse FIT file
-                    parsed_data = parse_fit_file(fit_file)
-
-                    if "error" in parsed_data:
-                        logger.warning(f"Error parsing {fit_file}: {parsed_data['error']}")
-                        summary["by_category"]["fit_files"]["errors"] += 1
-                        summary["error_details"].append({
-                            "file": fit_file,
-                            "type": "fit",
-                            "error": parsed_data["error"]
-                        })
+        # (summary category, file category, error type, label, operation, stream, insert, records key)
+        json_categories = [
+            ("sleep_json", "sleep", "sleep_json", "sleep JSON", "Processing sleep JSON",
+             stream_sleep_json, insert_sleep_data, "sleep_records"),
+            ("daily_summaries", "daily_summaries", "daily_summary", "daily summary", "Processing daily summaries",
+             stream_daily_summary_json, insert_daily_summary_data, "daily_summaries"),
+        ] + [
+            (name, name, name, category.label, f"Processing {category.label}",
+             partial(stream_category_json, name), partial(insert_category_data, name), "records")
+            for name, category in JSON_CATEGORIES.items()
+        ]
+        json_files = {}
+        for category, file_category, *_ in json_categories:
+            json_files[category] = extraction_summary["file_categories"][file_category]
+            summary["by_category"][category]["found"] = len(json_files[category])
+
+        fit_file_names = {display_path(fit_file): fit_file for fit_file in fit_files}
+
+        def parsed_fit_files():
+            # Streamed members are read lazily, as the parser pool has room
+            read_errors = []
+
+            def fit_sources():
+                for fit_file in fit_files:
+                    if not streaming:
+                        yield fit_file
                         continue
+                    try:
+                        yield display_path(fit_file), read_member(fit_file)
+                    except Exception as e:
+                        read_errors.append((fit_file, e))
+
+            for parsed_path, parsed_data, _ in iter_parsed_fit_files(fit_sources(), workers):
+                while read_errors:
+                    fit_file, error = read_errors.pop(0)
+                    yield fit_file, None, error
+                yield fit_file_names[parsed_path], parsed_data, None
+            for fit_file, error in read_errors:
+                yield fit_file, None, error
+
+        def member_size(file_path: str) -> int:
+            if not streaming:
+                return os.path.getsize(file_path)
+            if file_path in nested_members:
+                return nested_members[file_path][1].file_size
+            return members[file_path].file_size
+
+        def json_parser(stream_json: Callable, records_key: str) -> Callable[[str], Dict[str, Any]]:
+            def parse(json_file: str) -> Dict[str, Any]:
+                if member_size(json_file) > FAST_DECODE_MAX_BYTES:
+                    # Too big to hold decoded: the writer streams it while inserting
+                    if streaming:
+                        # Decompressed twice (hash, then parse) rather than written to disk
+                        return {"file_hash": member_hash(json_file), "deferred": True}
+                    with FileBuffer(json_file) as buffer:
+                        return {"file_hash": buffer.sha256, "deferred": True}
+                with member_buffer(json_file) as buffer:
+                    parsed_data = stream_json(io.BytesIO(buffer.data), display_path(json_file), buffer.sha256)
+                    # Malformed partway through raises: reported as a failed file
+                    parsed_data[records_key] = list(parsed_data[records_key])
+                return parsed_data
+            return parse
+
+        def write_fit_file(fit_file: str, parsed_data: Optional[Dict[str, Any]], error: Optional[BaseException]):
+            if error is not None:
+                logger.error(f"Error reading FIT member {fit_file}: {error}")
+                summary["by_category"]["fit_files"]["errors"] += 1
+                summary["errors"] += 1
+                summary["error_details"].append({
+                    "file": display_path(fit_file),
+                    "type": "fit",
+                    "error": str(error)
+                })
+                return
 
-                    # Insert into database
-                    records_inserted = insert_fit_data(parsed_data, db_connection, source="gdpr")
-
-                    if records_inserted > 0:
-                        summary["by_category"]["fit_files"]["processed"] += 1
-                        summary["by_category"]["fit_files"]["records"] += records_inserted
-                        summary["total_records_inserted"] += records_inserted
-                        summary["total_files_processed"] += 1
-                    else:
-                        # Check if it was a duplicate
-                        file_hash = parsed_data.get("file_hash")
-                        if file_hash:
-                            cursor = db_connection.execute(
-                                "SELECT file_hash FROM imported_files WHERE file_hash = ?",
-                                (file_hash,)
-                            )
-                            if cursor.fetchone():
-                                summary["duplicates_skipped"] += 1
-                                logger.debug(f"Skipped duplicate FIT file: {fit_file}")
-
-                except Exception as e:
-                    logger.error(f"Error processing FIT file {fit_file}: {e}")
+            try:
+                if "error" in parsed_data:
+                    logger.warning(f"Error parsing {fit_file}: {parsed_data['error']}")
                     summary["by_category"]["fit_files"]["errors"] += 1
-                    summary["errors"] += 1
                     summary["error_details"].append({
-                        "file": fit_file,
+                        "file": display_path(fit_file),
                         "type": "fit",
-                        "error": str(e)
+                        "error": parsed_data["error"]
                     })
+                    return
+
+                if streaming:
+                    member = members[fit_file]
+                    parsed_data["file_metadata"] = {
+                        "file_size": member.file_size,
+                        "modified_time": datetime(*member.date_time)
+                    }
+
+                # Insert into database
+                checkpoint(fit_file)
+                records_inserted = insert_fit_data(parsed_data, db_connection, source="gdpr")
+
+                if records_inserted > 0:
+                    summary["by_category"]["fit_files"]["processed"] += 1
+                    summary["by_category"]["fit_files"]["records"] += records_inserted
+                    summary["total_records_inserted"] += records_inserted
+                    summary["total_files_processed"] += 1
+                else:
+                    # Check if it was a duplicate
+                    file_hash = parsed_data.get("file_hash")
+                    if file_hash:
+                        cursor = db_connection.execute(
+                            "SELECT file_hash FROM imported_files WHERE file_hash = ?",
+                            (file_hash,)
+                        )
+                        if cursor.fetchone():
+                            summary["duplicates_skipped"] += 1
+                            logger.debug(f"Skipped duplicate FIT file: {fit_file}")
 
-        # Step 3: Process JSON files by category
-        from ingestion.json_parser import (
-            load_json_file, parse_sleep_json, parse_daily_summary_json,
-            insert_sleep_data, insert_daily_summary_data
-        )
-
-        # Process sleep JSON files
-        sleep_files = extraction_summary["file_categories"]["sleep"]
-        summary["by_category"]["sleep_json"]["found"] = len(sleep_files)
-
-        if sleep_files:
-            logger.info(f"Step 3a: Processing {len(sleep_files)} sleep JSON files")
-
-            for idx, sleep_file in enumerate(sleep_files):
-                try:
-                    if progress_callback:
-                        progress_callback(f"Processing sleep JSON", idx + 1, len(sleep_files))
-
-                    json_data = load_json_file(sleep_file)
-                    if not json_data:
-                        summary["by_category"]["sleep_json"]["errors"] += 1
-                        continue
-
-                    parsed_data = parse_sleep_json(json_data, sleep_file)
-
-                    if parsed_data.get("error"):
-                        logger.warning(f"Error parsing sleep {sleep_file}: {parsed_data['error']}")
-                        summary["by_category"]["sleep_json"]["errors"] += 1
-                        summary["error_details"].append({
-                            "file": sleep_file,
-                            "type": "sleep_json",
-                            "error": parsed_data["error"]
-                        })
-                        continue
-
-                    records_inserted = insert_sleep_data(parsed_data, db_connection, source="gdpr")
-
-                    if records_inserted > 0:
-                        summary["by_category"]["sleep_json"]["processed"] += 1
-                        summary["by_category"]["sleep_json"]["records"] += records_inserted
-                        summary["total_records_inserted"] += records_inserted
-                        summary["total_files_processed"] += 1
-                    else:
-                        summary["duplicates_skipped"] += 1
-
-                except Exception as e:
-                    logger.error(f"Error processing sleep JSON {sleep_file}: {e}")
-                    summary["by_category"]["sleep_json"]["errors"] += 1
-                    summary["errors"] += 1
+            except Exception as e:
+                logger.error(f"Error processing FIT file {fit_file}: {e}")
+                summary["by_category"]["fit_files"]["errors"] += 1
+                summary["errors"] += 1
+                summary["error_details"].append({
+                    "file": display_path(fit_file),
+                    "type": "fit",
+                    "error": str(e)
+                })
+
+        def json_writer(category: str, error_type: str, label: str, stream_json: Callable, insert_json: Callable):
+            def insert_parsed(json_file: str, parsed_data: Dict[str, Any]) -> Optional[int]:
+                if parsed_data.get("error"):
+                    logger.warning(f"Error parsing {label} {json_file}: {parsed_data['error']}")
+                    summary["by_category"][category]["errors"] += 1
                     summary["error_details"].append({
-                        "file": sleep_file,
-                        "type": "sleep_json",
-                        "error": str(e)
+                        "file": display_path(json_file),
+                        "type": error_type,
+                        "error": parsed_data["error"]
                     })
+                    return None
 
-        # Process daily summary JSON files
-        daily_summary_files = extraction_summary["file_categories"]["daily_summaries"]
-        summary["by_category"]["daily_summaries"]["found"] = len(daily_summary_files)
-
-        if daily_summary_files:
-            logger.info(f"Step 3b: Processing {len(daily_summary_files)} daily summary JSON files")
+                checkpoint(json_file)
+                return insert_json(parsed_data, db_connection, source="gdpr")
 
-            for idx, summary_file in enumerate(daily_summary_files):
+            def write(json_file: str, parsed_data: Optional[Dict[str, Any]], error: Optional[BaseException]):
                 try:
-                    if progress_callback:
-                        progress_callback(f"Processing daily summaries", idx + 1, len(daily_summary_files))
-
-                    json_data = load_json_file(summary_file)
-                    if not json_data:
-                        summary["by_category"]["daily_summaries"]["errors"] += 1
-                        continue
-
-                    parsed_data = parse_daily_summary_json(json_data, summary_file)
-
-                    if parsed_data.get("error"):
-                        logger.warning(f"Error parsing daily summary {summary_file}: {parsed_data['error']}")
-                        summary["by_category"]["daily_summaries"]["errors"] += 1
-                        summary["error_details"].append({
-                            "file": summary_file,
-                            "type": "daily_summary",
-                            "error": parsed_data["error"]
-                        })
-                        continue
-
-                    records_inserted = insert_daily_summary_data(parsed_data, db_connection, source="gdpr")
+                    if error is not None:
+                        raise error
+
+                    if parsed_data.get("deferred"):
+                        # Days are decoded one at a time as they are inserted
+                        with open_member(json_file) as fp:
+                            parsed_data = stream_json(fp, display_path(json_file), parsed_data["file_hash"])
+                            records_inserted = insert_parsed(json_file, parsed_data)
+                        if records_inserted is None:
+                            return
+                        if parsed_data.get("error"):
+                            # Malformed partway through: the file's rows and checkpoint were rolled back
+                            raise ValueError(parsed_data["error"])
+                    else:
+                        records_inserted = insert_parsed(json_file, parsed_data)
+                        if records_inserted is None:
+                            return
 
                     if records_inserted > 0:
-                        summary["by_category"]["daily_summaries"]["processed"] += 1
-                        summary["by_category"]["daily_summaries"]["records"] += records_inserted
+                        summary["by_category"][category]["processed"] += 1
+                        summary["by_category"][category]["records"] += records_inserted
                         summary["total_records_inserted"] += records_inserted
                         summary["total_files_processed"] += 1
                     else:
                         summary["duplicates_skipped"] += 1
 
                 except Exception as e:
-                    logger.error(f"Error processing daily summary {summary_file}: {e}")
-                    summary["by_category"]["daily_summaries"]["errors"] += 1
+                    logger.error(f"Error processing {label} {json_file}: {e}")
+                    summary["by_category"][category]["errors"] += 1
                     summary["errors"] += 1
                     summary["error_details"].append({
-                        "file": summary_file,
-                        "type": "daily_summary",
+                        "file": display_path(json_file),
+                        "type": error_type,
                         "error": str(e)
                     })
 
-        # Calculate success rate
+            return write
+
+        writers = {"fit_files": ("Processing FIT files", len(fit_files), write_fit_file)}
+        pipeline = CategoryPipeline()
+        if fit_files:
+            pipeline.add_producer("fit_files", parsed_fit_files())
+        for category, _, error_type, label, operation, stream_json, insert_json, records_key in json_categories:
+            writers[category] = (operation, len(json_files[category]), json_writer(
+                category, error_type, label, stream_json, insert_json
+            ))
+            if json_files[category]:
+                pipeline.add_threaded_category(
+                    category, json_files[category],
+                    json_parser(stream_json, records_key), threads=json_threads
+                )
+        logger.info(
+            f"Step 2: Processing {len(fit_files)} FIT and "
+            f"{sum(len(files) for files in json_files.values())} JSON files"
+        )
+
+        written = dict.fromkeys(writers, 0)
+        try:
+            for category, member_path, parsed_data, error in pipeline.results():
+                if member_path is None:
+                    # A producer itself failed (e.g. the FIT parser pool died)
+                    raise error
+                operation, total, write = writers[category]
+                written[category] += 1
+                # Outside the writer's try: the callback may raise to cancel the import
+                if progress_callback:
+                    progress_callback(operation, written[category], total)
+                write(member_path, parsed_data, error)
+        finally:
+            # Before the archives close: producers may still be reading them
+            pipeline.close()
+
+        # Nested zips none of whose members failed: skipped whole next time
+        for name, nested_member in extraction_summary["nested_zip_members"].items():
+            failed_prefix = display_path(name + "/")
+            if not any(detail["file"].startswith(failed_prefix) for detail in summary["error_details"]):
+                record_member_completed(db_connection, zip_path, nested_member)
+
+        # Days this import wrote, and checkpoints of files that had nothing new to write
+        refresh_daily_metrics(db_connection)
+        db_connection.commit()
+
+        # Calculate success rate (members finished by an earlier run count as processed)
+        completed_files = summary["total_files_processed"] + summary["members_resumed"] + summary["members_unchanged"]
         success_rate = 0
         if summary["total_files_found"] > 0:
-            success_rate = (summary["total_files_processed"] / summary["total_files_found"]) * 100
+            success_rate = (completed_files / summary["total_files_found"]) * 100
 
         # Mark as successful if we met the 95% threshold
-        summary["success"] = success_rate >= 95.0 and summary["total_files_processed"] > 0
+        summary["success"] = success_rate >= 95.0 and completed_files > 0
         summary["success_rate"] = round(success_rate, 2)
 
         # Record processing time
@@ -414,6 +937,16 @@ def process_gdpr_export(
         raise
 
     finally:
+        # journal_mode and synchronous can't change inside a transaction, so
+        # drop what a failed or cancelled import left staged before restoring
+        if db_connection.in_transaction:
+            db_connection.rollback()
+        restore_profile(db_connection, previous_profile)
+        if zip_ref is not None:
+            for nested in reversed(nested_archives):
+                nested.close()
+            zip_ref.close()
+
         # Cleanup temporary extraction directory if requested
         if cleanup_temp and extract_path and os.path.exists(extract_path):
             try:
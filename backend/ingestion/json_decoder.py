@@ -0,0 +1,171 @@
+"""
+Fast JSON Decoding for Garmin Wellness Records
+
+Importing years of daily summaries is dominated by JSON decoding and by
+probing each record dict for every name variant in field_mappings.py. This
+module decodes with the fastest library available:
+
+- msgspec: decodes straight into typed record structs holding only the
+  fields Foldline maps, so unmapped keys are never materialized
+- orjson: a faster drop-in for json.loads
+- json: the stdlib fallback
+
+Both libraries are optional; records map to the same values whichever
+backend decoded them.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from ingestion.field_mappings import (
+    BODY_COMPOSITION_FIELD_MAPPINGS,
+    DAILY_SUMMARY_FIELD_MAPPINGS,
+    FITNESS_ASSESSMENT_FIELD_MAPPINGS,
+    HRV_FIELD_MAPPINGS,
+    HYDRATION_FIELD_MAPPINGS,
+    MENSTRUAL_CYCLE_FIELD_MAPPINGS,
+    SLEEP_FIELD_MAPPINGS,
+    STRESS_FIELD_MAPPINGS,
+    get_mapping_plan
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Files up to this size are decoded in one go by the fast backend; larger
+# ones are streamed element by element with iter_json_values()
+FAST_DECODE_MAX_BYTES = 16 * 1024 * 1024
+
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def json_backend() -> str:
+    """Name of the fastest available decoder: 'msgspec', 'orjson' or 'json'"""
+    if msgspec is not None:
+        return "msgspec"
+    if orjson is not None:
+        return "orjson"
+    return "json"
+
+
+def loads(data: bytes, backend: Optional[str] = None) -> Any:
+    """
+    Decode JSON bytes with the fastest available library
+
+    Raises:
+        ValueError: If the data isn't valid JSON (every backend's decode
+            error is a ValueError subclass)
+    """
+    backend = backend or json_backend()
+    if data.startswith(_UTF8_BOM):
+        data = data[len(_UTF8_BOM):]
+    if backend == "msgspec":
+        return msgspec.json.decode(data)
+    if backend == "orjson":
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+class RecordDecoder:
+    """
+    Decodes and maps one Garmin record type
+
+    Dicts are mapped with the compiled plan for their schema variant (see
+    field_mappings.MappingPlan). With msgspec, files are decoded into a
+    struct type with one optional attribute per name variant, mapped with
+    a plan of (db_field, name variants) pairs flattened once.
+
+    Usage:
+        decoder = RecordDecoder("SleepJson", SLEEP_FIELD_MAPPINGS)
+        for item in decoder.decode(data):
+            record = decoder.map(item)
+    """
+
+    def __init__(self, name: str, field_mappings: Dict[str, List[str]], backend: Optional[str] = None):
+        """
+        Args:
+            name: Struct type name (msgspec backend only)
+            field_mappings: db field -> Garmin name variants, in priority order
+            backend: 'msgspec', 'orjson' or 'json' (defaults to json_backend())
+        """
+        self.backend = backend or json_backend()
+        self.field_mappings = field_mappings
+        self.plan: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(
+            (db_field, tuple(names)) for db_field, names in field_mappings.items()
+        )
+        self.struct_type = None
+        self._decoder = None
+
+        if self.backend == "msgspec":
+            names = list(dict.fromkeys(name for _, variants in self.plan for name in variants))
+            self.struct_type = msgspec.defstruct(name, [(field, Any, None) for field in names])
+            self._decoder = msgspec.json.Decoder(Union[List[self.struct_type], self.struct_type])
+
+    def decode(self, data: bytes) -> List[Any]:
+        """
+        Decode a file holding one record or an array of records
+
+        Returns:
+            Items for map(): structs with msgspec, dicts otherwise
+
+        Raises:
+            ValueError: If the data isn't valid JSON, or (msgspec) an array
+                element isn't an object
+        """
+        if self._decoder is not None:
+            if data.startswith(_UTF8_BOM):
+                data = data[len(_UTF8_BOM):]
+            items = self._decoder.decode(data)
+        else:
+            items = loads(data, self.backend)
+        return items if isinstance(items, list) else [items]
+
+    def map(self, item: Any) -> Dict[str, Any]:
+        """
+        Map a decoded record (dict or struct) to Foldline field names
+
+        Same result as field_mappings.map_*_record(): the first non-null
+        name variant wins and fields with no value are left out.
+
+        Raises:
+            ValueError: If the item isn't a JSON object
+        """
+        if isinstance(item, dict):
+            return get_mapping_plan(self.field_mappings, item).extract(item)
+
+        mapped = {}
+        if self.struct_type is not None and isinstance(item, self.struct_type):
+            for db_field, names in self.plan:
+                for name in names:
+                    value = getattr(item, name)
+                    if value is not None:
+                        mapped[db_field] = value
+                        break
+        else:
+            raise ValueError(f"Expected a JSON object, got {type(item).__name__}")
+        return mapped
+
+    def iter_mapped(self, data: bytes) -> Iterator[Dict[str, Any]]:
+        """decode() then map() each record"""
+        for item in self.decode(data):
+            yield self.map(item)
+
+
+SLEEP_DECODER = RecordDecoder("GarminSleepJson", SLEEP_FIELD_MAPPINGS)
+DAILY_SUMMARY_DECODER = RecordDecoder("GarminDailySummaryJson", DAILY_SUMMARY_FIELD_MAPPINGS)
+HRV_DECODER = RecordDecoder("GarminHrvJson", HRV_FIELD_MAPPINGS)
+STRESS_DECODER = RecordDecoder("GarminStressJson", STRESS_FIELD_MAPPINGS)
+FITNESS_ASSESSMENT_DECODER = RecordDecoder("GarminFitnessAssessmentJson", FITNESS_ASSESSMENT_FIELD_MAPPINGS)
+HYDRATION_DECODER = RecordDecoder("GarminHydrationJson", HYDRATION_FIELD_MAPPINGS)
+BODY_COMPOSITION_DECODER = RecordDecoder("GarminBodyCompositionJson", BODY_COMPOSITION_FIELD_MAPPINGS)
+MENSTRUAL_CYCLE_DECODER = RecordDecoder("GarminMenstrualCycleJson", MENSTRUAL_CYCLE_FIELD_MAPPINGS)
@@ -4,20 +4,40 @@ JSON Data Parser for Garmin GDPR Export
 Processes various JSON files from Garmin GDPR exports:
 - Sleep data (DI_CONNECT/2019-2025/sleep_*.json)
 - Daily summaries (DI_CONNECT/UdsFile_2019-2025)
+- HRV and daily stress
 - Fitness assessments (VO2 max, fitness age)
 - Hydration logs
 - Menstrual cycles
 - Body composition data
 """
 
+import codecs
 import os
 import json
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from datetime import datetime, date
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+from datetime import datetime, date, timezone
 import hashlib
 
+from db.daily_metrics import refresh_daily_metrics
+from db.upserts import stable_record_id, upsert_sql
+from utils.dates import parse_date, parse_timestamp
+from ingestion.field_mappings import MENSTRUAL_CYCLE_FIELD_MAPPINGS
+from ingestion.json_decoder import (
+    BODY_COMPOSITION_DECODER,
+    DAILY_SUMMARY_DECODER,
+    FAST_DECODE_MAX_BYTES,
+    FITNESS_ASSESSMENT_DECODER,
+    HRV_DECODER,
+    HYDRATION_DECODER,
+    MENSTRUAL_CYCLE_DECODER,
+    SLEEP_DECODER,
+    STRESS_DECODER,
+    RecordDecoder,
+    loads as json_loads
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,37 +52,6 @@ def compute_file_hash(file_path: str) -> str:
     return hasher.hexdigest()
 
 
-def parse_date(date_str: str) -> Optional[date]:
-    """Parse various date formats found in Garmin JSON files"""
-    if not date_str:
-        return None
-
-    # Common formats: "2024-01-15", "2024-01-15T08:30:00.0"
-    try:
-        if 'T' in date_str:
-            return datetime.fromisoformat(date_str.replace('Z', '')).date()
-        else:
-            return datetime.fromisoformat(date_str).date()
-    except (ValueError, TypeError):
-        logger.warning(f"Could not parse date: {date_str}")
-        return None
-
-
-def parse_timestamp(ts_str: str) -> Optional[datetime]:
-    """Parse timestamp formats found in Garmin JSON files"""
-    if not ts_str:
-        return None
-
-    try:
-        # Handle both with and without timezone
-        if ts_str.endswith('Z'):
-            ts_str = ts_str[:-1] + '+00:00'
-        return datetime.fromisoformat(ts_str.replace('Z', ''))
-    except (ValueError, TypeError):
-        logger.warning(f"Could not parse timestamp: {ts_str}")
-        return None
-
-
 def scan_json_files(folder_path: str, pattern: str = "*.json") -> List[str]:
     """
     Recursively scan directory for JSON files matching pattern
@@ -112,11 +101,11 @@ def load_json_file(file_path: str) -> Optional[Dict[str, Any]]:
         Parsed JSON data or None if failed
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = json_loads(f.read())
             logger.debug(f"Successfully loaded JSON from {file_path}")
             return data
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         logger.error(f"Invalid JSON in {file_path}: {e}")
         return None
     except Exception as e:
@@ -124,118 +113,430 @@ def load_json_file(file_path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def parse_sleep_json(json_data: Dict[str, Any], file_path: str) -> Dict[str, Any]:
+def load_json_bytes(data: bytes, source: str) -> Optional[Dict[str, Any]]:
     """
-    Parse sleep data from Garmin JSON files using field mappings
+    Safely parse JSON contents already in memory (e.g. a zip member)
 
-    Uses field_mappings.py to handle field name variations across
-    different GDPR export versions
+    Args:
+        data: Raw JSON bytes
+        source: Name used in log messages
+
+    Returns:
+        Parsed JSON data or None if failed
     """
-    logger.info(f"Parsing sleep JSON: {file_path}")
+    try:
+        return json_loads(data)
+    except ValueError as e:
+        logger.error(f"Invalid JSON in {source}: {e}")
+        return None
+
+
+# Text read per step by iter_json_values(); one array element plus this
+# much lookahead is all that is held in memory
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_values(fp: BinaryIO, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Incrementally decode a JSON file, one top-level array element at a time
+
+    Garmin's sleep and UDS exports are arrays covering months of days.
+    Elements are decoded with JSONDecoder.raw_decode() as the text streams
+    in, so memory stays at one element plus a read chunk however large the
+    file is. A file holding a single object yields that object.
+
+    Args:
+        fp: Binary file object (a file on disk or a zip member stream)
+        chunk_size: Characters read per step
+
+    Yields:
+        Each array element, or the single top-level value
+
+    Raises:
+        json.JSONDecodeError: If the JSON is malformed or truncated
+    """
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill(size: int) -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        data = fp.read(size)
+        if not data:
+            eof = True
+            buf += text.decode(b"", final=True)
+            return False
+        # Drop consumed text so the buffer never grows past one element
+        buf = buf[pos:] + text.decode(data)
+        pos = 0
+        return True
+
+    def skip_whitespace() -> bool:
+        """Advance to the next significant character; False at end of input"""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\n\r":
+                pos += 1
+            if pos < len(buf):
+                return True
+            if not fill(chunk_size):
+                return False
+
+    if not skip_whitespace():
+        raise json.JSONDecodeError("Expecting value", buf, pos)
+
+    if buf[pos] != "[":
+        # A single object: small enough to decode in one go
+        while fill(chunk_size):
+            pass
+        yield decoder.decode(buf[pos:])
+        return
+
+    pos += 1
+    first = True
+    while True:
+        if not skip_whitespace():
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        if buf[pos] == "]":
+            pos += 1
+            if skip_whitespace():
+                raise json.JSONDecodeError("Extra data", buf, pos)
+            return
+        if not first:
+            if buf[pos] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos += 1
+            if not skip_whitespace():
+                raise json.JSONDecodeError("Unterminated array", buf, pos)
+        first = False
+
+        read_size = chunk_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # A number or literal cut at the end of the buffer may continue
+                if end < len(buf) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            if not fill(read_size):
+                continue
+            # Elements larger than a chunk: read more each retry, not O(n^2)
+            read_size *= 2
+
+        pos = end
+        yield value
+
+
+def _map_sleep_json(json_data: Any, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one night of Garmin sleep JSON to a sleep record
+
+    Returns:
+        The record, or None if the night has no sleep stage data
+
+    Raises:
+        ValueError: If the night's date can't be determined
+    """
+    # Use field mappings to extract data
+    sleep_record = SLEEP_DECODER.map(json_data)
+
+    # Extract sleep date
+    sleep_date = None
+
+    # Try to get date from calendar_date field
+    if "calendar_date" in sleep_record:
+        sleep_date = parse_date(sleep_record["calendar_date"])
+
+    # Try to get date from sleep start timestamp
+    if not sleep_date and "sleep_start_gmt" in sleep_record:
+        start_ts = parse_timestamp(sleep_record["sleep_start_gmt"])
+        if start_ts:
+            sleep_date = start_ts.date()
+
+    # Fallback: extract date from filename
+    if not sleep_date:
+        filename = os.path.basename(file_path)
+        if "sleep_" in filename:
+            date_part = filename.replace("sleep_", "").replace(".json", "")
+            sleep_date = parse_date(date_part)
+
+    if not sleep_date:
+        raise ValueError("Could not determine sleep date from file")
+
+    # Add date to record
+    sleep_record["date"] = sleep_date
+
+    # Convert string timestamps to datetime objects if needed
+    for ts_field in ["sleep_start_gmt", "sleep_end_gmt"]:
+        if ts_field in sleep_record:
+            sleep_record[ts_field] = parse_timestamp(sleep_record[ts_field])
+
+    # Only keep if we have meaningful data
+    if any(sleep_record.get(key) is not None for key in ["deep_sleep_seconds", "light_sleep_seconds", "rem_sleep_seconds"]):
+        logger.debug(f"Parsed sleep record for {sleep_date}")
+        return sleep_record
+
+    logger.warning(f"No meaningful sleep data for {sleep_date} in {file_path}")
+    return None
+
+
+def _map_daily_summary_json(json_data: Any, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one day of Garmin UDS JSON to a daily summary record
+
+    Returns:
+        The record, or None if the day has no meaningful data
+
+    Raises:
+        ValueError: If the day's date can't be determined
+    """
+    # Use field mappings to extract data
+    summary_record = DAILY_SUMMARY_DECODER.map(json_data)
+
+    # Extract date
+    summary_date = None
+    if "calendar_date" in summary_record:
+        summary_date = parse_date(summary_record["calendar_date"])
+
+    if not summary_date:
+        raise ValueError("Could not determine summary date from file")
+
+    # Add date to record
+    summary_record["date"] = summary_date
+
+    # Only keep if we have meaningful data
+    if any(summary_record.get(key) is not None for key in ["step_count", "calories_burned", "resting_heart_rate"]):
+        logger.debug(f"Parsed daily summary for {summary_date}")
+        return summary_record
+
+    logger.warning(f"No meaningful daily summary data for {summary_date} in {file_path}")
+    return None
+
+
+# Maps one decoded JSON object (dict or RecordDecoder struct) to a record,
+# or None if it has nothing to keep
+RecordMapper = Callable[[Any, str], Optional[Dict[str, Any]]]
+
+
+def _map_json_values(values: Iterable[Any], file_path: str, mapper: RecordMapper) -> Iterator[Dict[str, Any]]:
+    """
+    Map each day of a (possibly multi-day) JSON file to a record
 
+    Days that can't be dated are logged and skipped so one bad day doesn't
+    drop the rest of an array; if no day in the file could be mapped, the
+    last error is raised as before.
+    """
+    mapped = False
+    last_error: Optional[ValueError] = None
+
+    for value in values:
+        # Structs come from RecordDecoder's msgspec backend
+        if not isinstance(value, dict) and not hasattr(value, "__struct_fields__"):
+            raise ValueError(f"Expected a JSON object, got {type(value).__name__}")
+        try:
+            record = mapper(value, file_path)
+        except ValueError as e:
+            logger.warning(f"Skipping entry in {file_path}: {e}")
+            last_error = e
+            continue
+        mapped = True
+        if record is not None:
+            yield record
+
+    if not mapped and last_error is not None:
+        raise last_error
+
+
+def _parse_json_file(
+    json_data: Any,
+    file_path: str,
+    file_hash: Optional[str],
+    records_key: str,
+    mapper: RecordMapper
+) -> Dict[str, Any]:
+    """Map already loaded JSON (one day or an array of days) to a records list"""
     parsed_data = {
         "file_path": file_path,
-        "file_hash": compute_file_hash(file_path),
-        "sleep_records": [],
+        "file_hash": file_hash or compute_file_hash(file_path),
+        records_key: [],
         "error": None
     }
 
     try:
-        from ingestion.field_mappings import map_sleep_record, parse_date, parse_timestamp
-
-        # Use field mappings to extract data
-        sleep_record = map_sleep_record(json_data)
-
-        # Extract sleep date
-        sleep_date = None
-
-        # Try to get date from calendar_date field
-        if "calendar_date" in sleep_record:
-            sleep_date = parse_date(sleep_record["calendar_date"])
-
-        # Try to get date from sleep start timestamp
-        if not sleep_date and "sleep_start_gmt" in sleep_record:
-            start_ts = parse_timestamp(sleep_record["sleep_start_gmt"]) if isinstance(sleep_record["sleep_start_gmt"], str) else sleep_record["sleep_start_gmt"]
-            if start_ts:
-                sleep_date = start_ts.date()
-
-        # Fallback: extract date from filename
-        if not sleep_date:
-            filename = os.path.basename(file_path)
-            if "sleep_" in filename:
-                date_part = filename.replace("sleep_", "").replace(".json", "")
-                sleep_date = parse_date(date_part)
-
-        if not sleep_date:
-            raise ValueError("Could not determine sleep date from file")
-
-        # Add date to record
-        sleep_record["date"] = sleep_date
-
-        # Convert string timestamps to datetime objects if needed
-        for ts_field in ["sleep_start_gmt", "sleep_end_gmt"]:
-            if ts_field in sleep_record and isinstance(sleep_record[ts_field], str):
-                sleep_record[ts_field] = parse_timestamp(sleep_record[ts_field])
-
-        # Only add if we have meaningful data
-        if any(sleep_record.get(key) is not None for key in ["deep_sleep_seconds", "light_sleep_seconds", "rem_sleep_seconds"]):
-            parsed_data["sleep_records"].append(sleep_record)
-            logger.info(f"Parsed sleep record for {sleep_date}: {len(parsed_data['sleep_records'])} total")
-        else:
-            logger.warning(f"No meaningful sleep data found in {file_path}")
+        values = json_data if isinstance(json_data, list) else [json_data]
+        parsed_data[records_key] = list(_map_json_values(values, file_path, mapper))
+        logger.info(f"Parsed {len(parsed_data[records_key])} records from {file_path}")
 
     except Exception as e:
-        logger.error(f"Error parsing sleep JSON {file_path}: {e}")
+        logger.error(f"Error parsing JSON {file_path}: {e}")
         parsed_data["error"] = str(e)
 
     return parsed_data
 
 
-def parse_daily_summary_json(json_data: Dict[str, Any], file_path: str) -> Dict[str, Any]:
-    """
-    Parse daily summary data from UDS JSON files using field mappings
+class _PrefixedReader:
+    """Binary stream whose first bytes were already read from fp"""
 
-    Uses field_mappings.py to handle field name variations across
-    different GDPR export versions
+    def __init__(self, prefix: bytes, fp: BinaryIO):
+        self._prefix = memoryview(prefix)
+        self._fp = fp
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._prefix:
+            return self._fp.read(size)
+        if size < 0:
+            data = bytes(self._prefix) + self._fp.read()
+            self._prefix = memoryview(b"")
+            return data
+        data = bytes(self._prefix[:size])
+        self._prefix = self._prefix[size:]
+        return data
+
+
+def _iter_stream_values(fp: BinaryIO, decoder: RecordDecoder) -> Iterator[Any]:
     """
-    logger.info(f"Parsing daily summary JSON: {file_path}")
+    Decoded top-level values of a JSON stream
 
+    Files up to FAST_DECODE_MAX_BYTES are decoded in one call by the fast
+    backend; past that, memory is bounded by streaming with
+    iter_json_values() instead.
+    """
+    head = fp.read(FAST_DECODE_MAX_BYTES + 1)
+    if len(head) <= FAST_DECODE_MAX_BYTES:
+        yield from decoder.decode(head)
+    else:
+        yield from iter_json_values(_PrefixedReader(head, fp))
+
+
+def _stream_json_file(
+    fp: BinaryIO,
+    file_path: str,
+    file_hash: str,
+    records_key: str,
+    mapper: RecordMapper,
+    decoder: RecordDecoder
+) -> Dict[str, Any]:
+    """Map a JSON stream to a lazy records iterator (see stream_sleep_json)"""
     parsed_data = {
         "file_path": file_path,
-        "file_hash": compute_file_hash(file_path),
-        "daily_summaries": [],
+        "file_hash": file_hash,
+        records_key: iter(()),
         "error": None
     }
 
+    records = _map_json_values(_iter_stream_values(fp, decoder), file_path, mapper)
     try:
-        from ingestion.field_mappings import map_daily_summary_record, parse_date
+        # Decode the first day now, so a file that isn't usable JSON is
+        # reported as a parse error rather than failing mid-insert
+        first = next(records, None)
+    except Exception as e:
+        logger.error(f"Error parsing JSON {file_path}: {e}")
+        parsed_data["error"] = str(e)
+        return parsed_data
 
-        # Use field mappings to extract data
-        summary_record = map_daily_summary_record(json_data)
+    def remaining():
+        if first is None:
+            return
+        yield first
+        try:
+            yield from records
+        except Exception as e:
+            logger.error(f"Error parsing JSON {file_path}: {e}")
+            parsed_data["error"] = str(e)
+            raise
 
-        # Extract date
-        summary_date = None
-        if "calendar_date" in summary_record:
-            summary_date = parse_date(summary_record["calendar_date"]) if isinstance(summary_record["calendar_date"], str) else summary_record["calendar_date"]
+    parsed_data[records_key] = remaining()
+    return parsed_data
 
-        if not summary_date:
-            raise ValueError("Could not determine summary date from file")
 
-        # Add date to record
-        summary_record["date"] = summary_date
+def parse_sleep_json(json_data: Any, file_path: str, file_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse sleep data from Garmin JSON files using field mappings
 
-        # Only add if we have meaningful data
-        if any(summary_record.get(key) is not None for key in ["step_count", "calories_burned", "resting_heart_rate"]):
-            parsed_data["daily_summaries"].append(summary_record)
-            logger.info(f"Parsed daily summary for {summary_date}")
-        else:
-            logger.warning(f"No meaningful daily summary data found in {file_path}")
+    Uses field_mappings.py to handle field name variations across
+    different GDPR export versions. json_data may be one night or an
+    array of nights. Pass file_hash when the contents did not come from
+    file_path on disk.
+    """
+    logger.info(f"Parsing sleep JSON: {file_path}")
+    return _parse_json_file(json_data, file_path, file_hash, "sleep_records", _map_sleep_json)
 
-    except Exception as e:
-        logger.error(f"Error parsing daily summary JSON {file_path}: {e}")
-        parsed_data["error"] = str(e)
 
-    return parsed_data
+def parse_daily_summary_json(json_data: Any, file_path: str, file_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse daily summary data from UDS JSON files using field mappings
+
+    Uses field_mappings.py to handle field name variations across
+    different GDPR export versions. json_data may be one day or an array
+    of days. Pass file_hash when the contents did not come from file_path
+    on disk.
+    """
+    logger.info(f"Parsing daily summary JSON: {file_path}")
+    return _parse_json_file(json_data, file_path, file_hash, "daily_summaries", _map_daily_summary_json)
+
+
+def stream_sleep_json(fp: BinaryIO, file_path: str, file_hash: str) -> Dict[str, Any]:
+    """
+    Streaming counterpart of parse_sleep_json
+
+    parsed_data["sleep_records"] is a lazy iterator over the file's nights,
+    consumed once by insert_sleep_data() while fp is still open. Files up
+    to FAST_DECODE_MAX_BYTES go through the fast decoder in json_decoder.py;
+    larger ones are decoded incrementally. If the JSON turns out to be
+    malformed partway through, the iterator raises and parsed_data["error"]
+    is set.
+    """
+    logger.info(f"Streaming sleep JSON: {file_path}")
+    return _stream_json_file(fp, file_path, file_hash, "sleep_records", _map_sleep_json, SLEEP_DECODER)
+
+
+def stream_daily_summary_json(fp: BinaryIO, file_path: str, file_hash: str) -> Dict[str, Any]:
+    """Streaming counterpart of parse_daily_summary_json (see stream_sleep_json)"""
+    logger.info(f"Streaming daily summary JSON: {file_path}")
+    return _stream_json_file(fp, file_path, file_hash, "daily_summaries", _map_daily_summary_json, DAILY_SUMMARY_DECODER)
+
+
+_SLEEP_DETAILED_SQL = upsert_sql(
+    "sleep_detailed",
+    ("id", "date", "sleep_start_gmt", "sleep_end_gmt", "deep_sleep_seconds",
+     "light_sleep_seconds", "rem_sleep_seconds", "awake_sleep_seconds",
+     "sleep_window_confirmation_type", "average_respiration", "lowest_respiration",
+     "highest_respiration", "average_spo2", "lowest_spo2", "average_sleep_hr",
+     "source_file_hash"),
+    ("date",)
+)
+
+_DAILY_SUMMARIES_SQL = upsert_sql(
+    "daily_summaries",
+    ("id", "date", "step_count", "calories_burned", "distance_meters", "floors_climbed",
+     "active_minutes", "sedentary_minutes", "min_heart_rate", "max_heart_rate",
+     "resting_heart_rate", "avg_heart_rate", "stress_avg", "stress_max", "stress_min",
+     "body_battery_charged", "body_battery_drained", "body_battery_start", "body_battery_end",
+     "intensity_minutes_moderate", "intensity_minutes_vigorous", "source_file_hash"),
+    ("date",)
+)
+
+
+class _RowCounter:
+    """Counts the rows an iterator hands to executemany()"""
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._rows = iter(rows)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> tuple:
+        row = next(self._rows)
+        self.count += 1
+        return row
 
 
 def insert_sleep_data(parsed_data: Dict[str, Any], db_connection, source: str = "gdpr") -> int:
@@ -274,68 +575,30 @@ def insert_sleep_data(parsed_data: Dict[str, Any], db_connection, source: str =
             (file_hash, file_path, 'json', source, 0)
         )
 
-        # Insert sleep records
-        for i, sleep_record in enumerate(parsed_data.get("sleep_records", [])):
-            sleep_id = hash(file_hash + f"sleep_{i}") % (2**31)
-
-            try:
-                # Try INSERT first
-                db_connection.execute(
-                    """INSERT INTO sleep_detailed
-                       (id, date, sleep_start_gmt, sleep_end_gmt, deep_sleep_seconds,
-                        light_sleep_seconds, rem_sleep_seconds, awake_sleep_seconds,
-                        sleep_window_confirmation_type, average_respiration, lowest_respiration,
-                        highest_respiration, average_spo2, lowest_spo2, average_sleep_hr,
-                        source_file_hash)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (sleep_id,
-                     sleep_record.get("date"),
-                     sleep_record.get("sleep_start_gmt"),
-                     sleep_record.get("sleep_end_gmt"),
-                     sleep_record.get("deep_sleep_seconds"),
-                     sleep_record.get("light_sleep_seconds"),
-                     sleep_record.get("rem_sleep_seconds"),
-                     sleep_record.get("awake_sleep_seconds"),
-                     sleep_record.get("sleep_window_confirmation_type"),
-                     sleep_record.get("average_respiration"),
-                     sleep_record.get("lowest_respiration"),
-                     sleep_record.get("highest_respiration"),
-                     sleep_record.get("average_spo2"),
-                     sleep_record.get("lowest_spo2"),
-                     sleep_record.get("average_sleep_hr"),
-                     file_hash)
-                )
-                total_inserted += 1
-
-            except Exception as duplicate_error:
-                # If duplicate date, update existing record
-                if "Duplicate key" in str(duplicate_error) or "UNIQUE constraint failed" in str(duplicate_error):
-                    db_connection.execute(
-                        """UPDATE sleep_detailed SET
-                           sleep_start_gmt = ?, sleep_end_gmt = ?, deep_sleep_seconds = ?,
-                           light_sleep_seconds = ?, rem_sleep_seconds = ?, awake_sleep_seconds = ?,
-                           sleep_window_confirmation_type = ?, average_respiration = ?,
-                           lowest_respiration = ?, highest_respiration = ?, average_spo2 = ?,
-                           lowest_spo2 = ?, average_sleep_hr = ?, source_file_hash = ?
-                           WHERE date = ?""",
-                        (sleep_record.get("sleep_start_gmt"),
-                         sleep_record.get("sleep_end_gmt"),
-                         sleep_record.get("deep_sleep_seconds"),
-                         sleep_record.get("light_sleep_seconds"),
-                         sleep_record.get("rem_sleep_seconds"),
-                         sleep_record.get("awake_sleep_seconds"),
-                         sleep_record.get("sleep_window_confirmation_type"),
-                         sleep_record.get("average_respiration"),
-                         sleep_record.get("lowest_respiration"),
-                         sleep_record.get("highest_respiration"),
-                         sleep_record.get("average_spo2"),
-                         sleep_record.get("lowest_spo2"),
-                         sleep_record.get("average_sleep_hr"),
-                         file_hash,
-                         sleep_record.get("date"))
-                    )
-                else:
-                    raise  # Re-raise if not a duplicate error
+        # Insert sleep records (upsert on date; unchanged nights are not rewritten).
+        # Records may be a lazy stream, so rows are counted as they are fed in
+        rows = (
+            (stable_record_id("sleep_detailed", sleep_record.get("date")),
+             sleep_record.get("date"),
+             sleep_record.get("sleep_start_gmt"),
+             sleep_record.get("sleep_end_gmt"),
+             sleep_record.get("deep_sleep_seconds"),
+             sleep_record.get("light_sleep_seconds"),
+             sleep_record.get("rem_sleep_seconds"),
+             sleep_record.get("awake_sleep_seconds"),
+             sleep_record.get("sleep_window_confirmation_type"),
+             sleep_record.get("average_respiration"),
+             sleep_record.get("lowest_respiration"),
+             sleep_record.get("highest_respiration"),
+             sleep_record.get("average_spo2"),
+             sleep_record.get("lowest_spo2"),
+             sleep_record.get("average_sleep_hr"),
+             file_hash)
+            for sleep_record in parsed_data.get("sleep_records", [])
+        )
+        counter = _RowCounter(rows)
+        db_connection.executemany(_SLEEP_DETAILED_SQL, counter)
+        total_inserted = counter.count
 
         # Update record count
         db_connection.execute(
@@ -393,64 +656,36 @@ def insert_daily_summary_data(parsed_data: Dict[str, Any], db_connection, source
             (file_hash, file_path, 'json', source, 0)
         )
 
-        # Insert daily summary records
-        for i, summary_record in enumerate(parsed_data.get("daily_summaries", [])):
-            summary_id = hash(file_hash + f"summary_{i}") % (2**31)
-
-            db_connection.execute(
-                """INSERT INTO daily_summaries
-                   (id, date, step_count, calories_burned, distance_meters, floors_climbed,
-                    active_minutes, sedentary_minutes, min_heart_rate, max_heart_rate,
-                    resting_heart_rate, avg_heart_rate, stress_avg, stress_max, stress_min,
-                    body_battery_charged, body_battery_drained, body_battery_start, body_battery_end,
-                    intensity_minutes_moderate, intensity_minutes_vigorous, source_file_hash)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                   ON CONFLICT (date) DO UPDATE SET
-                   step_count = excluded.step_count,
-                   calories_burned = excluded.calories_burned,
-                   distance_meters = excluded.distance_meters,
-                   floors_climbed = excluded.floors_climbed,
-                   active_minutes = excluded.active_minutes,
-                   sedentary_minutes = excluded.sedentary_minutes,
-                   min_heart_rate = excluded.min_heart_rate,
-                   max_heart_rate = excluded.max_heart_rate,
-                   resting_heart_rate = excluded.resting_heart_rate,
-                   avg_heart_rate = excluded.avg_heart_rate,
-                   stress_avg = excluded.stress_avg,
-                   stress_max = excluded.stress_max,
-                   stress_min = excluded.stress_min,
-                   body_battery_charged = excluded.body_battery_charged,
-                   body_battery_drained = excluded.body_battery_drained,
-                   body_battery_start = excluded.body_battery_start,
-                   body_battery_end = excluded.body_battery_end,
-                   intensity_minutes_moderate = excluded.intensity_minutes_moderate,
-                   intensity_minutes_vigorous = excluded.intensity_minutes_vigorous,
-                   source_file_hash = excluded.source_file_hash,
-                   imported_at = now()""",
-                (summary_id,
-                 summary_record["date"],
-                 summary_record["step_count"],
-                 summary_record["calories_burned"],
-                 summary_record["distance_meters"],
-                 summary_record["floors_climbed"],
-                 summary_record["active_minutes"],
-                 summary_record["sedentary_minutes"],
-                 summary_record["min_heart_rate"],
-                 summary_record["max_heart_rate"],
-                 summary_record["resting_heart_rate"],
-                 summary_record["avg_heart_rate"],
-                 summary_record["stress_avg"],
-                 summary_record["stress_max"],
-                 summary_record["stress_min"],
-                 summary_record["body_battery_charged"],
-                 summary_record["body_battery_drained"],
-                 summary_record["body_battery_start"],
-                 summary_record["body_battery_end"],
-                 summary_record["intensity_minutes_moderate"],
-                 summary_record["intensity_minutes_vigorous"],
-                 file_hash)
-            )
-            total_inserted += 1
+        # Insert daily summary records (upsert on date). Sparse days lack
+        # some fields, which are stored as NULL
+        rows = (
+            (stable_record_id("daily_summary", summary_record["date"]),
+             summary_record["date"],
+             summary_record.get("step_count"),
+             summary_record.get("calories_burned"),
+             summary_record.get("distance_meters"),
+             summary_record.get("floors_climbed"),
+             summary_record.get("active_minutes"),
+             summary_record.get("sedentary_minutes"),
+             summary_record.get("min_heart_rate"),
+             summary_record.get("max_heart_rate"),
+             summary_record.get("resting_heart_rate"),
+             summary_record.get("avg_heart_rate"),
+             summary_record.get("stress_avg"),
+             summary_record.get("stress_max"),
+             summary_record.get("stress_min"),
+             summary_record.get("body_battery_charged"),
+             summary_record.get("body_battery_drained"),
+             summary_record.get("body_battery_start"),
+             summary_record.get("body_battery_end"),
+             summary_record.get("intensity_minutes_moderate"),
+             summary_record.get("intensity_minutes_vigorous"),
+             file_hash)
+            for summary_record in parsed_data.get("daily_summaries", [])
+        )
+        counter = _RowCounter(rows)
+        db_connection.executemany(_DAILY_SUMMARIES_SQL, counter)
+        total_inserted = counter.count
 
         # Update record count
         db_connection.execute(
@@ -472,13 +707,428 @@ def insert_daily_summary_data(parsed_data: Dict[str, Any], db_connection, source
     return total_inserted
 
 
-def process_sleep_json_files(folder_path: str, db_connection) -> Dict[str, Any]:
+# ============================================================================
+# HRV, Stress, Fitness Assessment, Hydration, Body Composition and
+# Menstrual Cycle Files
+# ============================================================================
+
+def _epoch_or_iso_timestamp(value: Any) -> Optional[datetime]:
+    """Garmin writes some timestamps as epoch milliseconds, others as ISO strings"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = value / 1000 if value > 1e11 else value
+        try:
+            return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+        except (OverflowError, OSError, ValueError):
+            return None
+    return parse_timestamp(value)
+
+
+def _has_value(json_data: Any, name: str) -> bool:
+    """True if a decoded record (dict or struct) has a non-null name"""
+    if isinstance(json_data, dict):
+        return json_data.get(name) is not None
+    return getattr(json_data, name, None) is not None
+
+
+def _map_hrv_json(json_data: Any, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one day of Garmin HRV JSON to an HRV record
+
+    Returns:
+        The record, or None if the day has no HRV value
+
+    Raises:
+        ValueError: If the day's date can't be determined
+    """
+    hrv_record = HRV_DECODER.map(json_data)
+
+    hrv_date = parse_date(hrv_record.get("calendar_date"))
+    if not hrv_date:
+        raise ValueError("Could not determine HRV date from file")
+    hrv_record["date"] = hrv_date
+
+    # Determine measurement type if not explicitly provided
+    if "measurement_type" not in hrv_record:
+        if _has_value(json_data, "rmssd") or _has_value(json_data, "weeklyAvg"):
+            hrv_record["measurement_type"] = "rmssd"
+        else:
+            hrv_record["measurement_type"] = "unknown"
+
+    if hrv_record.get("hrv_value") is None:
+        logger.warning(f"No HRV value for {hrv_date} in {file_path}")
+        return None
+    return hrv_record
+
+
+def _map_stress_json(json_data: Any, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one day of Garmin stress JSON to a daily stress record
+
+    Returns:
+        The record, or None if the day has no stress levels
+
+    Raises:
+        ValueError: If the day's date can't be determined
+    """
+    stress_record = STRESS_DECODER.map(json_data)
+
+    stress_date = parse_date(stress_record.get("calendar_date"))
+    if not stress_date:
+        raise ValueError("Could not determine stress date from file")
+    stress_record["date"] = stress_date
+
+    if all(stress_record.get(key) is None for key in ["avg_stress", "max_stress", "min_stress"]):
+        logger.warning(f"No stress levels for {stress_date} in {file_path}")
+        return None
+    return stress_record
+
+
+def _map_fitness_assessment_json(json_data: Any, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one Garmin VO2 max / fitness age entry to a fitness assessment record
+
+    Returns:
+        The record, or None if it has neither a VO2 max nor a fitness age
+
+    Raises:
+        ValueError: If the assessment's date can't be determined
+    """
+    assessment = FITNESS_ASSESSMENT_DECODER.map(json_data)
+
+    # createDate may be epoch milliseconds
+    assessed = assessment.get("assessment_date")
+    timestamp = _epoch_or_iso_timestamp(assessed)
+    assessment_date = timestamp.date() if timestamp else parse_date(assessed)
+    if not assessment_date:
+        raise ValueError("Could not determine fitness assessment date from file")
+    assessment["assessment_date"] = assessment_date
+
+    if assessment.get("vo2_max_value") is None and assessment.get("fitness_age") is None:
+        logger.warning(f"No VO2 max or fitness age for {assessment_date} in {file_path}")
+        return None
+    return assessment
+
+
+def _map_hydration_json(json_data: Any, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one Garmin hydration log entry to a hydration record
+
+    Entries without a timestamp are logged at midnight of their date.
+
+    Returns:
+        The record, or None if it has no logged volume
+
+    Raises:
+        ValueError: If the entry's date can't be determined
+    """
+    hydration_record = HYDRATION_DECODER.map(json_data)
+
+    timestamp = _epoch_or_iso_timestamp(hydration_record.get("timestamp_gmt"))
+    log_date = parse_date(hydration_record.get("log_date")) or (timestamp.date() if timestamp else None)
+    if not log_date:
+        raise ValueError("Could not determine hydration date from file")
+    hydration_record["log_date"] = log_date
+    hydration_record["timestamp_gmt"] = timestamp or datetime.combine(log_date, datetime.min.time())
+    hydration_record["timestamp_logged"] = timestamp is not None
+
+    if hydration_record.get("value_ml") is None:
+        logger.warning(f"No hydration volume for {log_date} in {file_path}")
+        return None
+    return hydration_record
+
+
+def _hydration_record_id(record: Dict[str, Any], index: int) -> int:
+    """
+    Row id of a hydration entry
+
+    Timestamped entries are keyed on their timestamp, activity and source.
+    Manual entries without one all fall on midnight of their day, so they
+    are told apart by their volume and position in the file.
+    """
+    if record.get("timestamp_logged"):
+        return stable_record_id("hydration", record["timestamp_gmt"], record.get("activity_id"),
+                                record.get("hydration_source"))
+    return stable_record_id("hydration", record["log_date"], record.get("activity_id"),
+                            record.get("hydration_source"), record.get("value_ml"), index)
+
+
+def _map_body_composition_json(json_data: Any, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one Garmin weigh-in to a body composition record
+
+    Returns:
+        The record, or None if it has no weight or body fat
+
+    Raises:
+        ValueError: If the weigh-in's date can't be determined
+    """
+    body_record = BODY_COMPOSITION_DECODER.map(json_data)
+
+    # timestampGMT / samplePk are epoch milliseconds; "date" a calendar date
+    measured = body_record.get("measurement_date")
+    timestamp = _epoch_or_iso_timestamp(measured)
+    measurement_date = timestamp.date() if timestamp else parse_date(measured)
+    if not measurement_date:
+        raise ValueError("Could not determine body composition date from file")
+    body_record["measured_at"] = timestamp or measurement_date
+    body_record["measurement_date"] = measurement_date
+
+    if body_record.get("weight_kg") is None and body_record.get("body_fat_percentage") is None:
+        logger.warning(f"No weight or body fat for {measurement_date} in {file_path}")
+        return None
+    return body_record
+
+
+_MENSTRUAL_DATE_FIELDS = (
+    "cycle_start_date", "cycle_end_date", "period_start_date", "period_end_date",
+    "fertility_window_start", "fertility_window_end", "ovulation_estimated_date"
+)
+
+
+def _map_menstrual_cycle_json(json_data: Any, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Map one Garmin menstrual cycle to a menstrual cycle record
+
+    Raises:
+        ValueError: If the cycle's start date can't be determined
+    """
+    cycle_record = MENSTRUAL_CYCLE_DECODER.map(json_data)
+
+    for date_field in _MENSTRUAL_DATE_FIELDS:
+        if date_field in cycle_record:
+            cycle_record[date_field] = parse_date(cycle_record[date_field])
+    if not cycle_record.get("cycle_start_date"):
+        raise ValueError("Could not determine menstrual cycle start date from file")
+    return cycle_record
+
+
+class JsonCategory:
+    """
+    How one Garmin JSON category is mapped and written
+
+    Attributes:
+        name: Category name (as in the GDPR export's file_categories)
+        label: Human-readable name for logs and progress
+        mapper: Maps one decoded record (see RecordMapper)
+        decoder: RecordDecoder for its field mappings
+        sql: Upsert statement for its table
+        row: Builds the statement's parameters from (record, file_hash), or
+            (record, file_hash, index) when numbered
+        numbered: Pass row the record's position in its file, for records
+            that may have no natural key of their own
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        mapper: RecordMapper,
+        decoder: RecordDecoder,
+        sql: str,
+        row: Callable[..., tuple],
+        numbered: bool = False
+    ):
+        self.name = name
+        self.label = label
+        self.mapper = mapper
+        self.decoder = decoder
+        self.sql = sql
+        self.row = row
+        self.numbered = numbered
+
+    def rows(self, records: Iterable[Dict[str, Any]], file_hash: str) -> Iterator[tuple]:
+        """Statement parameters for each record of one file"""
+        if self.numbered:
+            return (self.row(record, file_hash, index) for index, record in enumerate(records))
+        return (self.row(record, file_hash) for record in records)
+
+
+JSON_CATEGORIES: Dict[str, JsonCategory] = {
+    category.name: category for category in (
+        JsonCategory(
+            "hrv", "HRV JSON", _map_hrv_json, HRV_DECODER,
+            upsert_sql("hrv_records", ("id", "date", "hrv_value", "measurement_type", "source_file_hash"), ("date",)),
+            lambda record, file_hash: (
+                stable_record_id("hrv", record["date"]), record["date"],
+                record["hrv_value"], record.get("measurement_type"), file_hash
+            )
+        ),
+        JsonCategory(
+            "stress", "stress JSON", _map_stress_json, STRESS_DECODER,
+            upsert_sql(
+                "daily_stress",
+                ("date", "avg_stress", "max_stress", "min_stress", "rest_stress", "activity_stress"),
+                ("date",), touch_column=None
+            ),
+            lambda record, file_hash: (
+                record["date"], record.get("avg_stress"), record.get("max_stress"),
+                record.get("min_stress"), record.get("rest_stress"), record.get("activity_stress")
+            )
+        ),
+        JsonCategory(
+            "fitness_assessments", "fitness assessments", _map_fitness_assessment_json, FITNESS_ASSESSMENT_DECODER,
+            upsert_sql(
+                "fitness_assessments",
+                ("id", "assessment_date", "vo2_max_value", "fitness_age", "max_met", "sport",
+                 "sub_sport", "calibrated_data", "source_file_hash"),
+                ("id",),
+                # VO2 max and fitness age arrive as separate entries for the same day
+                merge_columns=("vo2_max_value", "fitness_age", "max_met", "calibrated_data")
+            ),
+            lambda record, file_hash: (
+                stable_record_id("fitness_assessment", record["assessment_date"],
+                                 record.get("sport"), record.get("sub_sport")),
+                record["assessment_date"], record.get("vo2_max_value"), record.get("fitness_age"),
+                record.get("max_met"), record.get("sport"), record.get("sub_sport"),
+                record.get("calibrated_data"), file_hash
+            )
+        ),
+        JsonCategory(
+            "hydration", "hydration logs", _map_hydration_json, HYDRATION_DECODER,
+            upsert_sql(
+                "hydration_logs",
+                ("id", "log_date", "timestamp_gmt", "value_ml", "estimated_sweat_loss_ml",
+                 "hydration_source", "activity_id", "source_file_hash"),
+                ("id",)
+            ),
+            lambda record, file_hash, index: (
+                _hydration_record_id(record, index),
+                record["log_date"], record["timestamp_gmt"], record.get("value_ml"),
+                record.get("estimated_sweat_loss_ml"), record.get("hydration_source"),
+                record.get("activity_id"), file_hash
+            ),
+            numbered=True
+        ),
+        JsonCategory(
+            "body_composition", "body composition", _map_body_composition_json, BODY_COMPOSITION_DECODER,
+            upsert_sql(
+                "body_composition",
+                ("id", "measurement_date", "weight_kg", "body_fat_percentage", "muscle_mass_kg",
+                 "bone_mass_kg", "water_percentage", "visceral_fat_rating", "metabolic_age", "bmi",
+                 "measurement_source", "source_file_hash"),
+                ("id",)
+            ),
+            lambda record, file_hash: (
+                stable_record_id("body_composition", record["measured_at"]),
+                record["measurement_date"], record.get("weight_kg"), record.get("body_fat_percentage"),
+                record.get("muscle_mass_kg"), record.get("bone_mass_kg"), record.get("water_percentage"),
+                record.get("visceral_fat_rating"), record.get("metabolic_age"), record.get("bmi"),
+                record.get("measurement_source"), file_hash
+            )
+        ),
+        JsonCategory(
+            "menstrual_cycles", "menstrual cycles", _map_menstrual_cycle_json, MENSTRUAL_CYCLE_DECODER,
+            upsert_sql(
+                "menstrual_cycles",
+                ("id",) + tuple(MENSTRUAL_CYCLE_FIELD_MAPPINGS) + ("source_file_hash",),
+                ("id",)
+            ),
+            lambda record, file_hash: (
+                (stable_record_id("menstrual_cycle", record["cycle_start_date"]),)
+                + tuple(record.get(field) for field in MENSTRUAL_CYCLE_FIELD_MAPPINGS)
+                + (file_hash,)
+            )
+        ),
+    )
+}
+
+
+def parse_category_json(category: str, json_data: Any, file_path: str, file_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse already loaded JSON of one of the JSON_CATEGORIES
+
+    Returns:
+        parsed_data with the mapped records under "records"
+    """
+    json_category = JSON_CATEGORIES[category]
+    logger.info(f"Parsing {json_category.label}: {file_path}")
+    return _parse_json_file(json_data, file_path, file_hash, "records", json_category.mapper)
+
+
+def stream_category_json(category: str, fp: BinaryIO, file_path: str, file_hash: str) -> Dict[str, Any]:
+    """Streaming counterpart of parse_category_json (see stream_sleep_json)"""
+    json_category = JSON_CATEGORIES[category]
+    logger.info(f"Streaming {json_category.label}: {file_path}")
+    return _stream_json_file(fp, file_path, file_hash, "records", json_category.mapper, json_category.decoder)
+
+
+def insert_category_data(category: str, parsed_data: Dict[str, Any], db_connection, source: str = "gdpr") -> int:
+    """
+    Insert parsed records of one of the JSON_CATEGORIES into its table
+
+    Records are upserted with one executemany() per file, in the same
+    transaction as the file's imported_files row.
+
+    Args:
+        category: JSON_CATEGORIES key
+        parsed_data: Data returned from parse_category_json() / stream_category_json()
+        db_connection: Database connection
+        source: Source identifier ('gdpr', 'manual', etc.)
+
+    Returns:
+        Number of records inserted
+    """
+    if not db_connection or parsed_data.get("error"):
+        return 0
+
+    json_category = JSON_CATEGORIES[category]
+    file_hash = parsed_data["file_hash"]
+    file_path = parsed_data["file_path"]
+    total_inserted = 0
+
+    try:
+        # Check if file already imported
+        cursor = db_connection.execute(
+            "SELECT file_hash FROM imported_files WHERE file_hash = ?",
+            (file_hash,)
+        )
+        if cursor.fetchone():
+            logger.info(f"{json_category.label.capitalize()} file already imported: {file_path}")
+            return 0
+
+        # Insert file tracking record
+        db_connection.execute(
+            """INSERT INTO imported_files (file_hash, file_path, file_type, source, record_count)
+               VALUES (?, ?, ?, ?, ?)""",
+            (file_hash, file_path, 'json', source, 0)
+        )
+
+        counter = _RowCounter(json_category.rows(parsed_data.get("records", []), file_hash))
+        db_connection.executemany(json_category.sql, counter)
+        total_inserted = counter.count
+
+        # Update record count
+        db_connection.execute(
+            "UPDATE imported_files SET record_count = ? WHERE file_hash = ?",
+            (total_inserted, file_hash)
+        )
+
+        db_connection.commit()
+        logger.info(f"Inserted {total_inserted} {json_category.label} records from {file_path}")
+
+    except Exception as e:
+        logger.error(f"Error inserting {json_category.label} from {file_path}: {e}")
+        try:
+            db_connection.rollback()
+        except:
+            pass
+        return 0
+
+    return total_inserted
+
+
+def process_sleep_json_files(
+    folder_path: str,
+    db_connection,
+    progress_callback: Optional[Callable[[str, int, int], None]] = None
+) -> Dict[str, Any]:
     """
     Process all sleep JSON files in a directory
 
     Args:
         folder_path: Directory containing sleep JSON files
         db_connection: Database connection
+        progress_callback: Optional callback function(operation, current, total)
 
     Returns:
         Summary of processing results
@@ -504,24 +1154,31 @@ def process_sleep_json_files(folder_path: str, db_connection) -> Dict[str, Any]:
             return summary
 
         # Process each sleep file
-        for file_path in sleep_files:
+        for idx, file_path in enumerate(sleep_files):
+            if progress_callback:
+                progress_callback("Processing sleep JSON", idx + 1, len(sleep_files))
+
             try:
                 logger.info(f"Processing sleep file: {file_path}")
 
-                # Load and parse JSON
-                json_data = load_json_file(file_path)
-                if not json_data:
-                    summary["errors"] += 1
-                    summary["error_files"].append({
-                        "file": file_path,
-                        "error": "Failed to load JSON"
-                    })
-                    continue
+                # Stream the file's nights straight into the database
+                file_hash = compute_file_hash(file_path)
+                with open(file_path, 'rb') as fp:
+                    parsed_data = stream_sleep_json(fp, file_path, file_hash)
 
-                # Parse sleep data
-                parsed_data = parse_sleep_json(json_data, file_path)
+                    if parsed_data.get("error"):
+                        summary["errors"] += 1
+                        summary["error_files"].append({
+                            "file": file_path,
+                            "error": parsed_data["error"]
+                        })
+                        continue
+
+                    # Insert into database
+                    records_inserted = insert_sleep_data(parsed_data, db_connection)
 
                 if parsed_data.get("error"):
+                    # Malformed partway through; the file's inserts were rolled back
                     summary["errors"] += 1
                     summary["error_files"].append({
                         "file": file_path,
@@ -529,9 +1186,6 @@ def process_sleep_json_files(folder_path: str, db_connection) -> Dict[str, Any]:
                     })
                     continue
 
-                # Insert into database
-                records_inserted = insert_sleep_data(parsed_data, db_connection)
-
                 if records_inserted == 0:
                     # Check if it was a duplicate
                     file_hash = parsed_data["file_hash"]
@@ -555,6 +1209,10 @@ def process_sleep_json_files(folder_path: str, db_connection) -> Dict[str, Any]:
                     "error": str(e)
                 })
 
+        # Days this import wrote
+        refresh_daily_metrics(db_connection)
+        db_connection.commit()
+
         logger.info(f"Sleep files processing complete: {summary}")
 
     except Exception as e:
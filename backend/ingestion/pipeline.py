@@ -0,0 +1,198 @@
+"""
+Pipelined Category Import
+
+Runs the producers for several categories of an export (FIT files, sleep
+JSON, daily summaries, ...) concurrently and hands their results to a
+single writer through one bounded queue.
+
+SQLite allows one writer at a time, so all inserts stay on the thread that
+drains the queue (the caller's, which owns the database connection).
+Producers only read and decode. How much they gain depends on where they
+run:
+
+- A producer fed by a process pool (add_producer, e.g. FIT files from
+  fit_folder.iter_parsed_fit_files) parses on other cores, in parallel
+  with the writer and with each other.
+- A threaded category (add_threaded_category) runs its parse function on
+  threads of this process. Reading and decompressing archive members and
+  the writer's time in SQLite release the GIL, so those overlap with
+  parsing; JSON decoding and record mapping hold it, so the threaded
+  categories together parse on at most one core. This is I/O overlap, not
+  parallel parsing: extra threads don't make CPU-bound parsing faster.
+
+The bounded queue keeps parsed-but-unwritten files from piling up when the
+writer is the bottleneck.
+
+Usage:
+    pipeline = CategoryPipeline()
+    pipeline.add_threaded_category("sleep_json", sleep_files, parse_sleep, threads=2)
+    pipeline.add_producer("fit_files", parsed_fit_files)
+    try:
+        for category, item, result, error in pipeline.results():
+            write(category, item, result, error)
+    finally:
+        pipeline.close()
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Parsed files waiting for the writer, across all categories
+PIPELINE_QUEUE_SIZE = 16
+
+# How often blocked producers check whether the pipeline was closed
+_PUT_POLL_SECONDS = 0.1
+
+# (category, item, result, error): error is the exception raised parsing
+# item (result is then None)
+PipelineResult = Tuple[str, Any, Any, Optional[BaseException]]
+
+
+class _Stopped(Exception):
+    """Raised in a producer thread once the pipeline is closed"""
+
+
+class _Done:
+    """Queued by a producer thread when its category is exhausted"""
+
+    def __init__(self, category: str):
+        self.category = category
+
+
+class CategoryPipeline:
+    """
+    Concurrent per-category producers feeding one writer
+
+    A category is either a list of items mapped through a parse function
+    on threads (add_threaded_category), or any iterable of (item, result,
+    error) tuples run on a thread of its own (add_producer), e.g. FIT files
+    parsed in a process pool.
+    """
+
+    def __init__(self, queue_size: int = PIPELINE_QUEUE_SIZE):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def add_threaded_category(
+        self, category: str, items: Iterable[Any], parse: Callable[[Any], Any], threads: int = 1
+    ):
+        """
+        Parse items with parse(item) on a pool of `threads` threads
+
+        The threads share the GIL, so more of them only help while parse
+        waits on I/O (see the module docstring). Results are queued as they
+        complete, so the writer sees them in completion order rather than
+        item order when threads > 1.
+        """
+        self.add_producer(category, _map_in_threads(items, parse, threads, self._stop))
+
+    def add_producer(self, category: str, results: Iterable[Tuple[Any, Any, Optional[BaseException]]]):
+        """Queue (item, result, error) tuples from results, iterated on a thread of its own"""
+        thread = threading.Thread(
+            target=self._produce, args=(category, results),
+            name=f"import-{category}", daemon=True
+        )
+        self._threads.append(thread)
+        thread.start()
+
+    def results(self) -> Iterator[PipelineResult]:
+        """
+        Parsed results of all categories, as they become ready
+
+        Drained by the writer; ends once every category is exhausted.
+        """
+        remaining = len(self._threads)
+        while remaining:
+            entry = self._queue.get()
+            if isinstance(entry, _Done):
+                remaining -= 1
+                continue
+            yield entry
+
+    def close(self):
+        """Stop the producers (e.g. after the writer failed) and wait for them"""
+        self._stop.set()
+        for thread in self._threads:
+            # Producers may be blocked on a full queue; make room until they exit
+            while thread.is_alive():
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+                thread.join(_PUT_POLL_SECONDS)
+
+    def _put(self, entry):
+        while True:
+            if self._stop.is_set():
+                raise _Stopped()
+            try:
+                self._queue.put(entry, timeout=_PUT_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    def _produce(self, category: str, results: Iterable[Tuple[Any, Any, Optional[BaseException]]]):
+        iterator = iter(results)
+        try:
+            for item, result, error in iterator:
+                self._put((category, item, result, error))
+        except _Stopped:
+            pass
+        except Exception as e:
+            # The producer itself failed: report it once instead of hanging the writer
+            logger.error(f"Import pipeline producer for {category} failed: {e}")
+            try:
+                self._put((category, None, None, e))
+            except _Stopped:
+                pass
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            try:
+                self._put(_Done(category))
+            except _Stopped:
+                pass
+
+
+def _map_in_threads(
+    items: Iterable[Any],
+    parse: Callable[[Any], Any],
+    threads: int,
+    stop: threading.Event
+) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """(item, parse(item), error) for each item, from a bounded thread pool"""
+    pending = iter(items)
+    max_in_flight = max(threads, 1) * 2
+
+    with ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+        in_flight = {}
+
+        def submit_next() -> bool:
+            if stop.is_set():
+                return False
+            item = next(pending, _END)
+            if item is _END:
+                return False
+            in_flight[executor.submit(parse, item)] = item
+            return True
+
+        while len(in_flight) < max_in_flight and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = in_flight.pop(future)
+                error = future.exception()
+                submit_next()
+                yield item, (None if error else future.result()), error
+
+
+_END = object()
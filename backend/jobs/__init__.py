@@ -0,0 +1,19 @@
+"""
+Jobs Module
+
+Background import jobs with progress reporting and cancellation.
+"""
+
+from .manager import (
+    ImportCancelled,
+    ImportJob,
+    JobManager,
+    get_job_manager
+)
+
+__all__ = [
+    'ImportCancelled',
+    'ImportJob',
+    'JobManager',
+    'get_job_manager'
+]
@@ -0,0 +1,293 @@
+"""
+Import Job Manager
+
+Runs long imports (GDPR exports, FIT folders, JSON folders) off the request
+path. Submitting an import returns a job id straight away; the import runs
+on a background worker thread holding the database's writer connection
+(see Database.write()), and its progress, throughput and ETA can be polled
+until it finishes. API reads keep going through their own read-only
+connections meanwhile.
+
+Progress comes from the importers' progress_callback(operation, current,
+total) hook. The same hook is where cancellation takes effect: once a job
+is cancelled, its next progress report raises ImportCancelled, the job's
+open transaction is rolled back and the worker moves on.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = frozenset({SUCCEEDED, FAILED, CANCELLED})
+
+# Finished jobs kept in memory for status queries
+MAX_FINISHED_JOBS = 100
+
+
+class ImportCancelled(BaseException):
+    """
+    Raised from a cancelled job's progress callback
+
+    A BaseException (like asyncio.CancelledError) so the importers'
+    per-file `except Exception` handlers don't swallow it.
+    """
+
+
+class ImportJob:
+    """State and progress of one background import"""
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.operation: Optional[str] = None
+        self.current = 0
+        self.total = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._cancel_requested = threading.Event()
+        self._lock = threading.Lock()
+        # (start time, start count, last count) per operation, for throughput/ETA;
+        # pipelined imports interleave the progress of several operations
+        self._operations: Dict[str, List[float]] = {}
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    def progress(self, operation: str, current: int, total: int):
+        """
+        progress_callback for the importers
+
+        Raises:
+            ImportCancelled: If the job has been cancelled
+        """
+        if self._cancel_requested.is_set():
+            raise ImportCancelled(self.id)
+
+        now = time.monotonic()
+        with self._lock:
+            state = self._operations.get(operation)
+            if state is None or current < state[2]:
+                state = self._operations[operation] = [now, current, current]
+            state[2] = current
+            self.operation = operation
+            self.current = current
+            self.total = total
+
+    def _rate(self) -> Optional[float]:
+        """Items per second in the current operation"""
+        state = self._operations.get(self.operation)
+        if state is None:
+            return None
+        started, start_count, _ = state
+        elapsed = time.monotonic() - started
+        done = self.current - start_count
+        if elapsed <= 0 or done <= 0:
+            return None
+        return done / elapsed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot for the job status API"""
+        with self._lock:
+            rate = self._rate() if self.status == RUNNING else None
+            eta = None
+            if rate and self.total:
+                eta = max(self.total - self.current, 0) / rate
+
+            if self.started_at is None:
+                elapsed = 0.0
+            else:
+                elapsed = (self.finished_at or time.time()) - self.started_at
+
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "params": self.params,
+                "operation": self.operation,
+                "current": self.current,
+                "total": self.total,
+                "percent": round(100.0 * self.current / self.total, 1) if self.total else None,
+                "items_per_second": round(rate, 2) if rate else None,
+                "eta_seconds": round(eta, 1) if eta is not None else None,
+                "elapsed_seconds": round(elapsed, 2),
+                "cancel_requested": self.cancel_requested,
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+# run(db_connection, progress_callback) -> result dict
+JobRunner = Callable[[Any, Callable[[str, int, int], None]], Dict[str, Any]]
+
+
+class JobManager:
+    """
+    Queue of background import jobs
+
+    Jobs run one at a time by default, so two imports never contend for
+    the SQLite write lock. Each job writes through the database's single
+    writer connection, so synchronous imports wait for it to finish
+    instead of failing on a locked database.
+
+    Usage:
+        manager = get_job_manager()
+        job = manager.submit("fit_folder", {"folder_path": path}, run)
+        manager.get(job.id).to_dict()
+        manager.cancel(job.id)
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_workers: int = 1):
+        """
+        Args:
+            db_path: Database the jobs write to (defaults to get_db()'s)
+            max_workers: Number of jobs run concurrently
+        """
+        self._db_path = db_path
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="import-job")
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, params: Dict[str, Any], run: JobRunner) -> ImportJob:
+        """
+        Queue an import and return its job immediately
+
+        Args:
+            kind: Import type ('garmin_export', 'fit_folder', 'json_folder')
+            params: Request parameters, reported back in the job status
+            run: Callable doing the import with (db_connection, progress_callback)
+
+        Returns:
+            The queued ImportJob
+        """
+        job = ImportJob(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, run)
+        logger.info(f"Queued {kind} import job {job.id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[ImportJob]:
+        """All known jobs, newest first"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[ImportJob]:
+        """
+        Request cancellation of a job
+
+        A queued job never starts; a running one stops at its next progress
+        report. Finished jobs are left as they are.
+
+        Returns:
+            The job, or None if the id is unknown
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.status not in FINISHED_STATES:
+            job._cancel_requested.set()
+            logger.info(f"Cancellation requested for import job {job_id}")
+        return job
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[ImportJob]:
+        """Block until a job finishes (mainly for tests and scripts)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        job = self.get(job_id)
+        while job is not None and job.status not in FINISHED_STATES:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(0.01)
+        return job
+
+    def shutdown(self, wait: bool = True):
+        """Cancel outstanding jobs and stop the worker threads"""
+        for job in self.list():
+            self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _open_database(self):
+        from db.connection import Database, get_db
+
+        if self._db_path is None:
+            return get_db()
+        db = Database(self._db_path)
+        db.connect()
+        db.initialize_schema()
+        return db
+
+    def _run(self, job: ImportJob, run: JobRunner):
+        if job.cancel_requested:
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            return
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        db = None
+        try:
+            db = self._open_database()
+            # Rolls the open transaction back if the import raises
+            with db.write() as connection:
+                job.result = run(connection, job.progress)
+            job.status = SUCCEEDED
+            logger.info(f"Import job {job.id} finished")
+        except ImportCancelled:
+            job.status = CANCELLED
+            logger.info(f"Import job {job.id} cancelled")
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger.error(f"Import job {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            if db is not None and self._db_path is not None:
+                db.close()
+
+
+# Global job manager instance
+_job_manager = None
+
+
+def get_job_manager() -> JobManager:
+    """
+    Get the global job manager
+
+    Returns:
+        JobManager instance
+    """
+    global _job_manager
+
+    if _job_manager is None:
+        _job_manager = JobManager()
+
+    return _job_manager
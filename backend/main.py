@@ -51,11 +51,16 @@ app.add_middleware(
 class GarminExportRequest(BaseModel):
     """Request to import a Garmin GDPR export zip"""
     zip_path: str
+    streaming: bool = True  # Read members from the zip instead of extracting it to disk
+    workers: int = 1  # FIT parser processes
+    json_threads: int = 2  # Reader threads per JSON category (overlap I/O; parsing shares one core)
 
 
 class FitFolderRequest(BaseModel):
     """Request to import a FIT file folder"""
     folder_path: str
+    workers: int = 1  # Parser processes; results are still written by a single DB writer
+    batch_files: int = 50  # Files written per transaction
 
 
 class JsonFolderRequest(BaseModel):
@@ -85,6 +90,24 @@ class ImportResponse(BaseModel):
     summary: Dict[str, Any]
 
 
+class JobResponse(BaseModel):
+    """Status of a background import job"""
+    job_id: str
+    kind: str
+    status: str  # "queued", "running", "succeeded", "failed", "cancelled"
+    params: Dict[str, Any]
+    operation: Optional[str]
+    current: int
+    total: int
+    percent: Optional[float]
+    items_per_second: Optional[float]
+    eta_seconds: Optional[float]
+    elapsed_seconds: float
+    cancel_requested: bool
+    result: Optional[Dict[str, Any]]  # ImportResponse once the job succeeds
+    error: Optional[str]
+
+
 class HeatmapDataPoint(BaseModel):
     """Single data point for heatmap"""
     date: str
@@ -105,6 +128,13 @@ class CorrelationResponse(BaseModel):
     stats: Dict[str, Any]
 
 
+class ActivitySamplesResponse(BaseModel):
+    """Per-second sample streams for one activity"""
+    activity_id: int
+    sample_count: int
+    channels: Dict[str, List[Optional[float]]]
+
+
 # ============================================================================
 # Status Endpoints
 # ============================================================================
@@ -143,241 +173,415 @@ async def get_status():
     )
 
 
+@app.get("/diagnostics/mapping-plans")
+async def get_mapping_plan_stats():
+    """
+    Compiled field-mapping plan cache statistics
+
+    Hit rate near 1.0 means imported files mostly share one schema variant;
+    see ingestion.field_mappings.MappingPlanCache.
+    """
+    from ingestion.field_mappings import mapping_plan_stats
+
+    return mapping_plan_stats()
+
+
 # ============================================================================
 # Import Endpoints
 # ============================================================================
+#
+# Imports take minutes on real exports. The /import/* endpoints are plain
+# `def` so FastAPI runs them in its threadpool instead of blocking the event
+# loop; the /jobs/* endpoints run the same imports in the background and
+# return a job id immediately.
 
-@app.post("/import/garmin-export", response_model=ImportResponse)
-async def import_garmin_export(request: GarminExportRequest):
+def _validate_zip_path(zip_path: str):
+    import os
+
+    if not os.path.exists(zip_path):
+        raise HTTPException(status_code=400, detail=f"ZIP file not found: {zip_path}")
+
+    if not zip_path.lower().endswith('.zip'):
+        raise HTTPException(status_code=400, detail=f"File must be a ZIP archive: {zip_path}")
+
+
+def _validate_folder_path(folder_path: str):
+    import os
+
+    if not os.path.exists(folder_path):
+        raise HTTPException(status_code=400, detail=f"Directory not found: {folder_path}")
+
+    if not os.path.isdir(folder_path):
+        raise HTTPException(status_code=400, detail=f"Path is not a directory: {folder_path}")
+
+
+def _run_garmin_export_import(request: GarminExportRequest, db_connection, progress_callback=None) -> ImportResponse:
     """
     Import a Garmin GDPR export zip file
 
     Steps:
-    1. Validate zip file exists
-    2. Extract to internal data directory
-    3. Locate FIT/TCX/JSON files
-    4. Parse relevant metrics (sleep, HR, HRV, stress, steps, training load)
-    5. Store in DB with deduplication
-    6. Return summary
+    1. Extract to internal data directory
+    2. Locate FIT/TCX/JSON files
+    3. Parse relevant metrics (sleep, HR, HRV, stress, steps, training load)
+    4. Store in DB with deduplication
+    5. Return summary
 
     This implements the complete GDPR import pipeline per PRE_COMMERCIAL_MVP_PLAN.md Week 1
     """
+    from ingestion.garmin_gdpr import process_gdpr_export
+
+    # Process the GDPR export using the full pipeline
+    summary = process_gdpr_export(
+        zip_path=request.zip_path,
+        db_connection=db_connection,
+        progress_callback=progress_callback,
+        cleanup_temp=True,
+        streaming=request.streaming,
+        workers=request.workers,
+        json_threads=request.json_threads
+    )
+
+    # Build success message
+    if summary["success"]:
+        message = f"GDPR export imported successfully! "
+        message += f"Processed {summary['total_files_processed']} files, "
+        message += f"inserted {summary['total_records_inserted']} records "
+        message += f"({summary['success_rate']}% success rate)"
+
+        if summary["duplicates_skipped"] > 0:
+            message += f", skipped {summary['duplicates_skipped']} duplicates"
+
+        if summary["errors"] > 0:
+            message += f". Warning: {summary['errors']} errors occurred"
+    else:
+        message = f"GDPR export import completed with errors. "
+        message += f"Processed {summary['total_files_processed']}/{summary['total_files_found']} files, "
+        message += f"inserted {summary['total_records_inserted']} records. "
+        message += f"{summary['errors']} errors occurred."
+
+    return ImportResponse(
+        success=summary["success"],
+        message=message,
+        summary={
+            "zip_path": summary["zip_path"],
+            "total_files_found": summary["total_files_found"],
+            "total_files_processed": summary["total_files_processed"],
+            "total_records_inserted": summary["total_records_inserted"],
+            "duplicates_skipped": summary["duplicates_skipped"],
+            "members_resumed": summary["members_resumed"],
+            "members_unchanged": summary["members_unchanged"],
+            "nested_zips": summary["nested_zips"],
+            "errors": summary["errors"],
+            "success_rate": summary["success_rate"],
+            "processing_time_seconds": summary["processing_time_seconds"],
+            "by_category": summary["by_category"],
+            "error_details": summary["error_details"][:10] if summary["error_details"] else []  # Limit to first 10 errors
+        }
+    )
+
+
+def _run_fit_folder_import(request: FitFolderRequest, db_connection, progress_callback=None) -> ImportResponse:
+    """
+    Import FIT files from a local directory (e.g., Garmin Express folder)
+
+    Steps:
+    1. Recursively walk directory tree
+    2. Parse all .fit files (across `workers` processes)
+    3. Deduplicate based on file hash or activity ID
+    4. Insert new records into DB
+    5. Return summary
+    """
+    from ingestion.fit_folder import process_fit_folder
+
+    # Process the FIT folder using our implementation
+    summary = process_fit_folder(
+        request.folder_path,
+        db_connection,
+        workers=request.workers,
+        batch_files=request.batch_files,
+        progress_callback=progress_callback
+    )
+
+    # Build success message
+    message = f"Processed {summary['files_found']} FIT files"
+    if summary['files_processed'] > 0:
+        message += f", inserted {summary['total_records']} records"
+    if summary['duplicates_skipped'] > 0:
+        message += f", skipped {summary['duplicates_skipped']} duplicates"
+    if summary['errors'] > 0:
+        message += f", {summary['errors']} errors"
+
+    return ImportResponse(
+        success=summary['errors'] == 0,
+        message=message,
+        summary={
+            "files_found": summary['files_found'],
+            "files_processed": summary['files_processed'],
+            "total_records": summary['total_records'],
+            "duplicates_skipped": summary['duplicates_skipped'],
+            "errors": summary['errors'],
+            "error_files": summary.get('error_files', []),
+            "workers": summary['workers'],
+            "rows_written": summary['rows_written'],
+            "rows_per_second": summary['rows_per_second'],
+            "timings": summary['timings']
+        }
+    )
+
+
+def _run_json_folder_import(request: JsonFolderRequest, db_connection, progress_callback=None) -> ImportResponse:
+    """
+    Import JSON files from Garmin GDPR export
+
+    Steps:
+    1. Scan for JSON files by type (sleep, daily summaries, etc.)
+    2. Parse and extract health metrics
+    3. Deduplicate and insert into appropriate tables
+    4. Return summary
+
+    Supported data_type values:
+    - "sleep": Process sleep_*.json files
+    - "daily_summaries": Process UdsFile_*.json files
+    - "all": Process all supported JSON types
+    """
+    from ingestion.json_parser import process_sleep_json_files
+
+    summary = {"files_found": 0, "files_processed": 0, "total_records": 0,
+              "duplicates_skipped": 0, "errors": 0, "error_files": []}
+
+    # Process based on data type
+    if request.data_type == "sleep" or request.data_type == "all":
+        sleep_summary = process_sleep_json_files(request.folder_path, db_connection, progress_callback)
+
+        # Aggregate sleep results
+        summary["files_found"] += sleep_summary["files_found"]
+        summary["files_processed"] += sleep_summary["files_processed"]
+        summary["total_records"] += sleep_summary["total_records"]
+        summary["duplicates_skipped"] += sleep_summary["duplicates_skipped"]
+        summary["errors"] += sleep_summary["errors"]
+        summary["error_files"].extend(sleep_summary.get("error_files", []))
+
+    # TODO: Add daily_summaries processing when request.data_type includes it
+    # if request.data_type == "daily_summaries" or request.data_type == "all":
+    #     daily_summary = process_daily_summary_json_files(request.folder_path, db_connection)
+    #     # Aggregate results...
+
+    # Build success message
+    message = f"Processed {summary['files_found']} JSON files"
+    if summary['files_processed'] > 0:
+        message += f", imported {summary['total_records']} records"
+    if summary['duplicates_skipped'] > 0:
+        message += f", skipped {summary['duplicates_skipped']} duplicates"
+    if summary['errors'] > 0:
+        message += f", {summary['errors']} errors"
+
+    return ImportResponse(
+        success=summary['errors'] == 0,
+        message=message,
+        summary={
+            "data_type": request.data_type,
+            "files_found": summary['files_found'],
+            "files_processed": summary['files_processed'],
+            "total_records": summary['total_records'],
+            "duplicates_skipped": summary['duplicates_skipped'],
+            "errors": summary['errors'],
+            "error_files": summary.get('error_files', [])
+        }
+    )
+
+
+@app.post("/import/garmin-export", response_model=ImportResponse)
+def import_garmin_export(request: GarminExportRequest):
+    """
+    Import a Garmin GDPR export zip file and wait for the result
+
+    See POST /jobs/garmin-export to run the import in the background.
+    """
     logger.info(f"Importing Garmin export from: {request.zip_path}")
 
-    import os
     from db.connection import get_db
-    from ingestion.garmin_gdpr import process_gdpr_export
-
-    # Validate file exists
-    if not os.path.exists(request.zip_path):
-        raise HTTPException(status_code=400, detail=f"ZIP file not found: {request.zip_path}")
 
-    if not request.zip_path.lower().endswith('.zip'):
-        raise HTTPException(status_code=400, detail=f"File must be a ZIP archive: {request.zip_path}")
+    _validate_zip_path(request.zip_path)
 
     try:
-        # Get database connection
-        db = get_db()
-
-        # Process the GDPR export using the full pipeline
-        summary = process_gdpr_export(
-            zip_path=request.zip_path,
-            db_connection=db.connection,
-            progress_callback=None,  # TODO: Add WebSocket support for real-time progress
-            cleanup_temp=True
-        )
-
-        # Build success message
-        if summary["success"]:
-            message = f"GDPR export imported successfully! "
-            message += f"Processed {summary['total_files_processed']} files, "
-            message += f"inserted {summary['total_records_inserted']} records "
-            message += f"({summary['success_rate']}% success rate)"
-
-            if summary["duplicates_skipped"] > 0:
-                message += f", skipped {summary['duplicates_skipped']} duplicates"
-
-            if summary["errors"] > 0:
-                message += f". Warning: {summary['errors']} errors occurred"
-        else:
-            message = f"GDPR export import completed with errors. "
-            message += f"Processed {summary['total_files_processed']}/{summary['total_files_found']} files, "
-            message += f"inserted {summary['total_records_inserted']} records. "
-            message += f"{summary['errors']} errors occurred."
-
-        return ImportResponse(
-            success=summary["success"],
-            message=message,
-            summary={
-                "zip_path": summary["zip_path"],
-                "total_files_found": summary["total_files_found"],
-                "total_files_processed": summary["total_files_processed"],
-                "total_records_inserted": summary["total_records_inserted"],
-                "duplicates_skipped": summary["duplicates_skipped"],
-                "errors": summary["errors"],
-                "success_rate": summary["success_rate"],
-                "processing_time_seconds": summary["processing_time_seconds"],
-                "by_category": summary["by_category"],
-                "error_details": summary["error_details"][:10] if summary["error_details"] else []  # Limit to first 10 errors
-            }
-        )
+        with get_db().write() as connection:
+            return _run_garmin_export_import(request, connection)
 
     except Exception as e:
         logger.error(f"Failed to import GDPR export {request.zip_path}: {e}")
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
 
 
+@app.post("/import/plan")
+def plan_garmin_export(request: GarminExportRequest) -> Dict[str, Any]:
+    """
+    Dry run of a Garmin GDPR export import
+
+    Reads only the zip's central directory and the import checkpoints, and
+    reports per-category member counts, compressed and uncompressed bytes,
+    members already imported and an estimated import time. Nothing is
+    extracted or written.
+    """
+    from db.connection import get_db
+    from ingestion.garmin_gdpr import plan_gdpr_export
+
+    _validate_zip_path(request.zip_path)
+
+    try:
+        with get_db().read() as connection:
+            return plan_gdpr_export(
+                request.zip_path,
+                connection,
+                workers=request.workers
+            )
+
+    except Exception as e:
+        logger.error(f"Failed to plan GDPR export import {request.zip_path}: {e}")
+        raise HTTPException(status_code=500, detail=f"Planning failed: {str(e)}")
+
+
 @app.post("/import/fit-folder", response_model=ImportResponse)
-async def import_fit_folder(request: FitFolderRequest):
+def import_fit_folder(request: FitFolderRequest):
     """
-    Import FIT files from a local directory (e.g., Garmin Express folder)
+    Import FIT files from a local directory and wait for the result
 
-    Steps:
-    1. Validate folder exists
-    2. Recursively walk directory tree
-    3. Parse all .fit files
-    4. Deduplicate based on file hash or activity ID
-    5. Insert new records into DB
-    6. Return summary
+    See POST /jobs/fit-folder to run the import in the background.
     """
     logger.info(f"Importing FIT folder from: {request.folder_path}")
 
-    import os
     from db.connection import get_db
-    from ingestion.fit_folder import process_fit_folder
-
-    # Validate directory exists
-    if not os.path.exists(request.folder_path):
-        raise HTTPException(status_code=400, detail=f"Directory not found: {request.folder_path}")
 
-    if not os.path.isdir(request.folder_path):
-        raise HTTPException(status_code=400, detail=f"Path is not a directory: {request.folder_path}")
+    _validate_folder_path(request.folder_path)
 
     try:
-        # Get database connection
-        db = get_db()
-
-        # Process the FIT folder using our implementation
-        summary = process_fit_folder(request.folder_path, db.connection)
+        with get_db().write() as connection:
+            return _run_fit_folder_import(request, connection)
 
-        # Build success message
-        message = f"Processed {summary['files_found']} FIT files"
-        if summary['files_processed'] > 0:
-            message += f", inserted {summary['total_records']} records"
-        if summary['duplicates_skipped'] > 0:
-            message += f", skipped {summary['duplicates_skipped']} duplicates"
-        if summary['errors'] > 0:
-            message += f", {summary['errors']} errors"
-
-        return ImportResponse(
-            success=summary['errors'] == 0,
-            message=message,
-            summary={
-                "files_found": summary['files_found'],
-                "files_processed": summary['files_processed'],
-                "total_records": summary['total_records'],
-                "duplicates_skipped": summary['duplicates_skipped'],
-                "errors": summary['errors'],
-                "error_files": summary.get('error_files', [])
-            }
-        )
-
-    except HTTPException:
-        # Re-raise HTTPExceptions (like 400 for invalid directories) as-is
-        raise
     except Exception as e:
         logger.error(f"Failed to import FIT folder {request.folder_path}: {e}")
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
 
 
 @app.post("/import/json-folder", response_model=ImportResponse)
-async def import_json_folder(request: JsonFolderRequest):
+def import_json_folder(request: JsonFolderRequest):
     """
-    Import JSON files from Garmin GDPR export
-
-    Steps:
-    1. Validate folder exists
-    2. Scan for JSON files by type (sleep, daily summaries, etc.)
-    3. Parse and extract health metrics
-    4. Deduplicate and insert into appropriate tables
-    5. Return summary
+    Import JSON files from a Garmin GDPR export folder and wait for the result
 
-    Supported data_type values:
-    - "sleep": Process sleep_*.json files
-    - "daily_summaries": Process UdsFile_*.json files
-    - "all": Process all supported JSON types
+    See POST /jobs/json-folder to run the import in the background.
     """
     logger.info(f"Importing JSON {request.data_type} files from: {request.folder_path}")
 
+    from db.connection import get_db
+
+    _validate_folder_path(request.folder_path)
+
     try:
-        import os
-        from db.connection import get_db
-        from ingestion.json_parser import process_sleep_json_files
-
-        # Validate directory exists
-        if not os.path.exists(request.folder_path):
-            raise HTTPException(status_code=400, detail=f"Directory not found: {request.folder_path}")
-
-        if not os.path.isdir(request.folder_path):
-            raise HTTPException(status_code=400, detail=f"Path is not a directory: {request.folder_path}")
-
-        # Get database connection
-        db = get_db()
-
-        summary = {"files_found": 0, "files_processed": 0, "total_records": 0,
-                  "duplicates_skipped": 0, "errors": 0, "error_files": []}
-
-        # Process based on data type
-        if request.data_type == "sleep" or request.data_type == "all":
-            sleep_summary = process_sleep_json_files(request.folder_path, db.connection)
-
-            # Aggregate sleep results
-            summary["files_found"] += sleep_summary["files_found"]
-            summary["files_processed"] += sleep_summary["files_processed"]
-            summary["total_records"] += sleep_summary["total_records"]
-            summary["duplicates_skipped"] += sleep_summary["duplicates_skipped"]
-            summary["errors"] += sleep_summary["errors"]
-            summary["error_files"].extend(sleep_summary.get("error_files", []))
-
-        # TODO: Add daily_summaries processing when request.data_type includes it
-        # if request.data_type == "daily_summaries" or request.data_type == "all":
-        #     daily_summary = process_daily_summary_json_files(request.folder_path, db.connection)
-        #     # Aggregate results...
-
-        # Build success message
-        message = f"Processed {summary['files_found']} JSON files"
-        if summary['files_processed'] > 0:
-            message += f", imported {summary['total_records']} records"
-        if summary['duplicates_skipped'] > 0:
-            message += f", skipped {summary['duplicates_skipped']} duplicates"
-        if summary['errors'] > 0:
-            message += f", {summary['errors']} errors"
-
-        return ImportResponse(
-            success=summary['errors'] == 0,
-            message=message,
-            summary={
-                "data_type": request.data_type,
-                "files_found": summary['files_found'],
-                "files_processed": summary['files_processed'],
-                "total_records": summary['total_records'],
-                "duplicates_skipped": summary['duplicates_skipped'],
-                "errors": summary['errors'],
-                "error_files": summary.get('error_files', [])
-            }
-        )
+        with get_db().write() as connection:
+            return _run_json_folder_import(request, connection)
 
     except Exception as e:
         logger.error(f"Failed to import JSON folder {request.folder_path}: {e}")
         raise HTTPException(status_code=500, detail=f"JSON import failed: {str(e)}")
 
 
+# ============================================================================
+# Import Job Endpoints
+# ============================================================================
+
+def _job_runner(run_import, request):
+    """Adapt an import function to JobManager's run(db_connection, progress_callback)"""
+    def run(db_connection, progress_callback):
+        return run_import(request, db_connection, progress_callback).model_dump()
+    return run
+
+
+@app.post("/jobs/garmin-export", response_model=JobResponse, status_code=202)
+def start_garmin_export_job(request: GarminExportRequest):
+    """Start a background Garmin GDPR export import"""
+    from jobs import get_job_manager
+
+    _validate_zip_path(request.zip_path)
+    job = get_job_manager().submit(
+        "garmin_export", request.model_dump(), _job_runner(_run_garmin_export_import, request)
+    )
+    return JobResponse(**job.to_dict())
+
+
+@app.post("/jobs/fit-folder", response_model=JobResponse, status_code=202)
+def start_fit_folder_job(request: FitFolderRequest):
+    """Start a background FIT folder import"""
+    from jobs import get_job_manager
+
+    _validate_folder_path(request.folder_path)
+    job = get_job_manager().submit(
+        "fit_folder", request.model_dump(), _job_runner(_run_fit_folder_import, request)
+    )
+    return JobResponse(**job.to_dict())
+
+
+@app.post("/jobs/json-folder", response_model=JobResponse, status_code=202)
+def start_json_folder_job(request: JsonFolderRequest):
+    """Start a background JSON folder import"""
+    from jobs import get_job_manager
+
+    _validate_folder_path(request.folder_path)
+    job = get_job_manager().submit(
+        "json_folder", request.model_dump(), _job_runner(_run_json_folder_import, request)
+    )
+    return JobResponse(**job.to_dict())
+
+
+@app.get("/jobs", response_model=List[JobResponse])
+async def list_jobs():
+    """List import jobs, newest first"""
+    from jobs import get_job_manager
+
+    return [JobResponse(**job.to_dict()) for job in get_job_manager().list()]
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get an import job's status, progress, throughput and ETA"""
+    from jobs import get_job_manager
+
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return JobResponse(**job.to_dict())
+
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """
+    Cancel an import job
+
+    A running import stops after the file it is working on; its
+    uncommitted rows are rolled back. Files already committed stay
+    imported and are skipped as duplicates if the import is re-run.
+    """
+    from jobs import get_job_manager
+
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return JobResponse(**job.to_dict())
+
+
 # ============================================================================
 # Metrics Endpoints
 # ============================================================================
 
+# Short metric names the frontend uses, as daily_metrics columns
+HEATMAP_METRIC_ALIASES = {
+    "sleep": "sleep_duration",
+    "hrv": "hrv_value",
+    "stress": "avg_stress",
+    "steps": "step_count",
+}
+
+
 @app.get("/metrics/heatmap")
-async def get_heatmap_data(
+def get_heatmap_data(
     metric: str,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None
@@ -385,25 +589,35 @@ async def get_heatmap_data(
     """
     Get heatmap data for a specific metric
 
-    Returns a list of {date, value} that can be binned into a year × day heatmap
+    Returns a list of {date, value} that can be binned into a year × day heatmap,
+    one per day with a value between start_date and end_date (inclusive)
 
-    TODO: Implement actual DB queries for each metric type
+    Args:
+        metric: A daily_metrics column (e.g. 'sleep_duration', 'resting_hr')
+                or one of 'sleep', 'hrv', 'stress', 'steps'
     """
     logger.info(f"Fetching heatmap data for metric: {metric}")
 
-    # TODO: Validate metric is supported
-    # TODO: Query DB for metric between start_date and end_date
-    # TODO: Return array of {date, value}
+    from db.connection import get_db
+    from db.daily_metrics import DAILY_METRIC_COLUMNS
 
-    # Stub response - generate some fake data
-    stub_data = []
-    for i in range(100):
-        stub_data.append(HeatmapDataPoint(
-            date=f"2024-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}",
-            value=float(i % 10)
-        ))
+    column = HEATMAP_METRIC_ALIASES.get(metric, metric)
+    if column not in DAILY_METRIC_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Invalid metric: {metric}")
 
-    return stub_data
+    query = f"SELECT date, {column} FROM daily_metrics WHERE {column} IS NOT NULL"
+    params = []
+    if start_date:
+        query += " AND date >= ?"
+        params.append(start_date)
+    if end_date:
+        query += " AND date <= ?"
+        params.append(end_date)
+
+    with get_db().read() as conn:
+        rows = conn.execute(query + " ORDER BY date", params).fetchall()
+
+    return [HeatmapDataPoint(date=str(day), value=float(value)) for day, value in rows]
 
 
 @app.get("/metrics/timeseries")
@@ -436,7 +650,7 @@ async def get_timeseries_data(
 
 
 @app.get("/metrics/correlation", response_model=CorrelationResponse)
-async def get_correlation_data(
+def get_correlation_data(
     x_metric: str,
     y_metric: str,
     lag_days: Optional[int] = 0
@@ -460,73 +674,41 @@ async def get_correlation_data(
     logger.info(f"Calculating correlation: {x_metric} vs {y_metric} (lag={lag_days})")
 
     from db.connection import get_db
+    from db.daily_metrics import DAILY_METRIC_COLUMNS
     import numpy as np
     from scipy import stats
 
-    # Get database connection
-    db = get_db()
-    conn = db.connection
-
-    # Valid metrics from daily_metrics view
-    valid_metrics = [
-        'sleep_duration', 'sleep_score',
-        'resting_hr', 'hrv_value',
-        'avg_stress', 'max_stress', 'min_stress',
-        'step_count'
-    ]
-
-    if x_metric not in valid_metrics:
+    # Valid metrics: the daily_metrics columns
+    if x_metric not in DAILY_METRIC_COLUMNS:
         raise HTTPException(status_code=400, detail=f"Invalid x_metric: {x_metric}")
-    if y_metric not in valid_metrics:
+    if y_metric not in DAILY_METRIC_COLUMNS:
         raise HTTPException(status_code=400, detail=f"Invalid y_metric: {y_metric}")
 
     try:
-        # Query data from daily_metrics view
+        # daily_metrics has a row for every day, so the lag is a date offset:
+        # x_metric on date D is paired with y_metric on date D + lag_days
         query = f"""
-        SELECT date, {x_metric}, {y_metric}
-        FROM daily_metrics
-        WHERE {x_metric} IS NOT NULL AND {y_metric} IS NOT NULL
-        ORDER BY date
+        SELECT x.date, x.{x_metric}, y.{y_metric}
+        FROM daily_metrics x
+        JOIN daily_metrics y ON y.date = date(x.date, ?)
+        WHERE x.{x_metric} IS NOT NULL AND y.{y_metric} IS NOT NULL
+        ORDER BY x.date
         """
 
-        cursor = conn.cursor()
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        with get_db().read() as conn:
+            rows = conn.execute(query, (f"{lag_days or 0:+d} days",)).fetchall()
 
         if len(rows) < 2:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Insufficient data for correlation (need at least 2 points, found {len(rows)})"
-            )
+            detail = f"Insufficient data for correlation (need at least 2 points, found {len(rows)})"
+            if lag_days:
+                detail += f" after applying lag_days={lag_days}"
+            raise HTTPException(status_code=400, detail=detail)
 
         # Extract data
         dates = [row[0] for row in rows]
         x_values = [float(row[1]) for row in rows]
         y_values = [float(row[2]) for row in rows]
 
-        # Apply lag offset if specified
-        if lag_days != 0:
-            if lag_days > 0:
-                # Positive lag: shift y_values forward in time
-                # This correlates x_metric on date D with y_metric on date D+lag
-                # Example: sleep on Nov 21 (x) correlates with stress on Nov 22 (y)
-                y_values = y_values[lag_days:]
-                x_values = x_values[:-lag_days]
-                dates = dates[:-lag_days]
-            else:
-                # Negative lag: shift x_values forward
-                lag_abs = abs(lag_days)
-                x_values = x_values[lag_abs:]
-                y_values = y_values[:-lag_abs]
-                dates = dates[lag_abs:]
-
-        # Check we still have enough data after lag
-        if len(x_values) < 2:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Insufficient data after applying lag_days={lag_days}"
-            )
-
         # Calculate correlation statistics
         x_array = np.array(x_values)
         y_array = np.array(y_values)
@@ -557,6 +739,44 @@ async def get_correlation_data(
         raise HTTPException(status_code=500, detail=f"Correlation calculation failed: {str(e)}")
 
 
+# ============================================================================
+# Activity Endpoints
+# ============================================================================
+
+@app.get("/activities/{activity_id}/samples", response_model=ActivitySamplesResponse)
+def get_activity_samples(activity_id: int, channels: Optional[str] = None):
+    """
+    Get the stored per-second streams (HR, speed, cadence, power, position)
+    for an activity
+
+    Args:
+        activity_id: activities.id
+        channels: Optional comma-separated list of channels to return
+
+    Streams come from the columnar sample store, so no FIT re-parsing is
+    needed. Missing values are returned as null; timestamps are Unix seconds.
+    """
+    from db.connection import get_db
+    from db.sample_store import read_activity_samples
+
+    requested = [c.strip() for c in channels.split(",") if c.strip()] if channels else None
+    with get_db().read() as conn:
+        samples = read_activity_samples(conn, activity_id, requested)
+
+    if not samples:
+        raise HTTPException(status_code=404, detail=f"No samples stored for activity {activity_id}")
+
+    sample_count = max(len(values) for values in samples.values())
+    return ActivitySamplesResponse(
+        activity_id=activity_id,
+        sample_count=sample_count,
+        channels={
+            channel: [None if v != v else v for v in values.tolist()]  # NaN -> null
+            for channel, values in samples.items()
+        }
+    )
+
+
 # ============================================================================
 # Settings Endpoints
 # ============================================================================
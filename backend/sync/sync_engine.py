@@ -7,8 +7,9 @@ Implements CONTINUAL_SYNC_SPEC.md §3.4 Folder Scanning Algorithm:
 1. Recursively walk subdirectories
 2. Identify files where:
    - Extension matches .fit or .FIT
-   - File has not been ingested (checked via file_hash)
-   - Or file has changed (size/timestamp/hash differs)
+   - File path is not in the registry, or its size/mtime differ
+   - And its hash has not been ingested (§6.2: stat first, hash only
+     new or ambiguous files)
 3. Pass new/updated files to FIT parser
 
 Never writes to Garmin Express folders (read-only).
@@ -16,7 +17,7 @@ Never writes to Garmin Express folders (read-only).
 
 import os
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 from datetime import datetime
 
@@ -30,6 +31,8 @@ from ingestion.fit_folder import (
     parse_fit_file,
     insert_fit_data
 )
+from ingestion.file_buffer import FileBuffer
+from db.daily_metrics import refresh_daily_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -79,48 +82,129 @@ def update_last_sync_time(device_id: str, db_connection):
         logger.error(f"Error updating last sync time for device {device_id}: {e}")
 
 
-def is_file_changed(file_path: str, db_connection) -> bool:
+def _normalize_mtime(value: Any) -> Optional[datetime]:
+    """Stored modified_time may come back as a datetime or an ISO string"""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def load_file_registry(db_connection) -> Dict[str, Tuple[Any, Optional[datetime]]]:
     """
-    Check if a file has changed since last import
+    Load the path-indexed file registry in one query
+
+    Args:
+        db_connection: Database connection
+
+    Returns:
+        {file_path: (file_size, modified_time)} for the latest import of
+        each path
+    """
+    registry = {}
+    try:
+        cursor = db_connection.execute(
+            """SELECT file_path, file_size, modified_time
+               FROM imported_files
+               ORDER BY imported_at"""
+        )
+        for file_path, file_size, modified_time in cursor.fetchall():
+            registry[file_path] = (file_size, _normalize_mtime(modified_time))
+    except Exception as e:
+        logger.error(f"Error loading file registry: {e}")
+    return registry
+
+
+def check_file_status(
+    file_path: str,
+    db_connection,
+    registry: Optional[Dict[str, Tuple[Any, Optional[datetime]]]] = None,
+    buffer: Optional[FileBuffer] = None
+) -> Tuple[str, Optional[str]]:
+    """
+    Classify a file against the registry (CONTINUAL_SYNC_SPEC.md §6.2)
+
+    Size and modified time are compared first; the file is only hashed when
+    its path is new or its stat differs. A hash that is already imported
+    (moved or touched file) counts as unchanged, and its stored path/stat is
+    refreshed so the next sync short-circuits on stat alone.
 
     Args:
         file_path: Path to the file
         db_connection: Database connection
+        registry: Preloaded load_file_registry() result; looked up per file
+            when omitted
+        buffer: Optional FileBuffer for file_path; when given, the hash is
+            taken from it so a later parse reuses the same read
 
     Returns:
-        True if file is new or changed, False if unchanged
+        (status, file_hash) where status is "unchanged", "new" or "changed";
+        file_hash is None when the file was not hashed
     """
-    file_hash = compute_file_hash(file_path)
     metadata = get_file_metadata(file_path)
 
-    try:
+    if registry is None:
         cursor = db_connection.execute(
             """SELECT file_size, modified_time
                FROM imported_files
-               WHERE file_hash = ?""",
-            (file_hash,)
+               WHERE file_path = ?
+               ORDER BY imported_at DESC LIMIT 1""",
+            (file_path,)
         )
         row = cursor.fetchone()
+        known = (row[0], _normalize_mtime(row[1])) if row else None
+    else:
+        known = registry.get(file_path)
+
+    if known is not None:
+        stored_size, stored_mtime = known
+        if stored_size == metadata['file_size'] and stored_mtime == metadata['modified_time']:
+            logger.debug(f"File unchanged: {file_path}")
+            return "unchanged", None
+
+    # New path, or stat differs: hash to confirm identity
+    file_hash = buffer.sha256 if buffer is not None else compute_file_hash(file_path)
+    cursor = db_connection.execute(
+        "SELECT file_hash FROM imported_files WHERE file_hash = ?",
+        (file_hash,)
+    )
+    if cursor.fetchone():
+        logger.debug(f"File content already imported: {file_path}")
+        db_connection.execute(
+            """UPDATE imported_files
+               SET file_path = ?, file_size = ?, modified_time = ?
+               WHERE file_hash = ?""",
+            (file_path, metadata['file_size'], metadata['modified_time'], file_hash)
+        )
+        if registry is not None:
+            registry[file_path] = (metadata['file_size'], metadata['modified_time'])
+        return "unchanged", file_hash
 
-        if not row:
-            # File is new (not in database)
-            logger.debug(f"File is new: {file_path}")
-            return True
+    if known is None:
+        logger.debug(f"File is new: {file_path}")
+        return "new", file_hash
 
-        stored_size, stored_mtime = row
+    logger.info(f"File changed: {file_path}")
+    return "changed", file_hash
 
-        # Check if size or modified time changed
-        if stored_size != metadata['file_size']:
-            logger.info(f"File size changed: {file_path} (was {stored_size}, now {metadata['file_size']})")
-            return True
 
-        if stored_mtime != metadata['modified_time']:
-            logger.info(f"File modified time changed: {file_path}")
-            return True
+def is_file_changed(file_path: str, db_connection, registry: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Check if a file has changed since last import
+
+    Args:
+        file_path: Path to the file
+        db_connection: Database connection
+        registry: Optional preloaded load_file_registry() result
 
-        # File is unchanged
-        logger.debug(f"File unchanged: {file_path}")
-        return False
+    Returns:
+        True if file is new or changed, False if unchanged
+    """
+    try:
+        status, _ = check_file_status(file_path, db_connection, registry)
+        return status != "unchanged"
 
     except Exception as e:
         logger.error(f"Error checking file change status for {file_path}: {e}")
@@ -176,17 +260,21 @@ def sync_garmin_express_device(device_id: str, device_path: str, db_connection)
             summary["duration_seconds"] = (datetime.now() - start_time).total_seconds()
             return summary
 
-        # 2. Process each file (new or changed only)
+        # 2. Process each file (new or changed only), checking stat against
+        # the registry before hashing anything
+        registry = load_file_registry(db_connection)
         for file_path in fit_files:
             try:
-                # Check if file is new or changed
-                if not is_file_changed(file_path, db_connection):
-                    summary["files_skipped"] += 1
-                    continue
+                # One read per file: the bytes hashed here are the ones parsed
+                with FileBuffer(file_path) as buffer:
+                    status, _ = check_file_status(file_path, db_connection, registry, buffer)
+                    if status == "unchanged":
+                        summary["files_skipped"] += 1
+                        continue
 
-                # File is new or changed - parse it
-                logger.info(f"Processing file: {file_path}")
-                parsed_data = parse_fit_file(file_path)
+                    # File is new or changed - parse it
+                    logger.info(f"Processing file: {file_path}")
+                    parsed_data = parse_fit_file(file_path, buffer=buffer)
 
                 if "error" in parsed_data:
                     logger.error(f"Failed to parse {file_path}: {parsed_data['error']}")
@@ -197,19 +285,11 @@ def sync_garmin_express_device(device_id: str, device_path: str, db_connection)
                     })
                     continue
 
-                # Check if this is a new file or update
-                file_hash = parsed_data["file_hash"]
-                cursor = db_connection.execute(
-                    "SELECT file_hash FROM imported_files WHERE file_hash = ?",
-                    (file_hash,)
-                )
-                is_new = cursor.fetchone() is None
-
                 # Insert data into database
                 records_inserted = insert_fit_data(parsed_data, db_connection, source="garmin_express")
 
                 if records_inserted > 0:
-                    if is_new:
+                    if status == "new":
                         summary["files_new"] += 1
                     else:
                         summary["files_updated"] += 1
@@ -228,6 +308,11 @@ def sync_garmin_express_device(device_id: str, device_path: str, db_connection)
                     "error": str(e)
                 })
 
+        # Persist path/stat refreshes for moved or touched files, and the
+        # days the new files wrote
+        refresh_daily_metrics(db_connection)
+        db_connection.commit()
+
         # 3. Update device last_sync_at timestamp
         update_last_sync_time(device_id, db_connection)
 
@@ -0,0 +1,238 @@
+"""
+Minimal FIT file encoder for tests and benchmarks.
+
+Writes valid FIT files (header, definition/data messages, CRCs) for the
+handful of message types Foldline ingests, so tests don't depend on binary
+fixtures from a real device.
+
+Values are given in physical units (seconds, metres, m/s, datetimes) and are
+converted with the same scale/offset as the FIT profile.
+"""
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+FIT_EPOCH = datetime(1989, 12, 31, tzinfo=timezone.utc)
+
+# base type code -> struct format
+BASE_TYPES = {
+    0x00: 'B',   # enum
+    0x01: 'b',   # sint8
+    0x02: 'B',   # uint8
+    0x83: 'h',   # sint16
+    0x84: 'H',   # uint16
+    0x85: 'i',   # sint32
+    0x86: 'I',   # uint32
+    0x8C: 'I',   # uint32z
+}
+
+# base type code -> invalid ("no value") raw value, written for None
+INVALID_VALUES = {
+    0x00: 0xFF, 0x01: 0x7F, 0x02: 0xFF, 0x83: 0x7FFF,
+    0x84: 0xFFFF, 0x85: 0x7FFFFFFF, 0x86: 0xFFFFFFFF, 0x8C: 0,
+}
+
+# message name -> (global number, {field name: (def num, base type, scale, offset)})
+PROFILE = {
+    'file_id': (0, {
+        'type': (0, 0x00, 1, 0),
+        'manufacturer': (1, 0x84, 1, 0),
+        'product': (2, 0x84, 1, 0),
+        'serial_number': (3, 0x8C, 1, 0),
+        'time_created': (4, 0x86, 1, 0),
+    }),
+    'session': (18, {
+        'timestamp': (253, 0x86, 1, 0),
+        'start_time': (2, 0x86, 1, 0),
+        'sport': (5, 0x00, 1, 0),
+        'total_elapsed_time': (7, 0x86, 1000, 0),
+        'total_distance': (9, 0x86, 100, 0),
+        'avg_heart_rate': (16, 0x02, 1, 0),
+        'max_heart_rate': (17, 0x02, 1, 0),
+    }),
+    'activity': (34, {
+        'timestamp': (253, 0x86, 1, 0),
+        'total_timer_time': (0, 0x86, 1000, 0),
+        'num_sessions': (1, 0x84, 1, 0),
+    }),
+    'record': (20, {
+        'timestamp': (253, 0x86, 1, 0),
+        'position_lat': (0, 0x85, 1, 0),
+        'position_long': (1, 0x85, 1, 0),
+        'altitude': (2, 0x84, 5, 500),
+        'heart_rate': (3, 0x02, 1, 0),
+        'cadence': (4, 0x02, 1, 0),
+        'distance': (5, 0x86, 100, 0),
+        'speed': (6, 0x84, 1000, 0),
+        'power': (7, 0x84, 1, 0),
+    }),
+    'monitoring': (55, {
+        'timestamp': (253, 0x86, 1, 0),
+        'calories': (1, 0x84, 1, 0),
+        'distance': (2, 0x86, 100, 0),
+        'cycles': (3, 0x86, 2, 0),
+        'active_time': (4, 0x86, 1000, 0),
+        'activity_type': (5, 0x00, 1, 0),
+        'active_calories': (19, 0x84, 1, 0),
+        'timestamp_16': (26, 0x84, 1, 0),
+        'heart_rate': (27, 0x02, 1, 0),
+    }),
+    'hrv': (78, {
+        'time': (0, 0x84, 1000, 0),
+    }),
+    'stress_level': (227, {
+        'stress_level_value': (0, 0x83, 1, 0),
+        'stress_level_time': (1, 0x86, 1, 0),
+    }),
+}
+
+_CRC_TABLE = (
+    0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
+    0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400,
+)
+
+
+def fit_crc(data: bytes, crc: int = 0) -> int:
+    """FIT SDK CRC-16"""
+    for byte in data:
+        tmp = _CRC_TABLE[crc & 0xF]
+        crc = (crc >> 4) & 0x0FFF
+        crc = crc ^ tmp ^ _CRC_TABLE[byte & 0xF]
+        tmp = _CRC_TABLE[crc & 0xF]
+        crc = (crc >> 4) & 0x0FFF
+        crc = crc ^ tmp ^ _CRC_TABLE[(byte >> 4) & 0xF]
+    return crc
+
+
+def _to_raw(value: Any, scale: float, offset: float) -> int:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int((value - FIT_EPOCH).total_seconds())
+    return int(round((value + offset) * scale))
+
+
+def _field_count(value: Any) -> int:
+    return len(value) if isinstance(value, (list, tuple)) else 1
+
+
+def build_fit_bytes(messages: Iterable[Tuple[str, Dict[str, Any]]], compressed_timestamps: bool = False) -> bytes:
+    """
+    Encode a sequence of (message name, {field: value}) pairs as a FIT file
+
+    A definition message is emitted whenever a message's field layout differs
+    from the one currently bound to its local message slot. List/tuple values
+    are written as arrays and None as the base type's invalid value.
+
+    With compressed_timestamps, a message whose timestamp is less than 32s
+    after the previous one is written with a compressed timestamp header
+    (when its local slot allows it) instead of a timestamp field.
+    """
+    body = bytearray()
+    slots: Dict[Tuple[str, Tuple[Any, ...]], int] = {}
+    last_timestamp = None
+
+    for name, fields in messages:
+        global_num, profile = PROFILE[name]
+        time_offset = None
+        if 'timestamp' in fields:
+            raw_timestamp = _to_raw(fields['timestamp'], 1, 0)
+            if (compressed_timestamps and last_timestamp is not None
+                    and 0 <= raw_timestamp - last_timestamp < 32):
+                compressed = {k: v for k, v in fields.items() if k != 'timestamp'}
+                compressed_layout = (name, tuple((k, _field_count(v)) for k, v in compressed.items()))
+                # Compressed headers can only address local slots 0-3
+                if slots.get(compressed_layout, len(slots) % 16) < 4:
+                    time_offset = raw_timestamp & 0x1F
+                    fields = compressed
+            last_timestamp = raw_timestamp
+
+        layout = (name, tuple((k, _field_count(v)) for k, v in fields.items()))
+
+        local = slots.get(layout)
+        if local is None:
+            local = len(slots) % 16
+            # Evict whatever layout previously held this slot
+            for key, slot in list(slots.items()):
+                if slot == local:
+                    del slots[key]
+            slots[layout] = local
+
+            body += struct.pack('<BBBHB', 0x40 | local, 0, 0, global_num, len(fields))
+            for field_name, value in fields.items():
+                def_num, base_type, _, _ = profile[field_name]
+                size = struct.calcsize('<' + BASE_TYPES[base_type]) * _field_count(value)
+                body += struct.pack('<3B', def_num, size, base_type)
+
+        if time_offset is not None:
+            body += struct.pack('<B', 0x80 | (local << 5) | time_offset)
+        else:
+            body += struct.pack('<B', local)
+        for field_name, value in fields.items():
+            _, base_type, scale, offset = profile[field_name]
+            for item in (value if isinstance(value, (list, tuple)) else (value,)):
+                raw = INVALID_VALUES[base_type] if item is None else _to_raw(item, scale, offset)
+                body += struct.pack('<' + BASE_TYPES[base_type], raw)
+
+    header = struct.pack('<BBHI4s', 14, 0x20, 2132, len(body), b'.FIT')
+    header += struct.pack('<H', fit_crc(header))
+    data = header + bytes(body)
+    return data + struct.pack('<H', fit_crc(data))
+
+
+def write_fit_file(path, messages: Iterable[Tuple[str, Dict[str, Any]]], compressed_timestamps: bool = False) -> str:
+    """Encode messages and write them to path, returning the path as a string"""
+    with open(path, 'wb') as f:
+        f.write(build_fit_bytes(messages, compressed_timestamps))
+    return str(path)
+
+
+def sample_activity_messages(start: datetime, seconds: int = 60) -> List[Tuple[str, Dict[str, Any]]]:
+    """A small running activity: file_id, one record per second, session, activity"""
+    from datetime import timedelta
+
+    messages = [('file_id', {
+        'type': 4, 'manufacturer': 1, 'product': 3113,
+        'serial_number': 3900000001, 'time_created': start,
+    })]
+    for i in range(seconds):
+        messages.append(('record', {
+            'timestamp': start + timedelta(seconds=i),
+            'heart_rate': 120 + i % 30,
+            'cadence': 85,
+            'distance': i * 3.0,
+            'speed': 3.0,
+            'power': 250 + i % 10,
+        }))
+    end = start + timedelta(seconds=seconds)
+    messages.append(('session', {
+        'timestamp': end, 'start_time': start, 'sport': 1,
+        'total_elapsed_time': float(seconds), 'total_distance': seconds * 3.0,
+        'avg_heart_rate': 135, 'max_heart_rate': 149,
+    }))
+    messages.append(('activity', {'timestamp': end, 'total_timer_time': float(seconds), 'num_sessions': 1}))
+    return messages
+
+
+def sample_monitoring_messages(start: datetime, intervals: int = 96) -> List[Tuple[str, Dict[str, Any]]]:
+    """A day of 15-minute monitoring and stress samples with cumulative walking steps"""
+    from datetime import timedelta
+
+    messages = [('file_id', {
+        'type': 32, 'manufacturer': 1, 'product': 3113,
+        'serial_number': 3900000001, 'time_created': start,
+    })]
+    for i in range(intervals):
+        ts = start + timedelta(minutes=15 * i)
+        messages.append(('monitoring', {
+            'timestamp': ts,
+            'activity_type': 6,
+            'cycles': float(40 * (i + 1)),
+            'distance': 30.0 * (i + 1),
+            'active_calories': 2 * (i + 1),
+        }))
+        messages.append(('stress_level', {
+            'stress_level_value': 20 + i % 50,
+            'stress_level_time': ts,
+        }))
+    return messages
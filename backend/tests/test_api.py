@@ -13,6 +13,7 @@ Tests:
 import pytest
 from fastapi.testclient import TestClient
 
+from db.daily_metrics import refresh_daily_metrics
 from main import app
 
 
@@ -80,6 +81,17 @@ class TestStatusEndpoint:
         # When implemented, verify actual counts
 
 
+class TestDiagnosticsEndpoints:
+    """Tests for diagnostics endpoints"""
+
+    def test_mapping_plan_stats(self, client):
+        """Should report the field-mapping plan cache and its hit rate"""
+        response = client.get("/diagnostics/mapping-plans")
+
+        assert response.status_code == 200
+        assert set(response.json()) == {"plans", "lookups", "hits", "misses", "hit_rate"}
+
+
 class TestImportGarminExport:
     """Tests for /import/garmin-export endpoint"""
 
@@ -158,6 +170,35 @@ class TestImportGarminExport:
         # assert "sleep_records" in data["summary"]
 
 
+class TestImportPlan:
+    """Tests for /import/plan endpoint"""
+
+    def test_plan_reports_categories(self, client, temp_dir):
+        """Should plan an export without importing it"""
+        import json
+        import zipfile
+
+        zip_path = temp_dir / "plan_export.zip"
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("DI_CONNECT/DI-Connect-Wellness/sleep_2024-01-15.json", json.dumps({
+                "calendarDate": "2024-01-15", "deepSleepSeconds": 7200
+            }))
+
+        response = client.post("/import/plan", json={"zip_path": str(zip_path)})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["by_category"]["sleep_json"]["members"] == 1
+        assert data["total_members"] == 1
+        assert data["estimated_seconds"] >= 0
+
+    def test_plan_invalid_path(self, client):
+        """Should reject paths that don't exist"""
+        response = client.post("/import/plan", json={"zip_path": "/nonexistent/path.zip"})
+
+        assert response.status_code == 400
+
+
 class TestImportFitFolder:
     """Tests for /import/fit-folder endpoint"""
 
@@ -267,9 +308,7 @@ class TestMetricsHeatmap:
         """Should handle invalid metric names"""
         response = client.get("/metrics/heatmap?metric=invalid_metric")
 
-        # Current stub returns data regardless
-        # When implemented, should validate metric:
-        # assert response.status_code == 400
+        assert response.status_code == 400
 
     def test_heatmap_date_format(self, client):
         """Date values should be ISO format strings"""
@@ -376,6 +415,7 @@ class TestMetricsCorrelation:
                 "INSERT INTO hrv_records (date, hrv_value) VALUES (?, ?)",
                 (date, 50 + i * 2)
             )
+        refresh_daily_metrics(conn)
         conn.commit()
 
         # Override the global database for this test
@@ -428,6 +468,7 @@ class TestMetricsCorrelation:
                 "INSERT INTO resting_hr (date, resting_hr) VALUES (?, ?)",
                 (date, 60 + i)
             )
+        refresh_daily_metrics(conn)
         conn.commit()
 
         import db.connection
@@ -476,6 +517,7 @@ class TestMetricsCorrelation:
                 "INSERT INTO daily_stress (date, avg_stress) VALUES (?, ?)",
                 (date, 30 + i * 2)
             )
+        refresh_daily_metrics(conn)
         conn.commit()
 
         import db.connection
@@ -521,6 +563,7 @@ class TestMetricsCorrelation:
                 "INSERT INTO sleep_records (date, duration_minutes) VALUES (?, ?)",
                 (date, 420 + i * 10)
             )
+        refresh_daily_metrics(conn)
         conn.commit()
 
         import db.connection
@@ -544,6 +587,61 @@ class TestMetricsCorrelation:
             db.connection._db_instance = original_db
 
 
+class TestActivitySamples:
+    """Tests for /activities/{activity_id}/samples endpoint"""
+
+    def test_samples_round_trip(self, temp_db):
+        """Should return stored streams with NaN gaps as null"""
+        from datetime import datetime, timedelta
+        from db.sample_store import build_sample_columns, write_activity_samples
+
+        temp_db.connect()
+        temp_db.initialize_schema()
+        start = datetime(2024, 1, 15, 7, 0)
+        records = [
+            {"timestamp": start + timedelta(seconds=i), "heart_rate": 120 + i,
+             "power": 250 if i else None}
+            for i in range(5)
+        ]
+        write_activity_samples(temp_db.connection, [(7, build_sample_columns(records))])
+        temp_db.connection.commit()
+
+        import db.connection
+        original_db = db.connection._db_instance
+        db.connection._db_instance = temp_db
+
+        try:
+            client = TestClient(app)
+            response = client.get("/activities/7/samples?channels=heart_rate,power")
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["sample_count"] == 5
+            assert data["channels"]["heart_rate"] == [120, 121, 122, 123, 124]
+            assert data["channels"]["power"][0] is None
+
+        finally:
+            db.connection._db_instance = original_db
+
+    def test_samples_unknown_activity(self, temp_db):
+        """Should return 404 when no samples are stored"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        import db.connection
+        original_db = db.connection._db_instance
+        db.connection._db_instance = temp_db
+
+        try:
+            client = TestClient(app)
+            response = client.get("/activities/12345/samples")
+
+            assert response.status_code == 404
+
+        finally:
+            db.connection._db_instance = original_db
+
+
 class TestSettingsDataRoot:
     """Tests for /settings/data-root endpoint"""
 
@@ -0,0 +1,71 @@
+"""
+Tests for the executemany bulk writer.
+
+Tests:
+- Rows are buffered until flush/commit
+- Automatic flush at the buffer limit
+- Rollback discards buffered and flushed rows
+"""
+import pytest
+
+from db.bulk_writer import BulkWriter
+
+INSERT_SQL = "INSERT INTO daily_steps (date, step_count) VALUES (?, ?)"
+
+
+@pytest.fixture
+def conn(temp_db):
+    connection = temp_db.connect()
+    temp_db.initialize_schema()
+    return connection
+
+
+def _count(conn):
+    return conn.execute("SELECT COUNT(*) FROM daily_steps").fetchone()[0]
+
+
+class TestBulkWriter:
+    """Tests for BulkWriter"""
+
+    def test_buffers_until_commit(self, conn):
+        """Should not execute anything before flush"""
+        writer = BulkWriter(conn)
+        writer.add_many(INSERT_SQL, [("2024-01-15", 100), ("2024-01-16", 200)])
+
+        assert _count(conn) == 0
+        assert writer.buffered_rows == 2
+
+        writer.commit()
+
+        assert _count(conn) == 2
+        assert writer.rows_written == 2
+        assert writer.buffered_rows == 0
+
+    def test_auto_flush(self, conn):
+        """Should flush once max_buffered_rows is reached"""
+        writer = BulkWriter(conn, max_buffered_rows=3)
+        for day in range(1, 5):
+            writer.add(INSERT_SQL, (f"2024-01-{day:02d}", day))
+
+        assert writer.rows_written == 3
+        assert writer.buffered_rows == 1
+
+    def test_rollback(self, conn):
+        """Should discard flushed and buffered rows and pending keys"""
+        writer = BulkWriter(conn, max_buffered_rows=2)
+        writer.add_many(INSERT_SQL, [("2024-01-15", 1), ("2024-01-16", 2), ("2024-01-17", 3)])
+        writer.add_pending_key("abc")
+
+        writer.rollback()
+
+        assert _count(conn) == 0
+        assert writer.buffered_rows == 0
+        assert not writer.is_pending("abc")
+
+    def test_context_manager_commits(self, conn):
+        """Should commit on a clean exit"""
+        with BulkWriter(conn) as writer:
+            writer.add(INSERT_SQL, ("2024-01-15", 100))
+
+        assert _count(conn) == 1
+        assert writer.commits == 1
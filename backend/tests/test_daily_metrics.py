@@ -0,0 +1,183 @@
+"""
+Tests for the materialized daily_metrics table.
+
+Tests:
+- Continuous date spine
+- Source table triggers
+- Merging the source tables
+- Incremental refresh of the dates an import touched
+- Replacing the old daily_metrics view
+"""
+import sqlite3
+
+import pytest
+
+from db.connection import Database
+from db.daily_metrics import DAILY_METRIC_SOURCES, refresh_daily_metrics
+
+
+def metrics(connection, *columns):
+    return connection.execute(
+        f"SELECT date, {', '.join(columns)} FROM daily_metrics ORDER BY date"
+    ).fetchall()
+
+
+def dirty_dates(connection):
+    return [row[0] for row in connection.execute("SELECT date FROM daily_metrics_dirty ORDER BY date")]
+
+
+@pytest.fixture
+def conn(temp_db):
+    temp_db.connect()
+    temp_db.initialize_schema()
+    return temp_db.connection
+
+
+class TestDateSpine:
+    """Tests for the continuous date spine"""
+
+    def test_days_without_sleep_are_kept(self, conn):
+        """Should have a row for every day, including days with only one metric or none"""
+        conn.execute("INSERT INTO sleep_records (date, duration_minutes) VALUES ('2024-01-10', 420)")
+        conn.execute("INSERT INTO resting_hr (date, resting_hr) VALUES ('2024-01-11', 55)")
+        conn.execute("INSERT INTO daily_steps (date, step_count) VALUES ('2024-01-14', 9000)")
+
+        assert refresh_daily_metrics(conn) == 3
+
+        assert metrics(conn, "sleep_duration", "resting_hr", "step_count") == [
+            ("2024-01-10", 420, None, None),
+            ("2024-01-11", None, 55, None),
+            ("2024-01-12", None, None, None),
+            ("2024-01-13", None, None, None),
+            ("2024-01-14", None, None, 9000),
+        ]
+
+    def test_spine_grows_both_ways(self, conn):
+        """Should fill the days between the old and new ends of the spine"""
+        conn.execute("INSERT INTO hrv_records (date, hrv_value) VALUES ('2024-01-10', 50)")
+        refresh_daily_metrics(conn)
+
+        conn.execute("INSERT INTO hrv_records (date, hrv_value) VALUES ('2024-01-07', 48)")
+        conn.execute("INSERT INTO hrv_records (date, hrv_value) VALUES ('2024-01-12', 52)")
+        refresh_daily_metrics(conn)
+
+        assert [row[0] for row in metrics(conn, "hrv_value")] == [
+            f"2024-01-{day:02d}" for day in range(7, 13)
+        ]
+
+
+class TestTriggers:
+    """Tests for the triggers that mark dates dirty"""
+
+    def test_one_trigger_per_source_and_event(self, conn):
+        """Should have an insert, update and delete trigger on every source table"""
+        triggers = conn.execute(
+            "SELECT tbl_name, name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_daily_metrics_%'"
+        ).fetchall()
+
+        assert sorted(triggers) == sorted(
+            (table, f"{table}_daily_metrics_{event}")
+            for table in DAILY_METRIC_SOURCES for event in ("insert", "update", "delete")
+        )
+
+
+class TestSourceMerge:
+    """Tests for combining the source tables into one row per day"""
+
+    def test_dedicated_tables_win_over_daily_summaries(self, conn):
+        """Should prefer resting_hr/daily_steps/daily_stress and fall back to the UDS summary"""
+        conn.execute(
+            "INSERT INTO daily_summaries (date, step_count, resting_heart_rate, stress_avg, stress_max, floors_climbed)"
+            " VALUES ('2024-01-10', 7000, 58, 35, 80, 12)"
+        )
+        conn.execute("INSERT INTO resting_hr (date, resting_hr) VALUES ('2024-01-10', 55)")
+        conn.execute("INSERT INTO daily_steps (date, step_count) VALUES ('2024-01-10', 7100)")
+        refresh_daily_metrics(conn)
+
+        assert metrics(conn, "resting_hr", "step_count", "avg_stress", "max_stress", "floors_climbed") == [
+            ("2024-01-10", 55, 7100, 35.0, 80, 12)
+        ]
+
+    def test_sleep_detailed_fills_in_sleep(self, conn):
+        """Should derive sleep minutes from sleep_detailed when sleep_records has no row"""
+        conn.execute(
+            "INSERT INTO sleep_detailed (date, deep_sleep_seconds, light_sleep_seconds, rem_sleep_seconds,"
+            " awake_sleep_seconds, average_spo2) VALUES ('2024-01-10', 3600, 14400, 5400, 600, 95)"
+        )
+        refresh_daily_metrics(conn)
+
+        assert metrics(conn, "sleep_duration", "deep_sleep_minutes", "awake_minutes", "avg_spo2") == [
+            ("2024-01-10", 390, 60, 10, 95.0)
+        ]
+
+
+class TestIncrementalRefresh:
+    """Tests for refreshing only the dates written since the last refresh"""
+
+    def test_only_touched_dates_are_recomputed(self, conn):
+        """Should record written dates and clear them once refreshed"""
+        for day in range(10, 20):
+            conn.execute("INSERT INTO resting_hr (date, resting_hr) VALUES (?, ?)", (f"2024-01-{day}", 50 + day))
+        refresh_daily_metrics(conn)
+        assert dirty_dates(conn) == []
+
+        conn.execute("UPDATE resting_hr SET resting_hr = 99 WHERE date = '2024-01-15'")
+        conn.execute("INSERT INTO hrv_records (date, hrv_value) VALUES ('2024-01-16', 61)")
+        assert dirty_dates(conn) == ["2024-01-15", "2024-01-16"]
+
+        assert refresh_daily_metrics(conn) == 2
+        assert metrics(conn, "resting_hr", "hrv_value")[5:7] == [
+            ("2024-01-15", 99, None), ("2024-01-16", 66, 61.0)
+        ]
+        assert refresh_daily_metrics(conn) == 0
+
+    def test_upserts_and_deletes_mark_dates(self, conn):
+        """Should pick up upserted and deleted rows"""
+        conn.execute("INSERT INTO daily_stress (date, avg_stress) VALUES ('2024-01-10', 30)")
+        refresh_daily_metrics(conn)
+
+        conn.execute(
+            "INSERT INTO daily_stress (date, avg_stress) VALUES ('2024-01-10', 40)"
+            " ON CONFLICT (date) DO UPDATE SET avg_stress = excluded.avg_stress"
+        )
+        refresh_daily_metrics(conn)
+        assert metrics(conn, "avg_stress") == [("2024-01-10", 40.0)]
+
+        conn.execute("DELETE FROM daily_stress WHERE date = '2024-01-10'")
+        refresh_daily_metrics(conn)
+        assert metrics(conn, "avg_stress") == [("2024-01-10", None)]
+
+
+class TestViewUpgrade:
+    """Tests for databases created while daily_metrics was a view"""
+
+    def test_view_replaced_and_rebuilt(self, temp_dir):
+        """Should drop the old view and fill the new table from existing data"""
+        db_path = str(temp_dir / "old.db")
+        db = Database(db_path)
+        db.connect()
+        db.initialize_schema()
+        db.close()
+
+        # Roll the file back to the old layout: no triggers, a view, existing rows
+        old = sqlite3.connect(db_path)
+        for (trigger,) in old.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+            old.execute(f"DROP TRIGGER {trigger}")
+        old.executescript("""
+            DROP TABLE daily_metrics;
+            CREATE VIEW daily_metrics AS SELECT date, duration_minutes AS sleep_duration FROM sleep_records;
+            INSERT INTO sleep_records (date, duration_minutes) VALUES ('2024-01-10', 400), ('2024-01-12', 450);
+        """)
+        old.close()
+
+        db = Database(db_path)
+        db.connect()
+        db.initialize_schema()
+        try:
+            kind = db.connection.execute("SELECT type FROM sqlite_master WHERE name = 'daily_metrics'").fetchone()
+            rows = metrics(db.connection, "sleep_duration")
+        finally:
+            db.close()
+
+        assert kind == ("table",)
+        assert rows == [("2024-01-10", 400), ("2024-01-11", None), ("2024-01-12", 450)]
@@ -7,13 +7,30 @@ Tests:
 - Connection management
 - Basic CRUD operations
 - Deduplication logic
+- Performance profiles
+- Reader and writer connection scopes
 """
+import sqlite3
 import tempfile
+import threading
 from pathlib import Path
 
 import pytest
 
-from db.connection import Database, get_db
+from db.connection import (
+    PERFORMANCE_PROFILES,
+    Database,
+    apply_profile,
+    get_db,
+    performance_profile
+)
+
+
+def read_pragmas(connection):
+    return {
+        name: connection.execute(f"PRAGMA {name}").fetchone()[0]
+        for name in ("journal_mode", "synchronous", "cache_size", "temp_store")
+    }
 
 
 class TestDatabaseInitialization:
@@ -124,6 +141,17 @@ class TestSchemaInitialization:
 
         # Should not raise error
 
+    def test_adds_new_columns_to_old_tables(self, temp_db):
+        """Should add columns introduced since a table was first created"""
+        conn = temp_db.connect()
+        conn.execute("""CREATE TABLE daily_steps (date DATE PRIMARY KEY, step_count INTEGER NOT NULL,
+            distance_meters REAL, calories REAL, source_file_hash TEXT, imported_at TIMESTAMP)""")
+
+        temp_db.initialize_schema()
+
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(daily_steps)")]
+        assert "source_recorded_at" in columns
+
 
 class TestDatabaseOperations:
     """Tests for basic database CRUD operations"""
@@ -240,3 +268,148 @@ class TestDatabaseTransactions:
         temp_db.initialize_schema()
 
         # When implemented, test successful commit
+
+
+class TestPerformanceProfiles:
+    """Tests for the named SQLite performance profiles"""
+
+    def test_connect_applies_interactive_profile(self, temp_db):
+        """Should connect in WAL mode with the interactive settings"""
+        temp_db.connect()
+
+        assert temp_db.profile == "interactive"
+        assert read_pragmas(temp_db.connection) == {
+            "journal_mode": "wal", "synchronous": 1, "cache_size": -65536, "temp_store": 2
+        }
+
+    @pytest.mark.parametrize("profile", sorted(PERFORMANCE_PROFILES))
+    def test_connect_with_profile(self, temp_dir, profile):
+        """Should apply each profile's settings on connect"""
+        db = Database(str(temp_dir / "profile.db"), profile=profile)
+        db.connect()
+        settings = PERFORMANCE_PROFILES[profile]
+
+        pragmas = read_pragmas(db.connection)
+        db.close()
+
+        assert pragmas == {name: settings[name] for name in pragmas}
+
+    def test_profile_block_restores_previous_settings(self, temp_db):
+        """Should switch to bulk-import for a block and switch back after"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        before = read_pragmas(temp_db.connection)
+
+        with performance_profile(temp_db.connection, "bulk-import"):
+            assert read_pragmas(temp_db.connection)["synchronous"] == 0
+            temp_db.connection.execute(
+                "INSERT INTO daily_stress (date, avg_stress) VALUES ('2024-01-15', 30)"
+            )
+            temp_db.connection.commit()
+
+        assert read_pragmas(temp_db.connection) == before
+
+    def test_transaction_bound_settings_kept(self, temp_db):
+        """Should leave journal_mode and synchronous alone while a transaction is open"""
+        temp_db.connect(profile="safe")
+        temp_db.initialize_schema()
+        temp_db.connection.execute("INSERT INTO daily_stress (date, avg_stress) VALUES ('2024-01-15', 30)")
+
+        previous = apply_profile(temp_db.connection, "bulk-import")
+
+        assert previous["journal_mode"] == "delete"
+        assert read_pragmas(temp_db.connection) == {
+            "journal_mode": "delete", "synchronous": 2, "cache_size": -262144, "temp_store": 2
+        }
+        temp_db.connection.commit()
+
+    def test_unknown_profile(self, temp_db):
+        """Should reject profiles that don't exist"""
+        temp_db.connect()
+
+        with pytest.raises(ValueError):
+            temp_db.use_profile("turbo")
+
+
+class TestReadWriteScopes:
+    """Tests for the writer connection and per-thread readers"""
+
+    def insert_stress(self, connection, day, value=30):
+        connection.execute("INSERT INTO daily_stress (date, avg_stress) VALUES (?, ?)", (day, value))
+
+    def count_stress(self, temp_db):
+        with temp_db.read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM daily_stress").fetchone()[0]
+
+    def test_write_commits_and_rolls_back(self, temp_db):
+        """Should commit a write block and roll back one that raises"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        with temp_db.write() as conn:
+            self.insert_stress(conn, "2024-01-15")
+        with pytest.raises(RuntimeError):
+            with temp_db.write() as conn:
+                self.insert_stress(conn, "2024-01-16")
+                raise RuntimeError("import failed")
+
+        assert self.count_stress(temp_db) == 1
+
+    def test_one_read_only_reader_per_thread(self, temp_db):
+        """Should reuse a thread's reader and give other threads their own"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        other = []
+
+        def read_in_thread():
+            with temp_db.read() as conn:
+                other.append(conn)
+
+        with temp_db.read() as first, temp_db.read() as second:
+            thread = threading.Thread(target=read_in_thread)
+            thread.start()
+            thread.join()
+
+            assert first is second
+            assert other[0] is not first
+            assert first is not temp_db.connection
+            with pytest.raises(sqlite3.OperationalError):
+                self.insert_stress(first, "2024-01-15")
+
+    def test_reads_run_during_write(self, temp_db):
+        """Should read the last committed state while another thread writes"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        with temp_db.write() as conn:
+            self.insert_stress(conn, "2024-01-15")
+        writing = threading.Event()
+        release = threading.Event()
+
+        def long_import():
+            with temp_db.write() as conn:
+                self.insert_stress(conn, "2024-01-16")
+                writing.set()
+                release.wait(5)
+
+        writer = threading.Thread(target=long_import)
+        writer.start()
+        try:
+            assert writing.wait(5)
+            assert self.count_stress(temp_db) == 1
+        finally:
+            release.set()
+            writer.join()
+
+        assert self.count_stress(temp_db) == 2
+
+    def test_close_closes_readers(self, temp_db):
+        """Should close reader connections with the writer"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        with temp_db.read() as reader:
+            pass
+
+        temp_db.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            reader.execute("SELECT 1")
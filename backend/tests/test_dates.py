@@ -0,0 +1,123 @@
+"""
+Tests for the shared date parsing module.
+
+Tests:
+- Memoized calendar date parsing
+- Timestamp parsing
+- Bulk parsing of ISO columns into datetime64 and epoch arrays
+- Rate-limited warnings
+"""
+import logging
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+
+import utils.dates as dates
+from utils.dates import (
+    NAT_EPOCH,
+    RateLimitedWarnings,
+    date_cache_info,
+    iso_to_epoch,
+    parse_date,
+    parse_iso_column,
+    parse_timestamp
+)
+
+
+class TestParseDate:
+    """Tests for parse_date function"""
+
+    def test_repeated_dates_hit_the_cache(self):
+        """Should parse each distinct date string once"""
+        dates._parse_date_str.cache_clear()
+
+        results = [parse_date("2024-01-15") for _ in range(100)]
+
+        assert results == [date(2024, 1, 15)] * 100
+        info = date_cache_info()
+        assert info.misses == 1
+        assert info.hits == 99
+
+    def test_formats(self):
+        """Should accept dates, datetimes and ISO strings"""
+        assert parse_date("2024-01-15T08:30:00.0") == date(2024, 1, 15)
+        assert parse_date("2024-01-15T08:30:00Z") == date(2024, 1, 15)
+        assert parse_date(date(2024, 1, 15)) == date(2024, 1, 15)
+        assert parse_date(datetime(2024, 1, 15, 8, 30)) == date(2024, 1, 15)
+
+    @pytest.mark.parametrize("value", [None, "", "not a date", "2024-13-01", 20240115])
+    def test_invalid_values(self, value):
+        """Should return None for values that aren't dates"""
+        assert parse_date(value) is None
+
+
+class TestParseTimestamp:
+    """Tests for parse_timestamp function"""
+
+    def test_naive_and_utc(self):
+        """Should keep GMT fields naive and make a trailing Z UTC-aware"""
+        assert parse_timestamp("2024-01-15T08:30:00.0") == datetime(2024, 1, 15, 8, 30)
+        assert parse_timestamp("2024-01-15T08:30:00Z") == datetime(2024, 1, 15, 8, 30, tzinfo=timezone.utc)
+
+    def test_passes_datetimes_through(self):
+        """Should return datetime values unchanged"""
+        value = datetime(2024, 1, 15, 8, 30)
+        assert parse_timestamp(value) is value
+
+    @pytest.mark.parametrize("value", [None, "", "not a timestamp", 12345])
+    def test_invalid_values(self, value):
+        """Should return None for values that aren't timestamps"""
+        assert parse_timestamp(value) is None
+
+
+class TestParseIsoColumn:
+    """Tests for the bulk column parsers"""
+
+    def test_datetime64_column(self):
+        """Should parse a column in one go, with NaT for missing values"""
+        result = parse_iso_column(["2024-01-15T08:30:00.0", "2024-01-15T08:31:00Z", None, "2024-01-16"])
+
+        assert result.dtype == np.dtype("datetime64[s]")
+        assert result.tolist()[:2] == [datetime(2024, 1, 15, 8, 30), datetime(2024, 1, 15, 8, 31)]
+        assert np.isnat(result[2])
+        assert result[3] == np.datetime64("2024-01-16T00:00:00")
+
+    def test_offsets_and_bad_values_fall_back(self):
+        """Should convert offsets to UTC and give NaT for unparseable values"""
+        result = parse_iso_column(["2024-01-15T08:30:00+02:00", "bad", datetime(2024, 1, 15, 7, 0)], unit="ms")
+
+        assert result[0] == np.datetime64("2024-01-15T06:30:00.000")
+        assert np.isnat(result[1])
+        assert result[2] == np.datetime64("2024-01-15T07:00:00.000")
+
+    def test_epoch_ints(self):
+        """Should return epoch ints matching datetime.timestamp()"""
+        values = ["2024-01-15T08:30:00", None]
+
+        result = iso_to_epoch(values)
+
+        assert result.dtype == np.int64
+        assert result[0] == int(datetime(2024, 1, 15, 8, 30, tzinfo=timezone.utc).timestamp())
+        assert result[1] == NAT_EPOCH
+        assert iso_to_epoch(values, unit="ms")[0] == result[0] * 1000
+
+
+class TestRateLimitedWarnings:
+    """Tests for RateLimitedWarnings"""
+
+    def test_suppresses_past_burst(self, caplog, monkeypatch):
+        """Should log a burst, count the rest and report them next interval"""
+        clock = [0.0]
+        monkeypatch.setattr(dates.time, "monotonic", lambda: clock[0])
+        limiter = RateLimitedWarnings(logging.getLogger("test_dates"), burst=2, interval=10)
+
+        with caplog.at_level(logging.WARNING, logger="test_dates"):
+            for i in range(5):
+                limiter.warning(f"bad value {i}")
+            clock[0] = 11.0
+            limiter.warning("bad value 5")
+
+        assert [record.getMessage() for record in caplog.records] == [
+            "bad value 0", "bad value 1", "Suppressed 3 similar warnings", "bad value 5"
+        ]
@@ -8,7 +8,10 @@ Tests field name variations and mapping functions for:
 - Stress
 - Activities
 - Other data types
+- Compiled mapping plans and their cache
 """
+import sqlite3
+
 import pytest
 from datetime import datetime, date
 
@@ -21,11 +24,26 @@ from ingestion.field_mappings import (
     map_activity_record,
     parse_date,
     parse_timestamp,
+    MappingPlanCache,
+    map_records,
+    map_record_rows,
+    mapping_plan_stats,
+    clear_mapping_plans,
     SLEEP_FIELD_MAPPINGS,
     DAILY_SUMMARY_FIELD_MAPPINGS
 )
 
 
+def walk_aliases(data, field_mappings):
+    """Reference mapping: every alias list walked per record"""
+    mapped = {}
+    for db_field, json_fields in field_mappings.items():
+        value = get_field_value(data, json_fields)
+        if value is not None:
+            mapped[db_field] = value
+    return mapped
+
+
 class TestGetFieldValue:
     """Tests for get_field_value helper function"""
 
@@ -376,3 +394,98 @@ class TestRealWorldScenarios:
 
         # Should only map the correctly-cased field
         assert result["step_count"] == 10000
+
+
+class TestMappingPlans:
+    """Tests for compiled mapping plans"""
+
+    RECORDS = [
+        {"calendarDate": "2024-01-15", "totalSteps": 10000, "restingHeartRate": 55, "other": 1},
+        {"calendarDate": "2024-01-16", "totalSteps": None, "restingHeartRate": 54, "other": 2},
+        # Same fields under alternative names, with a null primary and a fallback
+        {"date": "2024-01-17", "steps": 9000, "maxHeartRate": None, "maxHR": 170},
+        {"date": "2024-01-18", "steps": 8000, "maxHeartRate": 165, "maxHR": 170},
+        # Back to the first variant, but missing a key and carrying a new alias
+        {"calendarDate": "2024-01-19", "stepCount": 7000},
+    ]
+
+    def test_matches_alias_walk(self):
+        """Should map exactly what walking the alias lists does"""
+        cache = MappingPlanCache()
+
+        for record in self.RECORDS:
+            plan = cache.plan_for(DAILY_SUMMARY_FIELD_MAPPINGS, record)
+            assert plan.extract(record) == walk_aliases(record, DAILY_SUMMARY_FIELD_MAPPINGS)
+
+    def test_plan_reused_within_a_variant(self):
+        """Should compile once per schema variant"""
+        cache = MappingPlanCache()
+
+        plans = [cache.plan_for(DAILY_SUMMARY_FIELD_MAPPINGS, record) for record in self.RECORDS]
+
+        assert plans[0] is plans[1]
+        assert plans[2] is plans[3]
+        assert plans[4] is not plans[0]
+        assert plans[0].sources[plans[0].columns.index("step_count")] == ("totalSteps",)
+        assert cache.stats() == {"plans": 3, "lookups": 5, "hits": 2, "misses": 3, "hit_rate": 0.4}
+
+    def test_returning_variant_hits_cache(self):
+        """Should reuse a plan compiled earlier when its variant comes back"""
+        cache = MappingPlanCache()
+        first = cache.plan_for(SLEEP_FIELD_MAPPINGS, {"calendarDate": "2024-01-15", "deepSleepSeconds": 1})
+        cache.plan_for(SLEEP_FIELD_MAPPINGS, {"date": "2024-01-16", "deepSleep": 1})
+
+        again = cache.plan_for(SLEEP_FIELD_MAPPINGS, {"calendarDate": "2024-01-17", "deepSleepSeconds": 2})
+
+        assert again is first
+        assert cache.stats()["misses"] == 2
+
+    def test_stats_exact_across_threads(self):
+        """Should count every lookup when several threads share the cache"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache = MappingPlanCache()
+
+        def lookup_all(_):
+            for record in self.RECORDS * 200:
+                cache.plan_for(DAILY_SUMMARY_FIELD_MAPPINGS, record)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lookup_all, range(4)))
+
+        stats = cache.stats()
+        assert stats["lookups"] == 4 * 200 * len(self.RECORDS)
+        assert stats["hits"] + stats["misses"] == stats["lookups"]
+
+    def test_rows_go_straight_into_executemany(self):
+        """Should produce row tuples in field_mappings column order"""
+        columns = list(DAILY_SUMMARY_FIELD_MAPPINGS)
+        conn = sqlite3.connect(":memory:")
+        conn.execute(f"CREATE TABLE uds ({', '.join(columns)})")
+
+        conn.executemany(
+            f"INSERT INTO uds VALUES ({', '.join('?' * len(columns))})",
+            map_record_rows(self.RECORDS, DAILY_SUMMARY_FIELD_MAPPINGS)
+        )
+
+        rows = conn.execute("SELECT calendar_date, step_count, max_heart_rate FROM uds ORDER BY 1").fetchall()
+        assert rows == [
+            ("2024-01-15", 10000, None),
+            ("2024-01-16", None, None),
+            ("2024-01-17", 9000, 170),
+            ("2024-01-18", 8000, 165),
+            ("2024-01-19", 7000, None),
+        ]
+
+    def test_shared_cache_stats(self):
+        """Should expose the shared cache's hit rate for diagnostics"""
+        clear_mapping_plans()
+        records = [{"calendarDate": f"2024-01-{day:02d}", "totalSteps": day} for day in range(1, 11)]
+
+        list(map_records(records, DAILY_SUMMARY_FIELD_MAPPINGS))
+        map_daily_summary_record(records[0])
+
+        stats = mapping_plan_stats()
+        assert stats["lookups"] == 11
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(10 / 11, abs=1e-4)
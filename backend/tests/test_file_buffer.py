@@ -0,0 +1,99 @@
+"""
+Tests for read-once file buffers.
+
+Tests:
+- Hash matches compute_file_hash
+- Contents are read lazily and only once
+- Large files are memory-mapped and parse the same
+"""
+import builtins
+import mmap
+from datetime import datetime
+
+import pytest
+
+import ingestion.file_buffer as file_buffer
+from ingestion.file_buffer import FileBuffer
+from ingestion.fit_folder import FitFile, compute_file_hash, parse_fit_file
+from tests.fit_builder import write_fit_file, sample_activity_messages
+
+
+@pytest.fixture
+def count_opens(monkeypatch):
+    opened = []
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(str(path))
+        return builtins.open(path, *args, **kwargs)
+
+    monkeypatch.setattr(file_buffer, "open", counting_open, raising=False)
+    return opened
+
+
+class TestFileBuffer:
+    """Tests for FileBuffer"""
+
+    def test_hash_matches_compute_file_hash(self, temp_dir):
+        """Should give the same digest as the streaming hasher"""
+        path = temp_dir / "data.bin"
+        path.write_bytes(b"x" * 100000)
+
+        with FileBuffer(str(path)) as buffer:
+            assert buffer.sha256 == compute_file_hash(str(path))
+
+    def test_reads_lazily_and_once(self, temp_dir, count_opens):
+        """Should not open the file until needed, then reuse the contents"""
+        path = temp_dir / "data.bin"
+        path.write_bytes(b"abc")
+
+        with FileBuffer(str(path)) as buffer:
+            assert count_opens == []
+            buffer.sha256
+            assert bytes(buffer.data) == b"abc"
+
+        assert count_opens == [str(path)]
+
+    def test_large_files_are_mmapped(self, temp_dir):
+        """Should memory-map files at or above the threshold"""
+        path = temp_dir / "data.bin"
+        path.write_bytes(b"abcd")
+
+        with FileBuffer(str(path), mmap_threshold=4) as buffer:
+            assert isinstance(buffer.data, mmap.mmap)
+            assert buffer.sha256 == compute_file_hash(str(path))
+
+    def test_empty_file(self, temp_dir):
+        """Should read empty files without trying to mmap them"""
+        path = temp_dir / "empty.bin"
+        path.write_bytes(b"")
+
+        with FileBuffer(str(path), mmap_threshold=0) as buffer:
+            assert buffer.data == b""
+
+
+@pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
+class TestParseFromBuffer:
+    """parse_fit_file should hash and decode from one read"""
+
+    def test_parse_reads_file_once(self, temp_dir, count_opens):
+        """Should open the FIT file exactly once"""
+        path = write_fit_file(temp_dir / "run.fit", sample_activity_messages(datetime(2024, 1, 15, 7, 0), seconds=20))
+
+        result = parse_fit_file(path)
+
+        assert count_opens == [path]
+        assert result["file_hash"] == compute_file_hash(path)
+        assert len(result["samples"]["timestamp"]) == 20
+
+    def test_parse_from_mmap(self, temp_dir):
+        """Should parse a memory-mapped buffer the same as the file"""
+        path = write_fit_file(temp_dir / "run.fit", sample_activity_messages(datetime(2024, 1, 15, 7, 0), seconds=20))
+
+        with FileBuffer(path, mmap_threshold=1) as buffer:
+            mapped = parse_fit_file(path, buffer=buffer)
+            # Caller-owned buffer stays usable after parsing
+            assert buffer.sha256 == mapped["file_hash"]
+
+        direct = parse_fit_file(path)
+        assert mapped["sessions"] == direct["sessions"]
+        assert mapped["samples"]["heart_rate"].tolist() == direct["samples"]["heart_rate"].tolist()
@@ -0,0 +1,121 @@
+"""
+Tests for the native FIT decoder.
+
+Tests:
+- Parity with fitparse on decoded values for the hot message types
+- Compressed timestamp headers and array fields
+- Rejection of data the native path doesn't handle
+- parse_fit_file results with and without the native decoder
+"""
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from ingestion.fit_decoder import NATIVE_MESSAGE_TYPES, UnsupportedFitData, iter_native_fit_messages
+from ingestion.fit_folder import FitFile, iter_fit_messages, parse_fit_file
+from tests.fit_builder import build_fit_bytes, write_fit_file, sample_activity_messages, sample_monitoring_messages
+
+pytestmark = pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
+
+START = datetime(2024, 1, 15, 7, 0)
+
+
+def _mixed_messages():
+    """Activity records with altitude, position and gaps, plus hrv and monitoring"""
+    messages = sample_activity_messages(START, seconds=120)
+    for i, (name, fields) in enumerate(messages):
+        if name == 'record':
+            fields['altitude'] = 100.0 + i * 0.2
+            fields['position_lat'] = 500000000 + i
+            fields['position_long'] = -100000 + i
+            if i % 7 == 0:
+                fields['heart_rate'] = None
+    messages += [('hrv', {'time': (0.8, 0.85, None, 0.9, 0.95)}), ('hrv', {'time': (1.0,)})]
+    messages += sample_monitoring_messages(START, intervals=10)[1:]
+    return messages
+
+
+def _assert_parity(data):
+    native = list(iter_native_fit_messages(data, NATIVE_MESSAGE_TYPES))
+    reference = list(iter_fit_messages(data, NATIVE_MESSAGE_TYPES))
+    assert native == reference
+    return native
+
+
+class TestNativeDecoderParity:
+    """Native output should match fitparse value for value"""
+
+    def test_activity_records(self):
+        """Should decode records, including scaled, position and missing values"""
+        messages = _assert_parity(build_fit_bytes(_mixed_messages()))
+
+        records = [fields for name, fields in messages if name == 'record']
+        assert len(records) == 120
+        assert records[6].get('heart_rate') is None
+        assert records[0]['altitude'] == pytest.approx(100.2)
+
+    def test_compressed_timestamps(self):
+        """Should expand compressed timestamp headers like fitparse"""
+        messages = _assert_parity(build_fit_bytes(_mixed_messages(), compressed_timestamps=True))
+
+        records = [fields for name, fields in messages if name == 'record']
+        assert records[-1]['timestamp'] == datetime(2024, 1, 15, 7, 1, 59)
+
+    def test_hrv_arrays(self):
+        """Should decode array fields as tuples with invalid entries as None"""
+        messages = _assert_parity(build_fit_bytes(_mixed_messages()))
+
+        hrv = [fields['time'] for name, fields in messages if name == 'hrv']
+        assert hrv[0] == (0.8, 0.85, None, 0.9, 0.95)
+
+    def test_monitoring(self):
+        """Should decode monitoring subfields and stress levels"""
+        messages = _assert_parity(build_fit_bytes(sample_monitoring_messages(START, intervals=24)))
+
+        monitoring = [fields for name, fields in messages if name == 'monitoring']
+        assert monitoring[0]['activity_type'] == 'walking'
+        assert monitoring[0]['steps'] == 80
+
+    def test_filters_message_types(self):
+        """Should only return the requested message types"""
+        data = build_fit_bytes(_mixed_messages())
+
+        names = {name for name, _ in iter_native_fit_messages(data, {'hrv'})}
+
+        assert names == {'hrv'}
+
+
+class TestNativeDecoderFallback:
+    """Data the native path can't handle should raise so callers fall back"""
+
+    def test_not_a_fit_file(self):
+        with pytest.raises(UnsupportedFitData):
+            list(iter_native_fit_messages(b'not a fit file at all'))
+
+    def test_truncated_file(self):
+        data = build_fit_bytes(sample_activity_messages(START, seconds=30))
+
+        with pytest.raises(UnsupportedFitData):
+            list(iter_native_fit_messages(data[:len(data) // 2]))
+
+
+class TestParseFitFileNative:
+    """parse_fit_file should give the same result either way"""
+
+    @pytest.mark.parametrize("messages", [
+        sample_activity_messages(START, seconds=300),
+        sample_monitoring_messages(START),
+    ])
+    def test_native_matches_fitparse(self, temp_dir, messages):
+        path = write_fit_file(temp_dir / "file.fit", messages)
+
+        native = parse_fit_file(path, native=True)
+        reference = parse_fit_file(path, native=False)
+
+        samples = native.pop('samples', None) or {}
+        reference_samples = reference.pop('samples', None) or {}
+        assert native == reference
+        assert set(samples) == set(reference_samples)
+        for channel, values in samples.items():
+            np.testing.assert_array_equal(values, reference_samples[channel])
@@ -6,18 +6,26 @@ Tests:
 - File hash computation for deduplication
 - FIT file parsing (when implemented)
 """
+import inspect
 import os
 import tempfile
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import pytest
 
 from ingestion.fit_folder import (
+    FitFile,
     scan_fit_directory,
     compute_file_hash,
     parse_fit_file,
-    process_fit_folder
+    iter_fit_records,
+    process_fit_folder,
+    aggregate_daily_steps
 )
+from tests.fit_builder import write_fit_file, sample_activity_messages, sample_monitoring_messages
+
+requires_fitparse = pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
 
 
 class TestScanFitDirectory:
@@ -183,6 +191,81 @@ class TestParseFitFile:
         # When implemented, should extract actual records:
         # assert len(result["records"]) > 0
 
+    @requires_fitparse
+    def test_parse_skips_unconsumed_messages(self, temp_dir):
+        """Should decode the messages the writers use and skip per-second records"""
+        start = datetime(2024, 1, 15, 7, 0)
+        fit_path = write_fit_file(
+            temp_dir / "mixed.fit",
+            sample_activity_messages(start, seconds=30) + sample_monitoring_messages(start, intervals=4)[1:]
+        )
+
+        result = parse_fit_file(fit_path)
+
+        assert "error" not in result
+        assert "records" not in result
+        assert len(result["sessions"]) == 1
+        assert len(result["daily_steps"]) == 4
+        assert len(result["stress_records"]) == 4
+        assert result["file_info"]["serial_number"] == 3900000001
+
+    @requires_fitparse
+    def test_filtered_values_match_full_decode(self, temp_dir):
+        """Filtered decoding should yield the same values as a full fitparse pass"""
+        start = datetime(2024, 1, 15, 7, 0)
+        fit_path = write_fit_file(
+            temp_dir / "mixed.fit",
+            sample_activity_messages(start, seconds=10) + sample_monitoring_messages(start, intervals=3)[1:]
+        )
+
+        full = {"monitoring": [], "stress_level": [], "session": []}
+        for message in FitFile(fit_path).get_messages():
+            if message.name in full:
+                full[message.name].append({f.name: f.value for f in message if f.value is not None})
+
+        result = parse_fit_file(fit_path)
+
+        assert result["daily_steps"] == full["monitoring"]
+        assert result["stress_records"] == full["stress_level"]
+        assert result["sessions"] == full["session"]
+
+    @requires_fitparse
+    def test_fitparse_private_hooks_unchanged(self, temp_dir):
+        """Should find the private fitparse methods and state FilteredFitFile relies on"""
+        hooks = {
+            "_parse_message": ["self"],
+            "_parse_definition_message": ["self", "header"],
+            "_parse_data_message": ["self", "header"],
+            "_parse_message_header": ["self"],
+            "_parse_file_header": ["self"],
+            "_read_and_assert_crc": ["self", "allow_zero"],
+            "_read": ["self", "size"],
+            "_apply_compressed_accumulation": ["raw_value", "accumulation", "num_bits"],
+        }
+        for name, parameters in hooks.items():
+            assert list(inspect.signature(getattr(FitFile, name)).parameters) == parameters, name
+
+        fit_path = write_fit_file(temp_dir / "run.fit", sample_activity_messages(datetime(2024, 1, 15, 7, 0), seconds=5))
+        fitfile = FitFile(fit_path)
+        try:
+            for attribute in ("_file", "_filesize", "_bytes_left", "_complete", "_compressed_ts_accumulator"):
+                assert hasattr(fitfile, attribute), attribute
+        finally:
+            fitfile.close()
+
+    @requires_fitparse
+    def test_iter_fit_records_streams_records(self, temp_dir):
+        """Should yield per-second records lazily"""
+        start = datetime(2024, 1, 15, 7, 0)
+        fit_path = write_fit_file(temp_dir / "run.fit", sample_activity_messages(start, seconds=20))
+
+        records = iter_fit_records(fit_path)
+
+        first = next(records)
+        assert first["timestamp"] == start
+        assert first["heart_rate"] == 120
+        assert sum(1 for _ in records) == 19
+
 
 class TestProcessFitFolder:
     """Tests for process_fit_folder function (integration)"""
@@ -231,3 +314,169 @@ class TestProcessFitFolder:
         # When implemented:
         # assert result2["duplicates_skipped"] == 1
         # assert result2["new_records"] == 0
+
+    def test_process_reports_stage_timings(self, temp_dir, temp_db):
+        """Should include per-stage timings in the summary"""
+        (temp_dir / "activity.fit").write_bytes(b"not a fit file")
+
+        result = process_fit_folder(str(temp_dir), temp_db)
+
+        assert result["workers"] == 1
+        assert set(result["timings"]) == {"scan_seconds", "parse_seconds", "write_seconds", "total_seconds"}
+        assert all(seconds >= 0 for seconds in result["timings"].values())
+
+    @requires_fitparse
+    def test_parallel_matches_serial(self, temp_dir, temp_db):
+        """Parallel parsing should produce the same summary as serial parsing"""
+        for i in range(4):
+            start = datetime(2024, 1, 15, 7, 0) + timedelta(days=i)
+            write_fit_file(temp_dir / f"activity{i}.fit", sample_activity_messages(start, seconds=10))
+        (temp_dir / "broken.fit").write_bytes(b"not a fit file")
+
+        serial_db = temp_db.connect()
+        temp_db.initialize_schema()
+        serial = process_fit_folder(str(temp_dir), serial_db, workers=1)
+
+        from db.connection import Database
+        parallel_db = Database(str(temp_dir / "parallel.db"))
+        parallel_db.connect()
+        parallel_db.initialize_schema()
+        try:
+            parallel = process_fit_folder(str(temp_dir), parallel_db.connection, workers=2)
+        finally:
+            parallel_db.close()
+
+        for key in ("files_found", "files_processed", "total_records", "duplicates_skipped", "errors"):
+            assert parallel[key] == serial[key]
+        assert serial["files_processed"] == 4
+        assert serial["errors"] == 1
+
+    @requires_fitparse
+    def test_process_reports_progress(self, temp_dir, temp_db):
+        """Should report progress once per file; a raising callback aborts uncommitted work"""
+        for i in range(3):
+            start = datetime(2024, 1, 15, 7, 0) + timedelta(days=i)
+            write_fit_file(temp_dir / f"activity{i}.fit", sample_activity_messages(start, seconds=10))
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+        calls = []
+
+        def progress(operation, current, total):
+            calls.append((operation, current, total))
+            if current == 3:
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            process_fit_folder(str(temp_dir), conn, progress_callback=progress)
+        conn.rollback()
+
+        assert calls == [("Processing FIT files", i, 3) for i in (1, 2, 3)]
+        assert conn.execute("SELECT COUNT(*) FROM imported_files").fetchone()[0] == 0
+
+    @requires_fitparse
+    def test_batched_writes_match_per_file(self, temp_dir, temp_db):
+        """Committing in batches should store the same rows and report throughput"""
+        for i in range(5):
+            start = datetime(2024, 1, 15, 7, 0) + timedelta(days=i)
+            write_fit_file(temp_dir / f"activity{i}.fit", sample_activity_messages(start, seconds=10))
+        # Same bytes as activity0.fit - a duplicate inside the first batch
+        (temp_dir / "copy.fit").write_bytes((temp_dir / "activity0.fit").read_bytes())
+
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+        result = process_fit_folder(str(temp_dir), conn, batch_files=2)
+
+        assert result["files_processed"] == 5
+        assert result["duplicates_skipped"] == 1
+        assert result["rows_written"] > 0
+        assert result["rows_per_second"] >= 0
+        assert conn.execute("SELECT COUNT(*) FROM imported_files").fetchone()[0] == 5
+        assert conn.execute("SELECT COUNT(*) FROM activities").fetchone()[0] == 5
+
+    def test_cancelled_import_restores_performance_profile(self, temp_dir, temp_db):
+        """Should roll back the open batch and restore synchronous when cancelled"""
+        from jobs.manager import ImportCancelled
+
+        start = datetime(2024, 1, 15, 8, 0, 0)
+        for i in range(2):
+            write_fit_file(temp_dir / f"run{i}.fit", sample_activity_messages(start + timedelta(days=i), seconds=20))
+        temp_db.connect()
+        temp_db.initialize_schema()
+        conn = temp_db.connection
+
+        def progress(operation, current, total):
+            if current == 2:
+                # Rows of the open batch, as a flushed buffer would leave them
+                conn.execute("INSERT INTO resting_hr (date, resting_hr) VALUES ('2024-01-01', 50)")
+                raise ImportCancelled("job")
+
+        with pytest.raises(ImportCancelled):
+            process_fit_folder(str(temp_dir), conn, progress_callback=progress, workers=1)
+
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM resting_hr").fetchone()[0] == 0
+
+
+class TestAggregateDailySteps:
+    """Tests for aggregate_daily_steps function"""
+
+    def test_sums_activity_types_per_day(self):
+        """Should take each activity type's cumulative maximum and sum them per day"""
+        start = datetime(2024, 1, 15, 7, 0)
+        records = [
+            {"timestamp": start, "activity_type": "walking", "steps": 100, "distance": 80.0},
+            {"timestamp": start + timedelta(hours=1), "activity_type": "walking", "steps": 400, "distance": 300.0},
+            {"timestamp": start + timedelta(hours=2), "activity_type": "running", "steps": 1000, "distance": 900.0},
+            {"timestamp": start + timedelta(hours=3), "activity_type": "walking", "steps": 450, "distance": 350.0},
+            {"timestamp": start + timedelta(days=1), "activity_type": "walking", "steps": 20, "distance": 15.0},
+        ]
+
+        days = aggregate_daily_steps(records)
+
+        assert days == [
+            {"date": start.date(), "steps": 1450, "distance": 1250.0, "active_calories": None},
+            {"date": (start + timedelta(days=1)).date(), "steps": 20, "distance": 15.0, "active_calories": None},
+        ]
+
+    def test_skips_days_without_steps(self):
+        """Should not emit rows for days with no step counts"""
+        records = [{"timestamp": datetime(2024, 1, 15, 7, 0), "activity_type": "cycling", "distance": 5000.0}]
+
+        assert aggregate_daily_steps(records) == []
+
+    @requires_fitparse
+    def test_import_writes_one_row_per_day(self, temp_dir, temp_db):
+        """Should store the day's cumulative total, and never lower it on a partial re-import"""
+        start = datetime(2024, 1, 15, 0, 0)
+        write_fit_file(temp_dir / "full.fit", sample_monitoring_messages(start, intervals=96))
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+
+        process_fit_folder(str(temp_dir), conn)
+        partial_dir = temp_dir / "partial"
+        partial_dir.mkdir()
+        write_fit_file(partial_dir / "morning.fit", sample_monitoring_messages(start, intervals=10))
+        process_fit_folder(str(partial_dir), conn)
+
+        rows = conn.execute("SELECT date, step_count, distance_meters, calories FROM daily_steps").fetchall()
+        assert len(rows) == 1
+        # 96 walking intervals of 40 cycles = 2 steps per cycle
+        assert rows[0][1:] == (96 * 40 * 2, 96 * 30.0, 96 * 2)
+
+    @requires_fitparse
+    def test_later_recording_replaces_a_larger_total(self, temp_dir, temp_db):
+        """Should take a lower total from a file recorded later, but not from one recorded earlier"""
+        start = datetime(2024, 1, 15, 0, 0)
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+
+        def import_file(name, recorded, intervals):
+            folder = temp_dir / name
+            folder.mkdir()
+            write_fit_file(folder / f"{name}.fit", sample_monitoring_messages(recorded, intervals=intervals))
+            process_fit_folder(str(folder), conn)
+            return conn.execute("SELECT step_count FROM daily_steps").fetchone()[0]
+
+        assert import_file("inflated", start, intervals=96) == 96 * 40 * 2
+        assert import_file("corrected", start + timedelta(hours=1), intervals=40) == 40 * 40 * 2
+        assert import_file("stale", start + timedelta(minutes=30), intervals=90) == 40 * 40 * 2
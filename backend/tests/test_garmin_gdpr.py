@@ -7,6 +7,7 @@ Tests the complete GDPR import pipeline including:
 - Deduplication
 - Error handling
 - End-to-end import
+- Concurrent category parsing with a single writer
 """
 import zipfile
 import json
@@ -15,10 +16,14 @@ from datetime import datetime, date
 
 import pytest
 
+from ingestion.fit_folder import FitFile
 from ingestion.garmin_gdpr import (
     extract_garmin_export,
-    process_gdpr_export
+    plan_gdpr_export,
+    process_gdpr_export,
+    scan_garmin_export
 )
+from tests.fit_builder import build_fit_bytes, sample_activity_messages
 
 
 class TestExtractGarminExport:
@@ -178,6 +183,49 @@ class TestProcessGdprExport:
         assert "processing_time_seconds" in result
         assert "by_category" in result
 
+    def test_import_restores_performance_profile(self, temp_dir, temp_db):
+        """Should import under the bulk-import profile and switch back after"""
+        zip_path = temp_dir / "export.zip"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr("DI_CONNECT/hydration_2024.json", json.dumps([
+                {"calendarDate": "2024-01-15", "valueInML": 500}
+            ]))
+        temp_db.connect()
+        temp_db.initialize_schema()
+        seen = []
+
+        def progress(operation, current, total):
+            seen.append(temp_db.connection.execute("PRAGMA synchronous").fetchone()[0])
+
+        process_gdpr_export(str(zip_path), temp_db.connection, progress_callback=progress)
+
+        assert set(seen) == {0}
+        assert temp_db.connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+    def test_cancelled_import_restores_performance_profile(self, temp_dir, temp_db):
+        """Should roll back staged rows and restore synchronous when cancelled mid-import"""
+        from jobs.manager import ImportCancelled
+
+        zip_path = temp_dir / "export.zip"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr("DI_CONNECT/hydration_2024.json", json.dumps([
+                {"calendarDate": "2024-01-15", "valueInML": 500}
+            ]))
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        def progress(operation, current, total):
+            # Stage a row, as an importer would have, then cancel
+            temp_db.connection.execute("INSERT INTO resting_hr (date, resting_hr) VALUES ('2024-01-01', 50)")
+            raise ImportCancelled("job")
+
+        with pytest.raises(ImportCancelled):
+            with temp_db.write() as connection:
+                process_gdpr_export(str(zip_path), connection, progress_callback=progress)
+
+        assert temp_db.connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM resting_hr").fetchone()[0] == 0
+
     def test_process_with_sleep_json(self, temp_dir, temp_db):
         """Should process sleep JSON files"""
         sleep_data = {
@@ -428,3 +476,649 @@ class TestProcessGdprExport:
         # With valid data, should achieve >95% success rate
         if result["success_rate"] >= 95.0:
             assert result["success"] is True
+
+
+class TestResumableImport:
+    """Tests for checkpointed, resumable GDPR imports"""
+
+    @staticmethod
+    def _write_export(zip_path, nights, deep_seconds=7200):
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            for i in range(nights):
+                zf.writestr(f"DI_CONNECT/sleep_2024-01-{i + 1:02d}.json", json.dumps({
+                    "calendarDate": f"2024-01-{i + 1:02d}",
+                    "deepSleepSeconds": deep_seconds + i,
+                }))
+
+    def test_interrupted_import_resumes(self, temp_dir, temp_db):
+        """Should only process the members an interrupted run didn't finish"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, 5)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        def interrupt(operation, current, total):
+            if current == 3:
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            process_gdpr_export(str(zip_path), temp_db.connection, progress_callback=interrupt)
+        temp_db.connection.rollback()
+
+        calls = []
+        result = process_gdpr_export(
+            str(zip_path), temp_db.connection,
+            progress_callback=lambda operation, current, total: calls.append((operation, total))
+        )
+
+        assert result["members_resumed"] == 2
+        assert result["total_files_processed"] == 3
+        assert result["total_files_found"] == 5
+        assert result["success"] is True
+        assert ("Processing sleep JSON", 3) in calls
+        assert ("Processing sleep JSON", 5) not in calls
+        count = temp_db.connection.execute("SELECT COUNT(*) FROM sleep_detailed").fetchone()[0]
+        assert count == 5
+
+    def test_changed_member_is_reimported(self, temp_dir, temp_db):
+        """Should re-process members whose content changed in the archive"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, 3)
+        temp_db.connect()
+        temp_db.initialize_schema()
+        process_gdpr_export(str(zip_path), temp_db.connection)
+
+        self._write_export(zip_path, 4)
+        result = process_gdpr_export(str(zip_path), temp_db.connection)
+
+        assert result["members_resumed"] == 3
+        assert result["total_files_processed"] == 1
+
+        self._write_export(zip_path, 4, deep_seconds=3600)
+        result = process_gdpr_export(str(zip_path), temp_db.connection)
+
+        assert result["members_resumed"] == 0
+        assert result["total_files_processed"] == 4
+
+    def test_resume_disabled(self, temp_dir, temp_db):
+        """Should extract and check every member when resume is off"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, 3)
+        temp_db.connect()
+        temp_db.initialize_schema()
+        process_gdpr_export(str(zip_path), temp_db.connection)
+
+        result = process_gdpr_export(str(zip_path), temp_db.connection, resume=False)
+
+        assert result["members_resumed"] == 0
+        assert result["by_category"]["sleep_json"]["found"] == 3
+        assert result["duplicates_skipped"] == 3
+
+    def test_extract_skips_members(self, temp_dir):
+        """Should leave members rejected by skip_member in the archive"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, 3)
+
+        result = extract_garmin_export(
+            str(zip_path), str(temp_dir / "out"),
+            skip_member=lambda member: member.filename.endswith("01.json")
+        )
+
+        assert result["skipped_members"] == 1
+        assert len(result["file_categories"]["sleep"]) == 2
+        assert not (temp_dir / "out" / "DI_CONNECT" / "sleep_2024-01-01.json").exists()
+
+
+class TestIncrementalReimport:
+    """Tests for skipping members a previously imported export already had"""
+
+    @staticmethod
+    def _write_export(zip_path, days, root="", changed=()):
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for day in days:
+                zf.writestr(f"{root}DI_CONNECT/DI-Connect-Wellness/sleep_2024-01-{day:02d}.json", json.dumps({
+                    "calendarDate": f"2024-01-{day:02d}",
+                    "deepSleepSeconds": 7200 + day + (1 if day in changed else 0),
+                }))
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_newer_export_processes_only_new_and_changed(self, temp_dir, temp_db, streaming):
+        """Should skip members with the same name, CRC and size in an earlier export"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        first = temp_dir / "export_2024-01.zip"
+        second = temp_dir / "export_2024-04.zip"
+        self._write_export(first, range(1, 6))
+        self._write_export(second, range(1, 8), root="123_export/", changed={5})
+        process_gdpr_export(str(first), temp_db.connection, streaming=streaming)
+
+        result = process_gdpr_export(str(second), temp_db.connection, streaming=streaming)
+
+        assert result["members_unchanged"] == 4
+        assert result["members_resumed"] == 0
+        assert result["by_category"]["sleep_json"]["found"] == 3
+        assert result["total_files_found"] == 7
+        assert result["success"] is True
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM sleep_detailed").fetchone()[0] == 7
+        assert temp_db.connection.execute(
+            "SELECT deep_sleep_seconds FROM sleep_detailed WHERE date = '2024-01-05'"
+        ).fetchone()[0] == 7206
+
+        # The newer export's checkpoints cover its unchanged members as well
+        rerun = process_gdpr_export(str(second), temp_db.connection, streaming=streaming)
+        assert rerun["members_resumed"] == 7
+        assert rerun["members_unchanged"] == 0
+
+    def test_unchanged_members_are_not_decompressed(self, temp_dir, temp_db, monkeypatch):
+        """Should not open members matched against the manifest"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        first = temp_dir / "first.zip"
+        second = temp_dir / "second.zip"
+        self._write_export(first, range(1, 4))
+        self._write_export(second, range(1, 5))
+        process_gdpr_export(str(first), temp_db.connection, streaming=True)
+        opened = []
+        original_open = zipfile.ZipFile.open
+
+        def recording_open(self, name, *args, **kwargs):
+            opened.append(getattr(name, "filename", name))
+            return original_open(self, name, *args, **kwargs)
+
+        monkeypatch.setattr(zipfile.ZipFile, "open", recording_open)
+        process_gdpr_export(str(second), temp_db.connection, streaming=True)
+
+        assert set(opened) == {"DI_CONNECT/DI-Connect-Wellness/sleep_2024-01-04.json"}
+
+    def test_resume_disabled_ignores_manifest(self, temp_dir, temp_db):
+        """Should process every member of a newer export when resume is off"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        first = temp_dir / "first.zip"
+        second = temp_dir / "second.zip"
+        self._write_export(first, range(1, 4))
+        self._write_export(second, range(1, 4))
+        process_gdpr_export(str(first), temp_db.connection)
+
+        result = process_gdpr_export(str(second), temp_db.connection, resume=False)
+
+        assert result["members_unchanged"] == 0
+        assert result["by_category"]["sleep_json"]["found"] == 3
+
+
+class TestImportPlan:
+    """Tests for the dry-run import planner"""
+
+    @staticmethod
+    def _write_export(zip_path):
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for day in range(1, 4):
+                zf.writestr(f"DI_CONNECT/DI-Connect-Wellness/sleep_2024-01-{day:02d}.json", json.dumps({
+                    "calendarDate": f"2024-01-{day:02d}", "deepSleepSeconds": 7200
+                }))
+            zf.writestr("DI_CONNECT/DI-Connect-Aggregator/UdsFile_2024.json", json.dumps([
+                {"calendarDate": "2024-01-01", "totalSteps": 9000}
+            ] * 5000))
+            zf.writestr("DI_CONNECT/DI-Connect-Uploaded-Files/UploadedFiles_0-_Part1.zip", b"x" * 4096)
+            zf.writestr("DI_CONNECT/DI-Connect-Fitness/run.tcx", "<tcx/>")
+
+    def test_plan_counts_members_and_bytes(self, temp_dir, temp_db, monkeypatch):
+        """Should categorize members from the central directory alone"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+        monkeypatch.setattr(zipfile.ZipFile, "open", lambda *args, **kwargs: pytest.fail("member decompressed"))
+
+        plan = plan_gdpr_export(str(zip_path), temp_db.connection)
+
+        with zipfile.ZipFile(zip_path) as zf:
+            uds = zf.getinfo("DI_CONNECT/DI-Connect-Aggregator/UdsFile_2024.json")
+        assert plan["by_category"]["sleep_json"]["members"] == 3
+        assert plan["by_category"]["daily_summaries"]["uncompressed_bytes"] == uds.file_size
+        assert plan["by_category"]["daily_summaries"]["compressed_bytes"] == uds.compress_size
+        assert plan["nested_zips"]["members"] == 1
+        assert plan["not_imported"]["members"] == 1
+        assert plan["total_members"] == 6
+        assert plan["members_already_imported"] == 0
+        assert plan["estimated_seconds"] > 0
+        assert plan["planning_time_ms"] >= 0
+
+    def test_plan_after_import(self, temp_dir, temp_db):
+        """Should count checkpointed members as already imported"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+        process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        plan = plan_gdpr_export(str(zip_path), temp_db.connection)
+
+        assert plan["by_category"]["sleep_json"]["already_imported"] == 3
+        assert plan["by_category"]["sleep_json"]["estimated_seconds"] == 0
+        assert plan["by_category"]["daily_summaries"]["already_imported"] == 1
+        assert plan_gdpr_export(str(zip_path), temp_db.connection, resume=False)["members_already_imported"] == 0
+
+    def test_json_categories_share_one_core(self, temp_dir, temp_db):
+        """Should add up the JSON categories' times instead of running them in parallel"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        plan = plan_gdpr_export(str(zip_path), temp_db.connection, resume=False, workers=4)
+
+        json_seconds = sum(
+            entry["estimated_seconds"] for category, entry in plan["by_category"].items() if category != "fit_files"
+        )
+        assert plan["by_category"]["sleep_json"]["estimated_seconds"] > 0
+        assert plan["by_category"]["daily_summaries"]["estimated_seconds"] > 0
+        assert plan["estimated_seconds"] == pytest.approx(json_seconds, abs=0.002)
+
+
+class TestStreamingImport:
+    """Tests for importing GDPR exports without extracting them"""
+
+    @staticmethod
+    def _write_export(zip_path, include_fit=False):
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("export/DI_CONNECT/DI-Connect-Wellness/sleep_2024-01-15.json", json.dumps({
+                "calendarDate": "2024-01-15", "deepSleepSeconds": 7200, "lightSleepSeconds": 18000
+            }))
+            zf.writestr("export/DI_CONNECT/DI-Connect-Aggregator/UdsFile_2024-01-15.json", json.dumps({
+                "calendarDate": "2024-01-15", "totalSteps": 10000, "restingHeartRate": 55
+            }))
+            zf.writestr("export/DI_CONNECT/DI-Connect-Wellness/hydration_2024.json", "{}")
+            zf.writestr("export/README.txt", "not under DI_CONNECT")
+            if include_fit:
+                zf.writestr(
+                    "export/DI_CONNECT/DI-Connect-Fitness/activity.fit",
+                    build_fit_bytes(sample_activity_messages(datetime(2024, 1, 15, 7, 0), seconds=30))
+                )
+
+    def test_scan_categorizes_from_central_directory(self, temp_dir):
+        """Should categorize members under DI_CONNECT without extracting"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+
+        with zipfile.ZipFile(zip_path) as zf:
+            result = scan_garmin_export(zf)
+
+        assert result["di_connect_found"] is True
+        assert result["extract_path"] is None
+        assert result["total_files"] == 3
+        assert result["file_categories"]["sleep"] == ["export/DI_CONNECT/DI-Connect-Wellness/sleep_2024-01-15.json"]
+        assert len(result["file_categories"]["daily_summaries"]) == 1
+        assert len(result["file_categories"]["hydration"]) == 1
+
+    def test_streaming_matches_extraction(self, temp_dir, temp_db):
+        """Should import the same rows as the extracting pipeline"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+        conn = temp_db.connection
+
+        extracted = process_gdpr_export(str(zip_path), conn, resume=False)
+        extracted_rows = conn.execute("SELECT date, deep_sleep_seconds FROM sleep_detailed").fetchall()
+        conn.execute("DELETE FROM sleep_detailed")
+        conn.execute("DELETE FROM daily_summaries")
+        conn.execute("DELETE FROM imported_files")
+        conn.commit()
+
+        streamed = process_gdpr_export(str(zip_path), conn, resume=False, streaming=True)
+
+        assert streamed["extract_path"] is None
+        for key in ("total_files_found", "total_files_processed", "total_records_inserted", "success"):
+            assert streamed[key] == extracted[key]
+        assert conn.execute("SELECT date, deep_sleep_seconds FROM sleep_detailed").fetchall() == extracted_rows
+        paths = [row[0] for row in conn.execute("SELECT file_path FROM imported_files")]
+        assert all(path.startswith(str(zip_path)) for path in paths)
+
+    def test_streaming_reads_only_needed_members(self, temp_dir, temp_db, monkeypatch):
+        """Should decompress only the members an importer consumes"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+        opened = []
+        original_open = zipfile.ZipFile.open
+
+        def recording_open(self, name, *args, **kwargs):
+            opened.append(getattr(name, "filename", name))
+            return original_open(self, name, *args, **kwargs)
+
+        monkeypatch.setattr(zipfile.ZipFile, "open", recording_open)
+        process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        # JSON members are read twice: once to hash, once to stream-parse
+        assert sorted(set(opened)) == [
+            "export/DI_CONNECT/DI-Connect-Aggregator/UdsFile_2024-01-15.json",
+            "export/DI_CONNECT/DI-Connect-Wellness/hydration_2024.json",
+            "export/DI_CONNECT/DI-Connect-Wellness/sleep_2024-01-15.json",
+        ]
+
+    def test_streaming_resumes_from_checkpoints(self, temp_dir, temp_db):
+        """Should skip members checkpointed by an earlier streamed run"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        assert result["members_resumed"] == 2
+        assert result["by_category"]["sleep_json"]["found"] == 0
+        assert result["by_category"]["daily_summaries"]["found"] == 0
+        assert result["total_files_processed"] == 0
+
+    @pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
+    def test_streaming_fit_member(self, temp_dir, temp_db):
+        """Should parse FIT members from memory and record their zip metadata"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, include_fit=True)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        assert result["by_category"]["fit_files"]["processed"] == 1
+        row = temp_db.connection.execute(
+            "SELECT file_path, file_size FROM imported_files WHERE file_type = 'fit'"
+        ).fetchone()
+        assert row[0].endswith("activity.fit")
+        assert row[1] > 0
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM activities").fetchone()[0] == 1
+
+
+class TestPipelinedImport:
+    """Tests for parsing categories concurrently with a single writer"""
+
+    @staticmethod
+    def _write_export(zip_path, nights=12, include_fit=False):
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for i in range(nights):
+                day = f"2024-01-{i + 1:02d}"
+                zf.writestr(f"DI_CONNECT/DI-Connect-Wellness/sleep_{day}.json", json.dumps({
+                    "calendarDate": day, "deepSleepSeconds": 7200 + i
+                }))
+                zf.writestr(f"DI_CONNECT/DI-Connect-Aggregator/UdsFile_{day}.json", json.dumps([
+                    {"calendarDate": day, "totalSteps": 10000 + i},
+                ]))
+            zf.writestr("DI_CONNECT/DI-Connect-Wellness/sleep_broken.json", "{not json")
+            if include_fit:
+                for day in (1, 2, 3):
+                    zf.writestr(
+                        f"DI_CONNECT/DI-Connect-Fitness/run{day}.fit",
+                        build_fit_bytes(sample_activity_messages(datetime(2024, 1, day, 7, 0), seconds=20))
+                    )
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_category_counts_are_exact(self, temp_dir, temp_db, streaming):
+        """Should give the same per-category counts with any number of parser threads"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        results = []
+        for json_threads in (1, 4):
+            temp_db.connection.execute("DELETE FROM sleep_detailed")
+            temp_db.connection.execute("DELETE FROM daily_summaries")
+            temp_db.connection.execute("DELETE FROM imported_files")
+            temp_db.connection.commit()
+            results.append(process_gdpr_export(
+                str(zip_path), temp_db.connection, resume=False, streaming=streaming, json_threads=json_threads
+            ))
+
+        sequential, pipelined = results
+        assert pipelined["by_category"] == sequential["by_category"]
+        assert pipelined["by_category"]["sleep_json"] == {"found": 13, "processed": 12, "records": 12, "errors": 1}
+        assert pipelined["by_category"]["daily_summaries"] == {"found": 12, "processed": 12, "records": 12, "errors": 0}
+        assert pipelined["total_records_inserted"] == 24
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM sleep_detailed").fetchone()[0] == 12
+
+    def test_progress_per_category(self, temp_dir, temp_db):
+        """Should report each category's own progress up to its total"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, nights=5)
+        temp_db.connect()
+        temp_db.initialize_schema()
+        calls = []
+
+        process_gdpr_export(
+            str(zip_path), temp_db.connection, streaming=True, json_threads=3,
+            progress_callback=lambda operation, current, total: calls.append((operation, current, total))
+        )
+
+        sleep_calls = [call for call in calls if call[0] == "Processing sleep JSON"]
+        summary_calls = [call for call in calls if call[0] == "Processing daily summaries"]
+        assert [current for _, current, _ in sleep_calls] == list(range(1, 7))
+        assert {total for _, _, total in sleep_calls} == {6}
+        assert [current for _, current, _ in summary_calls] == list(range(1, 6))
+
+    def test_large_files_are_streamed_by_the_writer(self, temp_dir, temp_db, monkeypatch):
+        """Should hand files too big to decode whole to the writer to stream"""
+        import ingestion.json_decoder
+
+        monkeypatch.setattr(ingestion.json_decoder, "FAST_DECODE_MAX_BYTES", 10)
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, nights=4)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        assert result["by_category"]["sleep_json"]["processed"] == 4
+        assert result["by_category"]["sleep_json"]["errors"] == 1
+        assert result["by_category"]["daily_summaries"]["processed"] == 4
+
+    @pytest.mark.parametrize("fast_decode_max_bytes,reads", [(16 * 1024 * 1024, 1), (10, 2)])
+    def test_json_members_are_not_reread(self, temp_dir, temp_db, monkeypatch, fast_decode_max_bytes, reads):
+        """Should read small members once, and hash then stream large ones without touching disk"""
+        import tempfile
+        import ingestion.json_decoder
+
+        monkeypatch.setattr(ingestion.json_decoder, "FAST_DECODE_MAX_BYTES", fast_decode_max_bytes)
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, nights=4)
+        temp_db.connect()
+        temp_db.initialize_schema()
+        opened = []
+        open_member = zipfile.ZipFile.open
+
+        def counting_open(archive, name, *args, **kwargs):
+            opened.append(getattr(name, "filename", name))
+            return open_member(archive, name, *args, **kwargs)
+
+        def no_temp_files(*args, **kwargs):
+            raise AssertionError("streaming import wrote a temp file")
+
+        monkeypatch.setattr(zipfile.ZipFile, "open", counting_open)
+        monkeypatch.setattr(tempfile, "TemporaryFile", no_temp_files)
+        monkeypatch.setattr(tempfile, "NamedTemporaryFile", no_temp_files)
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        json_opens = [name for name in opened if name.endswith(".json")]
+        assert result["by_category"]["daily_summaries"]["processed"] == 4
+        assert json_opens and all(json_opens.count(name) <= reads for name in json_opens)
+
+    def test_cancel_stops_all_categories(self, temp_dir, temp_db):
+        """Should stop every category's parsers when the writer is interrupted"""
+        import threading
+
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, nights=20)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        def interrupt(operation, current, total):
+            if current == 3:
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            process_gdpr_export(str(zip_path), temp_db.connection, streaming=True, progress_callback=interrupt)
+        temp_db.connection.rollback()
+
+        assert not [thread for thread in threading.enumerate() if thread.name.startswith("import-")]
+
+    @pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_fit_files_alongside_json(self, temp_dir, temp_db, workers):
+        """Should import FIT files while the JSON categories are parsed"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path, nights=6, include_fit=True)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True, workers=workers)
+
+        assert result["by_category"]["fit_files"]["processed"] == 3
+        assert result["by_category"]["fit_files"]["errors"] == 0
+        assert result["by_category"]["sleep_json"]["processed"] == 6
+        assert result["by_category"]["daily_summaries"]["processed"] == 6
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM activities").fetchone()[0] == 3
+
+
+@pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
+class TestNestedZips:
+    """Tests for FIT files inside zips inside the export"""
+
+    @staticmethod
+    def _zip_bytes(entries):
+        import io
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name, data in entries.items():
+                zf.writestr(name, data)
+        return buffer.getvalue()
+
+    def _fit(self, day):
+        return build_fit_bytes(sample_activity_messages(datetime(2024, 1, day, 7, 0), seconds=20))
+
+    def _write_export(self, zip_path):
+        inner = self._zip_bytes({"deeper/run3.fit": self._fit(3)})
+        uploaded = self._zip_bytes({
+            "run1.fit": self._fit(1),
+            "run2.fit": self._fit(2),
+            "more.zip": inner,
+            "notes.txt": "ignored",
+        })
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("DI_CONNECT/DI-Connect-Uploaded-Files/UploadedFiles_0-_Part1.zip", uploaded)
+            zf.writestr("DI_CONNECT/DI-Connect-Fitness/run4.fit", self._fit(4))
+
+    def test_scan_recurses_into_nested_zips(self, temp_dir):
+        """Should list nested members under their archive's name"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+
+        with zipfile.ZipFile(zip_path) as zf:
+            result = scan_garmin_export(zf)
+            for archive in result["nested_archives"]:
+                archive.close()
+
+        prefix = "DI_CONNECT/DI-Connect-Uploaded-Files/UploadedFiles_0-_Part1.zip/"
+        assert sorted(result["fit_files"]) == sorted([
+            prefix + "run1.fit",
+            prefix + "run2.fit",
+            prefix + "more.zip/deeper/run3.fit",
+            "DI_CONNECT/DI-Connect-Fitness/run4.fit",
+        ])
+        assert len(result["nested_archives"]) == 2
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_nested_fit_files_are_imported(self, temp_dir, temp_db, workers):
+        """Should import FIT files at every nesting level without extracting"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True, workers=workers)
+
+        assert result["nested_zips"] == 2
+        assert result["by_category"]["fit_files"]["processed"] == 4
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM activities").fetchone()[0] == 4
+
+    @pytest.mark.parametrize("buffered", [True, False])
+    def test_nested_zips_decompressed(self, temp_dir, temp_db, monkeypatch, buffered):
+        """Should decompress a nested zip once when it fits in memory, and still import it when not"""
+        import ingestion.garmin_gdpr
+
+        if not buffered:
+            monkeypatch.setattr(ingestion.garmin_gdpr, "MAX_BUFFERED_NESTED_ZIP_BYTES", 0)
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+        decompressed = {}
+        read = zipfile.ZipExtFile.read
+
+        def counting_read(stream, n=-1):
+            data = read(stream, n)
+            decompressed[stream.name] = decompressed.get(stream.name, 0) + len(data)
+            return data
+
+        monkeypatch.setattr(zipfile.ZipExtFile, "read", counting_read)
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        outer = "DI_CONNECT/DI-Connect-Uploaded-Files/UploadedFiles_0-_Part1.zip"
+        with zipfile.ZipFile(zip_path) as zf:
+            size = zf.getinfo(outer).file_size
+        assert result["by_category"]["fit_files"]["processed"] == 4
+        if buffered:
+            assert decompressed[outer] == size
+        else:
+            assert decompressed[outer] > size
+
+    def test_nested_members_resume(self, temp_dir, temp_db):
+        """Should checkpoint nested members and zips so a re-run skips them"""
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        # The fully imported uploaded-files zip is skipped whole, unopened
+        assert result["members_resumed"] == 2
+        assert result["nested_zips"] == 0
+        assert result["by_category"]["fit_files"]["found"] == 0
+
+    def test_nested_zip_with_failures_is_reopened(self, temp_dir, temp_db):
+        """Should not skip a nested zip whole while one of its members failed"""
+        zip_path = temp_dir / "export.zip"
+        uploaded = self._zip_bytes({"run1.fit": self._fit(1), "broken.fit": b"not a fit file"})
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("DI_CONNECT/DI-Connect-Uploaded-Files/UploadedFiles_0-_Part1.zip", uploaded)
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        assert result["nested_zips"] == 1
+        assert result["members_resumed"] == 1
+        assert result["by_category"]["fit_files"]["found"] == 1
+
+    def test_depth_limit_and_corrupt_nested_zip(self, temp_dir, temp_db, monkeypatch):
+        """Should report nested zips it can't or won't open and carry on"""
+        import ingestion.garmin_gdpr
+
+        monkeypatch.setattr(ingestion.garmin_gdpr, "MAX_NESTED_ZIP_DEPTH", 1)
+        zip_path = temp_dir / "export.zip"
+        self._write_export(zip_path)
+        with zipfile.ZipFile(zip_path, 'a') as zf:
+            zf.writestr("DI_CONNECT/broken.zip", b"not a zip")
+        temp_db.connect()
+        temp_db.initialize_schema()
+
+        result = process_gdpr_export(str(zip_path), temp_db.connection, streaming=True)
+
+        assert result["by_category"]["fit_files"]["processed"] == 3
+        failed = [detail["file"] for detail in result["error_details"] if detail["type"] == "zip"]
+        assert sorted(path.rsplit("/", 1)[-1] for path in failed) == ["broken.zip", "more.zip"]
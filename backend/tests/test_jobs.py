@@ -0,0 +1,208 @@
+"""
+Tests for background import jobs.
+
+Tests:
+- Job lifecycle (queued -> running -> succeeded/failed)
+- Progress, throughput and ETA reporting
+- Cancellation of queued and running jobs
+- /jobs endpoints
+"""
+import threading
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import jobs.manager
+from jobs.manager import ImportCancelled, JobManager, CANCELLED, FAILED, SUCCEEDED
+from ingestion.fit_folder import FitFile
+from tests.fit_builder import write_fit_file, sample_activity_messages
+
+
+@pytest.fixture
+def manager(temp_dir):
+    manager = JobManager(db_path=str(temp_dir / "jobs.db"))
+    yield manager
+    manager.shutdown()
+
+
+class TestJobManager:
+    """Tests for JobManager"""
+
+    def test_job_succeeds_with_result(self, manager):
+        """Should run the import on its own connection and keep the result"""
+        def run(db_connection, progress):
+            progress("Counting", 1, 1)
+            tables = db_connection.execute("SELECT COUNT(*) FROM imported_files").fetchone()[0]
+            return {"imported_files": tables}
+
+        job = manager.submit("test", {}, run)
+        manager.wait(job.id, timeout=5)
+
+        status = job.to_dict()
+        assert status["status"] == SUCCEEDED
+        assert status["result"] == {"imported_files": 0}
+        assert status["current"] == status["total"] == 1
+        assert status["percent"] == 100.0
+
+    def test_job_failure_is_reported(self, manager):
+        """Should record the error message of a failed import"""
+        def run(db_connection, progress):
+            raise ValueError("bad export")
+
+        job = manager.submit("test", {}, run)
+        manager.wait(job.id, timeout=5)
+
+        assert job.status == FAILED
+        assert job.error == "bad export"
+
+    def test_running_job_reports_progress_and_eta(self, manager):
+        """Should report throughput and ETA while the import runs"""
+        halfway = threading.Event()
+        release = threading.Event()
+
+        def run(db_connection, progress):
+            for i in range(1, 51):
+                progress("Processing FIT files", i, 100)
+            halfway.set()
+            release.wait(5)
+            return {}
+
+        job = manager.submit("test", {}, run)
+        assert halfway.wait(5)
+        status = job.to_dict()
+        release.set()
+
+        assert status["status"] == "running"
+        assert status["operation"] == "Processing FIT files"
+        assert status["percent"] == 50.0
+        assert status["items_per_second"] > 0
+        assert status["eta_seconds"] >= 0
+
+    def test_interleaved_operations_keep_their_rates(self):
+        """Should track throughput per operation when categories report in turn"""
+        job = jobs.manager.ImportJob("test", {})
+        job.status = jobs.manager.RUNNING
+
+        for i in range(1, 11):
+            job.progress("Processing FIT files", i, 20)
+            job.progress("Processing sleep JSON", i, 10)
+        job.progress("Processing FIT files", 11, 20)
+
+        started, start_count, _ = job._operations["Processing FIT files"]
+        assert start_count == 1
+        assert job.to_dict()["items_per_second"] > 0
+
+    def test_cancel_running_job(self, manager):
+        """Should stop at the next progress report and roll back its writes"""
+        started = threading.Event()
+
+        def run(db_connection, progress):
+            db_connection.execute(
+                "INSERT INTO imported_files (file_hash, file_path, file_type) VALUES ('h', 'p', 'fit')"
+            )
+            started.set()
+            while True:
+                progress("Processing FIT files", 1, 10)
+
+        job = manager.submit("test", {}, run)
+        assert started.wait(5)
+        manager.cancel(job.id)
+        manager.wait(job.id, timeout=5)
+
+        assert job.status == CANCELLED
+        check = JobManager(db_path=manager._db_path)._open_database()
+        try:
+            assert check.connection.execute("SELECT COUNT(*) FROM imported_files").fetchone()[0] == 0
+        finally:
+            check.close()
+
+    def test_cancel_queued_job(self, manager):
+        """A job cancelled before it starts should never run"""
+        release = threading.Event()
+        ran = []
+
+        blocker = manager.submit("test", {}, lambda conn, progress: release.wait(5) and {})
+        queued = manager.submit("test", {}, lambda conn, progress: ran.append(True) or {})
+        manager.cancel(queued.id)
+        release.set()
+        manager.wait(queued.id, timeout=5)
+
+        assert queued.status == CANCELLED
+        assert ran == []
+        assert manager.wait(blocker.id, timeout=5).status == SUCCEEDED
+
+    def test_progress_raises_after_cancel(self):
+        """Cancellation should escape `except Exception` handlers in importers"""
+        job = jobs.manager.ImportJob("test", {})
+        job._cancel_requested.set()
+
+        with pytest.raises(ImportCancelled):
+            try:
+                job.progress("Processing FIT files", 1, 2)
+            except Exception:
+                pass
+
+
+class TestImportJobEndpoints:
+    """Tests for the /jobs endpoints"""
+
+    @pytest.fixture
+    def client(self, manager):
+        from main import app
+
+        original = jobs.manager._job_manager
+        jobs.manager._job_manager = manager
+        try:
+            yield TestClient(app)
+        finally:
+            jobs.manager._job_manager = original
+
+    @pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
+    def test_fit_folder_job(self, client, manager, temp_dir):
+        """Should return a job id immediately and expose the import result"""
+        fit_folder = temp_dir / "fit_files"
+        fit_folder.mkdir()
+        write_fit_file(fit_folder / "run.fit", sample_activity_messages(datetime(2024, 1, 15, 7, 0)))
+
+        response = client.post("/jobs/fit-folder", json={"folder_path": str(fit_folder)})
+
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        manager.wait(job_id, timeout=10)
+
+        data = client.get(f"/jobs/{job_id}").json()
+        assert data["status"] == SUCCEEDED
+        assert data["kind"] == "fit_folder"
+        assert data["result"]["summary"]["files_processed"] == 1
+        assert [job["job_id"] for job in client.get("/jobs").json()] == [job_id]
+
+    def test_job_rejects_invalid_folder(self, client):
+        """Should validate the request before queueing a job"""
+        response = client.post("/jobs/fit-folder", json={"folder_path": "/nonexistent/folder"})
+
+        assert response.status_code == 400
+
+    def test_unknown_job(self, client):
+        """Should return 404 for unknown job ids"""
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.post("/jobs/missing/cancel").status_code == 404
+
+    def test_cancel_endpoint(self, client, manager):
+        """Should mark a running job as cancelled"""
+        started = threading.Event()
+
+        def run(db_connection, progress):
+            started.set()
+            while True:
+                progress("Processing FIT files", 1, 10)
+
+        job = manager.submit("test", {}, run)
+        assert started.wait(5)
+
+        response = client.post(f"/jobs/{job.id}/cancel")
+        manager.wait(job.id, timeout=5)
+
+        assert response.status_code == 200
+        assert response.json()["cancel_requested"] is True
+        assert client.get(f"/jobs/{job.id}").json()["status"] == CANCELLED
@@ -0,0 +1,143 @@
+"""
+Tests for the fast JSON decoding path.
+
+Tests:
+- Same mapped records from every available backend as field_mappings
+- Typed msgspec structs and the stdlib fallback
+- Rejection of invalid JSON and non-object records
+- The streaming parser's fast path and its fallback for large files
+"""
+import io
+import json
+
+import pytest
+
+import ingestion.json_decoder as json_decoder
+import ingestion.json_parser as json_parser
+from ingestion.field_mappings import (
+    DAILY_SUMMARY_FIELD_MAPPINGS,
+    SLEEP_FIELD_MAPPINGS,
+    map_daily_summary_record,
+    map_sleep_record
+)
+from ingestion.json_decoder import RecordDecoder, json_backend, loads
+
+BACKENDS = ["json"] + [
+    name for name, module in (("orjson", json_decoder.orjson), ("msgspec", json_decoder.msgspec))
+    if module is not None
+]
+
+DAYS = [
+    {
+        "calendarDate": "2024-01-15",
+        "totalSteps": 10432,
+        "totalKilocalories": 2450.0,
+        "restingHeartRate": 52,
+        "maxHeartRate": None,
+        "maxHR": 171,
+        "bodyBatteryChargedValue": 60,
+        "unmappedField": {"nested": [1, 2, 3]},
+        "userProfilePK": 12345
+    },
+    {"date": "2024-01-16", "steps": 8000, "avgHR": 70, "averageHeartRate": 65}
+]
+
+
+class TestRecordDecoder:
+    """Tests for RecordDecoder"""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_matches_field_mappings(self, backend):
+        """Should map the same values as map_daily_summary_record"""
+        decoder = RecordDecoder(f"Uds_{backend}", DAILY_SUMMARY_FIELD_MAPPINGS, backend=backend)
+
+        mapped = list(decoder.iter_mapped(json.dumps(DAYS).encode()))
+
+        assert mapped == [map_daily_summary_record(day) for day in DAYS]
+        assert mapped[0]["max_heart_rate"] == 171
+        assert mapped[1]["avg_heart_rate"] == 65
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_single_object_with_bom(self, backend):
+        """Should decode a lone object, with or without a UTF-8 BOM"""
+        night = {"calendarDate": "2024-01-15", "deepSleepSeconds": 7200, "sleepScore": 81}
+        decoder = RecordDecoder(f"Sleep_{backend}", SLEEP_FIELD_MAPPINGS, backend=backend)
+
+        mapped = list(decoder.iter_mapped(b"\xef\xbb\xbf" + json.dumps(night).encode()))
+
+        assert mapped == [map_sleep_record(night)]
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    @pytest.mark.parametrize("data", [b"", b"[{\"calendarDate\": ", b"not json"])
+    def test_invalid_json_raises_value_error(self, backend, data):
+        """Should raise ValueError for invalid JSON whichever backend decodes"""
+        decoder = RecordDecoder(f"Uds_{backend}", DAILY_SUMMARY_FIELD_MAPPINGS, backend=backend)
+
+        with pytest.raises(ValueError):
+            decoder.decode(data)
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_non_object_record_raises_value_error(self, backend):
+        """Should reject records that aren't JSON objects"""
+        decoder = RecordDecoder(f"Uds_{backend}", DAILY_SUMMARY_FIELD_MAPPINGS, backend=backend)
+
+        with pytest.raises(ValueError):
+            [decoder.map(item) for item in decoder.decode(b"[1, 2]")]
+
+    @pytest.mark.skipif(json_decoder.msgspec is None, reason="msgspec not installed")
+    def test_msgspec_decodes_typed_structs(self):
+        """Should decode into structs holding only the mapped name variants"""
+        decoder = RecordDecoder("UdsStruct", DAILY_SUMMARY_FIELD_MAPPINGS, backend="msgspec")
+
+        items = decoder.decode(json.dumps(DAYS).encode())
+
+        assert all(isinstance(item, decoder.struct_type) for item in items)
+        assert items[0].totalSteps == 10432
+        assert not hasattr(items[0], "unmappedField")
+
+    def test_loads_falls_back_to_stdlib(self):
+        """Should decode with the stdlib json module when asked to"""
+        assert loads(b'{"a": [1, 2.5, null]}', backend="json") == {"a": [1, 2.5, None]}
+        assert json_backend() in BACKENDS
+
+
+class TestStreamingFastPath:
+    """Tests for the streaming parser's use of the fast decoder"""
+
+    @staticmethod
+    def _nights(count):
+        return [
+            {"calendarDate": f"2024-02-{day:02d}", "deepSleepSeconds": 3600 + day, "lightSleepSeconds": 14400}
+            for day in range(1, count + 1)
+        ]
+
+    def test_large_file_is_streamed(self, monkeypatch):
+        """Should fall back to incremental decoding past FAST_DECODE_MAX_BYTES"""
+        data = json.dumps(self._nights(20)).encode()
+        monkeypatch.setattr(json_parser, "FAST_DECODE_MAX_BYTES", 100)
+        streamed = []
+        original = json_parser.iter_json_values
+
+        def recording_iter_json_values(fp, *args, **kwargs):
+            streamed.append(True)
+            return original(fp, *args, **kwargs)
+
+        monkeypatch.setattr(json_parser, "iter_json_values", recording_iter_json_values)
+
+        parsed = json_parser.stream_sleep_json(io.BytesIO(data), "sleep_2024.json", "h")
+
+        assert [record["deep_sleep_seconds"] for record in parsed["sleep_records"]] == [
+            3600 + day for day in range(1, 21)
+        ]
+        assert streamed == [True]
+
+    def test_small_file_is_decoded_in_one_go(self, monkeypatch):
+        """Should decode files under the limit without the incremental decoder"""
+        def fail(*args, **kwargs):
+            raise AssertionError("iter_json_values should not be used")
+
+        monkeypatch.setattr(json_parser, "iter_json_values", fail)
+
+        parsed = json_parser.stream_sleep_json(io.BytesIO(json.dumps(self._nights(3)).encode()), "sleep.json", "h")
+
+        assert len(list(parsed["sleep_records"])) == 3
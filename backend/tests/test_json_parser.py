@@ -0,0 +1,329 @@
+"""
+Tests for the Garmin JSON parser.
+
+Tests:
+- Incremental decoding of JSON arrays across read boundaries
+- Multi-day sleep and daily summary files
+- Streaming inserts and malformed input
+- Loaders for HRV, stress, fitness, hydration, body composition and cycles
+"""
+import io
+import json
+import zipfile
+
+import pytest
+
+from ingestion.garmin_gdpr import process_gdpr_export
+from ingestion.json_parser import (
+    insert_category_data,
+    iter_json_values,
+    parse_category_json,
+    stream_category_json,
+    parse_sleep_json,
+    stream_sleep_json,
+    stream_daily_summary_json,
+    insert_sleep_data,
+    insert_daily_summary_data,
+    process_sleep_json_files
+)
+
+
+def sleep_nights(count, start_day=1):
+    return [
+        {
+            "calendarDate": f"2024-01-{day:02d}",
+            "deepSleepSeconds": 3600 + day,
+            "lightSleepSeconds": 14400,
+            "remSleepSeconds": 5400
+        }
+        for day in range(start_day, start_day + count)
+    ]
+
+
+class TestIterJsonValues:
+    """Tests for iter_json_values function"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 65536])
+    def test_array_across_chunk_boundaries(self, chunk_size):
+        """Should yield the same elements whatever the read size"""
+        values = [
+            {"a": 1, "text": "café — über", "nested": [1, 2, {"b": None}]},
+            12345678,
+            -1.5e3,
+            "string, with ] and [",
+            True,
+            None,
+            [],
+            {}
+        ]
+        data = json.dumps(values, ensure_ascii=False, indent=2).encode("utf-8")
+
+        assert list(iter_json_values(io.BytesIO(data), chunk_size=chunk_size)) == values
+
+    def test_single_object(self):
+        """Should yield a top-level object as one value"""
+        data = b'\xef\xbb\xbf  {"calendarDate": "2024-01-15"}\n'
+
+        assert list(iter_json_values(io.BytesIO(data))) == [{"calendarDate": "2024-01-15"}]
+
+    def test_empty_array(self):
+        """Should yield nothing for an empty array"""
+        assert list(iter_json_values(io.BytesIO(b" [ ] "))) == []
+
+    @pytest.mark.parametrize("data", [b"", b"[{\"a\": 1},", b"[{\"a\": 1} {\"b\": 2}]", b"[1, 2] x", b"{not json"])
+    def test_malformed_raises(self, data):
+        """Should raise JSONDecodeError for malformed or truncated input"""
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_values(io.BytesIO(data), chunk_size=4))
+
+    def test_elements_are_yielded_before_the_array_ends(self):
+        """Should not need the whole file to yield the first element"""
+        class Endless(io.RawIOBase):
+            started = False
+
+            def readinto(self, buffer):
+                chunk = b'{"x": 1}, ' if self.started else b'['
+                self.started = True
+                buffer[:len(chunk)] = chunk
+                return len(chunk)
+
+        values = iter_json_values(Endless(), chunk_size=16)
+
+        assert [next(values) for _ in range(3)] == [{"x": 1}] * 3
+
+
+class TestMultiDayFiles:
+    """Tests for files holding an array of days"""
+
+    def test_parse_sleep_array(self):
+        """Should map every night of an array"""
+        parsed = parse_sleep_json(sleep_nights(3), "sleep_2024.json", file_hash="h")
+
+        assert parsed["error"] is None
+        assert [str(record["date"]) for record in parsed["sleep_records"]] == [
+            "2024-01-01", "2024-01-02", "2024-01-03"
+        ]
+
+    def test_undated_night_is_skipped(self):
+        """Should skip a night that can't be dated and keep the rest"""
+        nights = sleep_nights(2) + [{"deepSleepSeconds": 100}]
+
+        parsed = parse_sleep_json(nights, "sleep_2024.json", file_hash="h")
+
+        assert parsed["error"] is None
+        assert len(parsed["sleep_records"]) == 2
+
+    def test_stream_insert_sleep_array(self, temp_db):
+        """Should insert every night of a streamed file"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        data = json.dumps(sleep_nights(31)).encode()
+
+        parsed = stream_sleep_json(io.BytesIO(data), "sleep_2024.json", "hash-1")
+        inserted = insert_sleep_data(parsed, temp_db.connection)
+
+        assert inserted == 31
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM sleep_detailed").fetchone()[0] == 31
+        assert temp_db.connection.execute(
+            "SELECT record_count FROM imported_files WHERE file_hash = 'hash-1'"
+        ).fetchone()[0] == 31
+
+    def test_stream_insert_sparse_daily_summaries(self, temp_db):
+        """Should store fields missing from a day as NULL"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        days = [
+            {"calendarDate": "2024-01-01", "totalSteps": 8000},
+            {"calendarDate": "2024-01-02", "restingHeartRate": 52}
+        ]
+
+        parsed = stream_daily_summary_json(io.BytesIO(json.dumps(days).encode()), "UdsFile_2024.json", "hash-2")
+        inserted = insert_daily_summary_data(parsed, temp_db.connection)
+
+        assert inserted == 2
+        assert temp_db.connection.execute(
+            "SELECT date, step_count, resting_heart_rate FROM daily_summaries ORDER BY date"
+        ).fetchall() == [("2024-01-01", 8000, None), ("2024-01-02", None, 52)]
+
+    def test_malformed_mid_stream_rolls_back(self, temp_db):
+        """Should keep none of a file that turns out malformed partway through"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        data = json.dumps(sleep_nights(5)).encode()[:-40]
+
+        parsed = stream_sleep_json(io.BytesIO(data), "sleep_2024.json", "hash-3")
+        inserted = insert_sleep_data(parsed, temp_db.connection)
+
+        assert inserted == 0
+        assert parsed["error"]
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM sleep_detailed").fetchone()[0] == 0
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM imported_files").fetchone()[0] == 0
+
+    def test_process_folder_reports_malformed_file(self, temp_dir, temp_db):
+        """Should report a file malformed partway through as an error"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        (temp_dir / "sleep_2024.json").write_text(json.dumps(sleep_nights(10)))
+        (temp_dir / "sleep_2023.json").write_text(json.dumps(sleep_nights(10))[:-30])
+
+        result = process_sleep_json_files(str(temp_dir), temp_db.connection)
+
+        assert result["files_processed"] == 1
+        assert result["total_records"] == 10
+        assert result["errors"] == 1
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_gdpr_export_ingests_every_day(self, temp_dir, temp_db, streaming):
+        """Should import all days of multi-day sleep and UDS arrays"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        zip_path = temp_dir / "export.zip"
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("DI_CONNECT/DI-Connect-Wellness/sleep_2024.json", json.dumps(sleep_nights(20)))
+            zf.writestr("DI_CONNECT/DI-Connect-Aggregator/UdsFile_2024.json", json.dumps([
+                {"calendarDate": f"2024-01-{day:02d}", "totalSteps": 1000 * day}
+                for day in range(1, 16)
+            ]))
+
+        result = process_gdpr_export(str(zip_path), temp_db.connection, resume=False, streaming=streaming)
+
+        assert result["total_records_inserted"] == 35
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM sleep_detailed").fetchone()[0] == 20
+        assert temp_db.connection.execute("SELECT COUNT(*) FROM daily_summaries").fetchone()[0] == 15
+
+
+# One file per category: (archive member, records, table, expected rows)
+CATEGORY_FILES = {
+    "hrv": ("DI_CONNECT/DI-Connect-Wellness/hrv_2024.json", [
+        {"calendarDate": "2024-01-01", "lastNightAvg": 48},
+        {"calendarDate": "2024-01-02", "lastNightAvg": 51},
+    ], "hrv_records", 2),
+    "stress": ("DI_CONNECT/DI-Connect-Wellness/stress_2024.json", [
+        {"calendarDate": "2024-01-01", "avgStressLevel": 31, "maxStressLevel": 88},
+        {"calendarDate": "2024-01-02"},
+    ], "daily_stress", 1),
+    "fitness_assessments": ("DI_CONNECT/DI-Connect-Metrics/MetricsMaxMetData_vo2max.json", [
+        {"calendarDate": "2024-01-01", "vo2MaxValue": 52.0, "sport": "RUNNING"},
+        {"calendarDate": "2024-01-01", "vo2MaxValue": 49.0, "sport": "CYCLING"},
+    ], "fitness_assessments", 2),
+    "hydration": ("DI_CONNECT/DI-Connect-Wellness/HydrationLogFile_2024.json", [
+        {"calendarDate": "2024-01-01", "timestampGMT": "2024-01-01T09:00:00.0", "valueInML": 500},
+        {"calendarDate": "2024-01-01", "valueInML": 250},
+    ], "hydration_logs", 2),
+    "body_composition": ("DI_CONNECT/DI-Connect-User/weight_2024.json", [
+        {"timestampGMT": 1704103200000, "weight": 72.5, "bodyFat": 18.2},
+        {"timestampGMT": 1704189600000, "weight": 72.1},
+    ], "body_composition", 2),
+    "menstrual_cycles": ("DI_CONNECT/DI-Connect-Wellness/menstrualCycles.json", [
+        {"startDate": "2024-01-03", "cycleLengthInDays": 28, "periodLengthInDays": 5},
+    ], "menstrual_cycles", 1),
+}
+
+
+class TestCategoryLoaders:
+    """Tests for the HRV, stress, fitness, hydration, body composition and cycle loaders"""
+
+    @pytest.mark.parametrize("category", sorted(CATEGORY_FILES))
+    def test_stream_insert(self, temp_db, category):
+        """Should map and insert every usable record of a file"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        name, records, table, expected = CATEGORY_FILES[category]
+
+        parsed = stream_category_json(category, io.BytesIO(json.dumps(records).encode()), name, "hash-1")
+        inserted = insert_category_data(category, parsed, temp_db.connection)
+
+        assert inserted == expected
+        assert temp_db.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == expected
+
+    @pytest.mark.parametrize("category", sorted(CATEGORY_FILES))
+    def test_reimport_does_not_duplicate(self, temp_db, category):
+        """Should upsert the same records from a second copy of a file"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        name, records, table, expected = CATEGORY_FILES[category]
+
+        for file_hash in ("hash-1", "hash-2"):
+            parsed = parse_category_json(category, records, name, file_hash)
+            insert_category_data(category, parsed, temp_db.connection)
+
+        assert temp_db.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == expected
+
+    def test_field_values(self, temp_db):
+        """Should convert dates and epoch timestamps and fill derived fields"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        conn = temp_db.connection
+        for category in ("hrv", "hydration", "body_composition"):
+            name, records, _, _ = CATEGORY_FILES[category]
+            insert_category_data(category, parse_category_json(category, records, name, category), conn)
+
+        assert conn.execute("SELECT date, hrv_value, measurement_type FROM hrv_records ORDER BY date").fetchall() == [
+            ("2024-01-01", 48.0, "unknown"), ("2024-01-02", 51.0, "unknown")
+        ]
+        assert conn.execute("SELECT timestamp_gmt, value_ml FROM hydration_logs ORDER BY value_ml").fetchall() == [
+            ("2024-01-01 00:00:00", 250), ("2024-01-01 09:00:00", 500)
+        ]
+        assert conn.execute(
+            "SELECT measurement_date, weight_kg, body_fat_percentage FROM body_composition ORDER BY measurement_date"
+        ).fetchall() == [("2024-01-01", 72.5, 18.2), ("2024-01-02", 72.1, None)]
+
+    def test_fitness_entries_merge(self, temp_db):
+        """Should keep both a VO2 max and a fitness age entry for the same day"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        conn = temp_db.connection
+        for file_hash, record in (("vo2max", {"calendarDate": "2024-01-01", "vo2MaxValue": 50.0}),
+                                  ("fitness-age", {"calendarDate": "2024-01-01", "fitnessAge": 30})):
+            insert_category_data("fitness_assessments", parse_category_json(
+                "fitness_assessments", [record], f"{file_hash}.json", file_hash
+            ), conn)
+
+        assert conn.execute("SELECT assessment_date, vo2_max_value, fitness_age FROM fitness_assessments").fetchall() == [
+            ("2024-01-01", 50.0, 30)
+        ]
+
+    def test_untimed_hydration_entries_are_kept(self, temp_db):
+        """Should store each manual hydration entry of a day, not just the last"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        conn = temp_db.connection
+        records = [
+            {"calendarDate": "2024-01-01", "valueInML": 250, "source": "MANUAL"},
+            {"calendarDate": "2024-01-01", "valueInML": 250, "source": "MANUAL"},
+            {"calendarDate": "2024-01-01", "valueInML": 500, "source": "MANUAL"},
+        ]
+
+        for file_hash in ("hash-1", "hash-2"):
+            insert_category_data("hydration", parse_category_json(
+                "hydration", records, "hydration.json", file_hash
+            ), conn)
+
+        assert conn.execute("SELECT COUNT(*), SUM(value_ml) FROM hydration_logs").fetchone() == (3, 1000)
+
+    def test_undatable_file_is_an_error(self):
+        """Should report a file none of whose records can be dated"""
+        parsed = parse_category_json("menstrual_cycles", [{"cycleLengthInDays": 28}], "cycles.json", "hash")
+
+        assert "start date" in parsed["error"]
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_gdpr_export_populates_every_table(self, temp_dir, temp_db, streaming):
+        """Should load every categorized data type in one import"""
+        temp_db.connect()
+        temp_db.initialize_schema()
+        zip_path = temp_dir / "export.zip"
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("DI_CONNECT/DI-Connect-Wellness/sleep_2024.json", json.dumps(sleep_nights(3)))
+            for name, records, _, _ in CATEGORY_FILES.values():
+                zf.writestr(name, json.dumps(records))
+
+        result = process_gdpr_export(str(zip_path), temp_db.connection, resume=False, streaming=streaming)
+
+        for category, (_, _, table, expected) in CATEGORY_FILES.items():
+            assert result["by_category"][category] == {
+                "found": 1, "processed": 1, "records": expected, "errors": 0
+            }, category
+            assert temp_db.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == expected
+        assert result["by_category"]["sleep_json"]["records"] == 3
+        assert result["success"] is True
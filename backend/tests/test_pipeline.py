@@ -0,0 +1,104 @@
+"""
+Tests for the pipelined category import.
+
+Tests:
+- Categories are parsed concurrently and all results reach the writer
+- Parse and producer failures are reported to the writer
+- Closing the pipeline stops producers blocked on a full queue
+"""
+import threading
+import time
+
+import pytest
+
+from ingestion.pipeline import CategoryPipeline
+
+
+class TestCategoryPipeline:
+    """Tests for CategoryPipeline"""
+
+    def test_categories_run_concurrently(self):
+        """Should take about as long as the slowest category, not the sum"""
+        def slow_parse(item):
+            time.sleep(0.05)
+            return item * 2
+
+        pipeline = CategoryPipeline()
+        started = time.perf_counter()
+        for category in ("a", "b", "c"):
+            pipeline.add_threaded_category(category, range(4), slow_parse, threads=1)
+        try:
+            results = list(pipeline.results())
+        finally:
+            pipeline.close()
+        elapsed = time.perf_counter() - started
+
+        # Sequentially: 3 categories x 4 items x 50ms = 600ms
+        assert elapsed < 0.45
+        assert sorted((category, item, result) for category, item, result, _ in results) == [
+            (category, item, item * 2) for category in "abc" for item in range(4)
+        ]
+
+    def test_parse_errors_are_reported(self):
+        """Should hand a failed item's exception to the writer and carry on"""
+        def parse(item):
+            if item == 2:
+                raise ValueError("bad item")
+            return item
+
+        pipeline = CategoryPipeline()
+        pipeline.add_threaded_category("a", range(4), parse, threads=2)
+        try:
+            results = {item: (result, error) for _, item, result, error in pipeline.results()}
+        finally:
+            pipeline.close()
+
+        assert sorted(results) == [0, 1, 2, 3]
+        assert results[1] == (1, None)
+        assert results[2][0] is None
+        assert str(results[2][1]) == "bad item"
+
+    def test_producer_failure_is_reported(self):
+        """Should report a failing producer once instead of hanging the writer"""
+        def broken():
+            yield "first", 1, None
+            raise RuntimeError("pool died")
+
+        pipeline = CategoryPipeline()
+        pipeline.add_producer("fit_files", broken())
+        try:
+            results = list(pipeline.results())
+        finally:
+            pipeline.close()
+
+        assert results[0] == ("fit_files", "first", 1, None)
+        category, item, result, error = results[1]
+        assert (category, item, result) == ("fit_files", None, None)
+        assert str(error) == "pool died"
+
+    def test_close_stops_blocked_producers(self):
+        """Should stop producers waiting on a full queue when the writer gives up"""
+        closed = threading.Event()
+
+        def endless():
+            try:
+                i = 0
+                while True:
+                    yield i, i, None
+                    i += 1
+            finally:
+                closed.set()
+
+        pipeline = CategoryPipeline(queue_size=2)
+        pipeline.add_producer("a", endless())
+
+        with pytest.raises(KeyboardInterrupt):
+            try:
+                for _, item, _, _ in pipeline.results():
+                    if item == 5:
+                        raise KeyboardInterrupt
+            finally:
+                pipeline.close()
+
+        assert closed.is_set()
+        assert not any(thread.is_alive() for thread in pipeline._threads)
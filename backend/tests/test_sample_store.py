@@ -0,0 +1,132 @@
+"""
+Tests for the columnar activity sample store.
+
+Tests:
+- Building typed columns from FIT record dicts
+- Bulk write / single-call read round trip
+- Session slicing for multisport files
+- Samples written by the FIT import pipeline
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from db.sample_store import (
+    build_sample_columns,
+    slice_samples,
+    write_activity_samples,
+    read_activity_samples
+)
+from ingestion.fit_folder import FitFile, process_fit_folder
+from tests.fit_builder import write_fit_file, sample_activity_messages
+
+
+def _records(start, count):
+    return [
+        {
+            "timestamp": start + timedelta(seconds=i),
+            "heart_rate": 120 + i,
+            "enhanced_speed": 3.5,
+            "speed": 3.0,
+            "position_lat": 2 ** 30 if i % 2 == 0 else None,
+        }
+        for i in range(count)
+    ]
+
+
+class TestBuildSampleColumns:
+    """Tests for build_sample_columns"""
+
+    def test_builds_typed_columns(self):
+        """Should produce one typed array per channel that has data"""
+        columns = build_sample_columns(_records(datetime(2024, 1, 15, 7, 0), 5))
+
+        assert set(columns) == {"timestamp", "heart_rate", "speed", "position_lat"}
+        assert columns["timestamp"].dtype == np.dtype("<i8")
+        assert columns["heart_rate"].dtype == np.dtype("<f4")
+        assert columns["heart_rate"].tolist() == [120, 121, 122, 123, 124]
+
+    def test_prefers_enhanced_fields(self):
+        """Should read enhanced_speed ahead of speed"""
+        columns = build_sample_columns(_records(datetime(2024, 1, 15, 7, 0), 3))
+
+        assert columns["speed"].tolist() == pytest.approx([3.5, 3.5, 3.5])
+
+    def test_missing_values_are_nan(self):
+        """Should store gaps as NaN and convert semicircles to degrees"""
+        columns = build_sample_columns(_records(datetime(2024, 1, 15, 7, 0), 3))
+
+        lat = columns["position_lat"]
+        assert lat[0] == pytest.approx(90.0)
+        assert np.isnan(lat[1])
+
+    def test_empty_stream(self):
+        """Should return no columns for an empty stream"""
+        assert build_sample_columns([]) == {}
+
+
+class TestSampleStoreRoundTrip:
+    """Tests for write_activity_samples / read_activity_samples"""
+
+    def test_write_and_read(self, temp_db):
+        """Should read back exactly what was written in one call"""
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+        columns = build_sample_columns(_records(datetime(2024, 1, 15, 7, 0), 100))
+
+        written = write_activity_samples(conn, [(42, columns)], "abc")
+        conn.commit()
+        result = read_activity_samples(conn, 42)
+
+        assert written == len(columns)
+        assert set(result) == set(columns)
+        for channel, values in columns.items():
+            np.testing.assert_array_equal(result[channel], values)
+
+    def test_read_channel_subset(self, temp_db):
+        """Should load only the requested channels"""
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+        write_activity_samples(conn, [(1, build_sample_columns(_records(datetime(2024, 1, 15), 10)))])
+
+        result = read_activity_samples(conn, 1, ["heart_rate"])
+
+        assert list(result) == ["heart_rate"]
+
+    def test_read_unknown_activity(self, temp_db):
+        """Should return an empty dict when nothing is stored"""
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+
+        assert read_activity_samples(conn, 999) == {}
+
+    def test_slice_samples(self):
+        """Should select samples inside a session's time window"""
+        start = datetime(2024, 1, 15, 7, 0)
+        columns = build_sample_columns(_records(start, 60))
+
+        sliced = slice_samples(columns, start + timedelta(seconds=10), start + timedelta(seconds=19))
+
+        assert len(sliced["timestamp"]) == 10
+        assert sliced["heart_rate"][0] == 130
+
+
+@pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
+class TestSamplesFromFitImport:
+    """Samples should be stored when FIT activities are imported"""
+
+    def test_import_stores_samples(self, temp_dir, temp_db):
+        """Should store one stream per channel for the imported activity"""
+        start = datetime(2024, 1, 15, 7, 0)
+        write_fit_file(temp_dir / "run.fit", sample_activity_messages(start, seconds=120))
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+
+        process_fit_folder(str(temp_dir), conn)
+
+        activity_id = conn.execute("SELECT id FROM activities").fetchone()[0]
+        samples = read_activity_samples(conn, activity_id)
+        assert len(samples["timestamp"]) == 120
+        assert samples["heart_rate"][0] == 120
+        assert samples["power"].dtype == np.dtype("<f4")
@@ -0,0 +1,103 @@
+"""
+Tests for incremental Garmin Express sync.
+
+Tests:
+- Unchanged files are skipped on stat alone (no hashing)
+- Touched or moved files are confirmed by hash and not re-imported
+- Changed files are re-imported as updates
+"""
+import os
+from datetime import datetime
+
+import pytest
+
+import sync.sync_engine as sync_engine
+from ingestion.fit_folder import FitFile
+from tests.fit_builder import write_fit_file, sample_activity_messages
+
+pytestmark = pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
+
+
+@pytest.fixture
+def conn(temp_db):
+    connection = temp_db.connect()
+    temp_db.initialize_schema()
+    return connection
+
+
+@pytest.fixture
+def device_dir(temp_dir):
+    device = temp_dir / "device"
+    device.mkdir()
+    write_fit_file(device / "run.fit", sample_activity_messages(datetime(2024, 1, 15, 7, 0), seconds=10))
+    return device
+
+
+def _forbid_hashing(monkeypatch):
+    def fail(file_path):
+        raise AssertionError(f"unexpected hash of {file_path}")
+    monkeypatch.setattr(sync_engine, "compute_file_hash", fail)
+
+
+class TestIncrementalSync:
+    """Tests for stat-first change detection"""
+
+    def test_noop_sync_does_not_hash(self, conn, device_dir, monkeypatch):
+        """A second sync of untouched files should only stat them"""
+        first = sync_engine.sync_garmin_express_device("dev1", str(device_dir), conn)
+        assert first["files_new"] == 1
+
+        _forbid_hashing(monkeypatch)
+        second = sync_engine.sync_garmin_express_device("dev1", str(device_dir), conn)
+
+        assert second["files_skipped"] == 1
+        assert second["files_new"] == 0
+
+    def test_touched_file_is_hashed_once(self, conn, device_dir, monkeypatch):
+        """A new mtime with the same content should be confirmed by hash, then remembered"""
+        sync_engine.sync_garmin_express_device("dev1", str(device_dir), conn)
+        path = device_dir / "run.fit"
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + 60))
+
+        touched = sync_engine.sync_garmin_express_device("dev1", str(device_dir), conn)
+        assert touched["files_skipped"] == 1
+
+        _forbid_hashing(monkeypatch)
+        again = sync_engine.sync_garmin_express_device("dev1", str(device_dir), conn)
+        assert again["files_skipped"] == 1
+
+    def test_changed_file_is_updated(self, conn, device_dir):
+        """New content at a known path should count as an update"""
+        sync_engine.sync_garmin_express_device("dev1", str(device_dir), conn)
+        write_fit_file(device_dir / "run.fit", sample_activity_messages(datetime(2024, 1, 16, 7, 0), seconds=12))
+
+        summary = sync_engine.sync_garmin_express_device("dev1", str(device_dir), conn)
+
+        assert summary["files_updated"] == 1
+        assert summary["files_new"] == 0
+
+    def test_is_file_changed_without_registry(self, conn, device_dir):
+        """Should fall back to a per-path lookup when no registry is passed"""
+        path = str(device_dir / "run.fit")
+        assert sync_engine.is_file_changed(path, conn) is True
+
+        sync_engine.sync_garmin_express_device("dev1", str(device_dir), conn)
+
+        assert sync_engine.is_file_changed(path, conn) is False
+
+    def test_new_file_is_read_once(self, conn, device_dir, monkeypatch):
+        """Hashing and parsing a new file should share a single read"""
+        import builtins
+        import ingestion.file_buffer as file_buffer
+        opened = []
+
+        def counting_open(path, *args, **kwargs):
+            opened.append(str(path))
+            return builtins.open(path, *args, **kwargs)
+
+        monkeypatch.setattr(file_buffer, "open", counting_open, raising=False)
+        summary = sync_engine.sync_garmin_express_device("dev1", str(device_dir), conn)
+
+        assert summary["files_new"] == 1
+        assert opened == [str(device_dir / "run.fit")]
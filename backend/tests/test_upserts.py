@@ -0,0 +1,125 @@
+"""
+Tests for stable record keys and natural-key upserts.
+
+Tests:
+- Keys are identical across processes (no hash randomization)
+- Upserts skip rows whose values are unchanged
+- Re-importing the same recording does not duplicate rows
+"""
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+from db.upserts import stable_record_id, fit_file_identity, upsert_sql
+from ingestion.fit_folder import FitFile, process_fit_folder
+from tests.fit_builder import write_fit_file, sample_activity_messages, sample_monitoring_messages
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStableRecordId:
+    """Tests for stable_record_id"""
+
+    def test_deterministic_across_processes(self):
+        """Should give the same key in a process with a different hash seed"""
+        script = (
+            "from datetime import datetime; from db.upserts import stable_record_id; "
+            "print(stable_record_id('stress', datetime(2024, 1, 15, 7, 0)))"
+        )
+        env = dict(os.environ, PYTHONHASHSEED="12345")
+        output = subprocess.run(
+            [sys.executable, "-c", script], cwd=BACKEND_DIR, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+        assert int(output) == stable_record_id("stress", datetime(2024, 1, 15, 7, 0))
+
+    def test_positive_63_bit(self):
+        """Should fit a signed 64-bit INTEGER PRIMARY KEY"""
+        for i in range(100):
+            assert 0 <= stable_record_id("activity", i) < 2 ** 63
+
+    def test_parts_are_distinct(self):
+        """Should not collide when parts are concatenated differently"""
+        assert stable_record_id("ab", "c") != stable_record_id("a", "bc")
+
+    def test_fit_file_identity_fallback(self):
+        """Should fall back to the file hash when file_id is missing"""
+        assert fit_file_identity({}, "abc") == "abc"
+        assert fit_file_identity({"serial_number": 1, "time_created": 2}, "abc") != "abc"
+
+
+class TestUpsertSql:
+    """Tests for upsert_sql"""
+
+    SQL = upsert_sql("daily_steps", ("date", "step_count", "source_file_hash"), ("date",))
+
+    def test_skips_unchanged_rows(self, temp_db):
+        """Should not write when only the source file differs"""
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+        conn.execute(self.SQL, ("2024-01-15", 100, "a"))
+
+        before = conn.total_changes
+        conn.execute(self.SQL, ("2024-01-15", 100, "b"))
+        assert conn.total_changes == before
+
+        conn.execute(self.SQL, ("2024-01-15", 150, "b"))
+        assert conn.total_changes == before + 1
+        row = conn.execute("SELECT step_count, source_file_hash FROM daily_steps").fetchone()
+        assert tuple(row) == (150, "b")
+
+
+    def test_merge_columns_keep_values(self, temp_db):
+        """Should leave merged columns alone when the incoming value is NULL"""
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+        sql = upsert_sql(
+            "daily_stress", ("date", "avg_stress", "max_stress"), ("date",),
+            touch_column=None, merge_columns=("avg_stress", "max_stress")
+        )
+        conn.execute(sql, ("2024-01-15", 30, None))
+        conn.execute(sql, ("2024-01-15", None, 80))
+
+        before = conn.total_changes
+        conn.execute(sql, ("2024-01-15", None, 80))
+        assert conn.total_changes == before
+        assert tuple(conn.execute("SELECT avg_stress, max_stress FROM daily_stress").fetchone()) == (30, 80)
+
+@pytest.mark.skipif(FitFile is None, reason="fitparse not installed")
+class TestStableFitImport:
+    """Re-imported recordings should map onto existing rows"""
+
+    def test_reexported_activity_is_not_duplicated(self, temp_dir, temp_db):
+        """A copy with different bytes but the same file_id should reuse the activity row"""
+        start = datetime(2024, 1, 15, 7, 0)
+        messages = sample_activity_messages(start, seconds=30)
+        write_fit_file(temp_dir / "run.fit", messages)
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+        process_fit_folder(str(temp_dir), conn)
+        first_id = conn.execute("SELECT id FROM activities").fetchone()[0]
+
+        # Different bytes (one sample changed), same recording
+        messages[5][1]["heart_rate"] = 99
+        (temp_dir / "run.fit").unlink()
+        write_fit_file(temp_dir / "run_copy.fit", messages)
+        process_fit_folder(str(temp_dir), conn)
+
+        assert conn.execute("SELECT COUNT(*) FROM imported_files").fetchone()[0] == 2
+        assert [tuple(r) for r in conn.execute("SELECT id FROM activities").fetchall()] == [(first_id,)]
+
+    def test_overlapping_stress_is_not_duplicated(self, temp_dir, temp_db):
+        """Stress samples at the same timestamp from two files should be stored once"""
+        start = datetime(2024, 1, 15)
+        write_fit_file(temp_dir / "day1.fit", sample_monitoring_messages(start, intervals=8))
+        write_fit_file(temp_dir / "day1_late.fit", sample_monitoring_messages(start, intervals=12))
+        conn = temp_db.connect()
+        temp_db.initialize_schema()
+
+        process_fit_folder(str(temp_dir), conn)
+
+        assert conn.execute("SELECT COUNT(*) FROM stress_records").fetchone()[0] == 12
@@ -0,0 +1,193 @@
+"""
+Date and Timestamp Parsing
+
+Shared parsers for the date and timestamp strings in Garmin exports
+("2024-01-15", "2024-01-15T08:30:00.0", "2024-01-15T08:30:00Z").
+
+- parse_date() memoizes calendar dates: ten years of records repeat the
+  same few thousand dates across sleep, summaries, HRV and stress files
+- parse_timestamp() parses one timestamp (these rarely repeat, so no cache)
+- parse_iso_column() / iso_to_epoch() parse a whole column of timestamps
+  into a datetime64 / epoch int array in one numpy call
+
+Unparseable values give None (NaT in arrays) and a warning; warnings are
+rate-limited so a bad export can't flood the log.
+"""
+
+import logging
+import time
+import warnings
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Distinct calendar date strings kept by parse_date() (about 27 years of days)
+DATE_CACHE_SIZE = 10_000
+
+# int64 value of NaT in iso_to_epoch() results
+NAT_EPOCH = np.iinfo(np.int64).min
+
+
+class RateLimitedWarnings:
+    """
+    Logs at most `burst` warnings per `interval` seconds
+
+    Warnings past the limit are counted, and the count is reported with the
+    first warning of the next interval.
+    """
+
+    def __init__(self, log: logging.Logger, burst: int = 5, interval: float = 60.0):
+        self.log = log
+        self.burst = burst
+        self.interval = interval
+        self._window_start = float("-inf")
+        self._logged = 0
+        self.suppressed = 0
+
+    def warning(self, message: str):
+        now = time.monotonic()
+        if now - self._window_start >= self.interval:
+            if self.suppressed:
+                self.log.warning(f"Suppressed {self.suppressed} similar warnings")
+            self._window_start = now
+            self._logged = 0
+            self.suppressed = 0
+
+        if self._logged < self.burst:
+            self._logged += 1
+            self.log.warning(message)
+        else:
+            self.suppressed += 1
+
+
+_warnings = RateLimitedWarnings(logger)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date_str(date_str: str) -> Optional[date]:
+    # Common formats: "2024-01-15", "2024-01-15T08:30:00.0"
+    try:
+        if 'T' in date_str:
+            return datetime.fromisoformat(date_str.replace('Z', '')).date()
+        return datetime.fromisoformat(date_str).date()
+    except ValueError:
+        _warnings.warning(f"Could not parse date: {date_str}")
+        return None
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """
+    Parse various date formats found in Garmin JSON files
+
+    Args:
+        value: Date string; date/datetime values are passed through
+
+    Returns:
+        date object or None if parsing fails
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        _warnings.warning(f"Could not parse date: {value!r}")
+        return None
+    return _parse_date_str(value)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    Parse timestamp formats found in Garmin JSON files
+
+    A trailing 'Z' gives a UTC-aware datetime; other strings keep whatever
+    offset they carry (none, for Garmin's *GMT fields).
+
+    Args:
+        value: Timestamp string; datetime values are passed through
+
+    Returns:
+        datetime object or None if parsing fails
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        if value.endswith('Z'):
+            value = value[:-1] + '+00:00'
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError, AttributeError):
+        _warnings.warning(f"Could not parse timestamp: {value}")
+        return None
+
+
+def date_cache_info():
+    """parse_date() cache statistics (functools CacheInfo)"""
+    return _parse_date_str.cache_info()
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_iso_column(values: Iterable[Any], unit: str = "s") -> np.ndarray:
+    """
+    Parse a column of ISO timestamps into a datetime64 array
+
+    Naive strings (Garmin's *GMT fields) are taken as UTC; strings with a
+    'Z' or an offset are converted to UTC. The column is parsed by numpy in
+    one call; only if that fails is it parsed value by value, with NaT for
+    empty or unparseable values.
+
+    Args:
+        values: ISO strings (None, datetime and date values are accepted)
+        unit: datetime64 unit ('s', 'ms', 'us', 'D', ...)
+
+    Returns:
+        datetime64[unit] array
+    """
+    # numpy rejects timezone designators; a trailing Z is just UTC
+    column = [
+        value[:-1] if isinstance(value, str) and value.endswith('Z') else
+        (_naive_utc(value) if isinstance(value, datetime) else (value or "NaT"))
+        for value in values
+    ]
+    dtype = f"datetime64[{unit}]"
+    try:
+        # numpy only warns on (and misreads) other offsets: take the slow path
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            return np.array(column, dtype=dtype)
+    except (ValueError, TypeError, UserWarning, DeprecationWarning):
+        pass
+
+    parsed = np.empty(len(column), dtype=dtype)
+    for index, value in enumerate(column):
+        if isinstance(value, str):
+            value = parse_timestamp(value) if value != "NaT" else None
+        if isinstance(value, datetime):
+            value = _naive_utc(value)
+        parsed[index] = np.datetime64(value, unit) if value is not None else np.datetime64("NaT", unit)
+    return parsed
+
+
+def iso_to_epoch(values: Iterable[Any], unit: str = "s") -> np.ndarray:
+    """
+    Parse a column of ISO timestamps into epoch ints
+
+    Args:
+        values: As for parse_iso_column()
+        unit: Epoch unit ('s', 'ms', 'us')
+
+    Returns:
+        int64 array of units since 1970-01-01 UTC; NaT becomes NAT_EPOCH
+    """
+    return parse_iso_column(values, unit).astype(np.int64)